@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+from decimal import Decimal
+
+from main import build_engines, build_handler, build_order_manager, build_risk_manager
+from okx_trader import AppConfig, FixedPointCodec, StorageManager
+from okx_trader.backtest import BacktestExecutionEngine, SimulatedFillModel
+from okx_trader.recorder import read_frames
+from okx_trader.replay import ReplayClock, ReplayDriver
+from okx_trader.sweep import infer_codecs
+
+
+async def run(args: argparse.Namespace) -> None:
+    config = AppConfig.from_env()
+    logging.basicConfig(level=logging.ERROR, format="%(asctime)s %(levelname)s %(name)s - %(message)s")
+    logger = logging.getLogger("okx_trader.backtest")
+    clock = ReplayClock()
+    codecs = {}
+    if config.fixed_point:
+        if args.tick_size and args.lot_size:
+            codec = FixedPointCodec(tick_size=Decimal(args.tick_size), lot_size=Decimal(args.lot_size))
+            codecs = {instrument_id: codec for instrument_id in config.instruments}
+        else:
+            codecs = infer_codecs(read_frames(args.recordings), config.instruments)
+    feature_engines, strategy_engines = build_engines(config, codecs)
+    execution = BacktestExecutionEngine(
+        clock,
+        SimulatedFillModel(
+            latency_ns=int(args.latency_ms * 1_000_000),
+            order_ttl_ns=int(args.order_ttl_ms * 1_000_000),
+        ),
+        codecs=codecs,
+    )
+    risk_manager = build_risk_manager(config)
+    execution.order_listeners.append(risk_manager.on_order_update)
+    order_manager = build_order_manager(config, execution, clock)
+    if order_manager is not None:
+        execution.order_listeners.append(order_manager.on_order_update)
+    handler = build_handler(
+        codecs,
+        feature_engines,
+        strategy_engines,
+        risk_manager,
+        StorageManager(),
+        execution,
+        logger,
+        clock=clock,
+        order_manager=order_manager,
+    )
+    driver = ReplayDriver(config.instruments, codecs=codecs, validate_checksum=not args.no_checksum, clock=clock)
+    stats = await driver.run(read_frames(args.recordings), handler, on_book=execution.on_book)
+    print(
+        f"Replayed {stats.frames:,} frames ({stats.applied:,} applied, {stats.rejected:,} rejected, "
+        f"{stats.skipped:,} skipped) in {stats.elapsed:.1f} s: {stats.frames_per_second * 60:,.0f} frames/min."
+    )
+    print(
+        f"Orders: {execution.orders_submitted:,} submitted, {execution.orders_rejected:,} rejected, "
+        f"{execution.orders_expired:,} expired, {len(execution.fills):,} fills."
+    )
+    if order_manager is not None:
+        manager = order_manager.stats
+        print(
+            f"Order manager: {manager.signals:,} signals -> {manager.requests:,} requests ({manager.placed:,} placed, "
+            f"{manager.amended:,} amended, {manager.cancelled:,} cancelled, {manager.rejected:,} rejected, "
+            f"{manager.blocked:,} blocked by risk)."
+        )
+    for instrument_id, engine in strategy_engines.items():
+        for name, entry in engine.summary().items():
+            print(f"{instrument_id} strategy {name}: " + " ".join(f"{key}={value}" for key, value in entry.items()))
+    rejections = ", ".join(f"{count:,} {reason}" for reason, count in risk_manager.rejections.items()) or "none"
+    print(f"Risk: daily loss {risk_manager.daily_loss}, pre-trade rejections: {rejections}.")
+    for instrument_id, position in risk_manager.snapshot().items():
+        print(f"{instrument_id} (risk): " + " ".join(f"{key}={value}" for key, value in position.items()))
+    for instrument_id, summary in execution.summary().items():
+        print(f"{instrument_id}: " + " ".join(f"{key}={value}" for key, value in summary.items()))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay recorded books-l2-tbt frames through the trading pipeline.")
+    parser.add_argument("recordings", nargs="+", help="recording files, globs or directories (RECORD_DIR output)")
+    parser.add_argument("--latency-ms", type=float, default=5, help="order entry latency of the fill model")
+    parser.add_argument("--order-ttl-ms", type=float, default=1000, help="resting order lifetime")
+    parser.add_argument("--tick-size", help="FIXED_POINT price scale (default: inferred from the recordings)")
+    parser.add_argument("--lot-size", help="FIXED_POINT size scale (default: inferred from the recordings)")
+    parser.add_argument("--no-checksum", action="store_true", help="skip per-frame checksum validation")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
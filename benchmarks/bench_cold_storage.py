@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import tempfile
+import time
+from decimal import Decimal
+
+from okx_trader.cold_storage import ColdStorageWriter
+from okx_trader.features import FeatureSnapshot
+
+from .synthetic import make_updates
+
+
+def _percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))] if ordered else 0.0
+
+
+async def _probe(lags, stop: asyncio.Event, interval: float = 0.001) -> None:
+    # Sleep overshoot is the time other work (here, the writer thread holding the GIL) stole from the loop.
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append((time.perf_counter() - start - interval) * 1e3)
+
+
+async def _produce(writer, instruments: int, rate: int, seconds: float, frames) -> float:
+    snapshot = FeatureSnapshot(
+        ofi=Decimal("1.5"),
+        wmp=Decimal("-0.25"),
+        liquidity_vacuum=Decimal("0.1"),
+        bid_pressure=Decimal("40.2"),
+        ask_pressure=Decimal("38.7"),
+    )
+    names = [f"BENCH{idx}-USDT" for idx in range(instruments)]
+    period = 1 / rate
+    ticks = int(rate * seconds)
+    enqueue = 0.0
+    start = time.perf_counter()
+    for tick in range(ticks):
+        frame = frames[tick % len(frames)]
+        if writer is not None:
+            begin = time.perf_counter()
+            for name in names:
+                writer.write_book_delta(name, frame)
+                writer.write_features(name, snapshot, 3)
+            enqueue += time.perf_counter() - begin
+        delay = start + (tick + 1) * period - time.perf_counter()
+        await asyncio.sleep(max(0.0, delay))
+    return enqueue / max(1, ticks * instruments) * 1e6
+
+
+async def run(instruments: int, rate: int, seconds: float, flush_rows: int, compression: str) -> None:
+    frames = [
+        {"action": "update", "data": [{"bids": bids, "asks": asks, "seqId": idx + 1, "prevSeqId": idx, "ts": "0"}]}
+        for idx, (bids, asks) in enumerate(make_updates(2000, 400))
+    ]
+    for label, enabled in (("no writer", False), ("cold writer", True)):
+        with tempfile.TemporaryDirectory() as root:
+            writer = ColdStorageWriter(root, flush_rows=flush_rows, compression=compression) if enabled else None
+            if writer:
+                writer.start()
+            lags = []
+            stop = asyncio.Event()
+            probe = asyncio.create_task(_probe(lags, stop))
+            started = time.perf_counter()
+            enqueue_us = await _produce(writer, instruments, rate, seconds, frames)
+            stop.set()
+            await probe
+            line = (
+                f"{label:<12} loop lag p50={_percentile(lags, 0.5):5.2f} ms "
+                f"p99={_percentile(lags, 0.99):5.2f} ms max={max(lags):6.2f} ms"
+            )
+            if writer:
+                writer.stop()
+                elapsed = time.perf_counter() - started
+                metrics = writer.metrics
+                line += (
+                    f"  enqueue={enqueue_us:4.2f} us/tick  rows={metrics.rows_written} "
+                    f"({metrics.rows_written / elapsed:,.0f} rows/s) files={metrics.files_written} "
+                    f"bytes/row={metrics.bytes_written / max(1, metrics.rows_written):.1f} "
+                    f"max_pending={metrics.max_pending}"
+                )
+            print(line)
+
+    with tempfile.TemporaryDirectory() as root:
+        writer = ColdStorageWriter(root, flush_rows=flush_rows, compression=compression)
+        writer.start()
+        snapshot = FeatureSnapshot(*(Decimal("1.5"),) * 5)
+        started = time.perf_counter()
+        for idx in range(200_000):
+            writer.write_book_delta("BENCH-USDT", frames[idx % len(frames)])
+            writer.write_features("BENCH-USDT", snapshot, 3)
+        writer.stop()
+        elapsed = time.perf_counter() - started
+        rows = writer.metrics.rows_written
+        print(f"burst        {rows:,} rows in {elapsed:.2f} s ({rows / elapsed:,.0f} rows/s)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Cold-tier Parquet writer throughput and event-loop stall.")
+    parser.add_argument("--instruments", type=int, default=10)
+    parser.add_argument("--rate", type=int, default=500, help="ticks per second per instrument")
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--flush-rows", type=int, default=50_000)
+    parser.add_argument("--compression", default="zstd")
+    args = parser.parse_args()
+    asyncio.run(run(args.instruments, args.rate, args.seconds, args.flush_rows, args.compression))
+
+
+if __name__ == "__main__":
+    main()
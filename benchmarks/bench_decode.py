@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from typing import Dict, List
+
+from okx_trader.decoding import available_decoders, make_decoder
+from okx_trader.orderbook_stream import OrderBookStreamer
+from okx_trader.recorder import read_frames
+from okx_trader.utils import MonotonicClock, json_dumps
+from tests.mock_server import build_book_frames
+
+from .synthetic import make_snapshot, make_updates
+
+
+def _corpus(paths: List[str], frames: int, levels: int) -> List[bytes]:
+    if paths:
+        return [raw for _, raw in read_frames(paths)][: frames or None]
+    stream = build_book_frames("BENCH-USDT", make_snapshot(levels), make_updates(frames, levels))
+    return [json_dumps(frame).encode() for frame in stream]
+
+
+def _legacy(raw: bytes, now_ns: int):
+    # The previous stream() + _calc_latency_ms: a full dict per frame, then re-walked.
+    data = json.loads(raw)
+    entries = data.get("data")
+    if entries and entries[0].get("ts"):
+        return now_ns // 1_000_000 - int(entries[0]["ts"])
+    return None
+
+
+def _decode_with_latency(decode, raw: bytes, now_ns: int):
+    message = decode(raw)
+    return None if message.ts_ms is None else now_ns // 1_000_000 - message.ts_ms
+
+
+def _per_message_ns(fn, corpus: List[bytes], clock, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        for raw in corpus:
+            fn(raw, clock())
+        best = min(best, time.perf_counter_ns() - start)
+    return best / len(corpus)
+
+
+def _apply_ns(name: str, corpus: List[bytes], repeat: int) -> float:
+    decode = make_decoder(name).decode
+    best = float("inf")
+    for _ in range(repeat):
+        streamers: Dict[str, OrderBookStreamer] = {}
+        start = time.perf_counter_ns()
+        for raw in corpus:
+            message = decode(raw)
+            streamer = streamers.get(message.instrument_id)
+            if streamer is None:
+                streamer = streamers[message.instrument_id] = OrderBookStreamer(
+                    message.instrument_id, validate_checksum=False
+                )
+            streamer.apply_message(message)
+        best = min(best, time.perf_counter_ns() - start)
+    return best / len(corpus)
+
+
+def run(paths: List[str], frames: int, levels: int, repeat: int) -> None:
+    corpus = _corpus(paths, frames, levels)
+    clock = MonotonicClock()
+    size = sum(len(raw) for raw in corpus) / len(corpus)
+    print(f"corpus: {len(corpus):,} frames, {size:.0f} B/frame avg")
+    legacy = _per_message_ns(_legacy, corpus, clock, repeat)
+    print(f"{'legacy json.loads':24s} decode+latency {legacy:7.0f} ns/msg")
+    for name in available_decoders():
+        decode = make_decoder(name).decode
+        cost = _per_message_ns(
+            lambda raw, now, decode=decode: _decode_with_latency(decode, raw, now), corpus, clock, repeat
+        )
+        applied = _apply_ns(name, corpus, repeat)
+        print(
+            f"{name:24s} decode+latency {cost:7.0f} ns/msg ({legacy / cost:4.2f}x)  "
+            f"decode+apply {applied:7.0f} ns/msg"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-message decode cost of the pluggable frame decoders.")
+    parser.add_argument("corpus", nargs="*", help="recorded frames (RECORD_DIR output); synthetic if omitted")
+    parser.add_argument("--frames", type=int, default=20_000, help="synthetic frames, or cap on recorded ones")
+    parser.add_argument("--levels", type=int, default=400)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(args.corpus, args.frames, args.levels, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import argparse
+import time
+from decimal import Decimal
+
+from okx_trader.features import FeatureEngine
+from okx_trader.fixed_point import FixedPointCodec
+from okx_trader.orderbook import OrderBook
+from okx_trader.vector_features import VectorFeatureEngine
+
+from .synthetic import make_snapshot, make_updates
+
+
+def run(levels: int, ticks: int, depth: int) -> None:
+    snapshot = make_snapshot(levels)
+    deltas = list(make_updates(ticks, levels))
+
+    book = OrderBook("BENCH-USDT", depth=levels)
+    book.apply_snapshot(*snapshot)
+    scalar = FeatureEngine(depth=depth)
+    vector = VectorFeatureEngine(depth=depth)
+    worst = 0.0
+    for delta in deltas[: min(ticks, 2000)]:
+        book.apply_update(*delta)
+        worst = max(worst, VectorFeatureEngine.max_deviation(vector.compute(book), scalar.compute(book)))
+
+    codec = FixedPointCodec(tick_size=Decimal("0.1"), lot_size=Decimal("0.0001"))
+    for mode, book_codec in (("decimal book", None), ("fixed-point book", codec)):
+        timings = {}
+        for name, engine in (("scalar", FeatureEngine(depth=depth)), ("numpy", VectorFeatureEngine(depth=depth))):
+            book = OrderBook("BENCH-USDT", depth=levels, codec=book_codec)
+            book.apply_snapshot(*snapshot)
+            elapsed = 0.0
+            for delta in deltas:
+                book.apply_update(*delta)
+                start = time.perf_counter()
+                engine.compute(book)
+                elapsed += time.perf_counter() - start
+            timings[name] = elapsed / ticks * 1e6
+        print(
+            f"depth={depth:<4} {mode:<17} scalar={timings['scalar']:6.1f} us/tick  "
+            f"numpy={timings['numpy']:6.1f} us/tick (incl. multi-level/rolling features)"
+        )
+    print(f"depth={depth:<4} max parity deviation vs FeatureSnapshot: {worst:.3g}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Decimal FeatureEngine vs VectorFeatureEngine cost and parity.")
+    parser.add_argument("--levels", type=int, default=400)
+    parser.add_argument("--ticks", type=int, default=5000)
+    parser.add_argument("--depth", type=int, nargs="+", default=[25, 100])
+    args = parser.parse_args()
+    for depth in args.depth:
+        run(args.levels, args.ticks, depth)
+
+
+if __name__ == "__main__":
+    main()
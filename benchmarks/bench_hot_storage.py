@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import argparse
+import time
+import tracemalloc
+from collections import deque
+from datetime import datetime
+from decimal import Decimal
+
+from okx_trader.features import FeatureSnapshot
+from okx_trader.storage import FEATURES, StorageManager
+
+
+def _legacy_write(store: deque, snapshot: FeatureSnapshot) -> None:
+    # The previous StorageManager.write_hot.
+    store.append({"ts": datetime.utcnow().isoformat(), "data": {"instrument": "BENCH-USDT", "features": snapshot}})
+
+
+def _snapshots(count: int):
+    # Distinct snapshots per tick, as the handler produces.
+    return [
+        FeatureSnapshot(
+            ofi=Decimal(idx % 97) / 7,
+            wmp=Decimal(idx % 89) / 11,
+            liquidity_vacuum=Decimal(idx % 83) / 100,
+            bid_pressure=Decimal(idx % 79) + Decimal("0.5"),
+            ask_pressure=Decimal(idx % 73) + Decimal("0.25"),
+        )
+        for idx in range(count)
+    ]
+
+
+def _fill_legacy(snapshots) -> deque:
+    legacy: deque = deque(maxlen=len(snapshots))
+    for snapshot in snapshots:
+        _legacy_write(legacy, snapshot)
+    return legacy
+
+
+def _fill_ring(snapshots) -> StorageManager:
+    storage = StorageManager(hot_capacities={FEATURES: len(snapshots), "orders": 1})
+    for snapshot in snapshots:
+        storage.write_hot_features("BENCH-USDT", snapshot, 3)
+    return storage
+
+
+def _timed(fn, *args, repeat: int = 1) -> float:
+    fn(*args)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(*args)
+    return (time.perf_counter() - start) / repeat
+
+
+def _traced_bytes(fn, *args) -> int:
+    tracemalloc.start()
+    result = fn(*args)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def run(records: int) -> None:
+    # Snapshots are built up front and shared, so neither memory figure includes them.
+    snapshots = _snapshots(records)
+    legacy_bytes = _traced_bytes(_fill_legacy, snapshots)
+    ring_bytes = _traced_bytes(_fill_ring, snapshots)
+    legacy_us = _timed(_fill_legacy, snapshots) / records * 1e6
+    ring_us = _timed(_fill_ring, snapshots) / records * 1e6
+
+    legacy = _fill_legacy(snapshots)
+    storage = _fill_ring(snapshots)
+    legacy_read_ms = _timed(list, legacy, repeat=10) * 1e3
+    ring_read_us = _timed(storage.read_hot, FEATURES, "BENCH-USDT", 1000, repeat=1000) * 1e6
+    since = storage.hot_ring(FEATURES, "BENCH-USDT").latest()[0] - 1
+    since_us = _timed(storage.read_hot_since, FEATURES, "BENCH-USDT", since, repeat=1000) * 1e6
+    window = storage.read_hot(FEATURES, "BENCH-USDT", 1000)
+    assert len(window) == 1000 and window["ofi"][-1] == float(snapshots[-1].ofi)
+
+    print(
+        f"records={records:,}  legacy deque: {legacy_bytes / records:6.1f} B/record "
+        f"{legacy_us:5.2f} us/write  read_hot={legacy_read_ms:6.2f} ms (full copy)"
+    )
+    print(
+        f"records={records:,}  ring buffer:  {ring_bytes / records:6.1f} B/record "
+        f"{ring_us:5.2f} us/write  last(1000)={ring_read_us:5.1f} us  since(ts)={since_us:5.1f} us (zero-copy)"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Legacy deque-of-dicts vs preallocated hot ring buffer.")
+    parser.add_argument("--records", type=int, default=200_000)
+    args = parser.parse_args()
+    run(args.records)
+
+
+if __name__ == "__main__":
+    main()
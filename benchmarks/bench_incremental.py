@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import argparse
+import time
+from decimal import Decimal
+
+from okx_trader.features import FeatureEngine
+from okx_trader.fixed_point import FixedPointCodec
+from okx_trader.orderbook import OrderBook
+
+from .synthetic import make_snapshot, make_updates
+
+
+def run(levels: int, ticks: int, depth: int) -> None:
+    snapshot = make_snapshot(levels)
+    deltas = list(make_updates(ticks, levels))
+    codec = FixedPointCodec(tick_size=Decimal("0.1"), lot_size=Decimal("0.0001"))
+    for mode, book_codec in (("decimal book", None), ("fixed-point book", codec)):
+        mismatches = 0
+        reference_book = OrderBook("BENCH-USDT", depth=levels, codec=book_codec)
+        reference_book.apply_snapshot(*snapshot)
+        book = OrderBook("BENCH-USDT", depth=levels, codec=book_codec)
+        book.apply_snapshot(*snapshot)
+        reference = FeatureEngine(depth=depth)
+        incremental = FeatureEngine(depth=depth, incremental=True)
+        for delta in deltas[: min(ticks, 2000)]:
+            reference_book.apply_update(*delta)
+            book.apply_update(*delta)
+            if reference.compute(reference_book) != incremental.compute(book):
+                mismatches += 1
+
+        timings = {}
+        engines = {}
+        for name, flag in (("full", False), ("incremental", True)):
+            book = OrderBook("BENCH-USDT", depth=levels, codec=book_codec)
+            book.apply_snapshot(*snapshot)
+            engine = engines[name] = FeatureEngine(depth=depth, incremental=flag)
+            engine.compute(book)
+            elapsed = 0.0
+            for delta in deltas:
+                start = time.perf_counter()
+                book.apply_update(*delta)
+                engine.compute(book)
+                elapsed += time.perf_counter() - start
+            timings[name] = elapsed / ticks * 1e6
+        engine = engines["incremental"]
+        share = engine.incremental_computes / max(1, engine.incremental_computes + engine.full_computes)
+        print(
+            f"depth={depth:<4} {mode:<17} full={timings['full']:6.1f} us/tick  "
+            f"incremental={timings['incremental']:6.1f} us/tick  "
+            f"(update + compute, {share:.0%} incremental, parity mismatches={mismatches})"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Full-rescan vs delta-driven FeatureEngine cost and parity.")
+    parser.add_argument("--levels", type=int, default=400)
+    parser.add_argument("--ticks", type=int, default=5000)
+    parser.add_argument("--depth", type=int, nargs="+", default=[25, 100])
+    args = parser.parse_args()
+    for depth in args.depth:
+        run(args.levels, args.ticks, depth)
+
+
+if __name__ == "__main__":
+    main()
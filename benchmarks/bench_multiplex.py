@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from collections import Counter
+
+from okx_trader.latency import LatencyRecorder, format_summary
+from okx_trader.multiplex_stream import MultiplexOrderBookStreamer
+from tests.mock_server import MockOkxServer, build_book_frames
+
+from .synthetic import make_snapshot, make_updates
+
+
+async def run(
+    instruments: int,
+    frames: int,
+    levels: int,
+    connections: int,
+    drop_every: int,
+    pipeline: bool,
+    handler_delay: float,
+    latency: bool,
+) -> None:
+    instrument_ids = [f"SYN{idx}-USDT" for idx in range(instruments)]
+    snapshot = make_snapshot(levels)
+    updates = list(make_updates(frames, levels))
+    recorded = {inst: build_book_frames(inst, snapshot, updates) for inst in instrument_ids}
+
+    handled: Counter = Counter()
+    recorder = LatencyRecorder() if latency else None
+
+    async def handler(orderbook, message) -> None:
+        handled[orderbook.instrument_id] += 1
+        if handler_delay:
+            await asyncio.sleep(handler_delay)
+
+    async with MockOkxServer(recorded, drop_every=drop_every) as server:
+        streamer = MultiplexOrderBookStreamer(
+            instrument_ids,
+            depth=levels,
+            connections=connections,
+            url=server.public_url,
+            pipeline=pipeline,
+            latency=recorder,
+        )
+        start = time.perf_counter()
+        await streamer.run_forever(handler)
+        elapsed = time.perf_counter() - start
+
+    mismatched = [
+        inst
+        for inst, frames_for_inst in recorded.items()
+        if streamer.books[inst].checksum() != frames_for_inst[-1]["data"][0]["checksum"]
+    ]
+    resyncs = sum(s.resync_count for s in streamer.streamers.values())
+    total = sum(handled.values())
+    print(
+        f"instruments={instruments} connections={connections} frames_sent={server.frames_sent} "
+        f"handled={total} resyncs={resyncs} books_mismatched={len(mismatched)} "
+        f"elapsed={elapsed:.2f}s rate={server.frames_sent / elapsed:,.0f} msg/s"
+    )
+    if pipeline:
+        metrics = streamer.pipeline_metrics().values()
+        print(
+            f"pipeline: coalesced={sum(m.coalesced for m in metrics)} "
+            f"dropped={sum(m.dropped for m in metrics)} "
+            f"max_depth={max(m.max_queue_depth for m in metrics)}"
+        )
+    if recorder is not None:
+        print("latency: " + format_summary(recorder.summary()).replace("; ", "\n         "))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay synthetic tbt frames through a local fake OKX WebSocket.")
+    parser.add_argument("--instruments", type=int, default=50)
+    parser.add_argument("--frames", type=int, default=500)
+    parser.add_argument("--levels", type=int, default=400)
+    parser.add_argument("--connections", type=int, default=2)
+    parser.add_argument("--drop-every", type=int, default=0, help="Drop every Nth update to force resyncs.")
+    parser.add_argument("--pipeline", action="store_true", help="Decouple ingest from the handler and coalesce ticks.")
+    parser.add_argument("--handler-delay", type=float, default=0.0, help="Seconds each handler call sleeps.")
+    parser.add_argument("--latency", action="store_true", help="Record per-stage latency histograms.")
+    args = parser.parse_args()
+    asyncio.run(
+        run(
+            args.instruments,
+            args.frames,
+            args.levels,
+            args.connections,
+            args.drop_every,
+            args.pipeline,
+            args.handler_delay,
+            args.latency,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
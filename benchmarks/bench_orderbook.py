@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import argparse
+import time
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Dict, List, Tuple
+
+from okx_trader.orderbook import OrderBook
+from okx_trader.utils import to_decimal
+
+from .synthetic import make_snapshot, make_updates
+
+
+@dataclass
+class LegacyBookSide:
+    """The pre-sorted-container BookSide, kept here as the comparison baseline."""
+
+    side: str
+    levels: Dict[Decimal, Decimal] = field(default_factory=dict)
+    depth: int = 400
+
+    def update(self, price: Decimal, size: Decimal) -> None:
+        if size == 0:
+            self.levels.pop(price, None)
+        else:
+            self.levels[price] = size
+
+    def top_levels(self) -> List[Tuple[Decimal, Decimal]]:
+        if self.side == "bids":
+            sorted_prices = sorted(self.levels.keys(), reverse=True)
+        else:
+            sorted_prices = sorted(self.levels.keys())
+        trimmed = sorted_prices[: self.depth]
+        return [(price, self.levels[price]) for price in trimmed]
+
+
+def _legacy_tick(bids: LegacyBookSide, asks: LegacyBookSide, delta) -> None:
+    for price, size, *_ in delta[0]:
+        bids.update(to_decimal(price), to_decimal(size))
+    for price, size, *_ in delta[1]:
+        asks.update(to_decimal(price), to_decimal(size))
+    # FeatureEngine.compute, StrategyEngine.generate_signals, OrderBook.checksum
+    for _ in range(3):
+        top_bids = bids.top_levels()[:25]
+        top_asks = asks.top_levels()[:25]
+    sum(size for _, size in top_bids)
+    sum(size for _, size in top_asks)
+
+
+def _sorted_tick(book: OrderBook, delta) -> None:
+    book.apply_update(*delta)
+    top_bids, top_asks = book.top_levels(25)
+    sum(size for _, size in top_bids)
+    sum(size for _, size in top_asks)
+    book.best_bid()
+    book.best_ask()
+    book.checksum()
+
+
+def run(levels: int, ticks: int) -> Dict[str, float]:
+    snapshot_bids, snapshot_asks = make_snapshot(levels)
+    deltas = list(make_updates(ticks, levels))
+
+    legacy_bids = LegacyBookSide("bids", depth=levels)
+    legacy_asks = LegacyBookSide("asks", depth=levels)
+    for price, size, *_ in snapshot_bids:
+        legacy_bids.update(to_decimal(price), to_decimal(size))
+    for price, size, *_ in snapshot_asks:
+        legacy_asks.update(to_decimal(price), to_decimal(size))
+    start = time.perf_counter()
+    for delta in deltas:
+        _legacy_tick(legacy_bids, legacy_asks, delta)
+    legacy_us = (time.perf_counter() - start) / ticks * 1e6
+
+    book = OrderBook("BENCH-USDT", depth=levels)
+    book.apply_snapshot(snapshot_bids, snapshot_asks)
+    start = time.perf_counter()
+    for delta in deltas:
+        _sorted_tick(book, delta)
+    sorted_us = (time.perf_counter() - start) / ticks * 1e6
+
+    return {"levels": levels, "legacy_us_per_tick": legacy_us, "sorted_us_per_tick": sorted_us}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-tick order book cost, legacy dict+sort vs sorted BookSide.")
+    parser.add_argument("--levels", type=int, nargs="+", default=[400, 5000])
+    parser.add_argument("--ticks", type=int, default=5000)
+    args = parser.parse_args()
+    for levels in args.levels:
+        result = run(levels, args.ticks)
+        print(
+            f"levels={result['levels']:>5}  legacy={result['legacy_us_per_tick']:9.1f} us/tick  "
+            f"sorted={result['sorted_us_per_tick']:7.1f} us/tick  "
+            f"speedup={result['legacy_us_per_tick'] / result['sorted_us_per_tick']:5.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import random
+import time
+from decimal import Decimal
+from typing import List
+
+from okx_trader.execution import ExecutionEngine, OkxRestClient, OrderRequest
+from okx_trader.latency import LatencyHistogram
+from okx_trader.private_stream import PrivateStreamer
+from okx_trader.risk import RiskManager
+from tests.mock_server import MockOkxServer
+
+INSTRUMENT = "BENCH-USDT"
+
+
+async def _place(execution: ExecutionEngine, risk: RiskManager, count: int, rng: random.Random) -> List[str]:
+    order_ids = []
+    for i in range(count):
+        price = Decimal(30000 + rng.randint(-50, 50))
+        order = OrderRequest(INSTRUMENT, "buy" if i % 2 else "sell", Decimal("0.1"), price)
+        result = await execution.execute(order)
+        risk.track_order(order)
+        order_ids.append(result["data"][0]["ordId"])
+    return order_ids
+
+
+async def _fill_some(server: MockOkxServer, order_ids: List[str], rng: random.Random, count: int) -> int:
+    fills = 0
+    for order_id in rng.sample(order_ids, min(count, len(order_ids))):
+        if server.account_orders[order_id]["state"] in ("live", "partially_filled"):
+            await server.fill_order(order_id, size=rng.choice(["0.05", None]))
+            fills += 1
+    return fills
+
+
+def _consistent(server: MockOkxServer, streamer: PrivateStreamer, risk: RiskManager) -> bool:
+    exchange = Decimal(server.account_positions.get(INSTRUMENT, {}).get("pos", "0"))
+    pending = {oid for oid, order in server.account_orders.items() if order["state"] in ("live", "partially_filled")}
+    return risk.positions[INSTRUMENT].position == exchange and set(streamer.orders) == pending
+
+
+async def run(orders: int, fills: int, offline_fills: int, seed: int) -> None:
+    rng = random.Random(seed)
+    async with MockOkxServer() as server:
+        client = OkxRestClient("key", "secret", "pass", server.rest_url)
+        execution = ExecutionEngine(client, dry_run=False)
+        risk = RiskManager(0.05, 1000, 500)
+        streamer = PrivateStreamer(client, url=server.private_url, reconnect_delay=0.05)
+        push_latency = LatencyHistogram()
+        pushed_at: List[int] = []
+
+        def on_order(update) -> None:
+            if update.get("fillSz", "0") != "0" and pushed_at:
+                push_latency.record(time.perf_counter_ns() - pushed_at[-1])
+            risk.on_order_update(update)
+
+        streamer.order_listeners.append(on_order)
+        streamer.position_listeners.append(risk.on_position)
+        streamer.account_listeners.append(risk.on_account)
+        task = asyncio.create_task(streamer.run_forever())
+        await asyncio.wait_for(streamer.connected.wait(), 5)
+
+        order_ids = await _place(execution, risk, orders, rng)
+        for order_id in rng.sample(order_ids, fills):
+            pushed_at.append(time.perf_counter_ns())
+            await server.fill_order(order_id, size=rng.choice(["0.05", None]))
+            await asyncio.sleep(0)
+        await asyncio.sleep(0.1)
+        # A repeated push must not be applied twice.
+        await server._push("orders", [dict(server.account_orders[order_ids[0]])])
+        await asyncio.sleep(0.05)
+        online_ok = _consistent(server, streamer, risk)
+        pushed = push_latency.count
+        pushed_at.clear()
+
+        await server.drop_private()
+        missed = await _fill_some(server, order_ids, rng, offline_fills)
+        for order_id in order_ids[-5:]:
+            await client.cancel_order(INSTRUMENT, order_id)
+        started = time.perf_counter()
+        while streamer.connected.is_set():
+            await asyncio.sleep(0.001)
+        await asyncio.wait_for(streamer.connected.wait(), 5)
+        recovery_ms = (time.perf_counter() - started) * 1000
+        recovered_ok = _consistent(server, streamer, risk)
+
+        await streamer.close()
+        await asyncio.gather(task, return_exceptions=True)
+        await client.close()
+
+    micros = {q: push_latency.quantile(q) / 1000 for q in (0.5, 0.99)}
+    print(
+        f"{orders} orders, {pushed} fills pushed: push->risk p50 {micros[0.5]:.0f} us, p99 {micros[0.99]:.0f} us; "
+        f"duplicates ignored {streamer.duplicates}; consistent={online_ok}"
+    )
+    print(
+        f"disconnect with {missed} fills + 5 cancels missed: reconnected and reconciled in {recovery_ms:.1f} ms "
+        f"({streamer.connections} connections, {streamer.reconciliations} reconciliations); consistent={recovered_ok}"
+    )
+    print(f"risk: {risk.snapshot()[INSTRUMENT]}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Private order/position feed against the local mock server.")
+    parser.add_argument("--orders", type=int, default=200)
+    parser.add_argument("--fills", type=int, default=100)
+    parser.add_argument("--offline-fills", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    logging.getLogger("okx_trader").setLevel(logging.ERROR)
+    asyncio.run(run(args.orders, args.fills, args.offline_fills, args.seed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from decimal import Decimal
+from typing import Dict, List
+
+from okx_trader.execution import OkxRestClient, OrderRequest
+from okx_trader.rate_limit import OKX_RATE_LIMITS, RATE_LIMITED_CODE, RateLimiter, RequestScheduler
+from tests.mock_server import MockOkxServer
+
+
+def _orders(count: int, instruments: int) -> List[OrderRequest]:
+    return [
+        OrderRequest(
+            instrument_id=f"BENCH{i % instruments}-USDT",
+            side="buy" if i % 2 else "sell",
+            size=Decimal("0.01"),
+            price=Decimal("30000.1") + i,
+            client_order_id=f"b{i}",
+        )
+        for i in range(count)
+    ]
+
+
+async def _burst(client, orders: List[OrderRequest], cancels: int) -> Dict[str, int]:
+    start = time.perf_counter()
+    placed = [asyncio.ensure_future(client.place_order(order)) for order in orders]
+    await asyncio.sleep(0)
+    cancelled = [
+        asyncio.ensure_future(client.cancel_order(orders[i].instrument_id, str(i + 1))) for i in range(cancels)
+    ]
+    cancel_done = await asyncio.gather(*cancelled)
+    cancel_elapsed = time.perf_counter() - start
+    results = await asyncio.gather(*placed)
+    elapsed = time.perf_counter() - start
+    return {
+        "elapsed_ms": elapsed * 1000,
+        "cancel_elapsed_ms": cancel_elapsed * 1000,
+        "accepted": sum(result.get("code") == "0" for result in results),
+        "throttled": sum(result.get("code") == RATE_LIMITED_CODE for result in results + cancel_done),
+    }
+
+
+async def run(orders: int, cancels: int, instruments: int, coalesce_ms: float) -> None:
+    async with MockOkxServer(rate_limits=OKX_RATE_LIMITS) as server:
+        credentials = dict(api_key="key", secret_key="secret", passphrase="pass", base_url=server.rest_url)
+
+        client = OkxRestClient(**credentials)
+        await client.warm_up()
+        raw = await _burst(client, _orders(orders, instruments), cancels)
+        raw_requests, raw_limited = server.rest_requests, server.rate_limited
+        await asyncio.sleep(2.1)
+
+        server.rest_requests = server.rate_limited = 0
+        scheduler = await RequestScheduler(
+            client, RateLimiter(headroom=0.9), coalesce_window=coalesce_ms / 1000
+        ).start()
+        scheduled = await _burst(scheduler, _orders(orders, instruments), cancels)
+        await scheduler.close()
+        await client.close()
+        sched_requests, sched_limited = server.rest_requests, server.rate_limited
+
+    for name, result, requests, limited in (
+        ("direct", raw, raw_requests, raw_limited),
+        ("scheduled", scheduled, sched_requests, sched_limited),
+    ):
+        print(
+            f"{name:<9} {result['accepted']:>5}/{orders} orders accepted  {requests:>5} requests  "
+            f"{limited:>5} x 429  cancels done in {result['cancel_elapsed_ms']:7.1f} ms  "
+            f"all done in {result['elapsed_ms']:7.1f} ms"
+        )
+    print(f"scheduler: {scheduler.metrics.summary()}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Order burst against a rate-limited stub REST server.")
+    parser.add_argument("--orders", type=int, default=600)
+    parser.add_argument("--cancels", type=int, default=40)
+    parser.add_argument("--instruments", type=int, default=2)
+    parser.add_argument("--coalesce-ms", type=float, default=0.0)
+    args = parser.parse_args()
+    asyncio.run(run(args.orders, args.cancels, args.instruments, args.coalesce_ms))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import tempfile
+import time
+from decimal import Decimal
+
+from main import build_engines, build_handler, build_risk_manager
+from okx_trader import AppConfig, StorageManager
+from okx_trader.backtest import BacktestExecutionEngine
+from okx_trader.fixed_point import FixedPointCodec
+from okx_trader.recorder import FrameRecorder, read_frames
+from okx_trader.replay import ReplayClock, ReplayDriver
+from okx_trader.utils import json_dumps
+from tests.mock_server import build_book_frames
+
+from .synthetic import make_snapshot, make_updates
+
+
+def _record(directory: str, instruments: int, frames: int, levels: int) -> int:
+    recorder = FrameRecorder(directory)
+    recorder.start()
+    streams = [
+        build_book_frames(f"BENCH{idx}-USDT", make_snapshot(levels), make_updates(frames, levels))
+        for idx in range(instruments)
+    ]
+    for position in range(frames + 1):
+        for idx, stream in enumerate(streams):
+            # 2 ms after the frame's exchange ts, so the latency guard stays open.
+            recv_ns = (int(stream[position]["data"][0]["ts"]) + 2) * 1_000_000 + idx
+            recorder.record(json_dumps(stream[position]), recv_ns)
+    recorder.stop()
+    return recorder.metrics.bytes_written
+
+
+async def run(instruments: int, frames: int, levels: int, validate_checksum: bool) -> None:
+    names = [f"BENCH{idx}-USDT" for idx in range(instruments)]
+    with tempfile.TemporaryDirectory() as directory:
+        raw_bytes = _record(directory, instruments, frames, levels)
+        start = time.perf_counter()
+        count = sum(1 for _ in read_frames(directory))
+        read_rate = count / (time.perf_counter() - start)
+        print(
+            f"recorded {count:,} frames ({raw_bytes / count:.0f} B/frame raw); "
+            f"decompress+split {read_rate * 60:,.0f}/min"
+        )
+
+        driver = ReplayDriver(names, validate_checksum=validate_checksum)
+        stats = await driver.run(read_frames(directory))
+        print(f"apply only           {stats.frames_per_second * 60:12,.0f} frames/min  rejected={stats.rejected}")
+
+        codec = FixedPointCodec(tick_size=Decimal("0.1"), lot_size=Decimal("0.0001"))
+        for label, incremental, codecs in (
+            ("decimal", False, {}),
+            ("incremental", True, {}),
+            ("fixed+incr", True, {name: codec for name in names}),
+        ):
+            config = AppConfig.from_env()
+            config.instruments = names
+            config.enable_market_making = True
+            config.incremental_features = incremental
+            clock = ReplayClock()
+            execution = BacktestExecutionEngine(clock, codecs=codecs)
+            feature_engines, strategy_engines = build_engines(config, codecs)
+            logger = logging.getLogger("okx_trader.backtest")
+            logger.setLevel(logging.ERROR)
+            handler = build_handler(
+                codecs,
+                feature_engines,
+                strategy_engines,
+                build_risk_manager(config),
+                StorageManager(),
+                execution,
+                logger,
+                clock,
+            )
+            driver = ReplayDriver(names, codecs=codecs, validate_checksum=validate_checksum, clock=clock)
+            stats = await driver.run(read_frames(directory), handler, on_book=execution.on_book)
+            print(
+                f"backtest {label:<11} {stats.frames_per_second * 60:12,.0f} frames/min  "
+                f"orders={execution.orders_submitted:,} fills={len(execution.fills):,}"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Record/replay throughput of the offline backtest pipeline.")
+    parser.add_argument("--instruments", type=int, default=4)
+    parser.add_argument("--frames", type=int, default=20_000, help="updates per instrument")
+    parser.add_argument("--levels", type=int, default=400)
+    parser.add_argument("--no-checksum", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(run(args.instruments, args.frames, args.levels, not args.no_checksum))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional
+
+from okx_trader.execution import OkxRestClient
+from okx_trader.latency import LatencyHistogram
+from okx_trader.multiplex_stream import MultiplexOrderBookStreamer
+from tests.mock_server import MockOkxServer, build_book_frames
+
+from .synthetic import make_snapshot, make_updates
+
+INSTRUMENT = "BENCH-USDT"
+
+
+async def _stream(
+    frames: List[Dict],
+    levels: int,
+    interval: float,
+    stall_probability: float,
+    stall_ms: float,
+    redundancy: int,
+    reconnect_delay: float,
+    drop_at: Optional[int],
+    warm_start: bool,
+    seed: int,
+) -> Dict:
+    final = frames[-1]["data"][0]
+    delivery = LatencyHistogram()
+    done = asyncio.Event()
+    async with MockOkxServer(
+        {INSTRUMENT: frames},
+        live_interval=interval,
+        stall_probability=stall_probability,
+        stall_ms=stall_ms,
+        seed=seed,
+    ) as server:
+        client = OkxRestClient("key", "secret", "pass", server.rest_url) if warm_start else None
+        streamer = MultiplexOrderBookStreamer(
+            [INSTRUMENT],
+            depth=levels,
+            url=server.public_url,
+            redundancy=redundancy,
+            reconnect=True,
+            reconnect_delay=reconnect_delay,
+            rest_client=client,
+        )
+        published = server.published_ns
+
+        async def handler(orderbook, message) -> None:
+            if message.action == "update":
+                delivery.record(time.perf_counter_ns() - published[(INSTRUMENT, message.seq_id)])
+            if message.seq_id == final["seqId"]:
+                done.set()
+
+        task = asyncio.create_task(streamer.run_forever(handler))
+        if drop_at is not None:
+            while server._feeds.get(INSTRUMENT) is None or server._feeds[INSTRUMENT].position < drop_at:
+                await asyncio.sleep(0.01)
+            await server.drop_public()
+        await asyncio.wait_for(done.wait(), len(frames) * interval * 4 + 10)
+        consistent = streamer.books[INSTRUMENT].checksum() == final["checksum"]
+        await streamer.close()
+        await asyncio.gather(task, return_exceptions=True)
+        if client is not None:
+            await client.close()
+    return {"delivery": delivery, "recovery": streamer.recovery, "consistent": consistent}
+
+
+def _micros(histogram: LatencyHistogram) -> str:
+    return " ".join(f"p{q * 100:g} {histogram.quantile(q) / 1000:.0f}us" for q in (0.5, 0.99, 0.999))
+
+
+async def run(frames: int, levels: int, interval: float, stall_probability: float, stall_ms: float, seed: int) -> None:
+    recorded = build_book_frames(INSTRUMENT, make_snapshot(levels), make_updates(frames, levels))
+    print(f"{frames} updates every {interval * 1000:g} ms; per-socket {stall_ms:g} ms stalls at p={stall_probability}")
+    stalls = (stall_probability, stall_ms)
+    for redundancy in (1, 2):
+        result = await _stream(recorded, levels, interval, *stalls, redundancy, 1.0, None, False, seed)
+        print(
+            f"redundancy={redundancy}: publish->handler {_micros(result['delivery'])} "
+            f"duplicates={result['recovery'].duplicates} consistent={result['consistent']}"
+        )
+    print("disconnect mid-stream, reconnect backoff base 0.2 s:")
+    for warm_start in (False, True):
+        result = await _stream(recorded, levels, interval, 0.0, 0.0, 1, 0.2, frames // 2, warm_start, seed)
+        recovery = result["recovery"]
+        warm = f"{recovery.warm.max / 1e6:.1f} ms" if recovery.warm.count else "-"
+        print(
+            f"rest_snapshot={warm_start}: stale book reseeded after {warm}, "
+            f"back in sequence after {recovery.recovered.max / 1e6:.1f} ms "
+            f"(reconnects={recovery.reconnects}) consistent={result['consistent']}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Redundant connections and reconnect recovery against the mock feed.")
+    parser.add_argument("--frames", type=int, default=3000)
+    parser.add_argument("--levels", type=int, default=50)
+    parser.add_argument("--interval", type=float, default=0.001, help="Seconds between published updates.")
+    parser.add_argument("--stall-probability", type=float, default=0.01)
+    parser.add_argument("--stall-ms", type=float, default=20.0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    logging.getLogger("okx_trader").setLevel(logging.ERROR)
+    asyncio.run(run(args.frames, args.levels, args.interval, args.stall_probability, args.stall_ms, args.seed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import statistics
+import time
+from decimal import Decimal
+from typing import Dict, List
+
+import aiohttp
+
+from okx_trader.execution import OkxRestClient, OrderRequest
+from okx_trader.utils import iso_timestamp
+from tests.mock_server import MockOkxServer
+
+
+class LegacyRestClient(OkxRestClient):
+    """Pre-pooling request path: new ClientSession and HMAC key per order."""
+
+    def _sign(self, timestamp: str, method: str, path: str, body: str) -> str:
+        message = f"{timestamp}{method}{path}{body}".encode()
+        signature = hmac.new(self.secret_key.encode(), message, hashlib.sha256).digest()
+        return base64.b64encode(signature).decode()
+
+    async def _request(self, method: str, path: str, payload=None) -> Dict:
+        body = json.dumps(payload or {})
+        timestamp = iso_timestamp()
+        headers = {
+            "OK-ACCESS-KEY": self.api_key,
+            "OK-ACCESS-SIGN": self._sign(timestamp, method, path, body),
+            "OK-ACCESS-TIMESTAMP": timestamp,
+            "OK-ACCESS-PASSPHRASE": self.passphrase,
+            "Content-Type": "application/json",
+        }
+        async with aiohttp.ClientSession() as session:
+            async with session.request(method, f"{self.base_url}{path}", data=body, headers=headers) as resp:
+                return await resp.json()
+
+
+async def _measure(client: OkxRestClient, orders: int) -> List[float]:
+    order = OrderRequest(instrument_id="BTC-USDT", side="buy", size=Decimal("0.01"), price=Decimal("30000.1"))
+    samples = []
+    for _ in range(orders):
+        start = time.perf_counter()
+        await client.place_order(order)
+        samples.append((time.perf_counter() - start) * 1e6)
+    return samples
+
+
+def _summary(name: str, samples: List[float], connections: int) -> str:
+    samples = sorted(samples)
+    p99 = samples[int(len(samples) * 0.99) - 1]
+    return (
+        f"{name:<7} mean={statistics.fmean(samples):8.1f} us  p50={samples[len(samples) // 2]:8.1f} us  "
+        f"p99={p99:8.1f} us  server_connections={connections}"
+    )
+
+
+async def run(orders: int) -> None:
+    async with MockOkxServer() as server:
+        credentials = dict(api_key="key", secret_key="secret", passphrase="pass", base_url=server.rest_url)
+
+        legacy = LegacyRestClient(**credentials)
+        legacy_samples = await _measure(legacy, orders)
+        legacy_peers = len(server.rest_peers)
+
+        server.rest_peers.clear()
+        pooled = OkxRestClient(**credentials)
+        await pooled.warm_up()
+        pooled_samples = await _measure(pooled, orders)
+        await pooled.close()
+        pooled_peers = len(server.rest_peers)
+
+    print(_summary("legacy", legacy_samples, legacy_peers))
+    print(_summary("pooled", pooled_samples, pooled_peers))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Order round-trip latency against a local stub REST server.")
+    parser.add_argument("--orders", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(run(args.orders))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import time
+from typing import List
+
+from main import build_engines, build_order_router, build_risk_manager, build_signal_handler
+from okx_trader import AppConfig, ExecutionEngine, StorageManager
+from okx_trader.replay import ReplayClock, ReplayDriver
+from okx_trader.sharding import ShardCoordinator, WorkerLink, shard_instruments
+from okx_trader.utils import json_dumps
+from tests.mock_server import build_book_frames
+
+from .synthetic import make_snapshot, make_updates
+
+
+def _frames(instrument_ids: List[str], frames: int, levels: int) -> List:
+    streams = [
+        build_book_frames(instrument_id, make_snapshot(levels), make_updates(frames, levels))
+        for instrument_id in instrument_ids
+    ]
+    return [
+        ((int(stream[position]["data"][0]["ts"]) + 2) * 1_000_000, json_dumps(stream[position]).encode())
+        for position in range(frames + 1)
+        for stream in streams
+    ]
+
+
+async def replay_shard(link: WorkerLink, instrument_ids: List[str], frames: int, levels: int) -> None:
+    """Shard worker that replays synthetic books instead of connecting to OKX."""
+    config = AppConfig.from_env()
+    config.instruments = instrument_ids
+    config.enable_market_making = True
+    clock = ReplayClock()
+    feature_engines, strategy_engines = build_engines(config, {})
+    handler = build_signal_handler({}, feature_engines, strategy_engines, StorageManager(), link.route, clock)
+    await ReplayDriver(instrument_ids, clock=clock).run(_frames(instrument_ids, frames, levels), handler)
+
+
+async def run(instruments: int, frames: int, levels: int, shard_counts: List[int]) -> None:
+    names = [f"BENCH{idx}-USDT" for idx in range(instruments)]
+    config = AppConfig.from_env()
+    logger = logging.getLogger("benchmarks.sharding")
+    logger.setLevel(logging.ERROR)
+    for shards in shard_counts:
+        risk_manager = build_risk_manager(config)
+        storage = StorageManager()
+        execution = ExecutionEngine(None, dry_run=True)
+        route = build_order_router({}, risk_manager, storage, execution, logger)
+        coordinator = ShardCoordinator(
+            replay_shard, shard_instruments(names, shards), risk_manager, args=(frames, levels)
+        )
+        start = time.perf_counter()
+        coordinator.start()
+        await coordinator.run(route)
+        elapsed = time.perf_counter() - start
+        await coordinator.close()
+        ticks = sum(shard.ticks for shard in coordinator.stats.values())
+        signals = sum(shard.signals for shard in coordinator.stats.values())
+        print(
+            f"shards={len(coordinator.shards):<2} {ticks:>8,} ticks {signals:>8,} signals in {elapsed:6.2f} s "
+            f"-> {ticks / elapsed:>9,.0f} ticks/s (incl. process start-up)"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Tick throughput of the sharded runtime vs worker count.")
+    parser.add_argument("--instruments", type=int, default=4)
+    parser.add_argument("--frames", type=int, default=5000, help="updates per instrument")
+    parser.add_argument("--levels", type=int, default=400)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+    asyncio.run(run(args.instruments, args.frames, args.levels, args.shards))
+
+
+if __name__ == "__main__":
+    main()
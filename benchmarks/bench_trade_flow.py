@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import argparse
+import math
+import random
+import time
+import tracemalloc
+from typing import List, Tuple
+
+from okx_trader.features import FeatureEngine
+from okx_trader.orderbook import OrderBook
+from okx_trader.trade_flow import LIQUIDATION_ORDERS, TRADES, TradeFlow, TradeFlowStreamer
+
+from .synthetic import make_snapshot, make_updates
+
+INSTRUMENT = "BENCH-USDT-SWAP"
+
+Event = Tuple[int, bool, float, float, str]
+
+
+def _events(count: int, seed: int) -> List[Event]:
+    """(ts_ms, is_liquidation, price, size, side), mostly in order with some late arrivals and idle gaps."""
+    rng = random.Random(seed)
+    ts = 1_700_000_000_000
+    price = 30_000.0
+    events = []
+    for _ in range(count):
+        ts += rng.choice((0, 0, 1, 3, 10, 40)) if rng.random() > 0.001 else rng.randint(5_000, 90_000)
+        price += rng.uniform(-1, 1)
+        late = rng.randint(0, 300) if rng.random() < 0.02 else 0
+        side = "buy" if rng.random() < 0.5 else "sell"
+        events.append((ts - late, rng.random() < 0.01, round(price, 1), round(rng.uniform(0.001, 2), 3), side))
+    return events
+
+
+def _reference(events: List[Event], flow: TradeFlow, window: int) -> Tuple[float, float, int, int]:
+    """Brute-force signed volume, notional, trades and liquidations for one window at the flow's clock."""
+    newest = flow._newest
+    span = flow.windows_ms[window] // flow.bucket_ms
+    signed = notional = 0.0
+    trades = liquidations = 0
+    for ts, liquidation, price, size, side in events:
+        if not 0 <= newest - ts // flow.bucket_ms < span:
+            continue
+        if liquidation:
+            liquidations += 1
+            continue
+        signed += size if side == "buy" else -size
+        notional += price * size
+        trades += 1
+    return signed, notional, trades, liquidations
+
+
+def _message(event: Event) -> dict:
+    ts, liquidation, price, size, side = event
+    if liquidation:
+        detail = {"side": side, "posSide": "net", "bkPx": str(price), "sz": str(size), "ts": str(ts)}
+        data = [{"instId": INSTRUMENT, "details": [detail]}]
+        return {"arg": {"channel": LIQUIDATION_ORDERS, "instType": "SWAP"}, "data": data}
+    entry = {"instId": INSTRUMENT, "tradeId": "1", "px": str(price), "sz": str(size), "side": side, "ts": str(ts)}
+    return {"arg": {"channel": TRADES, "instId": INSTRUMENT}, "data": [entry]}
+
+
+def run(count: int, checks: int, seed: int) -> None:
+    events = _events(count, seed)
+    flow = TradeFlow(INSTRUMENT)
+    streamer = TradeFlowStreamer({INSTRUMENT: flow})
+    messages = [_message(event) for event in events]
+
+    worst = 0.0
+    step = max(1, count // checks)
+    applied: List[Event] = []
+    for idx, (event, message) in enumerate(zip(events, messages)):
+        streamer.on_message(message)
+        applied.append(event)
+        if idx % step == 0 or idx == count - 1:
+            for window in range(len(flow.windows_ms)):
+                signed, notional, trades, liquidations = _reference(applied, flow, window)
+                assert trades == flow.trades[window] and liquidations == flow.liquidations[window]
+                drift = abs(notional - flow.notional[window]) / 1e4
+                worst = max(worst, abs(signed - flow.signed_volume(window)), drift)
+    print(
+        f"{count:,} events ({streamer.trades:,} trades, {streamer.liquidations:,} liquidations, "
+        f"{flow.late} too late)"
+    )
+    print(
+        f"matches brute force at {checks} checkpoints x {len(flow.windows_ms)} windows; "
+        f"worst float drift {worst:.2e}"
+    )
+
+    fresh = TradeFlow(INSTRUMENT)
+    started = time.perf_counter()
+    for ts, liquidation, price, size, side in events:
+        if liquidation:
+            fresh.add_liquidation(ts, size, side)
+        else:
+            fresh.add_trade(ts, price, size, side)
+    direct = (time.perf_counter() - started) / count * 1e9
+    streamer = TradeFlowStreamer({INSTRUMENT: TradeFlow(INSTRUMENT)})
+    started = time.perf_counter()
+    for message in messages:
+        streamer.on_message(message)
+    parsed = (time.perf_counter() - started) / count * 1e9
+    print(f"update: {direct:,.0f} ns/event direct, {parsed:,.0f} ns/event from decoded channel messages")
+
+    # One lap of the ring first so every bucket already holds a float, then the steady state is measured.
+    add_trade = fresh.add_trade
+    start = events[-1][0]
+    lap = max(fresh.windows_ms)
+    for offset in range(lap):
+        add_trade(start + offset, 30_000.0, 1.0, "buy" if offset % 2 else "sell")
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for offset in range(lap, lap + 100_000):
+        add_trade(start + offset, 30_000.0, 1.0, "buy" if offset % 2 else "sell")
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    blocks = sum(stat.count_diff for stat in stats if "trade_flow" in stat.traceback[0].filename)
+    print(f"net blocks allocated by trade_flow over 100,000 warm updates: {blocks}")
+
+    book = OrderBook(INSTRUMENT, depth=400)
+    book.apply_snapshot(*make_snapshot(400))
+    deltas = list(make_updates(5000, 400))
+    for label, engine in (("without", FeatureEngine(25)), ("with", FeatureEngine(25, trade_flow=fresh, flow_window=2))):
+        started = time.perf_counter()
+        for bids, asks in deltas:
+            book.apply_update(bids, asks)
+            snapshot = engine.compute(book)
+        elapsed = (time.perf_counter() - started) / len(deltas) * 1e6
+        extra = ""
+        if not math.isnan(snapshot.vwap):
+            extra = f" (60s vwap {snapshot.vwap:.1f}, intensity {snapshot.trade_intensity:.0f}/s)"
+        print(f"FeatureEngine.compute {label} trade flow: {elapsed:.2f} us/tick{extra}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rolling trade/liquidation aggregates: correctness and update cost.")
+    parser.add_argument("--events", type=int, default=200_000)
+    parser.add_argument("--checks", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    run(args.events, args.checks, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from decimal import Decimal
+
+from okx_trader.features import FeatureSnapshot
+from okx_trader.warm_storage import FakeRedisBackend, WarmStorageWriter, backend_from_url, decode_features
+
+
+def _percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))] if ordered else 0.0
+
+
+class _TimedBackend:
+    """Wraps a backend and records enqueue-to-acknowledged latency for every XADD."""
+
+    def __init__(self, backend) -> None:
+        self.backend = backend
+        self.latencies = []
+
+    async def connect(self) -> None:
+        await self.backend.connect()
+
+    async def close(self) -> None:
+        await self.backend.close()
+
+    async def execute(self, commands):
+        replies = await self.backend.execute(commands)
+        now = time.time_ns()
+        for command in commands:
+            if command[0] == "XADD":
+                self.latencies.append((now - decode_features(command[-1])["ts_ns"]) / 1e6)
+        return replies
+
+
+async def run(url: str, rtt_ms: float, batch_sizes, records: int, rate: int) -> None:
+    snapshot = FeatureSnapshot(*(Decimal("1.5"),) * 5)
+    period = 1 / rate
+    for batch_size in batch_sizes:
+        backend = backend_from_url(url) if url else FakeRedisBackend(latency=rtt_ms / 1000)
+        timed = _TimedBackend(backend)
+        writer = WarmStorageWriter(timed, prefix="bench", batch_size=batch_size, flush_interval=0.05)
+        await writer.start()
+        enqueue = 0.0
+        start = time.perf_counter()
+        for idx in range(records):
+            begin = time.perf_counter()
+            writer.write_features("BENCH-USDT", snapshot, 1)
+            enqueue += time.perf_counter() - begin
+            delay = start + (idx + 1) * period - time.perf_counter()
+            await asyncio.sleep(max(0.0, delay))
+        await writer.close()
+        elapsed = time.perf_counter() - start
+        metrics = writer.metrics
+        print(
+            f"batch={batch_size:<5} write p50={_percentile(timed.latencies, 0.5):7.2f} ms "
+            f"p99={_percentile(timed.latencies, 0.99):7.2f} ms  flushes={metrics.flushes:<5} "
+            f"max_flush={metrics.max_flush_ms:6.2f} ms  enqueue={enqueue / records * 1e6:4.2f} us "
+            f"throughput={metrics.written / elapsed:,.0f}/s dropped={metrics.dropped} errors={metrics.errors}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Warm-tier batch size vs. write latency.")
+    parser.add_argument("--url", default="", help="redis://host:port/db; default is the in-process fake")
+    parser.add_argument("--rtt-ms", type=float, default=0.3, help="simulated round trip for the fake backend")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 16, 64, 256, 1024])
+    parser.add_argument("--records", type=int, default=20_000)
+    parser.add_argument("--rate", type=int, default=5000, help="records per second")
+    args = parser.parse_args()
+    asyncio.run(run(args.url, args.rtt_ms, args.batch_sizes, args.records, args.rate))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+from decimal import Decimal
+from typing import List
+
+from okx_trader.execution import ExecutionEngine, OkxRestClient, OrderRequest
+from okx_trader.ws_execution import OkxWsTradeClient
+from tests.mock_server import MockOkxServer
+
+
+def _order() -> OrderRequest:
+    return OrderRequest(instrument_id="BTC-USDT", side="buy", size=Decimal("0.01"), price=Decimal("30000.1"))
+
+
+async def _measure(engine: ExecutionEngine, orders: int) -> List[float]:
+    samples = []
+    for _ in range(orders):
+        start = time.perf_counter()
+        await engine.execute(_order())
+        samples.append((time.perf_counter() - start) * 1e6)
+    return sorted(samples)
+
+
+def _summary(name: str, samples: List[float]) -> str:
+    return f"{name:<5} mean={statistics.fmean(samples):8.1f} us  p50={samples[len(samples) // 2]:8.1f} us"
+
+
+async def run(orders: int) -> None:
+    async with MockOkxServer() as server:
+        rest = OkxRestClient("key", "secret", "pass", base_url=server.rest_url)
+        await rest.warm_up()
+        rest_samples = await _measure(ExecutionEngine(rest, dry_run=False), orders)
+
+        ws = OkxWsTradeClient(rest, url=server.private_url)
+        await ws.connect()
+        engine = ExecutionEngine(rest, dry_run=False, ws_client=ws)
+        ws_samples = await _measure(engine, orders)
+        result = await engine.amend("BTC-USDT", "1", new_price=Decimal("30000.2"))
+        assert result["code"] == "0"
+        result = await engine.cancel("BTC-USDT", "1")
+        assert result["code"] == "0"
+        await ws.close()
+
+        server.ws_unresponsive = True
+        ws = OkxWsTradeClient(rest, url=server.private_url, request_timeout=0.05)
+        await ws.connect()
+        engine = ExecutionEngine(rest, dry_run=False, ws_client=ws)
+        before = len(server.rest_orders)
+        await engine.execute(_order())
+        fell_back = engine.ws_fallbacks == 1 and len(server.rest_orders) == before + 1
+        await ws.close()
+        await rest.close()
+
+    print(_summary("rest", rest_samples))
+    print(_summary("ws", ws_samples))
+    print(f"fallback_to_rest_on_timeout={fell_back}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Order round-trip over REST vs private WebSocket (local mock).")
+    parser.add_argument("--orders", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(run(args.orders))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,367 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import platform
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional, Tuple
+
+from main import build_handler
+from okx_trader import StorageManager
+from okx_trader.backtest import BacktestExecutionEngine
+from okx_trader.features import FeatureEngine
+from okx_trader.fixed_point import FixedPointCodec
+from okx_trader.orderbook import OrderBook
+from okx_trader.recorder import read_frames
+from okx_trader.replay import ReplayClock, ReplayDriver
+from okx_trader.risk import RiskManager
+from okx_trader.strategies import StrategyEngine
+from okx_trader.utils import json_dumps, json_loads
+from tests.mock_server import build_book_frames
+
+from .synthetic import make_snapshot, make_updates
+
+Levels = List[List[str]]
+Delta = Tuple[Levels, Levels]
+Run = Callable[[], None]
+
+
+@dataclass
+class Stream:
+    """A snapshot, the deltas that follow it and the same data as raw frames."""
+
+    name: str
+    instrument_id: str
+    snapshot: Delta
+    deltas: List[Delta]
+    frames: List[Tuple[int, bytes]]
+    codec: FixedPointCodec
+
+    @property
+    def levels(self) -> int:
+        return max(len(self.snapshot[0]), len(self.snapshot[1]))
+
+
+def synthetic_stream(levels: int, ticks: int) -> Stream:
+    snapshot = make_snapshot(levels)
+    deltas = list(make_updates(ticks, levels))
+    frames = build_book_frames("BENCH-USDT", snapshot, deltas)
+    raw = [((int(frame["data"][0]["ts"]) + 2) * 1_000_000, json_dumps(frame).encode()) for frame in frames]
+    codec = FixedPointCodec(tick_size=Decimal("0.1"), lot_size=Decimal("0.0001"))
+    return Stream(f"synthetic-{levels}", "BENCH-USDT", snapshot, deltas, raw, codec)
+
+
+def recorded_stream(paths: List[str], ticks: int) -> Stream:
+    """First instrument in the recording, from its first snapshot on."""
+    from okx_trader.sweep import infer_codecs
+
+    instrument_id = None
+    snapshot: Optional[Delta] = None
+    deltas: List[Delta] = []
+    frames: List[Tuple[int, bytes]] = []
+    for recv_ns, raw in read_frames(paths):
+        data = json_loads(raw)
+        if not data.get("data"):
+            continue
+        inst = data.get("arg", {}).get("instId")
+        if snapshot is None:
+            if data.get("action") != "snapshot":
+                continue
+            instrument_id = inst
+            payload = data["data"][0]
+            snapshot = (payload.get("bids", []), payload.get("asks", []))
+        elif inst != instrument_id:
+            continue
+        elif data.get("action") == "snapshot" or len(deltas) >= ticks:
+            break
+        else:
+            payload = data["data"][0]
+            deltas.append((payload.get("bids", []), payload.get("asks", [])))
+        frames.append((recv_ns, raw))
+    if snapshot is None:
+        raise ValueError(f"No snapshot found in {paths}")
+    codec = infer_codecs([(0, frames[0][1])], [instrument_id])[instrument_id]
+    return Stream(f"recorded-{instrument_id}", instrument_id, snapshot, deltas, frames, codec)
+
+
+def _book(stream: Stream, codec: Optional[FixedPointCodec] = None) -> OrderBook:
+    book = OrderBook(stream.instrument_id, depth=max(stream.levels, 400), codec=codec)
+    book.apply_snapshot(*stream.snapshot)
+    return book
+
+
+def case_apply_snapshot(stream: Stream) -> Tuple[Run, int]:
+    book = OrderBook(stream.instrument_id, depth=max(stream.levels, 400))
+    bids, asks = stream.snapshot
+    count = max(5, 20_000 // stream.levels)
+
+    def run() -> None:
+        for _ in range(count):
+            book.apply_snapshot(bids, asks)
+
+    return run, count
+
+
+def case_apply_update(stream: Stream) -> Tuple[Run, int]:
+    book = _book(stream)
+    deltas = stream.deltas
+
+    def run() -> None:
+        apply_update = book.apply_update
+        for bids, asks in deltas:
+            apply_update(bids, asks)
+
+    return run, len(deltas)
+
+
+def case_top_levels(stream: Stream) -> Tuple[Run, int]:
+    book = _book(stream)
+    count = len(stream.deltas)
+
+    def run() -> None:
+        for _ in range(count):
+            bids, asks = book.top_levels(25)
+            for _ in bids:
+                pass
+            for _ in asks:
+                pass
+
+    return run, count
+
+
+def case_checksum(stream: Stream) -> Tuple[Run, int]:
+    # The checksum is cached per side, so each op dirties the book with one delta first.
+    book = _book(stream)
+    deltas = stream.deltas
+
+    def run() -> None:
+        for bids, asks in deltas:
+            book.apply_update(bids, asks)
+            book.checksum()
+
+    return run, len(deltas)
+
+
+def _case_features(stream: Stream, incremental: bool, fixed: bool) -> Tuple[Run, int]:
+    book = _book(stream, stream.codec if fixed else None)
+    engine = FeatureEngine(depth=25, incremental=incremental)
+    engine.compute(book)
+    deltas = stream.deltas
+
+    def run() -> None:
+        for bids, asks in deltas:
+            book.apply_update(bids, asks)
+            engine.compute(book)
+
+    return run, len(deltas)
+
+
+def case_strategy(stream: Stream) -> Tuple[Run, int]:
+    book = _book(stream)
+    engine = FeatureEngine(depth=25)
+    snapshots = []
+    for bids, asks in stream.deltas:
+        book.apply_update(bids, asks)
+        snapshots.append(engine.compute(book))
+    strategy = StrategyEngine(True, True, True)
+
+    def run() -> None:
+        generate = strategy.generate_signals
+        for features in snapshots:
+            generate(book, features)
+
+    return run, len(snapshots)
+
+
+def _case_handler(stream: Stream, fixed: bool) -> Tuple[Run, int]:
+    # Pinned to the default settings with every strategy on, not read from the environment or .env,
+    # so results stay comparable between machines.
+    instrument_id = stream.instrument_id
+    codec = stream.codec if fixed else None
+    codecs = {instrument_id: codec} if fixed else {}
+    clock = ReplayClock()
+    feature_engines = {instrument_id: FeatureEngine(depth=25, incremental=True)}
+    strategy_engines = {instrument_id: StrategyEngine(True, True, True, codec=codec)}
+    risk_manager = RiskManager(max_daily_loss=0.05, max_position_size=1000, max_latency_ms=500)
+    execution = BacktestExecutionEngine(clock, codecs=codecs)
+    logger = logging.getLogger("benchmarks.suite")
+    logger.setLevel(logging.ERROR)
+    handler = build_handler(
+        codecs,
+        feature_engines,
+        strategy_engines,
+        risk_manager,
+        StorageManager(),
+        execution,
+        logger,
+        clock=clock,
+    )
+    driver = ReplayDriver([instrument_id], depth=max(stream.levels, 400), codecs=codecs, clock=clock)
+    frames = stream.frames
+
+    def run() -> None:
+        asyncio.run(driver.run(frames, handler, on_book=execution.on_book))
+
+    return run, len(frames)
+
+
+CASES: Dict[str, Callable[[Stream], Tuple[Run, int]]] = {
+    "orderbook.apply_snapshot": case_apply_snapshot,
+    "orderbook.apply_update": case_apply_update,
+    "orderbook.top_levels": case_top_levels,
+    "orderbook.apply_update+checksum": case_checksum,
+    "features.compute[full]": lambda stream: _case_features(stream, incremental=False, fixed=False),
+    "features.compute[incremental]": lambda stream: _case_features(stream, incremental=True, fixed=False),
+    "features.compute[fixed+incremental]": lambda stream: _case_features(stream, incremental=True, fixed=True),
+    "strategy.generate_signals": case_strategy,
+    "handler.end_to_end[decimal]": lambda stream: _case_handler(stream, fixed=False),
+    "handler.end_to_end[fixed]": lambda stream: _case_handler(stream, fixed=True),
+}
+
+
+def measure(setup: Callable[[], Tuple[Run, int]], repeat: int) -> Dict[str, float]:
+    """Best-of-``repeat`` throughput, plus allocation figures from two separate untimed passes.
+
+    ``blocks_per_op`` is the net growth of live allocator blocks per op
+    (retained objects); ``peak_kib`` is the tracemalloc high-water mark of
+    one pass (transient working set).
+    """
+    best = float("inf")
+    ops = 0
+    for _ in range(repeat):
+        run, ops = setup()
+        gc.collect()
+        start = time.perf_counter_ns()
+        run()
+        best = min(best, time.perf_counter_ns() - start)
+
+    run, _ = setup()
+    gc.collect()
+    gc.disable()
+    try:
+        blocks = sys.getallocatedblocks()
+        run()
+        blocks = sys.getallocatedblocks() - blocks
+    finally:
+        gc.enable()
+
+    run, _ = setup()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        run()
+        peak = tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+    return {
+        "ops": ops,
+        "ns_per_op": best / ops,
+        "ops_per_sec": ops / best * 1e9,
+        "blocks_per_op": blocks / ops,
+        "peak_kib": peak / 1024,
+    }
+
+
+def run_suite(streams: List[Stream], selected: List[str], repeat: int) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for stream in streams:
+        for name in selected:
+            key = f"{name}[{stream.name}]" if not name.endswith("]") else f"{name[:-1]},{stream.name}]"
+            results[key] = measure(lambda factory=CASES[name], stream=stream: factory(stream), repeat)
+            result = results[key]
+            print(
+                f"{key:58s} {result['ops_per_sec']:>12,.0f} ops/s {result['ns_per_op']:>10,.0f} ns/op "
+                f"{result['blocks_per_op']:>7.2f} blocks/op {result['peak_kib']:>9,.0f} KiB peak",
+                file=sys.stderr,
+            )
+    return results
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    max_slowdown: float,
+    max_block_growth: float,
+) -> List[str]:
+    """Per-case deltas against ``baseline``; returns the keys that regressed."""
+    regressions = []
+    for key, result in results.items():
+        before = baseline.get(key)
+        if before is None:
+            print(f"{key:58s} (new)", file=sys.stderr)
+            continue
+        speed = result["ops_per_sec"] / before["ops_per_sec"] - 1
+        blocks = result["blocks_per_op"] - before["blocks_per_op"]
+        flags = []
+        if speed < -max_slowdown:
+            flags.append("SLOWER")
+        if blocks > max_block_growth:
+            flags.append("MORE-ALLOCS")
+        if flags:
+            regressions.append(key)
+        print(
+            f"{key:58s} ops/s {speed:+7.1%}  blocks/op {blocks:+7.2f}  {' '.join(flags)}",
+            file=sys.stderr,
+        )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Order book / features / strategy / handler benchmark suite with JSON output."
+    )
+    parser.add_argument(
+        "--levels", type=int, nargs="*", default=[400, 5000], help="synthetic book depths (none to skip)"
+    )
+    parser.add_argument("--ticks", type=int, default=5000, help="deltas per stream")
+    parser.add_argument("--recorded", nargs="+", default=[], help="also run on recorded frames (RECORD_DIR output)")
+    parser.add_argument("--cases", nargs="+", default=None, help="substring filters on case names")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="write results JSON here (default: stdout)")
+    parser.add_argument("--baseline", help="compare against a previous --output file")
+    parser.add_argument("--max-slowdown", type=float, default=0.10, help="allowed ops/s drop vs baseline (0.10 = 10%%)")
+    parser.add_argument("--max-block-growth", type=float, default=0.5, help="allowed blocks/op increase vs baseline")
+    args = parser.parse_args()
+
+    selected = [name for name in CASES if not args.cases or any(token in name for token in args.cases)]
+    streams = [synthetic_stream(levels, args.ticks) for levels in args.levels]
+    if args.recorded:
+        streams.append(recorded_stream(args.recorded, args.ticks))
+    results = run_suite(streams, selected, args.repeat)
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "timestamp": int(time.time()),
+            "ticks": args.ticks,
+            "streams": {stream.name: stream.levels for stream in streams},
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(text + "\n")
+    else:
+        print(text)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            baseline = json.load(handle)["results"]
+        regressions = compare(results, baseline, args.max_slowdown, args.max_block_growth)
+        if regressions:
+            print(f"{len(regressions)} regression(s): {', '.join(regressions)}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import random
+from decimal import Decimal
+from typing import Iterator, List, Tuple
+
+Level = List[str]
+
+
+def make_snapshot(
+    levels: int,
+    mid: Decimal = Decimal("30000.0"),
+    tick: Decimal = Decimal("0.1"),
+    seed: int = 7,
+) -> Tuple[List[Level], List[Level]]:
+    rng = random.Random(seed)
+    bids = [
+        [str(mid - tick * (idx + 1)), f"{rng.uniform(0.01, 5):.4f}", "0", "1"]
+        for idx in range(levels)
+    ]
+    asks = [
+        [str(mid + tick * (idx + 1)), f"{rng.uniform(0.01, 5):.4f}", "0", "1"]
+        for idx in range(levels)
+    ]
+    return bids, asks
+
+
+def make_updates(
+    count: int,
+    levels: int,
+    mid: Decimal = Decimal("30000.0"),
+    tick: Decimal = Decimal("0.1"),
+    seed: int = 11,
+) -> Iterator[Tuple[List[Level], List[Level]]]:
+    """Yield tbt-like deltas: mostly size changes near the touch, some adds/removes."""
+    rng = random.Random(seed)
+    for _ in range(count):
+        bids: List[Level] = []
+        asks: List[Level] = []
+        for _ in range(rng.randint(1, 3)):
+            offset = min(int(rng.expovariate(1 / 20)), levels + 20)
+            side_is_bid = rng.random() < 0.5
+            price = mid - tick * (offset + 1) if side_is_bid else mid + tick * (offset + 1)
+            roll = rng.random()
+            size = "0" if roll < 0.15 else f"{rng.uniform(0.01, 5):.4f}"
+            (bids if side_is_bid else asks).append([str(price), size, "0", "1"])
+        yield bids, asks
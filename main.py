@@ -2,100 +2,616 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from pathlib import Path
-from datetime import datetime, timezone
+import time
 from decimal import Decimal
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import aiohttp
 
 from okx_trader import (
     AppConfig,
     ExecutionEngine,
     FeatureEngine,
-    OrderBookStreamer,
+    MultiplexOrderBookStreamer,
     RiskManager,
     StorageManager,
     StrategyEngine,
 )
+from okx_trader.strategies import OrderSignal, StrategyParams
+from okx_trader.utils import MonotonicClock, instrument_type
+from okx_trader.cold_storage import ColdStorageWriter
+from okx_trader.decoding import OrderBookMessage, make_decoder
 from okx_trader.execution import OkxRestClient, OrderRequest
+from okx_trader.fixed_point import FixedPointCodec
+from okx_trader.latency import (
+    FEATURES,
+    HANDLER,
+    ORDER_ROUND_TRIP,
+    RISK,
+    STORAGE,
+    STRATEGY,
+    LatencyRecorder,
+    MetricsServer,
+    report_latency,
+)
+from okx_trader.order_manager import CANCEL, TERMINAL, OrderManager
+from okx_trader.private_stream import PrivateStreamer
+from okx_trader.rate_limit import RateLimiter, RequestScheduler
+from okx_trader.recorder import FrameRecorder
+from okx_trader.sharding import ShardCoordinator, WorkerLink, shard_instruments
+from okx_trader.trade_flow import TradeFlow, TradeFlowStreamer
+from okx_trader.warm_storage import WarmStorageWriter, backend_from_url
+from okx_trader.vector_features import VectorFeatureEngine
+from okx_trader.ws_execution import OkxWsTradeClient
+
 
+async def _report_pipeline(streamer: MultiplexOrderBookStreamer, logger: logging.Logger, interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        metrics = streamer.pipeline_metrics().values()
+        logger.info(
+            "Pipeline: received=%d processed=%d coalesced=%d dropped=%d max_depth=%d.",
+            sum(m.received for m in metrics),
+            sum(m.processed for m in metrics),
+            sum(m.coalesced for m in metrics),
+            sum(m.dropped for m in metrics),
+            max((m.max_queue_depth for m in metrics), default=0),
+        )
 
-def _calc_latency_ms(message_data) -> int | None:
-    data = message_data.get("data")
-    if not data:
+
+async def _report_scheduler(scheduler: RequestScheduler, logger: logging.Logger, interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        logger.info("Request scheduler: %s.", scheduler.metrics.summary())
+
+
+def _calc_latency_ms(message: OrderBookMessage, now_ns: int) -> int | None:
+    ts_ms = message.ts_ms
+    if ts_ms is None:
         return None
-    ts = data[0].get("ts")
-    if not ts:
+    return now_ns // 1_000_000 - ts_ms
+
+
+def build_strategy_params(config: AppConfig) -> StrategyParams:
+    return StrategyParams.from_dict(
+        {
+            "ofi_threshold": config.ofi_threshold,
+            "wmp_threshold": config.wmp_threshold,
+            "liquidation_size": config.liquidation_size,
+            "market_making_size": config.market_making_size,
+            "funding_size": config.funding_size,
+        }
+    )
+
+
+def build_engines(config: AppConfig, codecs: Dict[str, FixedPointCodec]) -> Tuple[Dict, Dict]:
+    params = build_strategy_params(config)
+    clock = MonotonicClock()
+    feature_engines = {
+        instrument_id: VectorFeatureEngine(depth=25)
+        if config.vector_features
+        else FeatureEngine(
+            depth=25,
+            incremental=config.incremental_features,
+            trade_flow=TradeFlow(instrument_id, clock=clock) if config.trade_flow else None,
+        )
+        for instrument_id in config.instruments
+    }
+    strategy_engines = {
+        instrument_id: StrategyEngine(
+            enable_liquidation_hunting=config.enable_liquidation_hunting,
+            enable_funding_arbitrage=config.enable_funding_arbitrage,
+            enable_market_making=config.enable_market_making,
+            codec=codecs.get(instrument_id),
+            params=params,
+            feature_depth=25,
+            strategies=config.strategy_plugins,
+            quote_refresh_ms=config.quote_refresh_ms,
+        )
+        for instrument_id in config.instruments
+    }
+    return feature_engines, strategy_engines
+
+
+def build_risk_manager(config: AppConfig) -> RiskManager:
+    return RiskManager(
+        max_daily_loss=config.max_daily_loss,
+        max_position_size=config.max_position_size,
+        max_latency_ms=config.max_latency_ms,
+        capital=config.risk_capital,
+        max_order_notional=config.max_order_notional,
+        max_position_notional=config.max_position_notional,
+        latency_window=config.risk_latency_window,
+        latency_quantile=config.risk_latency_quantile,
+    )
+
+
+def build_order_manager(
+    config: AppConfig, execution: ExecutionEngine, clock: Optional[Callable[[], int]] = None
+) -> Optional[OrderManager]:
+    if not config.order_manager:
         return None
-    msg_time = datetime.fromtimestamp(int(ts) / 1000, tz=timezone.utc)
-    latency = datetime.now(tz=timezone.utc) - msg_time
-    return int(latency.total_seconds() * 1000)
+    return OrderManager(
+        execution,
+        price_tolerance_bps=Decimal(str(config.order_price_tolerance_bps)),
+        size_tolerance=Decimal(str(config.order_size_tolerance)),
+        quote_ttl_ns=config.order_quote_ttl_ms * 1_000_000,
+        amend=config.order_amend,
+        clock=clock,
+    )
 
 
-async def main() -> None:
-    config = AppConfig.from_env()
+def build_order_router(
+    codecs: Dict[str, FixedPointCodec],
+    risk_manager: RiskManager,
+    storage: StorageManager,
+    execution: ExecutionEngine,
+    logger: logging.Logger,
+    latency: Optional[LatencyRecorder] = None,
+    order_manager: Optional[OrderManager] = None,
+    clock: Optional[Callable[[], int]] = None,
+):
+    """Risk -> execution for one tick's signals: ``route(instrument_id, signals, latency_ms, top)``.
+
+    ``top`` is the tick's ``(best_bid, best_ask)`` in book units (or
+    ``None``) and marks the risk engine's position. A halt
+    (``is_trading_allowed``) drops the whole tick; otherwise each order gets
+    its own pre-trade check and only the failing ones are dropped. With
+    ``order_manager`` set, quote signals are reconciled against working
+    orders instead of each becoming a new order, and a halt cancels the
+    instrument's working orders.
+    """
+    clock = clock or MonotonicClock()
+    warm = storage.warm
+    cold = storage.cold
+    perf_counter_ns = time.perf_counter_ns
+    check_order = risk_manager.check_order
+    track_order = risk_manager.track_order
+    if latency is not None:
+        record_risk = latency.stage(RISK).record
+        record_order = latency.stage(ORDER_ROUND_TRIP).record
+
+    async def route(
+        instrument_id: str, signals: List[OrderSignal], latency_ms: Optional[int], top: Optional[Tuple] = None
+    ) -> None:
+        if latency is not None:
+            mark = perf_counter_ns()
+        codec = codecs.get(instrument_id)
+        if top is not None:
+            bid, ask = top
+            if codec is not None:
+                bid, ask = codec.price_to_decimal(bid), codec.price_to_decimal(ask)
+            risk_manager.mark(instrument_id, bid, ask, clock())
+        if latency_ms is not None:
+            risk_manager.update_latency(latency_ms)
+        allowed = risk_manager.is_trading_allowed()
+        if latency is not None:
+            record_risk(perf_counter_ns() - mark)
+        if not allowed:
+            if signals:
+                logger.warning(
+                    "Risk guard blocked trading (latency=%s, daily_loss=%s).", latency_ms, risk_manager.daily_loss
+                )
+            if order_manager is not None:
+                for action in await order_manager.cancel_all(instrument_id):
+                    logger.info("Order cancel (%s): %s", action.reason, action.result)
+                    if action.order.state in TERMINAL:
+                        risk_manager.on_order_closed(action.order.request.client_order_id or "")
+            return
+        if order_manager is not None:
+            if latency is not None:
+                mark = perf_counter_ns()
+            actions = await order_manager.reconcile(instrument_id, signals, codec, check_order)
+            if latency is not None and actions:
+                record_order((perf_counter_ns() - mark) // len(actions))
+            for action in actions:
+                logger.info("Order %s (%s): %s", action.action, action.reason, action.result)
+                order = action.order.request
+                if action.order.state in TERMINAL:
+                    risk_manager.on_order_closed(order.client_order_id or "")
+                elif action.accepted and action.action != CANCEL:
+                    track_order(order, action.order.filled)
+                if action.action != CANCEL:
+                    storage.write_hot_order(instrument_id, order.side, order.price, order.size, action.accepted)
+                if warm is not None:
+                    warm.write_order(instrument_id, action.result, action.reason)
+                if cold is not None:
+                    cold.write_order(instrument_id, action.result, action.reason)
+            return
+        for signal in signals:
+            order = OrderRequest.from_signal(instrument_id, signal, codec)
+            reason = check_order(order)
+            if reason is not None:
+                logger.debug("Pre-trade check rejected %s %s %s: %s.", instrument_id, order.side, order.size, reason)
+                continue
+            if latency is not None:
+                mark = perf_counter_ns()
+            result = await execution.execute(order)
+            if latency is not None:
+                record_order(perf_counter_ns() - mark)
+            logger.info("Order executed: %s", result)
+            accepted = bool(result.get("dry_run")) or result.get("code") == "0"
+            if accepted:
+                track_order(order)
+            storage.write_hot_order(instrument_id, order.side, order.price, order.size, accepted)
+            if warm is not None:
+                warm.write_order(instrument_id, result, signal.reason)
+            if cold is not None:
+                cold.write_order(instrument_id, result, signal.reason)
+
+    return route
+
+
+def build_signal_handler(
+    codecs: Dict[str, FixedPointCodec],
+    feature_engines: Dict,
+    strategy_engines: Dict[str, StrategyEngine],
+    storage: StorageManager,
+    route,
+    clock: Optional[Callable[[], int]] = None,
+    latency: Optional[LatencyRecorder] = None,
+):
+    """Features -> storage -> strategy for one book update, then ``route`` the signals.
+
+    ``clock`` returns wall-clock nanoseconds (monotonic-anchored by default);
+    the backtester passes the replay clock. With ``latency`` set, each stage
+    is timed into its histogram.
+    """
+    clock = clock or MonotonicClock()
+    warm = storage.warm
+    cold = storage.cold
+    perf_counter_ns = time.perf_counter_ns
+    if latency is not None:
+        record_features = latency.stage(FEATURES).record
+        record_storage = latency.stage(STORAGE).record
+        record_strategy = latency.stage(STRATEGY).record
+        record_handler = latency.stage(HANDLER).record
+
+    async def handler(orderbook, message):
+        if latency is not None:
+            started = mark = perf_counter_ns()
+        now_ns = clock()
+        latency_ms = _calc_latency_ms(message, now_ns)
+        instrument_id = orderbook.instrument_id
+        engine = feature_engines[instrument_id]
+        features = engine.compute(orderbook)
+        if latency is not None:
+            now = perf_counter_ns()
+            record_features(now - mark)
+            mark = now
+        codec = codecs.get(instrument_id)
+        stored = engine.to_decimal(features, codec) if codec and isinstance(engine, FeatureEngine) else features
+        storage.write_hot_features(instrument_id, stored, latency_ms)
+        if warm is not None:
+            warm.write_features(instrument_id, stored, latency_ms)
+        if cold is not None:
+            cold.write_features(instrument_id, stored, latency_ms)
+        if latency is not None:
+            now = perf_counter_ns()
+            record_storage(now - mark)
+            mark = now
+        strategy = strategy_engines[instrument_id]
+        signals = strategy.generate_signals(orderbook, features, now_ns)
+        if latency is not None:
+            record_strategy(perf_counter_ns() - mark)
+        # The strategy engine has already read the touch for this tick.
+        context = strategy.context
+        top = (context.bid_price, context.ask_price) if context.has_book else None
+        await route(instrument_id, signals, latency_ms, top)
+        if latency is not None:
+            record_handler(perf_counter_ns() - started)
+
+    return handler
+
+
+def build_handler(
+    codecs: Dict[str, FixedPointCodec],
+    feature_engines: Dict,
+    strategy_engines: Dict[str, StrategyEngine],
+    risk_manager: RiskManager,
+    storage: StorageManager,
+    execution: ExecutionEngine,
+    logger: logging.Logger,
+    clock: Optional[Callable[[], int]] = None,
+    latency: Optional[LatencyRecorder] = None,
+    order_manager: Optional[OrderManager] = None,
+):
+    """The per-tick pipeline: features -> storage -> strategy -> risk -> execution."""
+    route = build_order_router(codecs, risk_manager, storage, execution, logger, latency, order_manager, clock)
+    return build_signal_handler(codecs, feature_engines, strategy_engines, storage, route, clock, latency)
+
+
+def _configure_logging(config: AppConfig) -> logging.Logger:
     log_path = Path(config.log_file)
     log_path.parent.mkdir(parents=True, exist_ok=True)
     logging.basicConfig(
         level=getattr(logging, config.log_level.upper(), logging.INFO),
-        format="%(asctime)s %(levelname)s %(name)s - %(message)s",
+        format="%(asctime)s %(levelname)s %(processName)s %(name)s - %(message)s",
         handlers=[
             logging.FileHandler(log_path),
             logging.StreamHandler(),
         ],
     )
-    logger = logging.getLogger("okx_trader")
-    logger.info("Starting OKX trader in %s mode (dry_run=%s).", config.trading_mode, config.dry_run)
+    return logging.getLogger("okx_trader")
 
-    proxy = config.https_proxy or config.http_proxy
-    streamer = OrderBookStreamer(instrument_id="BTC-USDT", depth=400, proxy=proxy)
-    feature_engine = FeatureEngine(depth=25)
-    strategy_engine = StrategyEngine(
-        enable_liquidation_hunting=config.enable_liquidation_hunting,
-        enable_funding_arbitrage=config.enable_funding_arbitrage,
-        enable_market_making=config.enable_market_making,
+
+async def _start_storage(config: AppConfig) -> StorageManager:
+    warm = None
+    if config.warm_storage_url:
+        warm = WarmStorageWriter(
+            backend_from_url(config.warm_storage_url),
+            batch_size=config.warm_batch_size,
+            retention_seconds=config.warm_retention_seconds,
+        )
+        await warm.start()
+    cold = None
+    if config.cold_storage_dir:
+        cold = ColdStorageWriter(
+            config.cold_storage_dir,
+            flush_rows=config.cold_flush_rows,
+            flush_interval=config.cold_flush_interval,
+        )
+        cold.start()
+    return StorageManager(
+        hot_capacities={"features": config.hot_feature_capacity, "orders": config.hot_order_capacity},
+        warm=warm,
+        cold=cold,
     )
-    risk_manager = RiskManager(
-        max_daily_loss=config.max_daily_loss,
-        max_position_size=config.max_position_size,
-        max_latency_ms=config.max_latency_ms,
+
+
+async def _stop_storage(storage: StorageManager) -> None:
+    if storage.warm:
+        await storage.warm.close()
+    if storage.cold:
+        storage.cold.stop()
+
+
+def _build_streamer(
+    config: AppConfig,
+    instrument_ids: List[str],
+    codecs: Dict[str, FixedPointCodec],
+    recorder: Optional[FrameRecorder],
+    latency: Optional[LatencyRecorder],
+    rest_client: OkxRestClient,
+    cold: Optional[ColdStorageWriter] = None,
+) -> MultiplexOrderBookStreamer:
+    return MultiplexOrderBookStreamer(
+        instrument_ids,
+        depth=400,
+        proxy=config.https_proxy or config.http_proxy,
+        codecs=codecs,
+        connections=config.ws_connections,
+        pipeline=config.pipeline_mode,
+        coalesce=config.pipeline_coalesce,
+        recorder=recorder,
+        decoder=make_decoder(config.json_decoder),
+        latency=latency,
+        redundancy=config.ws_redundancy,
+        reconnect=True,
+        reconnect_delay=config.ws_reconnect_delay,
+        ping_interval=config.ws_ping_interval,
+        rest_client=rest_client,
+        cold=cold,
     )
-    storage = StorageManager()
-    rest_client = OkxRestClient(
+
+
+def _build_rest_client(config: AppConfig) -> OkxRestClient:
+    return OkxRestClient(
         api_key=config.okx_api_key,
         secret_key=config.okx_secret_key,
         passphrase=config.okx_passphrase,
         base_url=config.okx_base_url,
-        proxy=proxy,
+        proxy=config.https_proxy or config.http_proxy,
+        timeout=config.timeout,
     )
-    execution = ExecutionEngine(rest_client, dry_run=config.dry_run)
 
-    async def handler(orderbook, message):
-        latency_ms = _calc_latency_ms(message.data)
-        if latency_ms is not None:
-            risk_manager.update_latency(latency_ms)
-        features = feature_engine.compute(orderbook)
-        storage.write_hot(
-            {
-                "instrument": orderbook.instrument_id,
-                "features": features,
-                "latency_ms": latency_ms,
-            }
+
+async def _warm_up(rest_client: OkxRestClient, logger: logging.Logger) -> None:
+    """Best effort: a failed warm-up only leaves the first order to pay for its own handshake."""
+    try:
+        await rest_client.warm_up()
+    except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as exc:
+        logger.warning("REST connection warm-up failed (%r); continuing without it.", exc)
+
+
+def _start_trade_flow(config: AppConfig, feature_engines: Dict) -> Optional[Tuple[TradeFlowStreamer, asyncio.Task]]:
+    flows = {
+        instrument_id: engine.trade_flow
+        for instrument_id, engine in feature_engines.items()
+        if getattr(engine, "trade_flow", None) is not None
+    }
+    if not flows:
+        return None
+    streamer = TradeFlowStreamer(
+        flows,
+        proxy=config.https_proxy or config.http_proxy,
+        liquidation_inst_types=config.liquidation_inst_types,
+        reconnect_delay=config.ws_reconnect_delay,
+        ping_interval=config.ws_ping_interval,
+    )
+    return streamer, asyncio.create_task(streamer.run_forever())
+
+
+async def _stop_trade_flow(trade_flow: Optional[Tuple[TradeFlowStreamer, asyncio.Task]]) -> None:
+    if trade_flow is not None:
+        streamer, task = trade_flow
+        await streamer.close()
+        await asyncio.gather(task, return_exceptions=True)
+
+
+async def run_shard(
+    link: WorkerLink,
+    instrument_ids: List[str],
+    config: AppConfig,
+    codecs: Dict[str, FixedPointCodec],
+) -> None:
+    """Shard worker: books, features and strategies for ``instrument_ids``; signals go to the coordinator."""
+    logger = _configure_logging(config)
+    config.instruments = instrument_ids
+    logger.info("Shard %d serving %s.", link.shard_id, ", ".join(instrument_ids))
+    latency = LatencyRecorder() if config.latency_metrics else None
+    recorder = None
+    if config.record_dir:
+        recorder = FrameRecorder(config.record_dir, prefix=f"frames-shard{link.shard_id}")
+        recorder.start()
+    # Only for REST order book snapshots after a market-data disconnect.
+    rest_client = _build_rest_client(config)
+    storage = await _start_storage(config)
+    streamer = _build_streamer(config, instrument_ids, codecs, recorder, latency, rest_client, storage.cold)
+    feature_engines, strategy_engines = build_engines(config, codecs)
+    trade_flow = _start_trade_flow(config, feature_engines)
+    handler = build_signal_handler(codecs, feature_engines, strategy_engines, storage, link.route, latency=latency)
+    reporter = asyncio.create_task(_report_pipeline(streamer, logger, 60)) if config.pipeline_mode else None
+    latency_reporter = None
+    if latency is not None:
+        latency_reporter = asyncio.create_task(report_latency(latency, logger, config.latency_report_interval))
+    try:
+        await streamer.run_forever(handler)
+    finally:
+        logger.info("Shard %d order book feed: %s.", link.shard_id, streamer.recovery.summary())
+        if reporter:
+            reporter.cancel()
+        if latency_reporter:
+            latency_reporter.cancel()
+        await _stop_trade_flow(trade_flow)
+        await _stop_storage(storage)
+        await rest_client.close()
+        if recorder:
+            recorder.stop()
+
+
+async def main() -> None:
+    config = AppConfig.from_env()
+    logger = _configure_logging(config)
+    logger.info("Starting OKX trader in %s mode (dry_run=%s).", config.trading_mode, config.dry_run)
+
+    proxy = config.https_proxy or config.http_proxy
+    rest_client = _build_rest_client(config)
+    codecs = {}
+    instruments = []
+    for instrument_id in config.instruments:
+        # Contract instruments need ctVal/ctValCcy for risk even without fixed-point mode.
+        if not config.fixed_point and instrument_type(instrument_id) not in ("SWAP", "FUTURES"):
+            continue
+        instrument = await rest_client.get_instrument(instrument_id)
+        instruments.append(instrument)
+        if config.fixed_point:
+            codec = codecs[instrument_id] = FixedPointCodec.from_instrument(instrument)
+            logger.info("Fixed-point mode for %s: tickSz=%s lotSz=%s.", instrument_id, codec.tick_size, codec.lot_size)
+    latency = LatencyRecorder() if config.latency_metrics else None
+    sharded = config.shards > 1 and len(config.instruments) > 1
+    recorder = None
+    if config.record_dir and not sharded:
+        recorder = FrameRecorder(config.record_dir)
+        recorder.start()
+    risk_manager = build_risk_manager(config)
+    for instrument in instruments:
+        risk_manager.add_instrument(instrument)
+    storage = await _start_storage(config)
+    ws_client = None
+    if config.execution_backend == "ws" and not config.dry_run:
+        ws_client = OkxWsTradeClient(rest_client, proxy=proxy, reconnect_delay=config.ws_reconnect_delay)
+        await ws_client.connect()
+    scheduler = None
+    if config.request_scheduler:
+        scheduler = await RequestScheduler(
+            rest_client,
+            RateLimiter(headroom=config.rate_limit_headroom),
+            coalesce_window=config.scheduler_coalesce_ms / 1000,
+        ).start()
+    execution = ExecutionEngine(scheduler or rest_client, dry_run=config.dry_run, ws_client=ws_client)
+    order_manager = build_order_manager(config, execution)
+    private_streamer = None
+    private_task = None
+    if config.private_stream and not config.dry_run:
+        private_streamer = PrivateStreamer(
+            rest_client,
+            proxy=proxy,
+            reconnect_delay=config.ws_reconnect_delay,
+            ping_interval=config.ws_ping_interval,
+            limiter=scheduler.limiter if scheduler is not None else RateLimiter(headroom=config.rate_limit_headroom),
         )
-        signals = strategy_engine.generate_signals(orderbook, features)
-        if not risk_manager.is_trading_allowed():
-            logger.warning("Risk guard blocked trading (latency=%s).", latency_ms)
-            return
-        for signal in signals:
-            order = OrderRequest(
-                instrument_id=orderbook.instrument_id,
-                side=signal.side,
-                size=Decimal(signal.size),
-                price=Decimal(signal.price),
-            )
-            result = await execution.execute(order)
-            logger.info("Order executed: %s", result)
-            storage.write_hot({"order": result, "reason": signal.reason})
+        private_streamer.order_listeners.append(risk_manager.on_order_update)
+        private_streamer.tracked_orders = risk_manager.open_client_order_ids
+        private_streamer.closed_order_listeners.append(risk_manager.on_order_closed)
+        if order_manager is not None:
+            private_streamer.order_listeners.append(order_manager.on_order_update)
+        private_streamer.position_listeners.append(risk_manager.on_position)
+        private_streamer.account_listeners.append(risk_manager.on_account)
+        private_task = asyncio.create_task(private_streamer.run_forever())
+
+    reporter = None
+    coordinator = None
+    streamer = None
+    trade_flow = None
+    if sharded:
+        # Workers own the market-data side; this process keeps risk, execution and order storage.
+        coordinator = ShardCoordinator(
+            run_shard, shard_instruments(config.instruments, config.shards), risk_manager, args=(config, codecs)
+        ).start()
+        logger.info("Sharded runtime: %d worker processes.", len(coordinator.shards))
+        route = build_order_router(codecs, risk_manager, storage, execution, logger, latency, order_manager)
+        runner = coordinator.run(route)
+    else:
+        streamer = _build_streamer(config, config.instruments, codecs, recorder, latency, rest_client, storage.cold)
+        feature_engines, strategy_engines = build_engines(config, codecs)
+        trade_flow = _start_trade_flow(config, feature_engines)
+        handler = build_handler(
+            codecs,
+            feature_engines,
+            strategy_engines,
+            risk_manager,
+            storage,
+            execution,
+            logger,
+            latency=latency,
+            order_manager=order_manager,
+        )
+        if config.pipeline_mode:
+            reporter = asyncio.create_task(_report_pipeline(streamer, logger, 60))
+        runner = streamer.run_forever(handler)
 
-    await streamer.run_forever(handler)
+    scheduler_reporter = asyncio.create_task(_report_scheduler(scheduler, logger, 60)) if scheduler else None
+    latency_reporter = None
+    metrics_server = None
+    if latency is not None:
+        latency_reporter = asyncio.create_task(report_latency(latency, logger, config.latency_report_interval))
+        if config.metrics_port:
+            metrics_server = await MetricsServer(latency, config.metrics_host, config.metrics_port).start()
+            logger.info("Prometheus metrics on http://%s:%d/metrics.", config.metrics_host, metrics_server.port)
+    try:
+        if not config.dry_run:
+            await _warm_up(rest_client, logger)
+        await runner
+    finally:
+        if streamer is not None:
+            logger.info("Order book feed: %s.", streamer.recovery.summary())
+        if coordinator:
+            dropped = sum(shard.dropped for shard in coordinator.stats.values())
+            if dropped:
+                logger.warning("Shard routing dropped %d stale batch(es) behind slow instruments.", dropped)
+            await coordinator.close()
+        if reporter:
+            reporter.cancel()
+        if scheduler_reporter:
+            scheduler_reporter.cancel()
+        if latency_reporter:
+            latency_reporter.cancel()
+        if metrics_server:
+            await metrics_server.close()
+        if private_streamer:
+            await private_streamer.close()
+            await asyncio.gather(private_task, return_exceptions=True)
+        await _stop_trade_flow(trade_flow)
+        if ws_client:
+            await ws_client.close()
+        if scheduler:
+            await scheduler.close()
+        await rest_client.close()
+        await _stop_storage(storage)
+        if recorder:
+            recorder.stop()
 
 
 if __name__ == "__main__":
@@ -1,8 +1,11 @@
 """OKX high-precision trading system modules."""
 
 from .config import AppConfig
+from .fixed_point import FixedPointCodec
 from .orderbook import OrderBook
 from .orderbook_stream import OrderBookStreamer
+from .multiplex_stream import MultiplexOrderBookStreamer
+from .pipeline import TickPipeline
 from .features import FeatureEngine
 from .strategies import StrategyEngine
 from .risk import RiskManager
@@ -11,8 +14,11 @@ from .storage import StorageManager
 
 __all__ = [
     "AppConfig",
+    "FixedPointCodec",
     "OrderBook",
     "OrderBookStreamer",
+    "MultiplexOrderBookStreamer",
+    "TickPipeline",
     "FeatureEngine",
     "StrategyEngine",
     "RiskManager",
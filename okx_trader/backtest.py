@@ -0,0 +1,288 @@
+from __future__ import annotations
+
+import itertools
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional
+
+from .execution import ExecutionEngine, OrderRequest
+from .fixed_point import FixedPointCodec
+from .orderbook import OrderBook
+
+_INF = Decimal("Infinity")
+
+
+@dataclass
+class Fill:
+    ts_ns: int
+    instrument_id: str
+    order_id: str
+    client_order_id: Optional[str]
+    side: str
+    price: Decimal
+    size: Decimal
+    fee: Decimal
+    liquidity: str
+
+
+@dataclass
+class _SimOrder:
+    order_id: str
+    request: OrderRequest
+    active_ns: int
+    expire_ns: int
+    resting: bool = False
+
+
+@dataclass
+class _InstrumentState:
+    orders: List[_SimOrder] = field(default_factory=list)
+    position: Decimal = Decimal("0")
+    cash: Decimal = Decimal("0")
+    fees: Decimal = Decimal("0")
+    last_bid: Optional[Decimal] = None
+    last_ask: Optional[Decimal] = None
+    max_buy: Decimal = -_INF
+    min_sell: Decimal = _INF
+    next_event_ns: int = 0
+
+    def refresh(self) -> None:
+        max_buy, min_sell, next_event = -_INF, _INF, 1 << 62
+        for order in self.orders:
+            price = order.request.price
+            if order.request.side == "buy":
+                max_buy = max(max_buy, price if price is not None else _INF)
+            else:
+                min_sell = min(min_sell, price if price is not None else -_INF)
+            next_event = min(next_event, order.expire_ns if order.resting else order.active_ns)
+        self.max_buy, self.min_sell, self.next_event_ns = max_buy, min_sell, next_event
+
+
+@dataclass
+class SimulatedFillModel:
+    """Top-of-book fill model.
+
+    An order goes live ``latency_ns`` after submission. If it is marketable
+    then, it fills in full at the opposite best price and pays
+    ``taker_fee``. Otherwise it rests, and it fills at its own price with
+    ``maker_fee`` once the opposite best touches it. Resting orders expire
+    after ``order_ttl_ns``. Depth and queue position are ignored, so fills are
+    optimistic for sizes larger than the touch.
+    """
+
+    latency_ns: int = 5_000_000
+    order_ttl_ns: int = 1_000_000_000
+    maker_fee: Decimal = Decimal("0.0002")
+    taker_fee: Decimal = Decimal("0.0005")
+    max_open_orders: int = 50
+
+
+class BacktestExecutionEngine(ExecutionEngine):
+    """``ExecutionEngine`` that fills against replayed books instead of calling OKX.
+
+    Pass ``on_book`` to ``ReplayDriver.run`` so resting orders are matched on
+    every tick before the strategy handler sees it. Every callable in
+    ``order_listeners`` receives an OKX ``orders``-channel style entry for
+    every fill and expiry.
+    """
+
+    def __init__(
+        self,
+        clock: Callable[[], int],
+        fill_model: Optional[SimulatedFillModel] = None,
+        codecs: Optional[Dict[str, FixedPointCodec]] = None,
+    ) -> None:
+        super().__init__(client=None, dry_run=False)
+        self.clock = clock
+        self.fill_model = fill_model or SimulatedFillModel()
+        self.codecs = codecs or {}
+        self.fills: List[Fill] = []
+        self.orders_submitted = 0
+        self.orders_rejected = 0
+        self.orders_expired = 0
+        self.orders_cancelled = 0
+        self.order_listeners: List[Callable[[Dict[str, str]], None]] = []
+        self._state: Dict[str, _InstrumentState] = {}
+        self._order_ids = itertools.count(1)
+
+    def _instrument(self, instrument_id: str) -> _InstrumentState:
+        state = self._state.get(instrument_id)
+        if state is None:
+            state = self._state[instrument_id] = _InstrumentState()
+        return state
+
+    def submit(self, order: OrderRequest) -> Dict[str, str]:
+        """Synchronous ``execute`` returning the per-order result entry (used by the parameter sweep)."""
+        order_id = str(next(self._order_ids))
+        if order.client_order_id is None:
+            # Deterministic ids keep replays reproducible (and skip uuid4 on the hot path).
+            order.client_order_id = f"bt{order_id}"
+        self.orders_submitted += 1
+        state = self._instrument(order.instrument_id)
+        if len(state.orders) >= self.fill_model.max_open_orders:
+            self.orders_rejected += 1
+            return {"clOrdId": order.client_order_id, "ordId": "", "sCode": "1", "sMsg": "open order limit (backtest)"}
+        now = self.clock()
+        model = self.fill_model
+        active_ns = now + model.latency_ns
+        state.orders.append(_SimOrder(order_id, order, active_ns, active_ns + model.order_ttl_ns))
+        state.refresh()
+        return {"clOrdId": order.client_order_id, "ordId": order_id, "sCode": "0", "sMsg": ""}
+
+    async def execute(self, order: OrderRequest) -> Dict:
+        entry = self.submit(order)
+        return {"code": "0" if entry["sCode"] == "0" else "1", "msg": "", "data": [entry]}
+
+    async def execute_batch(self, orders: List[OrderRequest]) -> Dict:
+        entries = [self.submit(order) for order in orders]
+        return {"code": "0" if all(e["sCode"] == "0" for e in entries) else "2", "msg": "", "data": entries}
+
+    def _find(self, instrument_id: str, order_id: Optional[str], client_order_id: Optional[str]) -> Optional[_SimOrder]:
+        for order in self._instrument(instrument_id).orders:
+            if order_id:
+                if order.order_id == order_id:
+                    return order
+            elif order.request.client_order_id == client_order_id:
+                return order
+        return None
+
+    async def amend(
+        self,
+        instrument_id: str,
+        order_id: Optional[str],
+        new_price: Optional[Decimal] = None,
+        new_size: Optional[Decimal] = None,
+        client_order_id: Optional[str] = None,
+    ) -> Dict:
+        order = self._find(instrument_id, order_id, client_order_id)
+        if order is None:
+            return {"code": "1", "msg": "", "data": [{"ordId": order_id, "sCode": "51503", "sMsg": "order not found"}]}
+        if new_price is not None:
+            order.request.price = new_price
+            # A reprice is a new order from the matching engine's point of view.
+            order.active_ns = self.clock() + self.fill_model.latency_ns
+            order.expire_ns = order.active_ns + self.fill_model.order_ttl_ns
+            order.resting = False
+        if new_size is not None:
+            order.request.size = new_size
+        self._instrument(instrument_id).refresh()
+        return {"code": "0", "msg": "", "data": [{"ordId": order.order_id, "sCode": "0", "sMsg": ""}]}
+
+    async def cancel(self, instrument_id: str, order_id: Optional[str], client_order_id: Optional[str] = None) -> Dict:
+        state = self._instrument(instrument_id)
+        order = self._find(instrument_id, order_id, client_order_id)
+        if order is None:
+            return {"code": "1", "msg": "", "data": [{"ordId": order_id, "sCode": "51400", "sMsg": "order not found"}]}
+        state.orders.remove(order)
+        state.refresh()
+        self.orders_cancelled += 1
+        return {"code": "0", "msg": "", "data": [{"ordId": order.order_id, "sCode": "0", "sMsg": ""}]}
+
+    def on_book(self, book: OrderBook) -> None:
+        best_bid = book.best_bid()
+        best_ask = book.best_ask()
+        if best_bid is None or best_ask is None:
+            return
+        state = self._instrument(book.instrument_id)
+        codec = self.codecs.get(book.instrument_id)
+        bid_price, ask_price = best_bid[0], best_ask[0]
+        if codec is not None:
+            bid_price, ask_price = codec.price_to_decimal(bid_price), codec.price_to_decimal(ask_price)
+        state.last_bid, state.last_ask = bid_price, ask_price
+        if not state.orders:
+            return
+        now = self.clock()
+        if now < state.next_event_ns and ask_price > state.max_buy and bid_price < state.min_sell:
+            return
+        remaining = []
+        for order in state.orders:
+            if now < order.active_ns:
+                remaining.append(order)
+                continue
+            request = order.request
+            price = request.price
+            if request.side == "buy":
+                marketable = price is None or ask_price <= price
+                fill_price = ask_price if not order.resting or price is None else price
+            else:
+                marketable = price is None or bid_price >= price
+                fill_price = bid_price if not order.resting or price is None else price
+            if marketable:
+                self._fill(state, order, fill_price, now, "maker" if order.resting else "taker")
+            elif now >= order.expire_ns:
+                self.orders_expired += 1
+                self._notify(order, "canceled")
+            else:
+                order.resting = True
+                remaining.append(order)
+        state.orders = remaining
+        state.refresh()
+
+    def _notify(self, order: _SimOrder, state: str, fill: Optional[Fill] = None) -> None:
+        if not self.order_listeners:
+            return
+        request = order.request
+        update = {
+            "instId": request.instrument_id,
+            "ordId": order.order_id,
+            "clOrdId": request.client_order_id or "",
+            "side": request.side,
+            "sz": str(request.size),
+            "state": state,
+            "accFillSz": str(request.size) if state == "filled" else "0",
+        }
+        if fill is not None:
+            update.update(
+                fillSz=str(fill.size),
+                fillPx=str(fill.price),
+                fillFee=str(-fill.fee),
+                execType="M" if fill.liquidity == "maker" else "T",
+            )
+        for listener in self.order_listeners:
+            listener(update)
+
+    def _fill(self, state: _InstrumentState, order: _SimOrder, price: Decimal, now: int, liquidity: str) -> None:
+        request = order.request
+        size = request.size
+        rate = self.fill_model.maker_fee if liquidity == "maker" else self.fill_model.taker_fee
+        fee = price * size * rate
+        notional = price * size
+        if request.side == "buy":
+            state.position += size
+            state.cash -= notional + fee
+        else:
+            state.position -= size
+            state.cash += notional - fee
+        state.fees += fee
+        fill = Fill(
+            ts_ns=now,
+            instrument_id=request.instrument_id,
+            order_id=order.order_id,
+            client_order_id=request.client_order_id,
+            side=request.side,
+            price=price,
+            size=size,
+            fee=fee,
+            liquidity=liquidity,
+        )
+        self.fills.append(fill)
+        self._notify(order, "filled", fill)
+
+    def summary(self) -> Dict[str, Dict[str, str]]:
+        """Per-instrument position, fees and PnL marked to the last replayed mid."""
+        result = {}
+        for instrument_id, state in self._state.items():
+            mark = Decimal("0")
+            if state.last_bid is not None:
+                mark = state.position * (state.last_bid + state.last_ask) / 2
+            fills = [fill for fill in self.fills if fill.instrument_id == instrument_id]
+            result[instrument_id] = {
+                "position": str(state.position),
+                "cash": str(state.cash),
+                "fees": str(state.fees),
+                "pnl": str(state.cash + mark),
+                "fills": str(len(fills)),
+                "maker_fills": str(sum(fill.liquidity == "maker" for fill in fills)),
+                "open_orders": str(len(state.orders)),
+            }
+        return result
@@ -0,0 +1,304 @@
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+logger = logging.getLogger(__name__)
+
+BOOK_DELTAS = "book_deltas"
+FEATURES = "features"
+ORDERS = "orders"
+
+_STOP = object()
+
+
+@dataclass
+class ColdStorageMetrics:
+    enqueued: int = 0
+    rows_written: int = 0
+    files_written: int = 0
+    bytes_written: int = 0
+    flushes: int = 0
+    errors: int = 0
+    max_pending: int = 0
+
+
+def _book_delta_rows(payload: Dict) -> Iterable[Tuple]:
+    # One row per level so deltas can be replayed or aggregated column-wise.
+    action = payload.get("action") or "update"
+    for entry in payload.get("data", ()):
+        seq_id = _optional_int(entry.get("seqId"))
+        prev_seq_id = _optional_int(entry.get("prevSeqId"))
+        checksum = _optional_int(entry.get("checksum"))
+        exchange_ts = _optional_int(entry.get("ts"))
+        for side in ("bids", "asks"):
+            for level in entry.get(side, ()):
+                yield action, side, level[0], level[1], seq_id, prev_seq_id, checksum, exchange_ts
+
+
+def _feature_rows(payload: Tuple[Any, Optional[float]]) -> Iterable[Tuple]:
+    snapshot, latency_ms = payload
+    yield (
+        float(snapshot.ofi),
+        float(snapshot.wmp),
+        float(snapshot.liquidity_vacuum),
+        float(snapshot.bid_pressure),
+        float(snapshot.ask_pressure),
+        None if latency_ms is None else float(latency_ms),
+    )
+
+
+def _order_rows(payload: Tuple[Dict, Optional[str]]) -> Iterable[Tuple]:
+    result, reason = payload
+    if result.get("dry_run"):
+        order = result.get("order") or {}
+        yield order.get("side"), order.get("sz"), order.get("px"), None, None, None, None, reason, True
+        return
+    for entry in result.get("data") or [{}]:
+        yield (
+            None,
+            None,
+            None,
+            entry.get("clOrdId"),
+            entry.get("ordId"),
+            entry.get("sCode") or result.get("code"),
+            entry.get("sMsg") or result.get("msg"),
+            reason,
+            False,
+        )
+
+
+def _optional_int(value: Any) -> Optional[int]:
+    if value is None or value == "":
+        return None
+    return int(value)
+
+
+def _schemas() -> Dict[str, Tuple["pa.Schema", Callable[[Any], Iterable[Tuple]]]]:
+    common = [("ts_ns", pa.int64()), ("instrument", pa.string())]
+    return {
+        BOOK_DELTAS: (
+            pa.schema(
+                common
+                + [
+                    ("action", pa.string()),
+                    ("side", pa.string()),
+                    # Exchange strings are kept verbatim so replays reproduce checksums.
+                    ("price", pa.string()),
+                    ("size", pa.string()),
+                    ("seq_id", pa.int64()),
+                    ("prev_seq_id", pa.int64()),
+                    ("checksum", pa.int64()),
+                    ("exchange_ts_ms", pa.int64()),
+                ]
+            ),
+            _book_delta_rows,
+        ),
+        FEATURES: (
+            pa.schema(
+                common
+                + [
+                    ("ofi", pa.float64()),
+                    ("wmp", pa.float64()),
+                    ("liquidity_vacuum", pa.float64()),
+                    ("bid_pressure", pa.float64()),
+                    ("ask_pressure", pa.float64()),
+                    ("latency_ms", pa.float64()),
+                ]
+            ),
+            _feature_rows,
+        ),
+        ORDERS: (
+            pa.schema(
+                common
+                + [
+                    ("side", pa.string()),
+                    ("size", pa.string()),
+                    ("price", pa.string()),
+                    ("client_order_id", pa.string()),
+                    ("order_id", pa.string()),
+                    ("code", pa.string()),
+                    ("msg", pa.string()),
+                    ("reason", pa.string()),
+                    ("dry_run", pa.bool_()),
+                ]
+            ),
+            _order_rows,
+        ),
+    }
+
+
+class _Batch:
+    __slots__ = ("columns", "rows", "opened")
+
+    def __init__(self, width: int) -> None:
+        self.columns: List[List[Any]] = [[] for _ in range(width)]
+        self.rows = 0
+        self.opened = time.monotonic()
+
+
+class ColdStorageWriter:
+    """Background Parquet writer for the cold tier.
+
+    ``write_*`` only timestamps the record and puts it on a queue, so the
+    event loop never converts, compresses or touches disk. A writer thread
+    turns records into column buffers keyed by (kind, instrument, UTC hour)
+    and writes ``<root>/<kind>/instrument=<id>/date=<YYYY-MM-DD>/hour=<HH>/``
+    part files once a buffer holds ``flush_rows`` rows or is older than
+    ``flush_interval`` seconds. Fixed-point feature snapshots should be
+    converted with ``FeatureEngine.to_decimal`` before they are written.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        flush_rows: int = 50_000,
+        flush_interval: float = 5.0,
+        compression: str = "zstd",
+    ) -> None:
+        if pa is None:
+            raise RuntimeError("ColdStorageWriter requires pyarrow (pip install pyarrow)")
+        self.root = root
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.compression = compression
+        self.metrics = ColdStorageMetrics()
+        self._schemas = _schemas()
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._batches: Dict[Tuple[str, str, int], _Batch] = {}
+        self._part = 0
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="cold-storage", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Flush everything still buffered and join the writer thread."""
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+            self._thread = None
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def write(self, kind: str, instrument: str, payload: Any, ts_ns: Optional[int] = None) -> None:
+        self._queue.put((kind, instrument, time.time_ns() if ts_ns is None else ts_ns, payload))
+        self.metrics.enqueued += 1
+
+    def write_book_delta(self, instrument: str, message: Dict, ts_ns: Optional[int] = None) -> None:
+        self.write(BOOK_DELTAS, instrument, message, ts_ns)
+
+    def write_features(
+        self,
+        instrument: str,
+        snapshot: Any,
+        latency_ms: Optional[float] = None,
+        ts_ns: Optional[int] = None,
+    ) -> None:
+        self.write(FEATURES, instrument, (snapshot, latency_ms), ts_ns)
+
+    def write_order(
+        self,
+        instrument: str,
+        result: Dict,
+        reason: Optional[str] = None,
+        ts_ns: Optional[int] = None,
+    ) -> None:
+        self.write(ORDERS, instrument, (result, reason), ts_ns)
+
+    def _run(self) -> None:
+        get = self._queue.get
+        poll = min(self.flush_interval, 0.5)
+        next_check = time.monotonic() + poll
+        while True:
+            try:
+                item = get(timeout=poll)
+            except queue.Empty:
+                item = None
+            if item is _STOP:
+                self._flush()
+                return
+            if item is not None:
+                try:
+                    self._buffer(item)
+                except Exception:
+                    self.metrics.errors += 1
+                    logger.exception("Dropping malformed %s record.", item[0])
+                size = self._queue.qsize()
+                if size > self.metrics.max_pending:
+                    self.metrics.max_pending = size
+            now = time.monotonic()
+            if now >= next_check:
+                next_check = now + poll
+                self._flush(expired_only=True)
+
+    def _buffer(self, item: Tuple[str, str, int, Any]) -> None:
+        kind, instrument, ts_ns, payload = item
+        schema, to_rows = self._schemas[kind]
+        key = (kind, instrument, ts_ns // 3_600_000_000_000)
+        batch = self._batches.get(key)
+        if batch is None:
+            batch = self._batches[key] = _Batch(len(schema))
+        columns = batch.columns
+        for row in to_rows(payload):
+            columns[0].append(ts_ns)
+            columns[1].append(instrument)
+            for column, value in zip(columns[2:], row):
+                column.append(value)
+            batch.rows += 1
+        if batch.rows >= self.flush_rows:
+            self._write(key, self._batches.pop(key))
+
+    def _flush(self, expired_only: bool = False) -> None:
+        now = time.monotonic()
+        for key in list(self._batches):
+            batch = self._batches[key]
+            if not expired_only or now - batch.opened >= self.flush_interval:
+                self._write(key, self._batches.pop(key))
+
+    def _write(self, key: Tuple[str, str, int], batch: _Batch) -> None:
+        if not batch.rows:
+            return
+        kind, instrument, hour = key
+        schema = self._schemas[kind][0]
+        stamp = datetime.fromtimestamp(hour * 3600, tz=timezone.utc)
+        directory = os.path.join(
+            self.root,
+            kind,
+            f"instrument={instrument}",
+            f"date={stamp:%Y-%m-%d}",
+            f"hour={stamp:%H}",
+        )
+        self._part += 1
+        path = os.path.join(directory, f"part-{time.time_ns()}-{self._part:06d}.parquet")
+        try:
+            os.makedirs(directory, exist_ok=True)
+            table = pa.Table.from_arrays(
+                [pa.array(column, type=field.type) for column, field in zip(batch.columns, schema)],
+                schema=schema,
+            )
+            pq.write_table(table, path, compression=self.compression)
+        except Exception:
+            self.metrics.errors += 1
+            logger.exception("Cold storage flush to %s failed; %d rows lost.", path, batch.rows)
+            return
+        metrics = self.metrics
+        metrics.rows_written += batch.rows
+        metrics.files_written += 1
+        metrics.bytes_written += os.path.getsize(path)
+        metrics.flushes += 1
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import os
 from dataclasses import dataclass
-from typing import Optional
+from typing import List, Optional
 
 from dotenv import load_dotenv
 
@@ -22,14 +22,61 @@ class AppConfig:
     okx_base_url: str
     max_position_size: float
     max_daily_loss: float
+    risk_capital: float
+    max_order_notional: float
+    max_position_notional: float
     leverage_limit: int
     timeout: int
     enable_liquidation_hunting: bool
     enable_funding_arbitrage: bool
     enable_market_making: bool
+    strategy_plugins: List[str]
+    quote_refresh_ms: int
+    ofi_threshold: float
+    wmp_threshold: float
+    liquidation_size: float
+    market_making_size: float
+    funding_size: float
+    instruments: List[str]
+    ws_connections: int
+    ws_redundancy: int
+    shards: int
+    pipeline_mode: bool
+    pipeline_coalesce: bool
     ws_reconnect_delay: int
     ws_ping_interval: int
     max_latency_ms: int
+    risk_latency_window: int
+    risk_latency_quantile: float
+    fixed_point: bool
+    json_decoder: str
+    vector_features: bool
+    incremental_features: bool
+    trade_flow: bool
+    liquidation_inst_types: List[str]
+    hot_feature_capacity: int
+    hot_order_capacity: int
+    warm_storage_url: str
+    warm_retention_seconds: int
+    warm_batch_size: int
+    cold_storage_dir: str
+    cold_flush_rows: int
+    cold_flush_interval: float
+    record_dir: str
+    latency_metrics: bool
+    latency_report_interval: float
+    metrics_host: str
+    metrics_port: int
+    execution_backend: str
+    private_stream: bool
+    request_scheduler: bool
+    rate_limit_headroom: float
+    scheduler_coalesce_ms: float
+    order_manager: bool
+    order_price_tolerance_bps: float
+    order_size_tolerance: float
+    order_quote_ttl_ms: int
+    order_amend: bool
     dry_run: bool
     trading_mode: str
     log_level: str
@@ -47,14 +94,63 @@ class AppConfig:
             okx_base_url=os.getenv("OKX_BASE_URL", "https://www.okx.com"),
             max_position_size=float(os.getenv("MAX_POSITION_SIZE", "1000")),
             max_daily_loss=float(os.getenv("MAX_DAILY_LOSS", "0.05")),
+            risk_capital=float(os.getenv("RISK_CAPITAL", "0")),
+            max_order_notional=float(os.getenv("MAX_ORDER_NOTIONAL", "0")),
+            max_position_notional=float(os.getenv("MAX_POSITION_NOTIONAL", "0")),
             leverage_limit=int(os.getenv("LEVERAGE_LIMIT", "20")),
             timeout=int(os.getenv("TIMEOUT", "30")),
             enable_liquidation_hunting=os.getenv("ENABLE_LIQUIDATION_HUNTING", "true").lower() == "true",
             enable_funding_arbitrage=os.getenv("ENABLE_FUNDING_ARBITRAGE", "true").lower() == "true",
             enable_market_making=os.getenv("ENABLE_MARKET_MAKING", "false").lower() == "true",
+            strategy_plugins=[name.strip() for name in os.getenv("STRATEGY_PLUGINS", "").split(",") if name.strip()],
+            quote_refresh_ms=int(os.getenv("QUOTE_REFRESH_MS", "1000")),
+            ofi_threshold=float(os.getenv("OFI_THRESHOLD", "50")),
+            wmp_threshold=float(os.getenv("WMP_THRESHOLD", "0")),
+            liquidation_size=float(os.getenv("LIQUIDATION_SIZE", "1")),
+            market_making_size=float(os.getenv("MARKET_MAKING_SIZE", "0.5")),
+            funding_size=float(os.getenv("FUNDING_SIZE", "0.3")),
+            instruments=[inst.strip() for inst in os.getenv("INSTRUMENTS", "BTC-USDT").split(",") if inst.strip()],
+            ws_connections=int(os.getenv("WS_CONNECTIONS", "1")),
+            ws_redundancy=int(os.getenv("WS_REDUNDANCY", "1")),
+            shards=int(os.getenv("SHARDS", "1")),
+            pipeline_mode=os.getenv("PIPELINE_MODE", "false").lower() == "true",
+            pipeline_coalesce=os.getenv("PIPELINE_COALESCE", "true").lower() == "true",
             ws_reconnect_delay=int(os.getenv("WS_RECONNECT_DELAY", "5")),
             ws_ping_interval=int(os.getenv("WS_PING_INTERVAL", "20")),
             max_latency_ms=int(os.getenv("MAX_LATENCY_MS", "500")),
+            risk_latency_window=int(os.getenv("RISK_LATENCY_WINDOW", "1000")),
+            risk_latency_quantile=float(os.getenv("RISK_LATENCY_QUANTILE", "0.99")),
+            fixed_point=os.getenv("FIXED_POINT", "false").lower() == "true",
+            json_decoder=os.getenv("JSON_DECODER", "auto").lower(),
+            vector_features=os.getenv("VECTOR_FEATURES", "false").lower() == "true",
+            incremental_features=os.getenv("INCREMENTAL_FEATURES", "false").lower() == "true",
+            trade_flow=os.getenv("TRADE_FLOW", "false").lower() == "true",
+            liquidation_inst_types=[
+                item.strip() for item in os.getenv("LIQUIDATION_INST_TYPES", "SWAP").split(",") if item.strip()
+            ],
+            hot_feature_capacity=int(os.getenv("HOT_FEATURE_CAPACITY", "100000")),
+            hot_order_capacity=int(os.getenv("HOT_ORDER_CAPACITY", "10000")),
+            warm_storage_url=os.getenv("WARM_STORAGE_URL", ""),
+            warm_retention_seconds=int(os.getenv("WARM_RETENTION_SECONDS", "3600")),
+            warm_batch_size=int(os.getenv("WARM_BATCH_SIZE", "256")),
+            cold_storage_dir=os.getenv("COLD_STORAGE_DIR", ""),
+            cold_flush_rows=int(os.getenv("COLD_FLUSH_ROWS", "50000")),
+            cold_flush_interval=float(os.getenv("COLD_FLUSH_INTERVAL", "5")),
+            record_dir=os.getenv("RECORD_DIR", ""),
+            latency_metrics=os.getenv("LATENCY_METRICS", "false").lower() == "true",
+            latency_report_interval=float(os.getenv("LATENCY_REPORT_INTERVAL", "60")),
+            metrics_host=os.getenv("METRICS_HOST", "127.0.0.1"),
+            metrics_port=int(os.getenv("METRICS_PORT", "0")),
+            execution_backend=os.getenv("EXECUTION_BACKEND", "rest").lower(),
+            private_stream=os.getenv("PRIVATE_STREAM", "false").lower() == "true",
+            request_scheduler=os.getenv("REQUEST_SCHEDULER", "false").lower() == "true",
+            rate_limit_headroom=float(os.getenv("RATE_LIMIT_HEADROOM", "0.9")),
+            scheduler_coalesce_ms=float(os.getenv("SCHEDULER_COALESCE_MS", "0")),
+            order_manager=os.getenv("ORDER_MANAGER", "false").lower() == "true",
+            order_price_tolerance_bps=float(os.getenv("ORDER_PRICE_TOLERANCE_BPS", "2")),
+            order_size_tolerance=float(os.getenv("ORDER_SIZE_TOLERANCE", "0.1")),
+            order_quote_ttl_ms=int(os.getenv("ORDER_QUOTE_TTL_MS", "5000")),
+            order_amend=os.getenv("ORDER_AMEND", "true").lower() == "true",
             dry_run=os.getenv("DRY_RUN", "true").lower() == "true",
             trading_mode=os.getenv("TRADING_MODE", "paper"),
             log_level=os.getenv("LOG_LEVEL", "INFO"),
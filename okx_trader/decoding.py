@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import json
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from .utils import json_loads
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+DECODERS = ("auto", "msgspec", "orjson", "stdlib")
+
+Level = Sequence[str]
+
+
+class OrderBookMessage:
+    """One books-l2-tbt frame (or event) in the shape the order book consumes.
+
+    Decoders fill the typed fields straight from the wire; ``data``, the
+    frame as a plain dict, is only built from ``raw`` when something asks
+    for it (cold storage, error logging). Passing ``data`` instead fills the
+    typed fields from it, as the pre-decoder code did.
+    """
+
+    __slots__ = (
+        "action",
+        "instrument_id",
+        "bids",
+        "asks",
+        "ts_ms",
+        "seq_id",
+        "prev_seq_id",
+        "checksum",
+        "has_data",
+        "raw",
+        "_data",
+    )
+
+    def __init__(
+        self,
+        action: str,
+        data: Optional[Dict] = None,
+        instrument_id: Optional[str] = None,
+        bids: Sequence[Level] = (),
+        asks: Sequence[Level] = (),
+        ts_ms: Optional[int] = None,
+        seq_id: Optional[int] = None,
+        prev_seq_id: Optional[int] = None,
+        checksum: Optional[int] = None,
+        has_data: bool = False,
+        raw: Union[str, bytes, None] = None,
+    ) -> None:
+        self.action = action
+        self.raw = raw
+        self._data = data
+        if data is not None:
+            instrument_id = data.get("arg", {}).get("instId")
+            entries = data.get("data")
+            has_data = bool(entries)
+            if has_data:
+                payload = entries[0]
+                bids = payload.get("bids", ())
+                asks = payload.get("asks", ())
+                ts = payload.get("ts")
+                ts_ms = int(ts) if ts else None
+                seq_id = payload.get("seqId")
+                prev_seq_id = payload.get("prevSeqId")
+                checksum = payload.get("checksum")
+        self.instrument_id = instrument_id
+        self.bids = bids
+        self.asks = asks
+        self.ts_ms = ts_ms
+        self.seq_id = seq_id
+        self.prev_seq_id = prev_seq_id
+        self.checksum = checksum
+        self.has_data = has_data
+
+    @classmethod
+    def from_dict(cls, data: Dict, raw: Union[str, bytes, None] = None) -> "OrderBookMessage":
+        return cls(data.get("action") or data.get("event") or "update", data, raw=raw)
+
+    @property
+    def data(self) -> Dict:
+        if self._data is None:
+            self._data = json_loads(self.raw) if self.raw is not None else {}
+        return self._data
+
+    def __repr__(self) -> str:
+        return f"OrderBookMessage(action={self.action!r}, instrument_id={self.instrument_id!r}, seq_id={self.seq_id!r})"
+
+
+class FrameDecoder:
+    """Turns raw WebSocket text into ``OrderBookMessage`` via a dict-producing ``loads``."""
+
+    name = "stdlib"
+
+    def __init__(self, loads=json.loads) -> None:
+        self._loads = loads
+
+    def decode(self, raw: Union[str, bytes]) -> OrderBookMessage:
+        return OrderBookMessage.from_dict(self._loads(raw), raw)
+
+
+class OrjsonFrameDecoder(FrameDecoder):
+    name = "orjson"
+
+    def __init__(self) -> None:
+        if orjson is None:
+            raise RuntimeError("OrjsonFrameDecoder requires orjson (pip install orjson)")
+        super().__init__(orjson.loads)
+
+
+if msgspec is not None:
+
+    class _Arg(msgspec.Struct, frozen=True):
+        instId: Optional[str] = None
+
+    class _Payload(msgspec.Struct):
+        # Levels stay exact strings: fixed-point parsing and the checksum both
+        # need the exchange's text, and decoding them as Decimal measured no
+        # faster than ``Decimal(str)`` in the book.
+        bids: List[Tuple[str, ...]] = []
+        asks: List[Tuple[str, ...]] = []
+        ts: Optional[int] = None
+        checksum: Optional[int] = None
+        seqId: Optional[int] = None
+        prevSeqId: Optional[int] = None
+
+    class _Frame(msgspec.Struct):
+        arg: _Arg = _Arg()
+        action: Optional[str] = None
+        event: Optional[str] = None
+        data: List[_Payload] = []
+
+
+class MsgspecFrameDecoder(FrameDecoder):
+    """Schema-driven decode into typed structs: no intermediate dict per frame.
+
+    ``ts`` arrives as a string and is coerced to ``int`` (``strict=False``).
+    Frames that do not fit the schema fall back to the dict path.
+    """
+
+    name = "msgspec"
+
+    def __init__(self) -> None:
+        if msgspec is None:
+            raise RuntimeError("MsgspecFrameDecoder requires msgspec (pip install msgspec)")
+        super().__init__(json_loads)
+        self._decoder = msgspec.json.Decoder(_Frame, strict=False)
+
+    def decode(self, raw: Union[str, bytes]) -> OrderBookMessage:
+        try:
+            frame = self._decoder.decode(raw)
+        except msgspec.ValidationError:
+            return OrderBookMessage.from_dict(json_loads(raw), raw)
+        action = frame.action or frame.event or "update"
+        if not frame.data:
+            return OrderBookMessage(action, instrument_id=frame.arg.instId, raw=raw)
+        payload = frame.data[0]
+        # Positional on purpose: this runs once per frame.
+        return OrderBookMessage(
+            action,
+            None,
+            frame.arg.instId,
+            payload.bids,
+            payload.asks,
+            payload.ts,
+            payload.seqId,
+            payload.prevSeqId,
+            payload.checksum,
+            True,
+            raw,
+        )
+
+
+def make_decoder(name: str = "auto") -> FrameDecoder:
+    """``auto`` picks msgspec, then orjson, then the stdlib ``json`` module."""
+    if name == "auto":
+        name = "msgspec" if msgspec is not None else "orjson" if orjson is not None else "stdlib"
+    if name == "msgspec":
+        return MsgspecFrameDecoder()
+    if name == "orjson":
+        return OrjsonFrameDecoder()
+    if name == "stdlib":
+        return FrameDecoder()
+    raise ValueError(f"Unknown decoder {name!r}; expected one of {', '.join(DECODERS)}")
+
+
+def available_decoders() -> List[str]:
+    names = ["stdlib"]
+    if orjson is not None:
+        names.append("orjson")
+    if msgspec is not None:
+        names.append("msgspec")
+    return names
+
@@ -1,15 +1,31 @@
 from __future__ import annotations
 
+import asyncio
 import base64
 import hashlib
 import hmac
-import json
+import logging
+import uuid
 from dataclasses import dataclass
 from decimal import Decimal
-from typing import Dict, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
+from urllib.parse import urlencode
 
 import aiohttp
 
+from .fixed_point import FixedPointCodec
+from .utils import instrument_type, iso_timestamp, json_dumps, json_loads
+
+if TYPE_CHECKING:
+    from .rate_limit import RequestScheduler
+    from .strategies import OrderSignal
+    from .ws_execution import OkxWsTradeClient
+
+logger = logging.getLogger(__name__)
+
+# sCode/code OKX answers an order query with when it has no such order.
+ORDER_NOT_FOUND_CODE = "51603"
+
 
 @dataclass
 class OrderRequest:
@@ -18,6 +34,42 @@ class OrderRequest:
     size: Decimal
     price: Optional[Decimal] = None
     order_type: str = "limit"
+    client_order_id: Optional[str] = None
+
+    def to_payload(self) -> Dict[str, str]:
+        payload = {
+            "instId": self.instrument_id,
+            "tdMode": "cross",
+            "side": self.side,
+            "ordType": self.order_type,
+            "sz": str(self.size),
+        }
+        if self.price is not None:
+            payload["px"] = str(self.price)
+        if self.client_order_id is not None:
+            payload["clOrdId"] = self.client_order_id
+        return payload
+
+    @classmethod
+    def from_signal(
+        cls,
+        instrument_id: str,
+        signal: "OrderSignal",
+        codec: Optional[FixedPointCodec] = None,
+    ) -> "OrderRequest":
+        if codec is None:
+            return cls(
+                instrument_id=instrument_id,
+                side=signal.side,
+                size=Decimal(signal.size),
+                price=Decimal(signal.price),
+            )
+        return cls(
+            instrument_id=instrument_id,
+            side=signal.side,
+            size=codec.size_to_decimal(signal.size),
+            price=codec.price_to_decimal(signal.price),
+        )
 
 
 class OkxRestClient:
@@ -28,58 +80,232 @@ class OkxRestClient:
         passphrase: str,
         base_url: str,
         proxy: str | None = None,
+        timeout: float = 30,
+        pool_size: int = 32,
+        keepalive_timeout: float = 60,
+        dns_ttl: int = 300,
     ) -> None:
         self.api_key = api_key
         self.secret_key = secret_key
         self.passphrase = passphrase
         self.base_url = base_url.rstrip("/")
         self.proxy = proxy
-
-    def _sign(self, timestamp: str, method: str, path: str, body: str) -> str:
-        message = f"{timestamp}{method}{path}{body}".encode()
-        secret = self.secret_key.encode()
-        signature = hmac.new(secret, message, hashlib.sha256).digest()
-        return base64.b64encode(signature).decode()
-
-    async def _request(self, method: str, path: str, payload: Optional[Dict] = None) -> Dict:
-        body = json.dumps(payload or {})
-        timestamp = str(int(aiohttp.helpers.utcnow().timestamp()))
-        signature = self._sign(timestamp, method, path, body)
-        headers = {
-            "OK-ACCESS-KEY": self.api_key,
-            "OK-ACCESS-SIGN": signature,
-            "OK-ACCESS-TIMESTAMP": timestamp,
-            "OK-ACCESS-PASSPHRASE": self.passphrase,
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_ttl = dns_ttl
+        self._hmac = hmac.new(secret_key.encode(), digestmod=hashlib.sha256)
+        self._static_headers = {
+            "OK-ACCESS-KEY": api_key,
+            "OK-ACCESS-PASSPHRASE": passphrase,
             "Content-Type": "application/json",
         }
-        url = f"{self.base_url}{path}"
-        async with aiohttp.ClientSession() as session:
-            async with session.request(
-                method,
-                url,
-                data=body,
-                headers=headers,
-                proxy=self.proxy,
-            ) as resp:
-                return await resp.json()
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def _sign(self, timestamp: str, method: str, path: str, body: str) -> str:
+        mac = self._hmac.copy()
+        mac.update(f"{timestamp}{method}{path}{body}".encode())
+        return base64.b64encode(mac.digest()).decode()
+
+    async def start(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                ttl_dns_cache=self.dns_ttl,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    async def warm_up(self, connections: int = 2) -> None:
+        """Open ``connections`` pooled sockets (DNS, TCP, TLS, proxy CONNECT) before the first order."""
+        session = await self.start()
+
+        async def ping() -> None:
+            async with session.get(f"{self.base_url}/api/v5/public/time", proxy=self.proxy) as resp:
+                await resp.read()
+
+        await asyncio.gather(*(ping() for _ in range(connections)))
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _request(self, method: str, path: str, payload: Optional[Any] = None) -> Dict:
+        body = "" if method == "GET" else json_dumps(payload or {})
+        timestamp = iso_timestamp()
+        headers = dict(self._static_headers)
+        headers["OK-ACCESS-SIGN"] = self._sign(timestamp, method, path, body)
+        headers["OK-ACCESS-TIMESTAMP"] = timestamp
+        session = self._session if self._session is not None else await self.start()
+        async with session.request(
+            method,
+            self.base_url + path,
+            data=body,
+            headers=headers,
+            proxy=self.proxy,
+        ) as resp:
+            return json_loads(await resp.read())
+
+    async def get_instrument(self, instrument_id: str) -> Dict:
+        query = urlencode({"instType": instrument_type(instrument_id), "instId": instrument_id})
+        response = await self._request("GET", f"/api/v5/public/instruments?{query}")
+        if response.get("code") != "0" or not response.get("data"):
+            raise RuntimeError(f"Instrument lookup failed for {instrument_id}: {response.get('msg')}")
+        return response["data"][0]
+
+    async def get_order_book(self, instrument_id: str, depth: int = 400) -> Dict:
+        query = urlencode({"instId": instrument_id, "sz": str(depth)})
+        return await self._request("GET", f"/api/v5/market/books?{query}")
+
+    async def get_orders_pending(self, after: Optional[str] = None) -> Dict:
+        query = urlencode({"limit": "100", **({"after": after} if after else {})})
+        return await self._request("GET", f"/api/v5/trade/orders-pending?{query}")
+
+    async def get_order(
+        self, instrument_id: str, order_id: Optional[str] = None, client_order_id: Optional[str] = None
+    ) -> Dict:
+        params = {"instId": instrument_id}
+        if order_id:
+            params["ordId"] = order_id
+        else:
+            params["clOrdId"] = client_order_id or ""
+        return await self._request("GET", f"/api/v5/trade/order?{urlencode(params)}")
+
+    async def get_fills(self, begin_ms: Optional[int] = None, after: Optional[str] = None) -> Dict:
+        """Fills of the last three days, newest first; ``after`` pages back from a ``billId``."""
+        params = {"limit": "100"}
+        if begin_ms is not None:
+            params["begin"] = str(begin_ms)
+        if after:
+            params["after"] = after
+        return await self._request("GET", f"/api/v5/trade/fills?{urlencode(params)}")
+
+    async def get_positions(self) -> Dict:
+        return await self._request("GET", "/api/v5/account/positions")
+
+    async def get_balance(self) -> Dict:
+        return await self._request("GET", "/api/v5/account/balance")
 
     async def place_order(self, order: OrderRequest) -> Dict:
-        payload = {
-            "instId": order.instrument_id,
-            "tdMode": "cross",
-            "side": order.side,
-            "ordType": order.order_type,
-            "sz": str(order.size),
-        }
-        if order.price is not None:
-            payload["px"] = str(order.price)
-        return await self._request("POST", "/api/v5/trade/order", payload)
+        return await self._request("POST", "/api/v5/trade/order", order.to_payload())
+
+    async def place_batch_orders(self, orders: List[OrderRequest]) -> Dict:
+        return await self._request("POST", "/api/v5/trade/batch-orders", [order.to_payload() for order in orders])
+
+    async def amend_order(
+        self,
+        instrument_id: str,
+        order_id: Optional[str],
+        new_price: Optional[Decimal] = None,
+        new_size: Optional[Decimal] = None,
+        client_order_id: Optional[str] = None,
+    ) -> Dict:
+        payload = amend_payload(instrument_id, order_id, new_price, new_size, client_order_id)
+        return await self._request("POST", "/api/v5/trade/amend-order", payload)
+
+    async def cancel_order(
+        self, instrument_id: str, order_id: Optional[str], client_order_id: Optional[str] = None
+    ) -> Dict:
+        payload = order_ref(instrument_id, order_id, client_order_id)
+        return await self._request("POST", "/api/v5/trade/cancel-order", payload)
+
+
+def order_ref(instrument_id: str, order_id: Optional[str], client_order_id: Optional[str] = None) -> Dict[str, str]:
+    """``instId`` with ``ordId``, or with ``clOrdId`` while the exchange id is not known yet."""
+    if order_id:
+        return {"instId": instrument_id, "ordId": order_id}
+    return {"instId": instrument_id, "clOrdId": client_order_id or ""}
+
+
+def amend_payload(
+    instrument_id: str,
+    order_id: Optional[str],
+    new_price: Optional[Decimal] = None,
+    new_size: Optional[Decimal] = None,
+    client_order_id: Optional[str] = None,
+) -> Dict[str, str]:
+    payload = order_ref(instrument_id, order_id, client_order_id)
+    if new_price is not None:
+        payload["newPx"] = str(new_price)
+    if new_size is not None:
+        payload["newSz"] = str(new_size)
+    return payload
+
+
+def new_client_order_id() -> str:
+    return uuid.uuid4().hex
 
 
 class ExecutionEngine:
-    def __init__(self, client: OkxRestClient, dry_run: bool = True) -> None:
+    def __init__(
+        self,
+        client: Union[OkxRestClient, "RequestScheduler"],
+        dry_run: bool = True,
+        ws_client: Optional["OkxWsTradeClient"] = None,
+    ) -> None:
         self.client = client
         self.dry_run = dry_run
+        self.ws_client = ws_client
+        self.ws_fallbacks = 0
+        self.ws_recovered = 0
+
+    async def _route(self, op: str, ws_call, rest_call, orders: Optional[List[OrderRequest]] = None) -> Dict:
+        ws_client = self.ws_client
+        if ws_client is not None and ws_client.connected:
+            try:
+                return await ws_call(ws_client)
+            except (ConnectionError, asyncio.TimeoutError) as exc:
+                self.ws_fallbacks += 1
+                logger.warning("WebSocket %s failed (%r); falling back to REST.", op, exc)
+                if orders:
+                    return await self._resend_missing(ws_client.rest_client, orders)
+        return await rest_call(self.client)
+
+    async def _resend_missing(self, lookup: OkxRestClient, orders: List[OrderRequest]) -> Dict:
+        """Send over REST only the ``orders`` OKX does not already have.
+
+        A lost WebSocket ack does not mean the order was lost, and OKX only
+        rejects a repeated clOrdId while the first order is still live -- one
+        that has already filled would be placed a second time. Each order is
+        looked up by clOrdId first and resent only when OKX confirms it does
+        not exist; any other failed lookup (rate limit, auth, ...) raises
+        rather than risk a duplicate. An order still in flight when the
+        lookup runs can't be seen.
+        """
+        found: List[Optional[Dict]] = []
+        for order in orders:
+            response = await lookup.get_order(order.instrument_id, client_order_id=order.client_order_id)
+            code = response.get("code")
+            data = response.get("data")
+            if code == "0" and data:
+                entry = {"ordId": data[0].get("ordId", ""), "clOrdId": order.client_order_id, "sCode": "0", "sMsg": ""}
+            elif code in ("0", ORDER_NOT_FOUND_CODE):
+                entry = None
+            else:
+                raise RuntimeError(
+                    f"Order lookup for {order.client_order_id} failed (code {code}): {response.get('msg')}"
+                )
+            found.append(entry)
+        missing = [order for order, entry in zip(orders, found) if entry is None]
+        self.ws_recovered += len(orders) - len(missing)
+        if not missing:
+            return {"code": "0", "msg": "", "data": found}
+        if len(orders) == 1:
+            return await self.client.place_order(missing[0])
+        result = await self.client.place_batch_orders(missing)
+        resent = iter(result.get("data") or [])
+        data = []
+        for order, entry in zip(orders, found):
+            if entry is None:
+                fallback = {"clOrdId": order.client_order_id, "sCode": result.get("code"), "sMsg": result.get("msg")}
+                entry = next(resent, fallback)
+            data.append(entry)
+        return {"code": result.get("code"), "msg": result.get("msg", ""), "data": data}
 
     async def execute(self, order: OrderRequest) -> Dict:
         if self.dry_run:
@@ -92,4 +318,52 @@ class ExecutionEngine:
                     "px": str(order.price) if order.price is not None else None,
                 },
             }
-        return await self.client.place_order(order)
+        if order.client_order_id is None:
+            order.client_order_id = new_client_order_id()
+        return await self._route(
+            "order",
+            lambda ws: ws.place_order(order),
+            lambda rest: rest.place_order(order),
+            [order],
+        )
+
+    async def execute_batch(self, orders: List[OrderRequest]) -> Dict:
+        if self.dry_run:
+            return {"dry_run": True, "orders": [order.to_payload() for order in orders]}
+        for order in orders:
+            if order.client_order_id is None:
+                order.client_order_id = new_client_order_id()
+        return await self._route(
+            "batch-orders",
+            lambda ws: ws.place_batch_orders(orders),
+            lambda rest: rest.place_batch_orders(orders),
+            orders,
+        )
+
+    async def amend(
+        self,
+        instrument_id: str,
+        order_id: Optional[str],
+        new_price: Optional[Decimal] = None,
+        new_size: Optional[Decimal] = None,
+        client_order_id: Optional[str] = None,
+    ) -> Dict:
+        """Amend by ``order_id``, or by ``client_order_id`` when the exchange id is not known yet."""
+        if self.dry_run:
+            payload = amend_payload(instrument_id, order_id, new_price, new_size, client_order_id)
+            return {"dry_run": True, "amend": payload}
+        return await self._route(
+            "amend-order",
+            lambda ws: ws.amend_order(instrument_id, order_id, new_price, new_size, client_order_id),
+            lambda rest: rest.amend_order(instrument_id, order_id, new_price, new_size, client_order_id),
+        )
+
+    async def cancel(self, instrument_id: str, order_id: Optional[str], client_order_id: Optional[str] = None) -> Dict:
+        """Cancel by ``order_id``, or by ``client_order_id`` when the exchange id is not known yet."""
+        if self.dry_run:
+            return {"dry_run": True, "cancel": order_ref(instrument_id, order_id, client_order_id)}
+        return await self._route(
+            "cancel-order",
+            lambda ws: ws.cancel_order(instrument_id, order_id, client_order_id),
+            lambda rest: rest.cancel_order(instrument_id, order_id, client_order_id),
+        )
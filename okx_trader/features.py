@@ -1,11 +1,19 @@
 from __future__ import annotations
 
+import math
 from dataclasses import dataclass
 from decimal import Decimal
-from typing import List, Tuple
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 
+from .fixed_point import FixedPointCodec
 from .orderbook import OrderBook
 
+if TYPE_CHECKING:
+    from .trade_flow import TradeFlow
+
+VACUUM_DECIMALS = 8
+VACUUM_SCALE = 10**VACUUM_DECIMALS
+
 
 @dataclass
 class FeatureSnapshot:
@@ -14,76 +22,145 @@ class FeatureSnapshot:
     liquidity_vacuum: Decimal
     bid_pressure: Decimal
     ask_pressure: Decimal
+    # Trade flow over the engine's ``flow_window``, read at compute time (NaN while trade flow is off).
+    signed_volume: float = math.nan
+    vwap: float = math.nan
+    trade_intensity: float = math.nan
+    liquidation_volume: float = math.nan
+    liquidations: float = math.nan
 
 
 class FeatureEngine:
-    def __init__(self, depth: int = 25) -> None:
+    def __init__(
+        self,
+        depth: int = 25,
+        incremental: bool = False,
+        trade_flow: Optional["TradeFlow"] = None,
+        flow_window: int = 0,
+    ) -> None:
+        if trade_flow is not None and not 0 <= flow_window < len(trade_flow.windows_ms):
+            raise ValueError(f"flow_window {flow_window} is not an index into {trade_flow.windows_ms}")
         self.depth = depth
-        self._prev_bids: List[Tuple[Decimal, Decimal]] = []
-        self._prev_asks: List[Tuple[Decimal, Decimal]] = []
+        self.incremental = incremental
+        self.trade_flow = trade_flow
+        self.flow_window = flow_window
+        self.full_computes = 0
+        self.incremental_computes = 0
+        self._prev_bids: Dict = {}
+        self._prev_asks: Dict = {}
+        self._decimal_weights = [Decimal(str(depth - idx)) / Decimal(str(depth)) for idx in range(depth)]
+        self._int_weights = [depth - idx for idx in range(depth)]
+        self._tracked_book: Optional[OrderBook] = None
+        self._bid_pressure = self._ask_pressure = self._bid_weighted = self._ask_weighted = 0
+        self._both_sides = False
 
     def compute(self, orderbook: OrderBook) -> FeatureSnapshot:
-        bids, asks = orderbook.top_levels()
-        bids = bids[: self.depth]
-        asks = asks[: self.depth]
+        if self.incremental:
+            if orderbook is not self._tracked_book:
+                orderbook.track_changes(self.depth)
+                self._tracked_book = orderbook
+            elif not orderbook.structure_changed:
+                return self._compute_incremental(orderbook)
+        snapshot = self._compute_full(orderbook)
+        if self.incremental:
+            orderbook.reset_changes()
+        return snapshot
 
-        ofi = self._order_flow_imbalance(bids, asks)
-        wmp = self._weighted_market_pressure(bids, asks)
-        liquidity_vacuum = self._liquidity_vacuum(bids, asks)
-        bid_pressure = sum(size for _, size in bids)
-        ask_pressure = sum(size for _, size in asks)
+    def _compute_full(self, orderbook: OrderBook) -> FeatureSnapshot:
+        self.full_computes += 1
+        fixed = orderbook.fixed_point
+        zero = 0 if fixed else Decimal("0")
+        weights = self._int_weights if fixed else self._decimal_weights
+        bids, asks = orderbook.top_levels(self.depth)
+        bid_pressure, bid_weighted, bid_flow, self._prev_bids = _scan_side(bids, self._prev_bids, weights, zero)
+        ask_pressure, ask_weighted, ask_flow, self._prev_asks = _scan_side(asks, self._prev_asks, weights, zero)
+        self._bid_pressure, self._ask_pressure = bid_pressure, ask_pressure
+        self._bid_weighted, self._ask_weighted = bid_weighted, ask_weighted
+        self._both_sides = bool(bids) and bool(asks)
+        return self._snapshot(bid_flow - ask_flow, fixed)
 
-        self._prev_bids = bids
-        self._prev_asks = asks
+    def _compute_incremental(self, orderbook: OrderBook) -> FeatureSnapshot:
+        # Only size changes inside the top ``depth`` are logged here: inserts and
+        # deletes there shift every rank below them and force a full scan.
+        self.incremental_computes += 1
+        fixed = orderbook.fixed_point
+        weights = self._int_weights if fixed else self._decimal_weights
+        ofi = 0 if fixed else Decimal("0")
+        for is_bid, price, delta in orderbook.changes:
+            if is_bid:
+                weight = weights[orderbook.bids.rank(price)]
+                self._bid_pressure += delta
+                self._bid_weighted += delta * weight
+                self._prev_bids[price] += delta
+                ofi += delta
+            else:
+                weight = weights[orderbook.asks.rank(price)]
+                self._ask_pressure += delta
+                self._ask_weighted += delta * weight
+                self._prev_asks[price] += delta
+                ofi -= delta
+        orderbook.changes.clear()
+        return self._snapshot(ofi, fixed)
 
-        return FeatureSnapshot(
+    def _snapshot(self, ofi, fixed: bool) -> FeatureSnapshot:
+        # Fixed-point snapshots are integer-only: sizes are lots, wmp is
+        # lots * depth and the vacuum ratio is scaled by VACUUM_SCALE.
+        # See ``to_decimal`` for the mapping.
+        bid_pressure = self._bid_pressure
+        ask_pressure = self._ask_pressure
+        total = bid_pressure + ask_pressure
+        if fixed:
+            liquidity_vacuum = 0
+            if self._both_sides and total:
+                liquidity_vacuum = _div_round_half_up((bid_pressure - ask_pressure) * VACUUM_SCALE, total)
+        else:
+            liquidity_vacuum = Decimal("0")
+            if self._both_sides and total != 0:
+                liquidity_vacuum = (bid_pressure - ask_pressure) / total
+        snapshot = FeatureSnapshot(
             ofi=ofi,
-            wmp=wmp,
+            wmp=self._bid_weighted - self._ask_weighted,
             liquidity_vacuum=liquidity_vacuum,
             bid_pressure=bid_pressure,
             ask_pressure=ask_pressure,
         )
+        flow = self.trade_flow
+        if flow is not None:
+            flow.refresh()
+            window = self.flow_window
+            snapshot.signed_volume = flow.signed_volume(window)
+            snapshot.vwap = flow.vwap(window)
+            snapshot.trade_intensity = flow.intensity(window)
+            snapshot.liquidation_volume = flow.liquidation_volume(window)
+            snapshot.liquidations = flow.liquidations[window]
+        return snapshot
 
-    def _order_flow_imbalance(
-        self,
-        bids: List[Tuple[Decimal, Decimal]],
-        asks: List[Tuple[Decimal, Decimal]],
-    ) -> Decimal:
-        def delta(prev, current):
-            prev_map = {price: size for price, size in prev}
-            current_map = {price: size for price, size in current}
-            total = Decimal("0")
-            for price, size in current_map.items():
-                total += size - prev_map.get(price, Decimal("0"))
-            return total
-
-        bid_delta = delta(self._prev_bids, bids)
-        ask_delta = delta(self._prev_asks, asks)
-        return bid_delta - ask_delta
-
-    def _weighted_market_pressure(
-        self,
-        bids: List[Tuple[Decimal, Decimal]],
-        asks: List[Tuple[Decimal, Decimal]],
-    ) -> Decimal:
-        def weighted(side: List[Tuple[Decimal, Decimal]]) -> Decimal:
-            total = Decimal("0")
-            for idx, (_, size) in enumerate(side, start=1):
-                weight = Decimal(str(self.depth - idx + 1)) / Decimal(str(self.depth))
-                total += size * weight
-            return total
-
-        return weighted(bids) - weighted(asks)
-
-    def _liquidity_vacuum(
-        self,
-        bids: List[Tuple[Decimal, Decimal]],
-        asks: List[Tuple[Decimal, Decimal]],
-    ) -> Decimal:
-        if not bids or not asks:
-            return Decimal("0")
-        bid_depth = sum(size for _, size in bids)
-        ask_depth = sum(size for _, size in asks)
-        if bid_depth + ask_depth == 0:
-            return Decimal("0")
-        return (bid_depth - ask_depth) / (bid_depth + ask_depth)
+    def to_decimal(self, snapshot: FeatureSnapshot, codec: FixedPointCodec) -> FeatureSnapshot:
+        return FeatureSnapshot(
+            ofi=codec.size_to_decimal(snapshot.ofi),
+            wmp=codec.size_to_decimal(snapshot.wmp) / Decimal(self.depth),
+            liquidity_vacuum=Decimal(snapshot.liquidity_vacuum).scaleb(-VACUUM_DECIMALS),
+            bid_pressure=codec.size_to_decimal(snapshot.bid_pressure),
+            ask_pressure=codec.size_to_decimal(snapshot.ask_pressure),
+            signed_volume=snapshot.signed_volume,
+            vwap=snapshot.vwap,
+            trade_intensity=snapshot.trade_intensity,
+            liquidation_volume=snapshot.liquidation_volume,
+            liquidations=snapshot.liquidations,
+        )
+
+
+def _scan_side(levels, prev: Dict, weights: List, zero) -> Tuple:
+    pressure = weighted = flow = zero
+    current = {}
+    for idx, (price, size) in enumerate(levels):
+        pressure += size
+        weighted += size * weights[idx]
+        flow += size - prev.get(price, zero)
+        current[price] = size
+    return pressure, weighted, flow, current
+
+
+def _div_round_half_up(numerator: int, denominator: int) -> int:
+    quotient = (2 * abs(numerator) + denominator) // (2 * denominator)
+    return -quotient if numerator < 0 else quotient
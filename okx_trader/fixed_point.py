@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Dict
+
+from .utils import to_decimal
+
+
+def _scale_of(step: Decimal) -> tuple[int, int]:
+    decimals = max(-step.normalize().as_tuple().exponent, 0)
+    units = int(step.scaleb(decimals))
+    if units <= 0:
+        raise ValueError(f"Step must be positive, got {step}")
+    return decimals, units
+
+
+def _parse_scaled(value: str, decimals: int) -> int:
+    whole, _, frac = value.partition(".")
+    if len(frac) > decimals:
+        if frac[decimals:].strip("0"):
+            raise ValueError(f"{value} has more than {decimals} decimals")
+        frac = frac[:decimals]
+    return int(whole + frac.ljust(decimals, "0"))
+
+
+@dataclass(frozen=True)
+class FixedPointCodec:
+    tick_size: Decimal
+    lot_size: Decimal
+    _price_decimals: int = field(init=False, repr=False)
+    _price_units: int = field(init=False, repr=False)
+    _size_decimals: int = field(init=False, repr=False)
+    _size_units: int = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        price_decimals, price_units = _scale_of(self.tick_size)
+        size_decimals, size_units = _scale_of(self.lot_size)
+        object.__setattr__(self, "_price_decimals", price_decimals)
+        object.__setattr__(self, "_price_units", price_units)
+        object.__setattr__(self, "_size_decimals", size_decimals)
+        object.__setattr__(self, "_size_units", size_units)
+
+    @classmethod
+    def from_instrument(cls, instrument: Dict) -> "FixedPointCodec":
+        return cls(tick_size=to_decimal(instrument["tickSz"]), lot_size=to_decimal(instrument["lotSz"]))
+
+    def price_to_int(self, value: str) -> int:
+        scaled = _parse_scaled(value, self._price_decimals)
+        if self._price_units == 1:
+            return scaled
+        ticks, remainder = divmod(scaled, self._price_units)
+        if remainder:
+            raise ValueError(f"Price {value} is not a multiple of tickSz {self.tick_size}")
+        return ticks
+
+    def size_to_int(self, value: str) -> int:
+        scaled = _parse_scaled(value, self._size_decimals)
+        if self._size_units == 1:
+            return scaled
+        lots, remainder = divmod(scaled, self._size_units)
+        if remainder:
+            raise ValueError(f"Size {value} is not a multiple of lotSz {self.lot_size}")
+        return lots
+
+    def price_to_decimal(self, ticks: int) -> Decimal:
+        return Decimal(ticks * self._price_units).scaleb(-self._price_decimals)
+
+    def size_to_decimal(self, lots: int) -> Decimal:
+        return Decimal(lots * self._size_units).scaleb(-self._size_decimals)
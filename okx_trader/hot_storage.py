@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import math
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterator, Sequence, Tuple
+
+FEATURE_FIELDS: Tuple[Tuple[str, str], ...] = (
+    ("ofi", "d"),
+    ("wmp", "d"),
+    ("liquidity_vacuum", "d"),
+    ("bid_pressure", "d"),
+    ("ask_pressure", "d"),
+    ("latency_ms", "d"),
+)
+ORDER_FIELDS: Tuple[Tuple[str, str], ...] = (
+    ("side", "b"),
+    ("price", "d"),
+    ("size", "d"),
+    ("accepted", "b"),
+)
+
+
+class HotWindow:
+    """Zero-copy window over a ``HotRingBuffer``: one ``memoryview`` per column, oldest first.
+
+    The views alias the ring, so they are only valid until the ring wraps
+    past them; copy (``list(window["ofi"])`` or ``numpy.array``) to keep data.
+    """
+
+    __slots__ = ("columns", "_length")
+
+    def __init__(self, columns: Dict[str, memoryview], length: int) -> None:
+        self.columns = columns
+        self._length = length
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, name: str) -> memoryview:
+        return self.columns[name]
+
+    def rows(self) -> Iterator[Tuple]:
+        return zip(*self.columns.values())
+
+
+class HotRingBuffer:
+    """Typed ring of fixed numeric records with an int64 ``ts_ns`` column.
+
+    Each column is an ``array`` of ``2 * capacity`` slots and every record is
+    written twice, ``capacity`` apart, so the latest ``capacity`` records are
+    always contiguous and ``last``/``since`` can hand out plain slices.
+    ``since`` assumes timestamps are appended in non-decreasing order.
+
+    Storage starts at ``initial`` records and doubles as the first lap fills
+    it, so an idle instrument does not hold a full-size ring; once at
+    ``capacity`` it never reallocates again.
+    """
+
+    def __init__(self, fields: Sequence[Tuple[str, str]], capacity: int, initial: int = 1024) -> None:
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.names = ("ts_ns",) + tuple(name for name, _ in fields)
+        self._typecodes = ("q",) + tuple(typecode for _, typecode in fields)
+        self._columns = [array(typecode) for typecode in self._typecodes]
+        self._count = 0
+        self._allocate(min(capacity, max(1, initial)))
+
+    def _allocate(self, size: int) -> None:
+        # Until the ring is full the records are [0, count) in the lower half, mirrored ``size`` above it.
+        count = self._count
+        columns = []
+        for typecode, old in zip(self._typecodes, self._columns):
+            column = array(typecode, bytes(array(typecode).itemsize * 2 * size))
+            column[:count] = old[:count]
+            column[size : size + count] = old[:count]
+            columns.append(column)
+        self._columns = columns
+        self._views = [memoryview(column) for column in columns]
+        self._mirror = size
+        self._grow_at = size if size < self.capacity else -1
+
+    def __len__(self) -> int:
+        return self._count if self._count < self.capacity else self.capacity
+
+    @property
+    def total(self) -> int:
+        return self._count
+
+    @property
+    def nbytes(self) -> int:
+        return sum(column.itemsize * len(column) for column in self._columns)
+
+    def append(self, ts_ns: int, *values) -> None:
+        if self._count == self._grow_at:
+            self._allocate(min(2 * self._mirror, self.capacity))
+        slot = self._count % self.capacity
+        mirror = slot + self._mirror
+        columns = self._columns
+        columns[0][slot] = columns[0][mirror] = ts_ns
+        for column, value in zip(columns[1:], values):
+            column[slot] = column[mirror] = value
+        self._count += 1
+
+    def _window(self, start: int, stop: int) -> HotWindow:
+        return HotWindow({name: view[start:stop] for name, view in zip(self.names, self._views)}, stop - start)
+
+    def _bounds(self) -> Tuple[int, int]:
+        # The newest ``len(self)`` records end at the slot after the last write, in the upper half once wrapped.
+        count = self._count
+        capacity = self.capacity
+        if count <= capacity:
+            return 0, count
+        stop = count % capacity + capacity
+        return stop - capacity, stop
+
+    def last(self, n: int) -> HotWindow:
+        start, stop = self._bounds()
+        return self._window(max(start, stop - n), stop)
+
+    def since(self, ts_ns: int) -> HotWindow:
+        start, stop = self._bounds()
+        return self._window(bisect_left(self._views[0], ts_ns, start, stop), stop)
+
+    def latest(self) -> Tuple:
+        if not self._count:
+            raise IndexError("ring is empty")
+        slot = (self._count - 1) % self.capacity
+        return tuple(column[slot] for column in self._columns)
+
+
+def feature_values(snapshot, latency_ms) -> Tuple[float, ...]:
+    return (
+        float(snapshot.ofi),
+        float(snapshot.wmp),
+        float(snapshot.liquidity_vacuum),
+        float(snapshot.bid_pressure),
+        float(snapshot.ask_pressure),
+        math.nan if latency_ms is None else float(latency_ms),
+    )
@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple, Union
+
+from aiohttp import web
+
+from .utils import MonotonicClock
+
+if TYPE_CHECKING:
+    from .decoding import OrderBookMessage
+
+EXCHANGE_TO_RECEIVE = "exchange_to_receive"
+DECODE = "decode"
+BOOK_APPLY = "book_apply"
+FEATURES = "features"
+STORAGE = "storage"
+STRATEGY = "strategy"
+RISK = "risk"
+ORDER_ROUND_TRIP = "order_round_trip"
+HANDLER = "handler"
+# Disconnect of an instrument's last socket until its book is in sequence again.
+BOOK_RECOVERY = "book_recovery"
+
+STAGES = (
+    EXCHANGE_TO_RECEIVE,
+    DECODE,
+    BOOK_APPLY,
+    FEATURES,
+    STORAGE,
+    STRATEGY,
+    RISK,
+    ORDER_ROUND_TRIP,
+    HANDLER,
+    BOOK_RECOVERY,
+)
+QUANTILES = (0.5, 0.99, 0.999)
+
+# Log-linear buckets: values below 2**SUB_BUCKET_BITS are exact, above that
+# every power of two is split into 2**(SUB_BUCKET_BITS - 1) buckets, so a
+# reported quantile is within ~3% of the true value.
+SUB_BUCKET_BITS = 6
+MAX_TRACKABLE_NS = (1 << 40) - 1
+
+_SUB = 1 << SUB_BUCKET_BITS
+_HALF = _SUB >> 1
+
+
+def _bucket_index(value: int) -> int:
+    if value < _SUB:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS
+    return _SUB + (shift - 1) * _HALF + (value >> shift) - _HALF
+
+
+def _bucket_upper(index: int) -> int:
+    if index < _SUB:
+        return index
+    shift, offset = divmod(index - _SUB, _HALF)
+    return ((offset + _HALF + 1) << (shift + 1)) - 1
+
+
+_BUCKETS = _bucket_index(MAX_TRACKABLE_NS) + 1
+
+
+class LatencyHistogram:
+    """Fixed-bucket, HDR-style histogram of nanosecond durations.
+
+    ``record`` is a couple of integer ops and one list increment; values are
+    clamped to ``[0, MAX_TRACKABLE_NS]``. Quantiles report the upper bound
+    of the bucket they fall in.
+    """
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self) -> None:
+        self.counts: List[int] = [0] * _BUCKETS
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, value: int) -> None:
+        if value < 0:
+            value = 0
+        elif value > MAX_TRACKABLE_NS:
+            value = MAX_TRACKABLE_NS
+        if value < _SUB:
+            self.counts[value] += 1
+        else:
+            shift = value.bit_length() - SUB_BUCKET_BITS
+            self.counts[_SUB + (shift - 1) * _HALF + (value >> shift) - _HALF] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> int:
+        if not self.count:
+            return 0
+        target = max(1, int(q * self.count + 0.5))
+        seen = 0
+        for index, bucket in enumerate(self.counts):
+            seen += bucket
+            if seen >= target:
+                return min(_bucket_upper(index), self.max)
+        return self.max
+
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def copy(self) -> "LatencyHistogram":
+        clone = LatencyHistogram()
+        clone.counts = list(self.counts)
+        clone.count, clone.total, clone.max = self.count, self.total, self.max
+        return clone
+
+    def since(self, earlier: "LatencyHistogram") -> "LatencyHistogram":
+        """Counts recorded after ``earlier`` (a ``copy`` of this histogram) was taken."""
+        delta = LatencyHistogram()
+        delta.counts = [now - then for now, then in zip(self.counts, earlier.counts)]
+        delta.count = self.count - earlier.count
+        delta.total = self.total - earlier.total
+        top = next((idx for idx in range(_BUCKETS - 1, -1, -1) if delta.counts[idx]), None)
+        delta.max = 0 if top is None else min(_bucket_upper(top), self.max)
+        return delta
+
+
+class LatencyRecorder:
+    """Per-stage ``LatencyHistogram`` set for the tick hot path.
+
+    Call sites hold a reference only when instrumentation is on
+    (``LATENCY_METRICS=true``) and skip timing entirely otherwise, so the
+    disabled cost is one ``is None`` check per stage.
+    """
+
+    def __init__(self, clock: Optional[MonotonicClock] = None) -> None:
+        self.clock = clock or MonotonicClock()
+        self.histograms: Dict[str, LatencyHistogram] = {stage: LatencyHistogram() for stage in STAGES}
+        self._last: Dict[str, LatencyHistogram] = {stage: LatencyHistogram() for stage in STAGES}
+
+    def stage(self, name: str) -> LatencyHistogram:
+        return self.histograms[name]
+
+    def record(self, stage: str, elapsed_ns: int) -> None:
+        self.histograms[stage].record(elapsed_ns)
+
+    def timed_decode(self, decode: Callable[[Union[str, bytes]], "OrderBookMessage"]) -> Callable:
+        """Wrap a decoder's ``decode`` to record decode time and exchange-to-receive latency.
+
+        The exchange ``ts`` has millisecond resolution, so that stage is
+        recorded in whole milliseconds.
+        """
+        clock = self.clock
+        perf_counter_ns = time.perf_counter_ns
+        receive = self.histograms[EXCHANGE_TO_RECEIVE].record
+        decoded = self.histograms[DECODE].record
+
+        def timed(raw):
+            received_ns = clock()
+            started = perf_counter_ns()
+            message = decode(raw)
+            decoded(perf_counter_ns() - started)
+            if message.ts_ms is not None:
+                receive((received_ns // 1_000_000 - message.ts_ms) * 1_000_000)
+            return message
+
+        return timed
+
+    def summary(self, interval: bool = False) -> Dict[str, Tuple[int, float, int, int, int, int]]:
+        """``stage -> (count, mean, p50, p99, p99.9, max)`` in ns.
+
+        With ``interval`` the figures cover only what was recorded since the
+        previous interval summary; otherwise they are cumulative.
+        """
+        result = {}
+        for stage, histogram in self.histograms.items():
+            if interval:
+                current = histogram.copy()
+                histogram = current.since(self._last[stage])
+                self._last[stage] = current
+            if histogram.count:
+                result[stage] = (
+                    histogram.count,
+                    histogram.mean(),
+                    *(histogram.quantile(q) for q in QUANTILES),
+                    histogram.max,
+                )
+        return result
+
+    def prometheus_text(self, prefix: str = "okx_trader") -> str:
+        name = f"{prefix}_stage_latency_seconds"
+        lines = [
+            f"# HELP {name} Hot-path latency per tick stage.",
+            f"# TYPE {name} summary",
+        ]
+        for stage, histogram in self.histograms.items():
+            for q in QUANTILES:
+                lines.append(f'{name}{{stage="{stage}",quantile="{q}"}} {histogram.quantile(q) / 1e9:.9f}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {histogram.total / 1e9:.9f}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+
+def format_summary(summary: Dict[str, Tuple[int, float, int, int, int, int]]) -> str:
+    return "; ".join(
+        f"{stage} n={count} mean={mean / 1e3:.1f}us p50={p50 / 1e3:.1f}us p99={p99 / 1e3:.1f}us "
+        f"p99.9={p999 / 1e3:.1f}us max={peak / 1e3:.1f}us"
+        for stage, (count, mean, p50, p99, p999, peak) in summary.items()
+    )
+
+
+async def report_latency(recorder: LatencyRecorder, logger: logging.Logger, interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        summary = recorder.summary(interval=True)
+        if summary:
+            logger.info("Latency (last %.0fs): %s", interval, format_summary(summary))
+
+
+class MetricsServer:
+    """Serves ``GET /metrics`` in Prometheus text format from the running event loop."""
+
+    def __init__(self, recorder: LatencyRecorder, host: str = "127.0.0.1", port: int = 9464) -> None:
+        self.recorder = recorder
+        self.host = host
+        self.port = port
+        self._app = web.Application()
+        self._app.router.add_get("/metrics", self._metrics)
+        self._runner: Optional[web.AppRunner] = None
+
+    async def _metrics(self, request: web.Request) -> web.Response:
+        return web.Response(text=self.recorder.prometheus_text(), content_type="text/plain", charset="utf-8")
+
+    async def start(self) -> "MetricsServer":
+        self._runner = web.AppRunner(self._app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        return self
+
+    async def close(self) -> None:
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
@@ -0,0 +1,507 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Deque, Dict, List, Optional, Sequence, Set, Tuple
+
+import aiohttp
+
+from .decoding import FrameDecoder, OrderBookMessage, make_decoder
+from .fixed_point import FixedPointCodec
+from .latency import BOOK_RECOVERY, LatencyHistogram
+from .orderbook import OrderBook
+from .orderbook_stream import PUBLIC_WS_URL, OrderBookStreamer, consume_pipeline
+from .pipeline import PipelineMetrics, TickPipeline
+from .utils import Backoff
+
+if TYPE_CHECKING:
+    from .cold_storage import ColdStorageWriter
+    from .execution import OkxRestClient
+    from .latency import LatencyRecorder
+    from .recorder import FrameRecorder
+
+logger = logging.getLogger(__name__)
+
+# Accepted (prevSeqId, seqId) pairs remembered per instrument for dropping redundant copies.
+DEDUPE_WINDOW = 256
+
+
+@dataclass
+class RecoveryMetrics:
+    """Connection-loss accounting for ``MultiplexOrderBookStreamer``.
+
+    ``warm`` is the time from losing a shard's last socket to a REST snapshot
+    being applied; ``recovered`` is the time until the book is back in
+    sequence on the WebSocket feed (per instrument, in nanoseconds).
+    """
+
+    disconnects: int = 0
+    outages: int = 0
+    reconnects: int = 0
+    duplicates: int = 0
+    rest_snapshots: int = 0
+    overflows: int = 0
+    warm: LatencyHistogram = field(default_factory=LatencyHistogram)
+    recovered: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+    def summary(self) -> str:
+        def millis(histogram: LatencyHistogram) -> str:
+            if not histogram.count:
+                return "-"
+            return f"p50 {histogram.quantile(0.5) / 1e6:.1f}ms max {histogram.max / 1e6:.1f}ms"
+
+        return (
+            f"disconnects={self.disconnects} outages={self.outages} reconnects={self.reconnects} "
+            f"duplicates={self.duplicates} rest_snapshots={self.rest_snapshots} overflows={self.overflows} "
+            f"warm=[{millis(self.warm)}] recovered=[{millis(self.recovered)}]"
+        )
+
+
+class MultiplexOrderBookStreamer:
+    """Order books for several instruments over a few shared sockets.
+
+    Each shard of instruments is served by ``redundancy`` identical
+    connections; the first arrival of every ``(prevSeqId, seqId)`` link is
+    applied and later copies are dropped, so a stall on one socket costs
+    nothing while another is delivering. With ``reconnect`` each connection is supervised and
+    reopened with jittered exponential backoff; when a shard loses its last
+    socket its books are marked stale and, given a ``rest_client``, reseeded
+    from a REST snapshot until the WebSocket snapshot arrives.
+
+    Instruments sharing a socket share its reader, so a full per-instrument
+    queue never blocks it: the lagging instrument's backlog is dropped, its
+    later deltas are skipped and it resyncs from a fresh snapshot
+    (``recovery.overflows``), while the other instruments keep flowing.
+    Dropped frames never reach the handler or cold storage.
+    """
+
+    def __init__(
+        self,
+        instrument_ids: Sequence[str],
+        depth: int = 400,
+        proxy: str | None = None,
+        codecs: Optional[Dict[str, FixedPointCodec]] = None,
+        connections: int = 1,
+        queue_size: int = 256,
+        validate_checksum: bool = True,
+        url: str = PUBLIC_WS_URL,
+        pipeline: bool = False,
+        coalesce: bool = True,
+        recorder: Optional["FrameRecorder"] = None,
+        decoder: Optional[FrameDecoder] = None,
+        latency: Optional["LatencyRecorder"] = None,
+        redundancy: int = 1,
+        reconnect: bool = False,
+        reconnect_delay: float = 5.0,
+        max_reconnect_delay: float = 60.0,
+        ping_interval: float = 20.0,
+        rest_client: Optional["OkxRestClient"] = None,
+        cold: Optional["ColdStorageWriter"] = None,
+    ) -> None:
+        if not instrument_ids:
+            raise ValueError("At least one instrument is required")
+        codecs = codecs or {}
+        self.depth = depth
+        self.proxy = proxy
+        self.url = url
+        self.queue_size = queue_size
+        self.pipeline = pipeline
+        self.coalesce = coalesce
+        self.recorder = recorder
+        self.decoder = decoder = decoder or make_decoder()
+        self.latency = latency
+        self.redundancy = max(1, redundancy)
+        self.reconnect = reconnect
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.ping_interval = ping_interval
+        self.rest_client = rest_client
+        self.streamers: Dict[str, OrderBookStreamer] = {
+            instrument_id: OrderBookStreamer(
+                instrument_id,
+                depth=depth,
+                proxy=proxy,
+                codec=codecs.get(instrument_id),
+                validate_checksum=validate_checksum,
+                url=url,
+                decoder=decoder,
+                latency=latency,
+                cold=cold,
+            )
+            for instrument_id in instrument_ids
+        }
+        connections = max(1, min(connections, len(instrument_ids)))
+        self.shards: List[List[str]] = [list(instrument_ids[idx::connections]) for idx in range(connections)]
+        self.recovery = RecoveryMetrics()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._sockets: List[aiohttp.ClientWebSocketResponse] = []
+        self._live: List[Set[aiohttp.ClientWebSocketResponse]] = [set() for _ in self.shards]
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self.pipelines: Dict[str, TickPipeline] = {}
+        self._last_seq: Dict[str, int] = {}
+        self._seen: Dict[str, Tuple[Set[Tuple[int, int]], Deque[Tuple[int, int]]]] = {}
+        self._recovering: Dict[str, int] = {}
+        # Per instrument: the queued REST warm-start snapshot and the outage it was fetched for.
+        self._warm_starts: Dict[str, Tuple[OrderBookMessage, int]] = {}
+        self._overflowed: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self._closing = False
+
+    @property
+    def books(self) -> Dict[str, OrderBook]:
+        return {instrument_id: streamer.orderbook for instrument_id, streamer in self.streamers.items()}
+
+    def queue_depths(self) -> Dict[str, int]:
+        if self.pipeline:
+            return {instrument_id: len(pipeline) for instrument_id, pipeline in self.pipelines.items()}
+        return {instrument_id: queue.qsize() for instrument_id, queue in self._queues.items()}
+
+    def pipeline_metrics(self) -> Dict[str, PipelineMetrics]:
+        return {instrument_id: pipeline.metrics for instrument_id, pipeline in self.pipelines.items()}
+
+    async def _open(self, shard_idx: int) -> aiohttp.ClientWebSocketResponse:
+        if self._session is None:
+            self._session = aiohttp.ClientSession()
+        ws = await self._session.ws_connect(
+            self.url,
+            heartbeat=self.ping_interval,
+            timeout=aiohttp.ClientWSTimeout(ws_receive=max(60.0, 3 * self.ping_interval), ws_close=10.0),
+            proxy=self.proxy,
+        )
+        shard = self.shards[shard_idx]
+        live = self._live[shard_idx]
+        if not live:
+            # Resyncs go out on whichever of the shard's sockets is alive.
+            for instrument_id in shard:
+                self.streamers[instrument_id].attach(ws)
+        await ws.send_json({"op": "subscribe", "args": [self.streamers[inst].subscription_arg for inst in shard]})
+        if not live:
+            for instrument_id in shard:
+                self.streamers[instrument_id].awaiting_snapshot = True
+        live.add(ws)
+        self._sockets.append(ws)
+        return ws
+
+    async def connect(self) -> None:
+        for shard_idx in range(len(self.shards)):
+            for _ in range(self.redundancy):
+                await self._open(shard_idx)
+
+    async def close(self) -> None:
+        self._closing = True
+        for task in self._tasks:
+            task.cancel()
+        for ws in list(self._sockets):
+            await ws.close()
+        self._sockets.clear()
+        for live in self._live:
+            live.clear()
+        if self._session:
+            await self._session.close()
+            self._session = None
+
+    def _decode_fn(self):
+        if self.latency is None:
+            return self.decoder.decode
+        return self.latency.timed_decode(self.decoder.decode)
+
+    def _fresh(self, message: OrderBookMessage) -> bool:
+        """First arrival of a sequence link across the redundant connections; later copies are dropped.
+
+        Deduplication follows the ``prevSeqId`` -> ``seqId`` chain rather than
+        comparing ``seqId`` alone, so a sequence reset (``seqId < prevSeqId``)
+        and genuine gaps still reach ``apply_message``, which resyncs on a gap.
+        """
+        seq_id = message.seq_id
+        if seq_id is None or self.redundancy == 1:
+            return True
+        instrument_id = message.instrument_id
+        last = self._last_seq.get(instrument_id)
+        seen = self._seen.get(instrument_id)
+        if seen is None:
+            seen = self._seen[instrument_id] = (set(), deque())
+        pairs, order = seen
+        if message.action == "snapshot":
+            # Only wanted while the book waits for one (a REST-seeded book still does). It restarts
+            # the chain, so copies of updates the snapshot already contains are applied again in order.
+            if not self.streamers[instrument_id].awaiting_snapshot and instrument_id not in self._recovering:
+                self.recovery.duplicates += 1
+                return False
+            pairs.clear()
+            order.clear()
+            self._last_seq[instrument_id] = seq_id
+            return True
+        prev_seq_id = message.prev_seq_id
+        link = (prev_seq_id, seq_id)
+        if last is not None and prev_seq_id != last:
+            if link in pairs or ((prev_seq_id is None or prev_seq_id <= seq_id) and seq_id <= last):
+                self.recovery.duplicates += 1
+                return False
+        if len(order) >= DEDUPE_WINDOW:
+            pairs.discard(order.popleft())
+        pairs.add(link)
+        order.append(link)
+        self._last_seq[instrument_id] = seq_id
+        return True
+
+    def _recovered(self, instrument_id: str) -> None:
+        elapsed = time.perf_counter_ns() - self._recovering.pop(instrument_id)
+        self.recovery.recovered.record(elapsed)
+        if self.latency is not None:
+            self.latency.record(BOOK_RECOVERY, elapsed)
+        logger.info("Order book for %s recovered %.1f ms after the disconnect.", instrument_id, elapsed / 1e6)
+
+    async def _read(self, ws: aiohttp.ClientWebSocketResponse) -> int:
+        queues = self._queues
+        overflowed = self._overflowed
+        recorder = self.recorder
+        decode = self._decode_fn()
+        fresh = self._fresh
+        received = 0
+        async for msg in ws:
+            if msg.type == aiohttp.WSMsgType.TEXT:
+                received += 1
+                if recorder is not None:
+                    recorder.record(msg.data)
+                message = decode(msg.data)
+                queue = queues.get(message.instrument_id)
+                if queue is None:
+                    if message.action == "error":
+                        logger.warning("WebSocket error: %s", message.data.get("msg"))
+                    continue
+                if not fresh(message):
+                    continue
+                if overflowed and message.instrument_id in overflowed:
+                    if message.action != "snapshot":
+                        continue
+                    overflowed.discard(message.instrument_id)
+                if queue.full():
+                    # A burst already buffered in the socket is read without yielding and can fill the queue of
+                    # a dispatcher that keeps up; give the dispatchers one turn before calling it an overflow.
+                    await asyncio.sleep(0)
+                if queue.full():
+                    self._overflow(message.instrument_id, queue)
+                else:
+                    queue.put_nowait(message)
+            elif msg.type == aiohttp.WSMsgType.ERROR:
+                break
+        return received
+
+    def _overflow(self, instrument_id: str, queue: asyncio.Queue) -> None:
+        """Drop a lagging instrument's backlog and resync it instead of stalling the shared reader."""
+        self.recovery.overflows += 1
+        while not queue.empty():
+            queue.get_nowait()
+            queue.task_done()
+        streamer = self.streamers[instrument_id]
+        streamer.synced = False
+        streamer.awaiting_snapshot = True
+        self._overflowed.add(instrument_id)
+        logger.warning("Queue for %s is full (%d); dropping its backlog and resyncing.", instrument_id, self.queue_size)
+        task = asyncio.create_task(self._resync(streamer))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _resync(self, streamer: OrderBookStreamer) -> None:
+        try:
+            await streamer.resync()
+        except (aiohttp.ClientError, ConnectionError, RuntimeError) as exc:
+            # The socket is gone; its reconnect resubscribes and brings the snapshot.
+            logger.warning("Resync of %s failed: %r.", streamer.instrument_id, exc)
+
+    async def _read_pipelined(self, ws: aiohttp.ClientWebSocketResponse) -> int:
+        streamers = self.streamers
+        recorder = self.recorder
+        decode = self._decode_fn()
+        fresh = self._fresh
+        received = 0
+        async for msg in ws:
+            if msg.type == aiohttp.WSMsgType.TEXT:
+                received += 1
+                if recorder is not None:
+                    recorder.record(msg.data)
+                message = decode(msg.data)
+                streamer = streamers.get(message.instrument_id)
+                if streamer is None:
+                    if message.action == "error":
+                        logger.warning("WebSocket error: %s", message.data.get("msg"))
+                    continue
+                if fresh(message):
+                    await self._apply_pipelined(streamer, message)
+            elif msg.type == aiohttp.WSMsgType.ERROR:
+                break
+        return received
+
+    async def _apply_pipelined(self, streamer: OrderBookStreamer, message: OrderBookMessage) -> None:
+        instrument_id = message.instrument_id
+        if await streamer.ingest(message):
+            if message.seq_id is not None and instrument_id in self._recovering:
+                self._recovered(instrument_id)
+            self.pipelines[instrument_id].push(message)
+            await asyncio.sleep(0)
+
+    async def _dispatch(self, streamer: OrderBookStreamer, queue: asyncio.Queue, handler) -> None:
+        recovering = self._recovering
+        warm_starts = self._warm_starts
+        while True:
+            message = await queue.get()
+            try:
+                warm = warm_starts.get(streamer.instrument_id)
+                if warm is not None and warm[0] is message:
+                    del warm_starts[streamer.instrument_id]
+                    if not self._still_stale(streamer.instrument_id, warm[1]):
+                        continue
+                    self._warmed(warm[1])
+                if await streamer.ingest(message):
+                    if recovering and message.seq_id is not None and message.instrument_id in recovering:
+                        self._recovered(message.instrument_id)
+                    await handler(streamer.orderbook, message)
+            except Exception:
+                logger.exception("Handler failed for %s.", streamer.instrument_id)
+            finally:
+                queue.task_done()
+
+    def _lost(self, shard_idx: int, ws: aiohttp.ClientWebSocketResponse) -> None:
+        live = self._live[shard_idx]
+        live.discard(ws)
+        if ws in self._sockets:
+            self._sockets.remove(ws)
+        if self._closing or not self.reconnect:
+            return
+        self.recovery.disconnects += 1
+        shard = self.shards[shard_idx]
+        if live:
+            survivor = next(iter(live))
+            for instrument_id in shard:
+                self.streamers[instrument_id].attach(survivor)
+            return
+        self.recovery.outages += 1
+        now = time.perf_counter_ns()
+        for instrument_id in shard:
+            streamer = self.streamers[instrument_id]
+            # Nothing after this point can be trusted until a snapshot arrives.
+            streamer.synced = False
+            streamer.awaiting_snapshot = True
+            self._recovering.setdefault(instrument_id, now)
+            if self.rest_client is not None:
+                task = asyncio.create_task(self._warm_start(instrument_id))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+    def _still_stale(self, instrument_id: str, started: int) -> bool:
+        """Whether the outage a REST snapshot was fetched for is still waiting for its WebSocket snapshot."""
+        if self._recovering.get(instrument_id) == started:
+            return True
+        logger.info("Dropping the REST snapshot of %s; the WebSocket snapshot came first.", instrument_id)
+        return False
+
+    def _warmed(self, started: int) -> None:
+        self.recovery.rest_snapshots += 1
+        self.recovery.warm.record(time.perf_counter_ns() - started)
+
+    async def _warm_start(self, instrument_id: str) -> None:
+        """Seed a stale book from the REST snapshot while the WebSocket reconnects.
+
+        The snapshot is only applied if the book is still waiting for the
+        WebSocket snapshot of the same outage when its turn comes: in queue
+        mode a WebSocket snapshot queued ahead of it is newer, and applying
+        the REST one after it would roll the book back and clear its seqId.
+        """
+        started = self._recovering.get(instrument_id)
+        try:
+            response = await self.rest_client.get_order_book(instrument_id, self.depth)
+        except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as exc:
+            logger.warning("REST order book for %s failed: %r.", instrument_id, exc)
+            return
+        data = response.get("data")
+        streamer = self.streamers[instrument_id]
+        if not data or started is None:
+            return
+        book = data[0]
+        message = OrderBookMessage(
+            "snapshot",
+            instrument_id=instrument_id,
+            bids=book.get("bids", []),
+            asks=book.get("asks", []),
+            ts_ms=int(book.get("ts") or 0),
+            has_data=True,
+        )
+        if self.pipeline:
+            if self._still_stale(instrument_id, started):
+                await self._apply_pipelined(streamer, message)
+                self._warmed(started)
+        else:
+            self._warm_starts[instrument_id] = (message, started)
+            await self._queues[instrument_id].put(message)
+
+    async def _supervise(self, shard_idx: int, replica: int) -> None:
+        """Keep one of a shard's connections open; without ``reconnect`` it returns when the socket closes."""
+        reader = self._read_pipelined if self.pipeline else self._read
+        backoff = Backoff(self.reconnect_delay, self.max_reconnect_delay)
+        opened = False
+        while not self._closing:
+            try:
+                ws = await self._open(shard_idx)
+            except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as exc:
+                if not self.reconnect:
+                    raise
+                delay = backoff.next()
+                logger.warning("Shard %d/%d connect failed (%r); retrying in %.2fs.", shard_idx, replica, exc, delay)
+                await asyncio.sleep(delay)
+                continue
+            if opened:
+                self.recovery.reconnects += 1
+            opened = True
+            try:
+                received = await reader(ws)
+            except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as exc:
+                logger.warning("Shard %d/%d read failed: %r.", shard_idx, replica, exc)
+                received = 0
+            finally:
+                self._lost(shard_idx, ws)
+            if not self.reconnect or self._closing:
+                return
+            if received:
+                backoff.reset()
+            delay = backoff.next()
+            logger.warning("Shard %d/%d disconnected; reconnecting in %.2fs.", shard_idx, replica, delay)
+            await asyncio.sleep(delay)
+
+    async def run_forever(self, handler) -> None:
+        if self.pipeline:
+            self.pipelines = {
+                instrument_id: TickPipeline(coalesce=self.coalesce, queue_size=self.queue_size)
+                for instrument_id in self.streamers
+            }
+            workers = [
+                asyncio.create_task(consume_pipeline(pipeline, self.streamers[instrument_id].orderbook, handler))
+                for instrument_id, pipeline in self.pipelines.items()
+            ]
+            pending = self.pipelines.values()
+        else:
+            self._queues = {
+                instrument_id: asyncio.Queue(maxsize=self.queue_size) for instrument_id in self.streamers
+            }
+            workers = [
+                asyncio.create_task(self._dispatch(self.streamers[instrument_id], queue, handler))
+                for instrument_id, queue in self._queues.items()
+            ]
+            pending = self._queues.values()
+        self._closing = False
+        try:
+            await asyncio.gather(
+                *(
+                    self._supervise(shard_idx, replica)
+                    for shard_idx in range(len(self.shards))
+                    for replica in range(self.redundancy)
+                )
+            )
+            await asyncio.gather(*(item.join() for item in pending))
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            await self.close()
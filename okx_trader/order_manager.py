@@ -0,0 +1,323 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, replace
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .execution import ExecutionEngine, OrderRequest
+from .fixed_point import FixedPointCodec
+from .strategies import OrderSignal
+from .utils import MonotonicClock
+
+logger = logging.getLogger(__name__)
+
+PENDING_NEW = "pending_new"
+LIVE = "live"
+PARTIALLY_FILLED = "partially_filled"
+PENDING_AMEND = "pending_amend"
+PENDING_CANCEL = "pending_cancel"
+FILLED = "filled"
+CANCELED = "canceled"
+REJECTED = "rejected"
+
+PENDING = frozenset({PENDING_NEW, PENDING_AMEND, PENDING_CANCEL})
+TERMINAL = frozenset({FILLED, CANCELED, REJECTED})
+
+PLACE = "place"
+AMEND = "amend"
+CANCEL = "cancel"
+
+# OKX orders-channel ``state`` values.
+_EXCHANGE_STATES = {
+    "live": LIVE,
+    "partially_filled": PARTIALLY_FILLED,
+    "filled": FILLED,
+    "canceled": CANCELED,
+    "mmp_canceled": CANCELED,
+}
+# sCodes meaning the order is no longer working (filled, cancelled or unknown to the exchange).
+_GONE_CODES = frozenset({"51400", "51401", "51402", "51503", "51603"})
+
+Key = Tuple[str, str]
+PreTradeCheck = Callable[[OrderRequest], Optional[str]]
+
+
+@dataclass
+class WorkingOrder:
+    """Local view of one exchange order; ``key`` is ``(signal reason, side)``."""
+
+    key: Key
+    request: OrderRequest
+    state: str = PENDING_NEW
+    order_id: Optional[str] = None
+    filled: Decimal = Decimal("0")
+    desired_ns: int = 0
+
+    @property
+    def instrument_id(self) -> str:
+        return self.request.instrument_id
+
+
+@dataclass
+class OrderAction:
+    action: str
+    reason: str
+    order: WorkingOrder
+    result: Dict
+    accepted: bool
+
+
+@dataclass
+class OrderManagerStats:
+    signals: int = 0
+    kept: int = 0
+    placed: int = 0
+    amended: int = 0
+    cancelled: int = 0
+    rejected: int = 0
+    blocked: int = 0
+    updates: int = 0
+
+    @property
+    def requests(self) -> int:
+        return self.placed + self.amended + self.cancelled + self.rejected
+
+
+def _ack(result: Dict) -> Tuple[bool, Optional[str], str]:
+    """``(accepted, ordId, sCode)`` from an order/amend/cancel response."""
+    if result.get("dry_run"):
+        return True, None, "0"
+    entries = result.get("data") or [{}]
+    entry = entries[0]
+    code = entry.get("sCode") or result.get("code", "")
+    return result.get("code") == "0" and code == "0", entry.get("ordId") or None, code
+
+
+class OrderManager:
+    """Keeps at most one working order per instrument, strategy reason and side.
+
+    Only quote signals (``OrderSignal.quote``, e.g. market making) are
+    managed; directional signals such as liquidation hunting are one-off
+    orders and are placed as they come, without a working order to diff,
+    amend or expire. Every tick's quote signals are diffed against the
+    working orders: a signal
+    within ``price_tolerance_bps`` and ``size_tolerance`` (fraction) of its
+    order sends nothing, a larger move amends it (or cancels and replaces it
+    with ``amend=False``, or when the amend is rejected), and orders no signal
+    has asked for in ``quote_ttl_ns`` are cancelled. A key with a request in
+    flight is left alone until the ack arrives. Acks drive the state machine;
+    fills and cancels from a private order feed come in via
+    ``on_order_update``.
+    """
+
+    def __init__(
+        self,
+        execution: ExecutionEngine,
+        price_tolerance_bps: Decimal = Decimal("2"),
+        size_tolerance: Decimal = Decimal("0.1"),
+        quote_ttl_ns: int = 5_000_000_000,
+        amend: bool = True,
+        clock: Optional[Callable[[], int]] = None,
+    ) -> None:
+        self.execution = execution
+        self.price_tolerance = Decimal(str(price_tolerance_bps)) / 10_000
+        self.size_tolerance = Decimal(str(size_tolerance))
+        self.quote_ttl_ns = quote_ttl_ns
+        self.amend = amend
+        self.clock = clock or MonotonicClock()
+        self.stats = OrderManagerStats()
+        self._orders: Dict[str, Dict[Key, WorkingOrder]] = {}
+        self._by_client_id: Dict[str, WorkingOrder] = {}
+        self._by_order_id: Dict[str, WorkingOrder] = {}
+
+    def _instrument(self, instrument_id: str) -> Dict[Key, WorkingOrder]:
+        orders = self._orders.get(instrument_id)
+        if orders is None:
+            orders = self._orders[instrument_id] = {}
+        return orders
+
+    def working(self, instrument_id: Optional[str] = None) -> List[WorkingOrder]:
+        if instrument_id is not None:
+            return list(self._orders.get(instrument_id, {}).values())
+        return [order for orders in self._orders.values() for order in orders.values()]
+
+    def _index(self, order: WorkingOrder) -> None:
+        if order.request.client_order_id is not None:
+            self._by_client_id[order.request.client_order_id] = order
+        if order.order_id is not None:
+            self._by_order_id[order.order_id] = order
+
+    def _forget(self, order: WorkingOrder, state: str) -> None:
+        order.state = state
+        orders = self._orders.get(order.instrument_id, {})
+        if orders.get(order.key) is order:
+            del orders[order.key]
+        self._by_client_id.pop(order.request.client_order_id, None)
+        self._by_order_id.pop(order.order_id, None)
+
+    def _within_tolerance(self, order: WorkingOrder, desired: OrderRequest) -> bool:
+        current = order.request
+        if current.price is None or desired.price is None:
+            if current.price != desired.price:
+                return False
+        elif abs(desired.price - current.price) > self.price_tolerance * current.price:
+            return False
+        return abs(desired.size - current.size) <= self.size_tolerance * current.size
+
+    async def reconcile(
+        self,
+        instrument_id: str,
+        signals: List[OrderSignal],
+        codec: Optional[FixedPointCodec] = None,
+        check: Optional[PreTradeCheck] = None,
+    ) -> List[OrderAction]:
+        """Bring the working orders of ``instrument_id`` in line with ``signals``; returns the requests sent.
+
+        ``check`` is a pre-trade check (``RiskManager.check_order``) run on
+        new orders and on the added size of amends; a failing signal sends
+        nothing and leaves any working order as it is.
+        """
+        now = self.clock()
+        orders = self._instrument(instrument_id)
+        actions: List[OrderAction] = []
+        for signal in signals:
+            self.stats.signals += 1
+            key = (signal.reason, signal.side)
+            desired = OrderRequest.from_signal(instrument_id, signal, codec)
+            if not signal.quote:
+                if check is not None and check(desired) is not None:
+                    self.stats.blocked += 1
+                    continue
+                actions.append(await self._submit(key, desired))
+                continue
+            order = orders.get(key)
+            if order is None:
+                if check is not None and check(desired) is not None:
+                    self.stats.blocked += 1
+                    continue
+                actions.append(await self._place(key, desired, now))
+                continue
+            order.desired_ns = now
+            if order.state in PENDING or self._within_tolerance(order, desired):
+                self.stats.kept += 1
+            elif (
+                check is not None
+                and desired.size > order.request.size
+                and check(replace(desired, size=desired.size - order.request.size)) is not None
+            ):
+                self.stats.blocked += 1
+            else:
+                actions.extend(await self._modify(order, desired, now))
+        if orders:
+            for order in list(orders.values()):
+                if order.state not in PENDING and now - order.desired_ns > self.quote_ttl_ns:
+                    actions.append(await self._cancel(order))
+        return actions
+
+    async def cancel_all(self, instrument_id: str) -> List[OrderAction]:
+        return [
+            await self._cancel(order)
+            for order in list(self._orders.get(instrument_id, {}).values())
+            if order.state not in PENDING
+        ]
+
+    async def _submit(self, key: Key, request: OrderRequest) -> OrderAction:
+        """Place a one-off order; it is not tracked as a working order."""
+        order = WorkingOrder(key, request)
+        result = await self.execution.execute(request)
+        accepted, order.order_id, code = _ack(result)
+        if accepted:
+            self.stats.placed += 1
+            order.state = LIVE
+        else:
+            self.stats.rejected += 1
+            order.state = REJECTED
+            logger.warning("Order %s %s rejected (sCode=%s).", key[0], key[1], code)
+        return OrderAction(PLACE, key[0], order, result, accepted)
+
+    async def _place(self, key: Key, request: OrderRequest, now: int) -> OrderAction:
+        order = WorkingOrder(key, request, desired_ns=now)
+        orders = self._instrument(request.instrument_id)
+        orders[key] = order
+        result = await self.execution.execute(request)
+        accepted, order_id, code = _ack(result)
+        if accepted:
+            self.stats.placed += 1
+            order.order_id = order_id
+            if order.state == PENDING_NEW:
+                order.state = LIVE
+            self._index(order)
+        else:
+            self.stats.rejected += 1
+            logger.warning("Order %s %s rejected (sCode=%s).", key[0], key[1], code)
+            self._forget(order, REJECTED)
+        return OrderAction(PLACE, key[0], order, result, accepted)
+
+    async def _modify(self, order: WorkingOrder, desired: OrderRequest, now: int) -> List[OrderAction]:
+        if self.amend:
+            current = order.request
+            new_price = desired.price if desired.price != current.price else None
+            new_size = desired.size if desired.size != current.size else None
+            order.state = PENDING_AMEND
+            result = await self.execution.amend(
+                order.instrument_id, order.order_id, new_price, new_size, current.client_order_id
+            )
+            accepted, _, code = _ack(result)
+            if accepted:
+                self.stats.amended += 1
+                current.price, current.size = desired.price, desired.size
+                if order.state == PENDING_AMEND:
+                    order.state = LIVE
+                return [OrderAction(AMEND, order.key[0], order, result, True)]
+            self.stats.rejected += 1
+            if code in _GONE_CODES:
+                self._forget(order, CANCELED)
+                return [
+                    OrderAction(AMEND, order.key[0], order, result, False),
+                    await self._place(order.key, desired, now),
+                ]
+            order.state = LIVE
+        cancelled = await self._cancel(order)
+        if not cancelled.accepted:
+            # Still working as far as we know; retry on a later tick rather than double up.
+            return [cancelled]
+        return [cancelled, await self._place(order.key, desired, now)]
+
+    async def _cancel(self, order: WorkingOrder) -> OrderAction:
+        previous = order.state
+        order.state = PENDING_CANCEL
+        result = await self.execution.cancel(order.instrument_id, order.order_id, order.request.client_order_id)
+        accepted, _, code = _ack(result)
+        if accepted:
+            self.stats.cancelled += 1
+            self._forget(order, CANCELED)
+        elif code in _GONE_CODES:
+            self.stats.rejected += 1
+            self._forget(order, CANCELED)
+            accepted = True
+        else:
+            self.stats.rejected += 1
+            order.state = previous
+            logger.warning("Cancel of %s failed (sCode=%s).", order.order_id or order.request.client_order_id, code)
+        return OrderAction(CANCEL, order.key[0], order, result, accepted)
+
+    def on_order_update(self, update: Dict) -> Optional[WorkingOrder]:
+        """Apply one OKX ``orders`` channel entry; returns the matching working order, if any."""
+        order = self._by_client_id.get(update.get("clOrdId") or "")
+        if order is None:
+            order = self._by_order_id.get(update.get("ordId") or "")
+        if order is None:
+            return None
+        self.stats.updates += 1
+        if order.order_id is None and update.get("ordId"):
+            order.order_id = update["ordId"]
+            self._by_order_id[order.order_id] = order
+        if update.get("accFillSz"):
+            order.filled = Decimal(update["accFillSz"])
+        state = _EXCHANGE_STATES.get(update.get("state", ""))
+        if state in TERMINAL:
+            self._forget(order, state)
+        elif state is not None and order.state not in PENDING:
+            order.state = state
+        return order
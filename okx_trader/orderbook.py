@@ -1,69 +1,268 @@
 from __future__ import annotations
 
+from bisect import bisect_left
+from collections.abc import Sequence
 from dataclasses import dataclass, field
 from decimal import Decimal
-from typing import Dict, Iterable, List, Tuple
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 import zlib
 
+from .fixed_point import FixedPointCodec
 from .utils import to_decimal
 
+CHECKSUM_DEPTH = 25
+MAX_TRACKED_CHANGES = 256
+
+
+class LevelsView(Sequence):
+    """Live, read-only view over the best ``limit`` levels of a book side.
+
+    The view does not copy: it reflects later updates to the side. Callers
+    that need to keep a frozen copy across ticks should use ``list(view)``.
+    """
+
+    __slots__ = ("_side", "_limit")
+
+    def __init__(self, side: "BookSide", limit: int) -> None:
+        self._side = side
+        self._limit = limit
+
+    def __len__(self) -> int:
+        size = len(self._side._prices)
+        return size if size < self._limit else self._limit
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if start == 0 and step == 1:
+                return LevelsView(self._side, stop)
+            return [self[idx] for idx in range(start, stop, step)]
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("level index out of range")
+        price = self._side.price_at(index)
+        return price, self._side.levels[price]
+
+    def __iter__(self) -> Iterator[Tuple[Decimal, Decimal]]:
+        side = self._side
+        levels = side.levels
+        prices = reversed(side._prices) if side.is_bid else side._prices
+        for price in islice(prices, len(self)):
+            yield price, levels[price]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (LevelsView, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"LevelsView({list(self)!r})"
+
 
 @dataclass
 class BookSide:
     side: str
     levels: Dict[Decimal, Decimal] = field(default_factory=dict)
     depth: int = 400
+    _prices: List[Decimal] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.is_bid = self.side == "bids"
+        self._prices = sorted(self.levels)
 
     def update(self, price: Decimal, size: Decimal) -> None:
+        levels = self.levels
         if size == 0:
-            self.levels.pop(price, None)
-        else:
-            self.levels[price] = size
+            if levels.pop(price, None) is not None:
+                prices = self._prices
+                del prices[bisect_left(prices, price)]
+            return
+        if price not in levels:
+            prices = self._prices
+            prices.insert(bisect_left(prices, price), price)
+        levels[price] = size
 
-    def top_levels(self) -> List[Tuple[Decimal, Decimal]]:
-        if self.side == "bids":
-            sorted_prices = sorted(self.levels.keys(), reverse=True)
-        else:
-            sorted_prices = sorted(self.levels.keys())
-        trimmed = sorted_prices[: self.depth]
-        return [(price, self.levels[price]) for price in trimmed]
+    def clear(self) -> None:
+        self.levels.clear()
+        self._prices.clear()
+
+    def price_at(self, index: int) -> Decimal:
+        if self.is_bid:
+            return self._prices[-1 - index]
+        return self._prices[index]
+
+    def top_prices(self, limit: int) -> List[Decimal]:
+        if self.is_bid:
+            return self._prices[: -limit - 1 : -1]
+        return self._prices[:limit]
+
+    def within_top(self, price: Decimal, count: int) -> bool:
+        prices = self._prices
+        if len(prices) <= count:
+            return True
+        if self.is_bid:
+            return price >= prices[-count]
+        return price <= prices[count - 1]
+
+    def rank(self, price: Decimal) -> int:
+        index = bisect_left(self._prices, price)
+        return len(self._prices) - 1 - index if self.is_bid else index
+
+    def best(self) -> Optional[Tuple[Decimal, Decimal]]:
+        if not self._prices:
+            return None
+        price = self._prices[-1] if self.is_bid else self._prices[0]
+        return price, self.levels[price]
+
+    def top_levels(self, limit: Optional[int] = None) -> LevelsView:
+        if limit is None or limit > self.depth:
+            limit = self.depth
+        return LevelsView(self, limit)
 
 
 @dataclass
 class OrderBook:
     instrument_id: str
     depth: int = 400
+    codec: Optional[FixedPointCodec] = None
     bids: BookSide = field(init=False)
     asks: BookSide = field(init=False)
 
     def __post_init__(self) -> None:
         self.bids = BookSide("bids", depth=self.depth)
         self.asks = BookSide("asks", depth=self.depth)
+        if self.codec is None:
+            self._parse_price = self._parse_size = to_decimal
+            self._raw_bids: Optional[Dict] = None
+            self._raw_asks: Optional[Dict] = None
+        else:
+            self._parse_price = self.codec.price_to_int
+            self._parse_size = self.codec.size_to_int
+            # Integers lose the exchange's string formatting, which the checksum needs.
+            self._raw_bids = {}
+            self._raw_asks = {}
+        self._bid_entries: List[str] = []
+        self._ask_entries: List[str] = []
+        self._bids_dirty = True
+        self._asks_dirty = True
+        self._checksum: Optional[int] = None
+        self._track_depth = 0
+        self.changes: List[Tuple[bool, Decimal, Decimal]] = []
+        self.structure_changed = True
+
+    @property
+    def fixed_point(self) -> bool:
+        return self.codec is not None
 
     def apply_snapshot(self, bids: Iterable[Iterable[str]], asks: Iterable[Iterable[str]]) -> None:
-        self.bids.levels.clear()
-        self.asks.levels.clear()
-        for price, size, *_ in bids:
-            self.bids.update(to_decimal(price), to_decimal(size))
-        for price, size, *_ in asks:
-            self.asks.update(to_decimal(price), to_decimal(size))
+        self.bids.clear()
+        self.asks.clear()
+        if self._raw_bids is not None:
+            self._raw_bids.clear()
+            self._raw_asks.clear()
+        self._bids_dirty = self._asks_dirty = True
+        self.structure_changed = True
+        self.apply_update(bids, asks)
+
+    def track_changes(self, depth: int) -> None:
+        """Log size deltas within the top ``depth`` levels into ``changes``.
+
+        Inserts and deletes there (and snapshots) reorder the levels, so they
+        only set ``structure_changed``; consumers rescan and call ``reset_changes``.
+        """
+        self._track_depth = depth
+        self.reset_changes()
+        self.structure_changed = True
+
+    def reset_changes(self) -> None:
+        self.changes.clear()
+        self.structure_changed = False
 
     def apply_update(self, bids: Iterable[Iterable[str]], asks: Iterable[Iterable[str]]) -> None:
-        for price, size, *_ in bids:
-            self.bids.update(to_decimal(price), to_decimal(size))
-        for price, size, *_ in asks:
-            self.asks.update(to_decimal(price), to_decimal(size))
-
-    def top_levels(self) -> Tuple[List[Tuple[Decimal, Decimal]], List[Tuple[Decimal, Decimal]]]:
-        return self.bids.top_levels(), self.asks.top_levels()
-
-    def checksum(self, depth: int = 25) -> int:
-        bids = self.bids.top_levels()[:depth]
-        asks = self.asks.top_levels()[:depth]
-        checksum_str = ":".join(
-            [
-                *[f"{price}:{size}" for price, size in bids],
-                *[f"{price}:{size}" for price, size in asks],
-            ]
-        )
-        return zlib.crc32(checksum_str.encode())
+        if bids:
+            if self._apply_side(self.bids, bids, self._raw_bids):
+                self._bids_dirty = True
+        if asks:
+            if self._apply_side(self.asks, asks, self._raw_asks):
+                self._asks_dirty = True
+
+    def _apply_side(self, side: BookSide, levels: Iterable[Iterable[str]], raw: Optional[Dict]) -> bool:
+        parse_price = self._parse_price
+        parse_size = self._parse_size
+        touched_top = False
+        track_depth = self._track_depth
+        for level in levels:
+            price = parse_price(level[0])
+            size = parse_size(level[1])
+            if track_depth:
+                old = side.levels.get(price)
+                side.update(price, size)
+                if (old is not None or size) and not self.structure_changed and side.within_top(price, track_depth):
+                    if old is None or not size:
+                        self.structure_changed = True
+                    elif size != old:
+                        self.changes.append((side.is_bid, price, size - old))
+                        if len(self.changes) > MAX_TRACKED_CHANGES:
+                            self.structure_changed = True
+            else:
+                side.update(price, size)
+            if raw is not None:
+                if size:
+                    raw[price] = level
+                else:
+                    raw.pop(price, None)
+            if not touched_top and side.within_top(price, CHECKSUM_DEPTH):
+                touched_top = True
+        return touched_top
+
+    def best_bid(self) -> Optional[Tuple[Decimal, Decimal]]:
+        return self.bids.best()
+
+    def best_ask(self) -> Optional[Tuple[Decimal, Decimal]]:
+        return self.asks.best()
+
+    def top_levels(self, limit: Optional[int] = None) -> Tuple[LevelsView, LevelsView]:
+        return self.bids.top_levels(limit), self.asks.top_levels(limit)
+
+    def checksum(self, depth: int = CHECKSUM_DEPTH) -> int:
+        if depth != CHECKSUM_DEPTH:
+            return _okx_crc32(
+                self._checksum_entries(self.bids, self._raw_bids, depth),
+                self._checksum_entries(self.asks, self._raw_asks, depth),
+            )
+        if self._bids_dirty:
+            self._bid_entries = self._checksum_entries(self.bids, self._raw_bids, depth)
+            self._bids_dirty = False
+            self._checksum = None
+        if self._asks_dirty:
+            self._ask_entries = self._checksum_entries(self.asks, self._raw_asks, depth)
+            self._asks_dirty = False
+            self._checksum = None
+        if self._checksum is None:
+            self._checksum = _okx_crc32(self._bid_entries, self._ask_entries)
+        return self._checksum
+
+    @staticmethod
+    def _checksum_entries(side: BookSide, raw: Optional[Dict], depth: int) -> List[str]:
+        if raw is None:
+            return [f"{price}:{size}" for price, size in side.top_levels(depth)]
+        entries = []
+        for price, _ in side.top_levels(depth):
+            level = raw[price]
+            entries.append(f"{level[0]}:{level[1]}")
+        return entries
+
+
+def _okx_crc32(bid_entries: List[str], ask_entries: List[str]) -> int:
+    # OKX interleaves bid/ask levels and reports the CRC32 as a signed int32.
+    parts: List[str] = []
+    for idx in range(max(len(bid_entries), len(ask_entries))):
+        if idx < len(bid_entries):
+            parts.append(bid_entries[idx])
+        if idx < len(ask_entries):
+            parts.append(ask_entries[idx])
+    value = zlib.crc32(":".join(parts).encode())
+    return value - (1 << 32) if value >= 1 << 31 else value
@@ -1,27 +1,66 @@
 from __future__ import annotations
 
 import asyncio
-import json
-from dataclasses import dataclass
-from typing import AsyncIterator, Dict, Iterable, Optional
+import logging
+import time
+from typing import TYPE_CHECKING, AsyncIterator, Dict, Iterable, Optional
 
 import aiohttp
 
+from .decoding import FrameDecoder, OrderBookMessage, make_decoder
+from .fixed_point import FixedPointCodec
+from .latency import BOOK_APPLY
 from .orderbook import OrderBook
+from .pipeline import TickPipeline
+from .utils import Backoff
 
+if TYPE_CHECKING:
+    from .cold_storage import ColdStorageWriter
+    from .latency import LatencyRecorder
+    from .recorder import FrameRecorder
 
-@dataclass
-class OrderBookMessage:
-    action: str
-    data: Dict
+logger = logging.getLogger(__name__)
+
+PUBLIC_WS_URL = "wss://ws.okx.com:8443/ws/v5/public"
 
 
 class OrderBookStreamer:
-    def __init__(self, instrument_id: str, depth: int = 400, proxy: str | None = None) -> None:
+    def __init__(
+        self,
+        instrument_id: str,
+        depth: int = 400,
+        proxy: str | None = None,
+        codec: Optional[FixedPointCodec] = None,
+        validate_checksum: bool = True,
+        url: str = PUBLIC_WS_URL,
+        recorder: Optional["FrameRecorder"] = None,
+        decoder: Optional[FrameDecoder] = None,
+        latency: Optional["LatencyRecorder"] = None,
+        reconnect: bool = False,
+        reconnect_delay: float = 5.0,
+        max_reconnect_delay: float = 60.0,
+        ping_interval: float = 20.0,
+        cold: Optional["ColdStorageWriter"] = None,
+    ) -> None:
         self.instrument_id = instrument_id
         self.depth = depth
-        self.orderbook = OrderBook(instrument_id, depth=depth)
+        self.orderbook = OrderBook(instrument_id, depth=depth, codec=codec)
         self.proxy = proxy
+        self.url = url
+        self.validate_checksum = validate_checksum
+        self.recorder = recorder
+        self.decoder = decoder or make_decoder()
+        self.latency = latency
+        self.reconnect = reconnect
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.ping_interval = ping_interval
+        self.cold = cold
+        self.synced = False
+        self.resync_count = 0
+        self.awaiting_snapshot = False
+        self._seq_id: Optional[int] = None
+        self.pipeline: Optional[TickPipeline] = None
         self._session: Optional[aiohttp.ClientSession] = None
         self._ws: Optional[aiohttp.ClientWebSocketResponse] = None
 
@@ -29,58 +68,157 @@ class OrderBookStreamer:
         if self._session is None:
             self._session = aiohttp.ClientSession()
         self._ws = await self._session.ws_connect(
-            "wss://ws.okx.com:8443/ws/v5/public",
-            heartbeat=20,
-            receive_timeout=60,
+            self.url,
+            heartbeat=self.ping_interval,
+            timeout=aiohttp.ClientWSTimeout(ws_receive=max(60.0, 3 * self.ping_interval), ws_close=10.0),
             proxy=self.proxy,
         )
         await self._subscribe()
 
-    async def _subscribe(self) -> None:
+    @property
+    def subscription_arg(self) -> Dict[str, str]:
+        return {"channel": "books-l2-tbt", "instId": self.instrument_id}
+
+    def attach(self, ws: aiohttp.ClientWebSocketResponse) -> None:
+        self._ws = ws
+
+    async def _subscribe(self, op: str = "subscribe") -> None:
         if not self._ws:
             raise RuntimeError("WebSocket not connected")
-        payload = {
-            "op": "subscribe",
-            "args": [
-                {"channel": "books-l2-tbt", "instId": self.instrument_id}
-            ],
-        }
+        payload = {"op": op, "args": [self.subscription_arg]}
         await self._ws.send_json(payload)
+        if op == "subscribe":
+            self.awaiting_snapshot = True
+
+    async def resync(self) -> None:
+        self.resync_count += 1
+        logger.warning("Resyncing %s order book (resync #%d).", self.instrument_id, self.resync_count)
+        await self._subscribe("unsubscribe")
+        await self._subscribe()
 
     async def close(self) -> None:
         if self._ws:
             await self._ws.close()
         if self._session:
             await self._session.close()
+            self._session = None
 
     async def stream(self) -> AsyncIterator[OrderBookMessage]:
         if not self._ws:
             raise RuntimeError("WebSocket not connected")
+        recorder = self.recorder
+        decode = self.decoder.decode if self.latency is None else self.latency.timed_decode(self.decoder.decode)
         async for msg in self._ws:
             if msg.type == aiohttp.WSMsgType.TEXT:
-                data = json.loads(msg.data)
-                action = data.get("action") or data.get("event") or "update"
-                yield OrderBookMessage(action=action, data=data)
+                if recorder is not None:
+                    recorder.record(msg.data)
+                yield decode(msg.data)
             elif msg.type == aiohttp.WSMsgType.ERROR:
                 break
 
-    def apply_message(self, message: OrderBookMessage) -> None:
-        data = message.data.get("data", [])
-        if not data:
-            return
-        payload = data[0]
-        bids = payload.get("bids", [])
-        asks = payload.get("asks", [])
+    def apply_message(self, message: OrderBookMessage) -> bool:
+        if not message.has_data:
+            return self.synced
+        seq_id = message.seq_id
         if message.action == "snapshot":
-            self.orderbook.apply_snapshot(bids, asks)
+            self.orderbook.apply_snapshot(message.bids, message.asks)
+            self.awaiting_snapshot = False
         else:
-            self.orderbook.apply_update(bids, asks)
+            if not self.synced:
+                return False
+            prev_seq_id = message.prev_seq_id
+            if prev_seq_id is not None and self._seq_id is not None and prev_seq_id != self._seq_id:
+                logger.warning(
+                    "Sequence gap on %s: prevSeqId=%s, last seqId=%s.", self.instrument_id, prev_seq_id, self._seq_id
+                )
+                self.synced = False
+                return False
+            self.orderbook.apply_update(message.bids, message.asks)
+        self._seq_id = seq_id
+        checksum = message.checksum
+        if self.validate_checksum and checksum is not None and self.orderbook.checksum() != checksum:
+            logger.warning("Checksum mismatch on %s at seqId=%s.", self.instrument_id, seq_id)
+            self.synced = False
+            return False
+        self.synced = True
+        return True
+
+    async def ingest(self, message: OrderBookMessage) -> bool:
+        """Apply one frame, resyncing on a gap or checksum mismatch.
+
+        Every applied frame goes to ``cold`` here rather than in the tick
+        handler, which may only see a coalesced subset of them.
+        """
+        latency = self.latency
+        if latency is None:
+            applied = self.apply_message(message)
+        else:
+            started = time.perf_counter_ns()
+            applied = self.apply_message(message)
+            latency.record(BOOK_APPLY, time.perf_counter_ns() - started)
+        if applied:
+            if self.cold is not None and message.has_data:
+                self.cold.write_book_delta(self.instrument_id, message.data)
+            return True
+        if not self.awaiting_snapshot:
+            await self.resync()
+        return False
 
     async def run_forever(self, handler) -> None:
+        """Stream until the socket closes; with ``reconnect``, reconnect with jittered backoff instead."""
+        backoff = Backoff(self.reconnect_delay, self.max_reconnect_delay)
+        try:
+            while True:
+                received = False
+                try:
+                    await self.connect()
+                    async for message in self.stream():
+                        received = True
+                        if await self.ingest(message):
+                            await handler(self.orderbook, message)
+                except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as exc:
+                    if not self.reconnect:
+                        raise
+                    logger.warning("Order book stream for %s failed: %r.", self.instrument_id, exc)
+                if not self.reconnect:
+                    return
+                self.synced = False
+                if received:
+                    backoff.reset()
+                delay = backoff.next()
+                logger.warning("Order book stream for %s closed; reconnecting in %.2fs.", self.instrument_id, delay)
+                await asyncio.sleep(delay)
+        finally:
+            await self.close()
+
+    async def run_pipeline(self, handler, coalesce: bool = True, queue_size: int = 64) -> None:
+        """Apply every delta in the read loop and run ``handler`` in a separate task.
+
+        The handler always sees the freshest book; ticks that arrive while it
+        is busy are coalesced (or queued and dropped oldest-first).
+        """
+        self.pipeline = TickPipeline(coalesce=coalesce, queue_size=queue_size)
         await self.connect()
+        consumer = asyncio.create_task(consume_pipeline(self.pipeline, self.orderbook, handler))
         try:
             async for message in self.stream():
-                self.apply_message(message)
-                await handler(self.orderbook, message)
+                if await self.ingest(message):
+                    self.pipeline.push(message)
+                    # Buffered frames complete without suspending; let the consumer in.
+                    await asyncio.sleep(0)
+            await self.pipeline.join()
         finally:
+            consumer.cancel()
+            await asyncio.gather(consumer, return_exceptions=True)
             await self.close()
+
+
+async def consume_pipeline(pipeline: TickPipeline, orderbook: OrderBook, handler) -> None:
+    while True:
+        message = await pipeline.get()
+        try:
+            await handler(orderbook, message)
+        except Exception:
+            logger.exception("Handler failed for %s.", orderbook.instrument_id)
+        finally:
+            pipeline.task_done()
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque
+
+
+@dataclass
+class PipelineMetrics:
+    received: int = 0
+    processed: int = 0
+    coalesced: int = 0
+    dropped: int = 0
+    queue_depth: int = 0
+    max_queue_depth: int = 0
+
+
+class TickPipeline:
+    """Hand-off between the ingest task and the strategy consumer.
+
+    With ``coalesce=True`` it is a single latest-state slot: a tick that
+    arrives while one is still pending replaces it. Otherwise it is a
+    bounded FIFO that drops the oldest tick when full. Either way ``push``
+    never blocks, so socket reads are never stalled by the consumer.
+    """
+
+    def __init__(self, coalesce: bool = True, queue_size: int = 64) -> None:
+        self.coalesce = coalesce
+        self.capacity = 1 if coalesce else max(1, queue_size)
+        self.metrics = PipelineMetrics()
+        self._items: Deque[Any] = deque()
+        self._ready = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._unfinished = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def push(self, item: Any) -> None:
+        metrics = self.metrics
+        metrics.received += 1
+        items = self._items
+        if len(items) >= self.capacity:
+            items.popleft()
+            if self.coalesce:
+                metrics.coalesced += 1
+            else:
+                metrics.dropped += 1
+        else:
+            self._unfinished += 1
+            self._idle.clear()
+        items.append(item)
+        depth = len(items)
+        metrics.queue_depth = depth
+        if depth > metrics.max_queue_depth:
+            metrics.max_queue_depth = depth
+        self._ready.set()
+
+    async def get(self) -> Any:
+        while not self._items:
+            self._ready.clear()
+            await self._ready.wait()
+        item = self._items.popleft()
+        self.metrics.queue_depth = len(self._items)
+        return item
+
+    def task_done(self) -> None:
+        self.metrics.processed += 1
+        self._unfinished -= 1
+        if self._unfinished <= 0:
+            self._unfinished = 0
+            self._idle.set()
+
+    async def join(self) -> None:
+        await self._idle.wait()
@@ -0,0 +1,314 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import aiohttp
+
+from .execution import ORDER_NOT_FOUND_CODE, OkxRestClient
+from .rate_limit import ORDER_QUERY, RateLimiter
+from .utils import Backoff, json_dumps, json_loads
+from .ws_execution import PRIVATE_WS_URL, login_args
+
+logger = logging.getLogger(__name__)
+
+ORDERS = "orders"
+POSITIONS = "positions"
+ACCOUNT = "account"
+
+_ZERO = Decimal("0")
+_TERMINAL_STATES = frozenset({"filled", "canceled", "mmp_canceled"})
+
+Listener = Callable[[Dict], None]
+
+
+def _decimal(value: Optional[str]) -> Decimal:
+    return Decimal(value) if value else _ZERO
+
+
+class PrivateStreamer:
+    """OKX private ``orders``/``positions``/``account`` feed with local caches.
+
+    Order entries are normalised against the cached cumulative fill
+    (``accFillSz``, ``avgPx``, ``fee``) before they reach
+    ``order_listeners``: ``fillSz``/``fillPx``/``fillFee`` always carry the
+    fill *since the last entry seen for that order*, so a duplicated push,
+    a stale push or a REST reconciliation never applies a fill twice.
+
+    Every (re)connect logs in, subscribes, and then reconciles over REST --
+    pending orders, the final state of cached orders that are no longer
+    pending, of orders with fills since the feed was last in sync that it
+    never saw (placed and filled while disconnected), positions and
+    balances -- so fills made while disconnected are delivered as ordinary
+    order entries. Given ``tracked_orders`` (the clOrdIds a caller counts as
+    working), each of them that is no longer live afterwards is passed to
+    ``closed_order_listeners``. A cached order is only dropped as canceled
+    when OKX confirms it does not exist; any other failed lookup aborts the
+    reconciliation and the feed reconnects and tries again. Order lookups
+    go through ``limiter``. ``positions`` are keyed by
+    ``(instId, posSide)`` and ``balances`` by currency; both are replaced
+    by every push.
+    """
+
+    def __init__(
+        self,
+        rest_client: OkxRestClient,
+        url: str = PRIVATE_WS_URL,
+        proxy: str | None = None,
+        reconnect_delay: float = 5.0,
+        max_reconnect_delay: float = 60.0,
+        ping_interval: float = 20.0,
+        request_timeout: float = 5.0,
+        closed_order_memory: int = 10_000,
+        fill_lookback_ms: int = 5_000,
+        limiter: Optional[RateLimiter] = None,
+    ) -> None:
+        self.rest_client = rest_client
+        self.url = url
+        self.proxy = proxy
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.ping_interval = ping_interval
+        self.request_timeout = request_timeout
+        self.closed_order_memory = closed_order_memory
+        self.fill_lookback_ms = fill_lookback_ms
+        self.limiter = limiter or RateLimiter()
+        self.orders: Dict[str, Dict] = {}
+        self.positions: Dict[Tuple[str, str], Dict] = {}
+        self.balances: Dict[str, Dict] = {}
+        self.account: Dict = {}
+        self.order_listeners: List[Listener] = []
+        self.position_listeners: List[Listener] = []
+        self.account_listeners: List[Listener] = []
+        self.tracked_orders: Optional[Callable[[], Iterable[str]]] = None
+        self.closed_order_listeners: List[Callable[[str], None]] = []
+        self.connected = asyncio.Event()
+        self.connections = 0
+        self.reconciliations = 0
+        self.pushes = 0
+        self.duplicates = 0
+        self.missed_orders = 0
+        # Exchange time (ms) up to which every order event is known to have been seen.
+        self._synced_ms = int(time.time() * 1000)
+        self._closed: "OrderedDict[str, Dict]" = OrderedDict()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._ws: Optional[aiohttp.ClientWebSocketResponse] = None
+        self._stopped = False
+
+    async def connect(self) -> None:
+        if self._session is None:
+            self._session = aiohttp.ClientSession()
+        self._ws = await self._session.ws_connect(self.url, heartbeat=self.ping_interval, proxy=self.proxy)
+        await self._ws.send_str(json_dumps({"op": "login", "args": [login_args(self.rest_client)]}))
+        response = await asyncio.wait_for(self._ws.receive_json(loads=json_loads), self.request_timeout)
+        if response.get("event") != "login" or response.get("code") != "0":
+            await self._ws.close()
+            raise RuntimeError(f"Private WebSocket login failed: {response.get('msg')}")
+        args = [{"channel": ORDERS, "instType": "ANY"}, {"channel": POSITIONS, "instType": "ANY"}, {"channel": ACCOUNT}]
+        await self._ws.send_str(json_dumps({"op": "subscribe", "args": args}))
+        self.connections += 1
+
+    async def close(self) -> None:
+        self._stopped = True
+        if self._ws is not None:
+            await self._ws.close()
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def run_forever(self) -> None:
+        """Connect, reconcile and consume pushes; reconnect with jittered backoff on any drop."""
+        backoff = Backoff(self.reconnect_delay, self.max_reconnect_delay)
+        try:
+            while not self._stopped:
+                try:
+                    await self.connect()
+                    # Subscribed first, so nothing pushed during the REST round trips is missed.
+                    await self.reconcile()
+                    self.connected.set()
+                    backoff.reset()
+                    await self._consume()
+                except (aiohttp.ClientError, asyncio.TimeoutError, OSError, RuntimeError) as exc:
+                    logger.warning("Private stream error: %r.", exc)
+                self.connected.clear()
+                if self._ws is not None:
+                    await self._ws.close()
+                if not self._stopped:
+                    delay = backoff.next()
+                    logger.warning("Private stream disconnected; reconnecting in %.2fs.", delay)
+                    await asyncio.sleep(delay)
+        finally:
+            if self._session is not None:
+                await self._session.close()
+                self._session = None
+
+    async def _consume(self) -> None:
+        async for msg in self._ws:
+            if msg.type == aiohttp.WSMsgType.TEXT:
+                self._synced_ms = int(time.time() * 1000)
+                self.on_message(json_loads(msg.data))
+            elif msg.type == aiohttp.WSMsgType.ERROR:
+                break
+
+    def on_message(self, message: Dict) -> None:
+        data = message.get("data")
+        if data is None:
+            if message.get("event") == "error":
+                logger.warning("Private stream error event: %s", message.get("msg"))
+            return
+        self.pushes += 1
+        channel = message.get("arg", {}).get("channel")
+        if channel == ORDERS:
+            for entry in data:
+                self.apply_order(entry)
+        elif channel == POSITIONS:
+            for entry in data:
+                self.apply_position(entry)
+        elif channel == ACCOUNT:
+            for entry in data:
+                self.apply_account(entry)
+
+    def apply_order(self, entry: Dict) -> Optional[Dict]:
+        """Normalise one order entry (push or REST) and hand it to ``order_listeners``."""
+        order_id = entry.get("ordId", "")
+        previous = self.orders.get(order_id)
+        if previous is None and order_id in self._closed:
+            self.duplicates += 1
+            return None
+        filled = _decimal(entry.get("accFillSz"))
+        previous_filled = _decimal(previous.get("accFillSz")) if previous else _ZERO
+        if filled < previous_filled:
+            self.duplicates += 1
+            return None
+        update = dict(entry)
+        delta = filled - previous_filled
+        if delta:
+            fill_price = entry.get("fillPx")
+            if not fill_price or _decimal(entry.get("fillSz")) != delta:
+                # Several fills merged (or missed): price the delta from the cumulative average.
+                previous_avg = _decimal(previous.get("avgPx")) if previous else _ZERO
+                fill_price = str((_decimal(entry.get("avgPx")) * filled - previous_avg * previous_filled) / delta)
+            fee = _decimal(entry.get("fee")) - (_decimal(previous.get("fee")) if previous else _ZERO)
+            update.update(fillSz=str(delta), fillPx=fill_price, fillFee=str(fee))
+        else:
+            if previous is not None and previous.get("state") == entry.get("state"):
+                # Nothing new for the listeners (a repeat, or an amend ack).
+                self.orders[order_id] = entry
+                return None
+            update.update(fillSz="0", fillPx="", fillFee="0")
+        if entry.get("state") in _TERMINAL_STATES:
+            self.orders.pop(order_id, None)
+            self._closed[order_id] = entry
+            if len(self._closed) > self.closed_order_memory:
+                self._closed.popitem(last=False)
+        else:
+            self.orders[order_id] = entry
+        for listener in self.order_listeners:
+            listener(update)
+        return update
+
+    def apply_position(self, entry: Dict) -> None:
+        key = (entry.get("instId", ""), entry.get("posSide", "net"))
+        if _decimal(entry.get("pos")):
+            self.positions[key] = entry
+        else:
+            self.positions.pop(key, None)
+        for listener in self.position_listeners:
+            listener(entry)
+
+    def apply_account(self, entry: Dict) -> None:
+        self.account = entry
+        for detail in entry.get("details", []):
+            self.balances[detail.get("ccy", "")] = detail
+        for listener in self.account_listeners:
+            listener(entry)
+
+    async def _lookup(self, instrument_id: str, order_id: str) -> Optional[Dict]:
+        """The order's current entry, ``None`` if OKX confirms it does not exist; raises on any other failure."""
+        await self.limiter.acquire((ORDER_QUERY,), {instrument_id: 1})
+        response = await self.rest_client.get_order(instrument_id, order_id)
+        code = response.get("code")
+        data = response.get("data")
+        if code == "0" and data:
+            return data[0]
+        if code in ("0", ORDER_NOT_FOUND_CODE):
+            return None
+        raise RuntimeError(f"Order lookup for {order_id} failed (code {code}): {response.get('msg')}")
+
+    async def _missed_orders(self, pending: Dict[str, Dict]) -> List[Dict]:
+        """Final state of orders filled since ``_synced_ms`` that neither the caches nor ``pending`` know."""
+        client = self.rest_client
+        begin = self._synced_ms - self.fill_lookback_ms
+        unknown: Dict[str, str] = {}
+        after = None
+        while True:
+            page = (await client.get_fills(begin, after)).get("data") or []
+            for fill in page:
+                order_id = fill.get("ordId", "")
+                if order_id in pending or order_id in self.orders or order_id in self._closed:
+                    continue
+                unknown[order_id] = fill.get("instId", "")
+            if len(page) < 100 or not page[-1].get("billId") or page[-1]["billId"] == after:
+                break
+            after = page[-1]["billId"]
+        entries = []
+        for order_id, inst_id in unknown.items():
+            entry = await self._lookup(inst_id, order_id)
+            if entry is not None:
+                entries.append(entry)
+        return entries
+
+    async def reconcile(self) -> None:
+        """Bring the caches up to date over REST after a (re)connect."""
+        client = self.rest_client
+        started_ms = int(time.time() * 1000)
+        tracked: Set[str] = set(self.tracked_orders()) if self.tracked_orders is not None else set()
+        pending: Dict[str, Dict] = {}
+        after = None
+        while True:
+            response = await client.get_orders_pending(after)
+            page = response.get("data") or []
+            for entry in page:
+                pending[entry["ordId"]] = entry
+            if len(page) < 100 or page[-1]["ordId"] == after:
+                break
+            after = page[-1]["ordId"]
+        for order_id, cached in list(self.orders.items()):
+            if order_id in pending:
+                continue
+            entry = await self._lookup(cached.get("instId", ""), order_id)
+            if entry is not None:
+                self.apply_order(entry)
+            else:
+                logger.warning("Order %s vanished while disconnected; treating it as canceled.", order_id)
+                self.apply_order(dict(cached, state="canceled"))
+        for entry in await self._missed_orders(pending):
+            self.missed_orders += 1
+            logger.warning("Order %s filled while disconnected; applying its fills.", entry.get("ordId"))
+            self.apply_order(entry)
+        for entry in pending.values():
+            self.apply_order(entry)
+        live = {entry.get("clOrdId") for entry in self.orders.values()}
+        for client_order_id in tracked - live:
+            for listener in self.closed_order_listeners:
+                listener(client_order_id)
+        positions = (await client.get_positions()).get("data") or []
+        stale = set(self.positions) - {(entry.get("instId", ""), entry.get("posSide", "net")) for entry in positions}
+        for inst_id, pos_side in stale:
+            self.apply_position({"instId": inst_id, "posSide": pos_side, "pos": "0", "avgPx": ""})
+        for entry in positions:
+            self.apply_position(entry)
+        for entry in (await client.get_balance()).get("data") or []:
+            self.apply_account(entry)
+        self._synced_ms = started_ms
+        self.reconciliations += 1
+        logger.info(
+            "Private stream reconciled: %d open orders, %d positions, %d balances.",
+            len(self.orders),
+            len(self.positions),
+            len(self.balances),
+        )
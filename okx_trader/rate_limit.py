@@ -0,0 +1,482 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from .execution import OkxRestClient, OrderRequest
+from .latency import QUANTILES, LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+ORDER_PATH = "/api/v5/trade/order"
+BATCH_ORDERS_PATH = "/api/v5/trade/batch-orders"
+AMEND_PATH = "/api/v5/trade/amend-order"
+CANCEL_PATH = "/api/v5/trade/cancel-order"
+ACCOUNT = "account"
+# GET on ORDER_PATH (order details) has its own limit.
+ORDER_QUERY = "order_query"
+
+MAX_BATCH_ORDERS = 20
+RATE_LIMITED_CODE = "50011"
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """``requests`` per ``window`` seconds, per instId unless ``per_instrument`` is off.
+
+    Batch endpoints (``per_order``) are charged one unit per order in the request.
+    """
+
+    requests: int
+    window: float = 2.0
+    per_instrument: bool = True
+    per_order: bool = False
+
+
+# OKX v5 trade limits (per UID and instId) plus the sub-account cap on new and
+# amended orders, which cancels do not count against.
+OKX_RATE_LIMITS: Dict[str, RateLimit] = {
+    ORDER_PATH: RateLimit(60),
+    BATCH_ORDERS_PATH: RateLimit(300, per_order=True),
+    AMEND_PATH: RateLimit(60),
+    CANCEL_PATH: RateLimit(60),
+    ORDER_QUERY: RateLimit(60),
+    ACCOUNT: RateLimit(1000, per_instrument=False, per_order=True),
+}
+
+
+class TokenBucket:
+    """Token bucket whose tokens come back one ``window`` after they were spent.
+
+    A constant refill rate would let a full bucket plus a window's refill
+    through in one window -- up to twice the limit as the exchange counts
+    it -- so spent tokens are kept in a log and returned as they age out.
+    Tokens taken with ``hold`` stay spent until ``release``: the exchange
+    counts a request when it arrives, which can be any time before the
+    response, so its window is only known to have started by then.
+    """
+
+    __slots__ = ("capacity", "window", "_spent", "_used")
+
+    def __init__(self, capacity: int, window: float) -> None:
+        self.capacity = max(1, capacity)
+        self.window = window
+        self._spent: Deque[Tuple[float, int]] = deque()
+        self._used = 0
+
+    def _expire(self, now: float) -> None:
+        spent = self._spent
+        while spent and spent[0][0] <= now:
+            self._used -= spent.popleft()[1]
+
+    def available(self, now: float) -> int:
+        self._expire(now)
+        return self.capacity - self._used
+
+    def wait_time(self, tokens: int, now: float) -> float:
+        """Seconds until ``tokens`` are available (0 if they already are)."""
+        self._expire(now)
+        missing = self._used + min(tokens, self.capacity) - self.capacity
+        if missing <= 0:
+            return 0.0
+        for expiry, count in self._spent:
+            missing -= count
+            if missing <= 0:
+                return expiry - now
+        return self.window
+
+    def take(self, tokens: int, now: float, hold: bool = False) -> bool:
+        if self.available(now) < tokens:
+            return False
+        if not hold:
+            self._spent.append((now + self.window, tokens))
+        self._used += tokens
+        return True
+
+    def release(self, tokens: int, now: float) -> None:
+        """Start the window of held tokens at ``now``."""
+        self._spent.append((now + self.window, tokens))
+
+    def refund(self, tokens: int) -> None:
+        """Give back held tokens whose request was never sent."""
+        self._used -= tokens
+
+    def drain(self, now: float) -> None:
+        """Treat the bucket as exhausted for a full window (after the exchange said so)."""
+        self._expire(now)
+        if self._used < self.capacity:
+            self._spent.append((now + self.window, self.capacity - self._used))
+            self._used = self.capacity
+
+
+class RateLimiter:
+    """``TokenBucket`` per (endpoint, instId), sized to ``headroom`` of the OKX limits."""
+
+    def __init__(
+        self,
+        limits: Optional[Dict[str, RateLimit]] = None,
+        headroom: float = 0.9,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.limits = OKX_RATE_LIMITS if limits is None else limits
+        self.headroom = headroom
+        self.clock = clock
+        self._buckets: Dict[Tuple[str, str], TokenBucket] = {}
+
+    def bucket(self, path: str, instrument_id: str = "") -> Optional[TokenBucket]:
+        limit = self.limits.get(path)
+        if limit is None:
+            return None
+        key = (path, instrument_id if limit.per_instrument else "")
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(int(limit.requests * self.headroom), limit.window)
+        return bucket
+
+    def _charges(self, path: str, counts: Dict[str, int]) -> List[Tuple[TokenBucket, int]]:
+        limit = self.limits.get(path)
+        if limit is None:
+            return []
+        if limit.per_instrument:
+            return [(self.bucket(path, inst), n if limit.per_order else 1) for inst, n in counts.items()]
+        return [(self.bucket(path), sum(counts.values()) if limit.per_order else 1)]
+
+    def wait_time(self, path: str, counts: Dict[str, int]) -> float:
+        now = self.clock()
+        return max((bucket.wait_time(n, now) for bucket, n in self._charges(path, counts)), default=0.0)
+
+    def try_acquire(self, paths: Tuple[str, ...], counts: Dict[str, int], hold: bool = False) -> bool:
+        """Take tokens from every bucket ``paths`` charges for ``counts`` (instId -> orders), or none.
+
+        With ``hold`` the tokens stay spent until ``release`` with the same arguments.
+        """
+        now = self.clock()
+        charges = [charge for path in paths for charge in self._charges(path, counts)]
+        if any(bucket.available(now) < n for bucket, n in charges):
+            return False
+        for bucket, n in charges:
+            bucket.take(n, now, hold)
+        return True
+
+    def release(self, paths: Tuple[str, ...], counts: Dict[str, int]) -> None:
+        now = self.clock()
+        for path in paths:
+            for bucket, n in self._charges(path, counts):
+                bucket.release(n, now)
+
+    def refund(self, paths: Tuple[str, ...], counts: Dict[str, int]) -> None:
+        for path in paths:
+            for bucket, n in self._charges(path, counts):
+                bucket.refund(n)
+
+    def drain(self, path: str, instrument_ids: List[str]) -> None:
+        now = self.clock()
+        for instrument_id in instrument_ids:
+            bucket = self.bucket(path, instrument_id)
+            if bucket is not None:
+                bucket.drain(now)
+
+    async def acquire(self, paths: Tuple[str, ...], counts: Dict[str, int]) -> None:
+        while not self.try_acquire(paths, counts):
+            await asyncio.sleep(max(self.wait_time(path, counts) for path in paths) or 0.001)
+
+
+CANCEL = "cancel"
+AMEND = "amend"
+ORDER = "order"
+
+# Dispatch order.
+_PRIORITY = (CANCEL, AMEND, ORDER)
+_PATHS = {CANCEL: CANCEL_PATH, AMEND: AMEND_PATH}
+_COUNTS_AGAINST_ACCOUNT = {CANCEL: False, AMEND: True, ORDER: True}
+
+
+@dataclass
+class _Request:
+    kind: str
+    instrument_id: str
+    payload: Any
+    future: asyncio.Future
+    enqueued_ns: int
+    retries: int = 0
+
+
+@dataclass
+class SchedulerMetrics:
+    queue_wait: Dict[str, LatencyHistogram] = field(
+        default_factory=lambda: {kind: LatencyHistogram() for kind in _PRIORITY}
+    )
+    requests: int = 0
+    orders: int = 0
+    batches: int = 0
+    coalesced: int = 0
+    rate_limited: int = 0
+    queue_depth: int = 0
+    max_queue_depth: int = 0
+
+    def summary(self) -> str:
+        waits = " ".join(
+            f"{kind}_wait_p50={hist.quantile(QUANTILES[0]) / 1e6:.1f}ms "
+            f"{kind}_wait_p99={hist.quantile(QUANTILES[1]) / 1e6:.1f}ms"
+            for kind, hist in self.queue_wait.items()
+            if hist.count
+        )
+        return (
+            f"requests={self.requests} orders={self.orders} batches={self.batches} coalesced={self.coalesced} "
+            f"rate_limited={self.rate_limited} max_depth={self.max_queue_depth} {waits}"
+        ).rstrip()
+
+
+class RequestScheduler:
+    """Rate-limited front for ``OkxRestClient``'s order endpoints.
+
+    Requests queue per kind and a single dispatcher sends them as their
+    buckets allow: cancels first (they also skip the sub-account order
+    cap), then amends, then new orders, which leave a quarter of the
+    ``max_in_flight`` connection slots to the other two. New orders queued
+    together -- within ``coalesce_window`` seconds, or because a bucket was
+    empty -- go out as ``batch-orders`` calls of up to ``MAX_BATCH_ORDERS``; each
+    caller still gets its own entry, matched by clOrdId. OKX charges a
+    one-order batch against the single-order limit, so a lone order only
+    ever goes out on ``ORDER_PATH`` and waits for it. A ``50011`` answer
+    -- for the whole call, or as one order's ``sCode`` in a batch -- drains
+    the bucket and requeues just the refused requests up to ``max_retries``
+    times.
+    Exposes the client's ``place_order``/``place_batch_orders``/
+    ``amend_order``/``cancel_order``, so it can stand in for it in
+    ``ExecutionEngine``.
+    """
+
+    def __init__(
+        self,
+        client: OkxRestClient,
+        limiter: Optional[RateLimiter] = None,
+        coalesce_window: float = 0.0,
+        max_in_flight: Optional[int] = None,
+        max_retries: int = 3,
+    ) -> None:
+        self.client = client
+        self.limiter = limiter or RateLimiter()
+        self.coalesce_window = coalesce_window
+        self.max_in_flight = max_in_flight or client.pool_size
+        # New orders never take the last slots, so a cancel is not stuck behind a wave of batches.
+        self._order_slots = max(1, self.max_in_flight - max(1, self.max_in_flight // 4))
+        self.max_retries = max_retries
+        self.metrics = SchedulerMetrics()
+        self._queues: Dict[str, Deque[_Request]] = {kind: deque() for kind in _PRIORITY}
+        self._wakeup = asyncio.Event()
+        self._in_flight = 0
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def start(self) -> "RequestScheduler":
+        if self._dispatcher is None:
+            self._dispatcher = asyncio.create_task(self._run())
+        return self
+
+    async def close(self) -> None:
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            await asyncio.gather(self._dispatcher, *self._tasks, return_exceptions=True)
+            self._dispatcher = None
+        for queue in self._queues.values():
+            while queue:
+                request = queue.popleft()
+                if not request.future.done():
+                    request.future.set_exception(ConnectionError("Request scheduler closed"))
+
+    def _enqueue(self, kind: str, instrument_id: str, payload: Any) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self._queues[kind].append(_Request(kind, instrument_id, payload, future, time.perf_counter_ns()))
+        depth = sum(len(queue) for queue in self._queues.values())
+        self.metrics.queue_depth = depth
+        if depth > self.metrics.max_queue_depth:
+            self.metrics.max_queue_depth = depth
+        self._wakeup.set()
+        return future
+
+    async def place_order(self, order: OrderRequest) -> Dict:
+        return await self._enqueue(ORDER, order.instrument_id, order)
+
+    async def place_batch_orders(self, orders: List[OrderRequest]) -> Dict:
+        results = await asyncio.gather(*(self.place_order(order) for order in orders))
+        entries = [entry for result in results for entry in result.get("data") or []]
+        code = "0" if all(result.get("code") == "0" for result in results) else "2"
+        return {"code": code, "msg": "", "data": entries}
+
+    async def amend_order(
+        self,
+        instrument_id: str,
+        order_id: Optional[str],
+        new_price: Optional[Decimal] = None,
+        new_size: Optional[Decimal] = None,
+        client_order_id: Optional[str] = None,
+    ) -> Dict:
+        return await self._enqueue(AMEND, instrument_id, (order_id, new_price, new_size, client_order_id))
+
+    async def cancel_order(
+        self, instrument_id: str, order_id: Optional[str], client_order_id: Optional[str] = None
+    ) -> Dict:
+        return await self._enqueue(CANCEL, instrument_id, (order_id, client_order_id))
+
+    async def _run(self) -> None:
+        while True:
+            timeout = self._dispatch()
+            self._wakeup.clear()
+            if timeout is None:
+                await self._wakeup.wait()
+            else:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+
+    def _dispatch(self) -> Optional[float]:
+        """Send everything the buckets allow; returns how long to sleep before the next try."""
+        wait: Optional[float] = None
+
+        def later(seconds: float) -> None:
+            nonlocal wait
+            seconds = max(seconds, 0.001)
+            wait = seconds if wait is None else min(wait, seconds)
+
+        for kind in (CANCEL, AMEND):
+            queue = self._queues[kind]
+            path = _PATHS[kind]
+            paths = (path, ACCOUNT) if _COUNTS_AGAINST_ACCOUNT[kind] else (path,)
+            for request in list(queue):
+                if self._in_flight >= self.max_in_flight:
+                    return wait
+                counts = {request.instrument_id: 1}
+                if self.limiter.try_acquire(paths, counts, hold=True):
+                    queue.remove(request)
+                    self._send(kind, path, [request])
+                else:
+                    later(max(self.limiter.wait_time(p, counts) for p in paths))
+
+        queue = self._queues[ORDER]
+        if not queue or self._in_flight >= self._order_slots:
+            return wait
+        if self.coalesce_window and len(queue) < MAX_BATCH_ORDERS:
+            age = (time.perf_counter_ns() - queue[0].enqueued_ns) / 1e9
+            if age < self.coalesce_window:
+                later(self.coalesce_window - age)
+                return wait
+        batch: List[_Request] = []
+        if len(queue) > 1:
+            for request in list(queue):
+                counts = {request.instrument_id: 1}
+                if self.limiter.try_acquire((BATCH_ORDERS_PATH, ACCOUNT), counts, hold=True):
+                    batch.append(request)
+                    if len(batch) == MAX_BATCH_ORDERS:
+                        self._send_batch(queue, batch)
+                        batch = []
+                        if self._in_flight >= self._order_slots:
+                            return wait
+                else:
+                    later(self.limiter.wait_time(BATCH_ORDERS_PATH, counts))
+            if len(batch) > 1:
+                self._send_batch(queue, batch)
+                return wait
+            if batch:
+                # Alone it would count against the single-order limit anyway.
+                self.limiter.refund((BATCH_ORDERS_PATH, ACCOUNT), {batch[0].instrument_id: 1})
+        request = batch[0] if batch else queue[0] if len(queue) == 1 else None
+        if request is not None:
+            counts = {request.instrument_id: 1}
+            if self.limiter.try_acquire((ORDER_PATH, ACCOUNT), counts, hold=True):
+                queue.remove(request)
+                self._send(ORDER, ORDER_PATH, [request])
+            else:
+                later(max(self.limiter.wait_time(path, counts) for path in (ORDER_PATH, ACCOUNT)))
+        return wait
+
+    def _send_batch(self, queue: Deque[_Request], batch: List[_Request]) -> None:
+        for request in batch:
+            queue.remove(request)
+        self._send(ORDER, BATCH_ORDERS_PATH, batch)
+
+    def _send(self, kind: str, path: str, requests: List[_Request]) -> None:
+        now = time.perf_counter_ns()
+        record = self.metrics.queue_wait[kind].record
+        for request in requests:
+            record(now - request.enqueued_ns)
+        self.metrics.queue_depth = sum(len(queue) for queue in self._queues.values())
+        self._in_flight += 1
+        task = asyncio.create_task(self._call(kind, path, requests))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _call(self, kind: str, path: str, requests: List[_Request]) -> None:
+        client = self.client
+        metrics = self.metrics
+        metrics.requests += 1
+        try:
+            if kind == CANCEL:
+                response = await client.cancel_order(requests[0].instrument_id, *requests[0].payload)
+            elif kind == AMEND:
+                response = await client.amend_order(requests[0].instrument_id, *requests[0].payload)
+            elif path == BATCH_ORDERS_PATH:
+                metrics.orders += len(requests)
+                metrics.batches += 1
+                if len(requests) > 1:
+                    metrics.coalesced += len(requests)
+                response = await client.place_batch_orders([request.payload for request in requests])
+            else:
+                metrics.orders += 1
+                response = await client.place_order(requests[0].payload)
+        except Exception as exc:
+            # Whatever the client raised goes to every caller waiting on this call.
+            for request in requests:
+                if not request.future.done():
+                    request.future.set_exception(exc)
+            return
+        finally:
+            # Charged per request, as they were taken; their windows start now that OKX has surely seen them.
+            paths = (path, ACCOUNT) if _COUNTS_AGAINST_ACCOUNT[kind] else (path,)
+            for request in requests:
+                self.limiter.release(paths, {request.instrument_id: 1})
+            self._in_flight -= 1
+            self._wakeup.set()
+        batch = kind == ORDER and path == BATCH_ORDERS_PATH
+        entries = _pair_entries(requests, response.get("data") or []) if batch else [None] * len(requests)
+        if response.get("code") == RATE_LIMITED_CODE:
+            limited = list(range(len(requests)))
+        else:
+            # A partly throttled batch answers per order, with sCode 50011 on the ones OKX refused.
+            limited = [idx for idx, entry in enumerate(entries) if entry and entry.get("sCode") == RATE_LIMITED_CODE]
+        requeued: Set[int] = set()
+        if limited:
+            metrics.rate_limited += 1
+            self.limiter.drain(path, [requests[idx].instrument_id for idx in limited])
+            requeued = {idx for idx in limited if requests[idx].retries < self.max_retries}
+            for idx in sorted(requeued, reverse=True):
+                requests[idx].retries += 1
+                self._queues[kind].appendleft(requests[idx])
+            logger.warning("%s rate limited by OKX; %d request(s) requeued.", path, len(requeued))
+        for idx, (request, entry) in enumerate(zip(requests, entries)):
+            if idx in requeued or request.future.done():
+                continue
+            if entry is None:
+                request.future.set_result(response)
+            else:
+                code = "0" if entry.get("sCode") == "0" else "1"
+                request.future.set_result({"code": code, "msg": response.get("msg", ""), "data": [entry]})
+
+
+def _pair_entries(requests: List[_Request], data: List[Dict]) -> List[Optional[Dict]]:
+    """Each batched request's own entry of a batch response: by clOrdId, else by position if the counts match."""
+    by_client_id = {entry.get("clOrdId"): entry for entry in data if entry.get("clOrdId")}
+    positional = len(data) == len(requests)
+    paired: List[Optional[Dict]] = []
+    for idx, request in enumerate(requests):
+        entry = by_client_id.get(request.payload.client_order_id) if request.payload.client_order_id else None
+        if entry is None and positional:
+            entry = data[idx]
+        paired.append(entry)
+    return paired
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import glob
+import gzip
+import logging
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import IO, Iterable, Iterator, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+@dataclass
+class RecorderMetrics:
+    frames: int = 0
+    bytes_written: int = 0
+    files: int = 0
+
+
+class FrameRecorder:
+    """Tees raw WebSocket frames to gzip files as ``<recv_ns>\\t<frame>`` lines.
+
+    ``record`` only queues the frame; a writer thread compresses and writes
+    it, starting a new ``<prefix>-YYYYmmdd-HHMMSS.tsv.gz`` file every
+    ``rotate_seconds`` of receive time. Frames are kept byte-for-byte so a
+    replay sees exactly what the streamer parsed.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        prefix: str = "frames",
+        rotate_seconds: int = 3600,
+        compresslevel: int = 1,
+    ) -> None:
+        self.directory = directory
+        self.prefix = prefix
+        self.rotate_seconds = rotate_seconds
+        self.compresslevel = compresslevel
+        self.metrics = RecorderMetrics()
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._file: Optional[IO[bytes]] = None
+        self._file_end_ns = 0
+
+    def start(self) -> None:
+        if self._thread is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._thread = threading.Thread(target=self._run, name="frame-recorder", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+            self._thread = None
+
+    def record(self, raw: Union[str, bytes], recv_ns: Optional[int] = None) -> None:
+        self._queue.put((time.time_ns() if recv_ns is None else recv_ns, raw))
+
+    def _open(self, recv_ns: int) -> None:
+        if self._file is not None:
+            self._file.close()
+        period_ns = self.rotate_seconds * 1_000_000_000
+        self._file_end_ns = (recv_ns // period_ns + 1) * period_ns
+        stamp = datetime.fromtimestamp(recv_ns / 1e9, tz=timezone.utc)
+        path = os.path.join(self.directory, f"{self.prefix}-{stamp:%Y%m%d-%H%M%S}.tsv.gz")
+        self._file = gzip.open(path, "ab", compresslevel=self.compresslevel)
+        self.metrics.files += 1
+
+    def _run(self) -> None:
+        get = self._queue.get
+        get_nowait = self._queue.get_nowait
+        try:
+            while True:
+                items = [get()]
+                # Drain whatever else is queued so each write call carries a batch of frames.
+                while len(items) < 4096:
+                    try:
+                        items.append(get_nowait())
+                    except queue.Empty:
+                        break
+                lines = []
+                for item in items:
+                    if item is _STOP:
+                        self._write(lines)
+                        return
+                    recv_ns, raw = item
+                    if recv_ns >= self._file_end_ns:
+                        self._write(lines)
+                        lines = []
+                        self._open(recv_ns)
+                    if isinstance(raw, str):
+                        raw = raw.encode()
+                    lines.append(b"%d\t%s\n" % (recv_ns, raw))
+                self._write(lines)
+        finally:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _write(self, lines) -> None:
+        if not lines:
+            return
+        data = b"".join(lines)
+        self._file.write(data)
+        self.metrics.frames += len(lines)
+        self.metrics.bytes_written += len(data)
+
+
+def recording_files(paths: Union[str, Iterable[str]]) -> list:
+    """Expand directories and globs into recording files ordered by name (i.e. by start time)."""
+    if isinstance(paths, str):
+        paths = [paths]
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(glob.glob(os.path.join(path, "*.tsv.gz")))
+        else:
+            files.extend(glob.glob(path) or [path])
+    return sorted(files, key=os.path.basename)
+
+
+def read_frames(paths: Union[str, Iterable[str]]) -> Iterator[Tuple[int, bytes]]:
+    """Yield ``(recv_ns, raw_frame)`` from recordings in receive order."""
+    for path in recording_files(paths):
+        with gzip.open(path, "rb") as handle:
+            for line in handle:
+                recv_ns, _, raw = line.rstrip(b"\n").partition(b"\t")
+                yield int(recv_ns), raw
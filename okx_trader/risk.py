@@ -1,8 +1,22 @@
 from __future__ import annotations
 
+import logging
+import math
 from dataclasses import dataclass
 from decimal import Decimal
-from typing import Optional
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from .utils import instrument_type
+
+if TYPE_CHECKING:
+    from .execution import OrderRequest
+
+logger = logging.getLogger(__name__)
+
+_ZERO = Decimal("0")
+_NS_PER_DAY = 86_400 * 1_000_000_000
+_TERMINAL_STATES = frozenset({"filled", "canceled", "mmp_canceled"})
+_CONTRACT_TYPES = frozenset({"SWAP", "FUTURES"})
 
 
 @dataclass
@@ -15,21 +29,161 @@ class RiskState:
     last_latency_ms: Optional[int] = None
 
 
+@dataclass
+class PositionState:
+    """Per-instrument position with average entry cost, marked to the mid."""
+
+    position: Decimal = _ZERO
+    avg_cost: Decimal = _ZERO
+    realized: Decimal = _ZERO
+    fees: Decimal = _ZERO
+    mark: Optional[Decimal] = None
+    open_buy: Decimal = _ZERO
+    open_sell: Decimal = _ZERO
+    pnl: Decimal = _ZERO
+
+    @property
+    def unrealized(self) -> Decimal:
+        if self.mark is None or not self.position:
+            return _ZERO
+        return (self.mark - self.avg_cost) * self.position
+
+    def revalue(self) -> Decimal:
+        """Recompute ``pnl`` and return the change."""
+        pnl = self.realized - self.fees + self.unrealized
+        delta = pnl - self.pnl
+        self.pnl = pnl
+        return delta
+
+
+class RollingLatency:
+    """Last ``window`` latency samples, judged against ``limit_ms`` at ``quantile``.
+
+    "The q-quantile exceeds the limit" is the same as "more than (1 - q) of
+    the samples exceed it", so only the breach count is maintained and the
+    check is O(1); ``percentile`` sorts the window and is for reporting.
+    """
+
+    __slots__ = ("window", "quantile", "limit_ms", "_samples", "_next", "_breaches")
+
+    def __init__(self, limit_ms: int, window: int = 1000, quantile: float = 0.99) -> None:
+        self.window = max(1, window)
+        self.quantile = quantile
+        self.limit_ms = limit_ms
+        self._samples: List[int] = []
+        self._next = 0
+        self._breaches = 0
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, latency_ms: int) -> None:
+        samples = self._samples
+        if len(samples) < self.window:
+            samples.append(latency_ms)
+        else:
+            if samples[self._next] > self.limit_ms:
+                self._breaches -= 1
+            samples[self._next] = latency_ms
+            self._next = (self._next + 1) % self.window
+        if latency_ms > self.limit_ms:
+            self._breaches += 1
+
+    def breached(self) -> bool:
+        return self._breaches > (1 - self.quantile) * len(self._samples)
+
+    def percentile(self) -> Optional[int]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[max(0, math.ceil(self.quantile * len(ordered)) - 1)]
+
+
 class RiskManager:
+    """Streaming risk state: positions and PnL from fills, marks from book ticks.
+
+    Fills arrive as OKX ``orders``-channel entries (``on_order_update``);
+    accepted orders are tracked as open exposure (``track_order``) until they
+    fill or close. Every update is O(1): the total PnL is adjusted by each
+    instrument's change rather than re-summed.
+
+    ``is_trading_allowed`` is the global halt -- the day's loss past
+    ``max_daily_loss`` of ``capital`` (when ``capital`` is 0, of the account
+    equity from ``on_account``; off until one arrives) or the
+    rolling latency quantile over ``max_latency_ms`` -- and ``check_order``
+    is the per-order pre-trade check on projected position and notional.
+    ``update_pnl``/``update_position`` remain as manual overrides of the
+    fractional loss and aggregate position.
+
+    Positions and open exposure are in the base currency and PnL, fees and
+    notionals in the quote currency. SWAP/FUTURES sizes arrive in contracts
+    and are converted with the ``ctVal``/``ctValCcy`` registered by
+    ``add_instrument`` (an inverse contract is ``ctVal`` of the quote
+    currency, so its base size depends on the price); fees charged in the
+    base currency (``fillFeeCcy``, e.g. on a spot buy) are converted at the
+    fill price.
+    """
+
     def __init__(
         self,
         max_daily_loss: float,
         max_position_size: float,
         max_latency_ms: int,
+        capital: float = 0,
+        max_order_notional: float = 0,
+        max_position_notional: float = 0,
+        latency_window: int = 1000,
+        latency_quantile: float = 0.99,
     ) -> None:
+        self.auto_capital = not capital
+        self.equity: Optional[Decimal] = None
+        self.position_corrections = 0
         self.state = RiskState(
             max_daily_loss=Decimal(str(max_daily_loss)),
             max_position_size=Decimal(str(max_position_size)),
             max_latency_ms=max_latency_ms,
         )
+        capital = Decimal(str(capital))
+        self.loss_limit: Optional[Decimal] = self.state.max_daily_loss * capital if capital else None
+        self.max_order_notional = Decimal(str(max_order_notional))
+        self.max_position_notional = Decimal(str(max_position_notional))
+        self.latency = RollingLatency(max_latency_ms, latency_window, latency_quantile)
+        self.positions: Dict[str, PositionState] = {}
+        self.total_pnl = _ZERO
+        self.daily_loss = _ZERO
+        self.rejections: Dict[str, int] = {}
+        self._day_start_pnl = _ZERO
+        self._day: Optional[int] = None
+        self._open: Dict[str, Tuple[str, str, Decimal]] = {}
+        self.contracts: Dict[str, Tuple[Decimal, bool]] = {}
+
+    def _position(self, instrument_id: str) -> PositionState:
+        position = self.positions.get(instrument_id)
+        if position is None:
+            position = self.positions[instrument_id] = PositionState()
+        return position
+
+    def add_instrument(self, instrument: Dict) -> None:
+        """Register an OKX ``instruments`` entry; only SWAP/FUTURES contract sizes need converting."""
+        instrument_id = instrument.get("instId", "")
+        if instrument_type(instrument_id) not in _CONTRACT_TYPES or not instrument.get("ctVal"):
+            return
+        base = instrument_id.split("-")[0]
+        self.contracts[instrument_id] = (Decimal(instrument["ctVal"]), instrument.get("ctValCcy", base) != base)
+
+    def _base_size(self, instrument_id: str, size: Decimal, price: Optional[Decimal]) -> Decimal:
+        contract = self.contracts.get(instrument_id)
+        if contract is None:
+            return size
+        ct_val, inverse = contract
+        if not inverse:
+            return size * ct_val
+        price = price or self._position(instrument_id).mark
+        return size * ct_val / price if price else _ZERO
 
     def update_latency(self, latency_ms: int) -> None:
         self.state.last_latency_ms = latency_ms
+        self.latency.record(latency_ms)
 
     def update_pnl(self, daily_loss: Decimal) -> None:
         self.state.daily_loss = daily_loss
@@ -37,11 +191,186 @@ class RiskManager:
     def update_position(self, position: Decimal) -> None:
         self.state.current_position = position
 
+    def _refresh_daily_loss(self) -> None:
+        self.daily_loss = max(_ZERO, self._day_start_pnl - self.total_pnl)
+
+    def reset_daily(self) -> None:
+        self._day_start_pnl = self.total_pnl
+        if self.auto_capital and self.equity:
+            self.loss_limit = self.state.max_daily_loss * self.equity
+        self._refresh_daily_loss()
+
+    def mark(self, instrument_id: str, bid: Decimal, ask: Decimal, ts_ns: Optional[int] = None) -> None:
+        """Mark ``instrument_id`` to the mid; ``ts_ns`` rolls the daily-loss baseline at UTC midnight."""
+        if ts_ns is not None:
+            day = ts_ns // _NS_PER_DAY
+            if day != self._day:
+                if self._day is not None:
+                    self.reset_daily()
+                self._day = day
+        position = self._position(instrument_id)
+        position.mark = (bid + ask) / 2
+        if position.position:
+            self.total_pnl += position.revalue()
+            self._refresh_daily_loss()
+
+    def on_fill(self, instrument_id: str, side: str, price: Decimal, size: Decimal, fee: Decimal = _ZERO) -> None:
+        """Apply one fill; ``fee`` is the cost paid (positive)."""
+        position = self._position(instrument_id)
+        signed = size if side == "buy" else -size
+        current = position.position
+        if not current or (current > 0) == (signed > 0):
+            total = abs(current) + size
+            position.avg_cost = (position.avg_cost * abs(current) + price * size) / total
+        else:
+            closed = min(abs(current), size)
+            direction = 1 if current > 0 else -1
+            position.realized += (price - position.avg_cost) * closed * direction
+            if size > abs(current):
+                position.avg_cost = price
+        position.position = current + signed
+        if not position.position:
+            position.avg_cost = _ZERO
+        position.fees += fee
+        if position.mark is None:
+            position.mark = price
+        self.total_pnl += position.revalue()
+        self._refresh_daily_loss()
+
+    def track_order(self, order: "OrderRequest", filled: Decimal = _ZERO) -> None:
+        """Count an accepted (or amended) working order as open exposure."""
+        if order.client_order_id is None:
+            return
+        self.on_order_closed(order.client_order_id)
+        remaining = self._base_size(order.instrument_id, order.size - filled, order.price)
+        if remaining <= 0:
+            return
+        position = self._position(order.instrument_id)
+        if order.side == "buy":
+            position.open_buy += remaining
+        else:
+            position.open_sell += remaining
+        self._open[order.client_order_id] = (order.instrument_id, order.side, remaining)
+
+    def open_client_order_ids(self) -> List[str]:
+        """clOrdIds currently counted as open exposure."""
+        return list(self._open)
+
+    def on_order_closed(self, client_order_id: str) -> None:
+        entry = self._open.pop(client_order_id, None)
+        if entry is None:
+            return
+        instrument_id, side, remaining = entry
+        position = self._position(instrument_id)
+        if side == "buy":
+            position.open_buy -= remaining
+        else:
+            position.open_sell -= remaining
+
+    def on_order_update(self, update: Dict) -> None:
+        """Apply one OKX ``orders``-channel entry: the fill it carries and the open-exposure change."""
+        instrument_id = update.get("instId", "")
+        fill_size = Decimal(update.get("fillSz") or "0")
+        if fill_size:
+            price = Decimal(update["fillPx"])
+            fill_size = self._base_size(instrument_id, fill_size, price)
+            # OKX reports fees as negative amounts (rebates positive).
+            fee = -Decimal(update.get("fillFee") or update.get("fee") or "0")
+            if (update.get("fillFeeCcy") or update.get("feeCcy")) == instrument_id.split("-")[0]:
+                fee *= price
+            self.on_fill(instrument_id, update.get("side", ""), price, fill_size, fee)
+        client_order_id = update.get("clOrdId") or ""
+        entry = self._open.get(client_order_id)
+        if entry is None:
+            return
+        if update.get("state") in _TERMINAL_STATES:
+            self.on_order_closed(client_order_id)
+        elif fill_size:
+            inst, side, remaining = entry
+            self._open[client_order_id] = (inst, side, remaining - fill_size)
+            position = self._position(inst)
+            if side == "buy":
+                position.open_buy -= fill_size
+            else:
+                position.open_sell -= fill_size
+
+    def on_position(self, update: Dict) -> None:
+        """Correct the local position from an OKX ``positions``-channel entry (net mode).
+
+        Only applied while the instrument has no open orders: otherwise the
+        push may race the fill that the ``orders`` channel is about to deliver.
+        """
+        if update.get("posSide", "net") != "net":
+            return
+        instrument_id = update.get("instId", "")
+        position = self._position(instrument_id)
+        if position.open_buy or position.open_sell:
+            return
+        avg_price = Decimal(update.get("avgPx") or "0")
+        size = self._base_size(instrument_id, Decimal(update.get("pos") or "0"), avg_price)
+        if size == position.position:
+            return
+        logger.warning(
+            "Position on %s corrected from %s to %s by the exchange.", update.get("instId"), position.position, size
+        )
+        self.position_corrections += 1
+        position.position = size
+        position.avg_cost = avg_price if size else _ZERO
+        self.total_pnl += position.revalue()
+        self._refresh_daily_loss()
+
+    def on_account(self, update: Dict) -> None:
+        """Track account equity; without ``capital`` the loss limit is set from the day's opening equity."""
+        if not update.get("totalEq"):
+            return
+        self.equity = Decimal(update["totalEq"])
+        if self.auto_capital and self.loss_limit is None:
+            self.loss_limit = self.state.max_daily_loss * self.equity
+
     def is_trading_allowed(self) -> bool:
         if self.state.daily_loss >= self.state.max_daily_loss:
             return False
+        if self.loss_limit is not None and self.daily_loss >= self.loss_limit:
+            return False
         if abs(self.state.current_position) >= self.state.max_position_size:
             return False
-        if self.state.last_latency_ms is not None and self.state.last_latency_ms > self.state.max_latency_ms:
+        if self.latency.breached():
             return False
         return True
+
+    def check_order(self, order: "OrderRequest") -> Optional[str]:
+        """Pre-trade check for one order; returns the rejection reason or ``None``."""
+        position = self._position(order.instrument_id)
+        size = self._base_size(order.instrument_id, order.size, order.price)
+        if order.side == "buy":
+            projected = position.position + position.open_buy + size
+        else:
+            projected = position.position - position.open_sell - size
+        reason = None
+        if abs(projected) > self.state.max_position_size:
+            reason = "position"
+        else:
+            price = order.price if order.price is not None else position.mark
+            if price is not None:
+                if self.max_order_notional and price * size > self.max_order_notional:
+                    reason = "order_notional"
+                elif self.max_position_notional and abs(projected) * price > self.max_position_notional:
+                    reason = "position_notional"
+        if reason is not None:
+            self.rejections[reason] = self.rejections.get(reason, 0) + 1
+        return reason
+
+    def snapshot(self) -> Dict[str, Dict[str, str]]:
+        return {
+            instrument_id: {
+                "position": str(state.position),
+                "avg_cost": str(state.avg_cost),
+                "realized": str(state.realized),
+                "unrealized": str(state.unrealized),
+                "fees": str(state.fees),
+                "pnl": str(state.pnl),
+                "open_buy": str(state.open_buy),
+                "open_sell": str(state.open_sell),
+            }
+            for instrument_id, state in self.positions.items()
+        }
@@ -0,0 +1,300 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from multiprocessing.connection import Connection
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .pipeline import TickPipeline
+from .risk import RiskManager
+from .strategies import OrderSignal
+
+logger = logging.getLogger(__name__)
+
+# Pipe message kinds. Worker -> coordinator: SIGNALS, HEARTBEAT, DONE.
+# Coordinator -> worker: RISK, STOP.
+SIGNALS = "signals"
+HEARTBEAT = "heartbeat"
+DONE = "done"
+RISK = "risk"
+STOP = "stop"
+
+Top = Optional[Tuple[Any, Any]]
+Route = Callable[[str, List[OrderSignal], Optional[int], Top], Awaitable[None]]
+WorkerTarget = Callable[..., Awaitable[None]]
+
+
+def shard_instruments(instrument_ids: Sequence[str], shards: int) -> List[List[str]]:
+    """Round-robin split, like ``MultiplexOrderBookStreamer`` shards its sockets."""
+    shards = max(1, min(shards, len(instrument_ids)))
+    return [list(instrument_ids[idx::shards]) for idx in range(shards)]
+
+
+@dataclass
+class ShardStats:
+    instruments: Tuple[str, ...] = ()
+    ticks: int = 0
+    signals: int = 0
+    last_latency_ms: Optional[int] = None
+    dropped: int = 0
+    alive: bool = True
+
+
+class WorkerLink:
+    """Worker end of the coordinator pipe.
+
+    Signal batches go out as they are produced, with the tick's top of
+    book; while the coordinator's risk guard is closed they are dropped in
+    the worker. Every ``heartbeat_interval`` without signals a heartbeat
+    carries the tick latency (so a latency block can still clear) and the
+    latest top of book of each instrument, so the coordinator's marks stay
+    at most one interval old.
+
+    ``route`` only queues the message: a writer thread does the pickling
+    and the ``send``, so a full pipe never stalls the worker's event loop.
+    """
+
+    def __init__(self, conn: Connection, shard_id: int, heartbeat_interval: float = 0.5) -> None:
+        self.conn = conn
+        self.shard_id = shard_id
+        self.heartbeat_interval = heartbeat_interval
+        self.trading_allowed = True
+        self.ticks = 0
+        self.signals = 0
+        self._last_latency: Optional[int] = None
+        self._tops: Dict[str, Top] = {}
+        self._next_heartbeat = 0.0
+        self._outbox: "queue.SimpleQueue[Optional[Tuple]]" = queue.SimpleQueue()
+        self._writer = threading.Thread(target=self._write, name=f"okx-shard-{shard_id}-writer", daemon=True)
+        self._writer.start()
+
+    async def route(
+        self, instrument_id: str, signals: List[OrderSignal], latency_ms: Optional[int], top: Top = None
+    ) -> None:
+        """Drop-in for the single-process order router (``main.build_order_router``)."""
+        self.ticks += 1
+        self._last_latency = latency_ms
+        if signals and self.trading_allowed:
+            self.signals += len(signals)
+            self._tops.pop(instrument_id, None)
+            self._outbox.put((SIGNALS, instrument_id, latency_ms, signals, top))
+            return
+        if top is not None:
+            self._tops[instrument_id] = top
+        now = time.monotonic()
+        if now >= self._next_heartbeat:
+            self._next_heartbeat = now + self.heartbeat_interval
+            self._outbox.put((HEARTBEAT, self.shard_id, self.ticks, self.signals, latency_ms, self._tops))
+            self._tops = {}
+
+    def _write(self) -> None:
+        outbox = self._outbox
+        while True:
+            message = outbox.get()
+            if message is None:
+                return
+            try:
+                self.conn.send(message)
+            except (BrokenPipeError, OSError):
+                # The coordinator is gone; ``_listen`` sees the EOF and stops the worker.
+                return
+
+    def _listen(self, loop: asyncio.AbstractEventLoop, task: asyncio.Task) -> None:
+        try:
+            while True:
+                message = self.conn.recv()
+                if message[0] == RISK:
+                    self.trading_allowed = message[1]
+                elif message[0] == STOP:
+                    loop.call_soon_threadsafe(task.cancel)
+                    return
+        except (EOFError, OSError):
+            loop.call_soon_threadsafe(task.cancel)
+
+    async def run(self, body: Awaitable[None]) -> None:
+        task = asyncio.ensure_future(body)
+        threading.Thread(target=self._listen, args=(asyncio.get_running_loop(), task), daemon=True).start()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._outbox.put((DONE, self.shard_id, self.ticks, self.signals, self._last_latency, {}))
+            self._outbox.put(None)
+            await asyncio.get_running_loop().run_in_executor(None, self._writer.join)
+
+
+def _worker_main(
+    target: WorkerTarget, shard_id: int, instrument_ids: List[str], conn: Connection, args: Tuple
+) -> None:
+    link = WorkerLink(conn, shard_id)
+    try:
+        asyncio.run(link.run(target(link, instrument_ids, *args)))
+    finally:
+        conn.close()
+
+
+class ShardCoordinator:
+    """Runs ``target(link, instrument_ids, *args)`` in one process per shard.
+
+    Each worker owns its books, features and strategies and sends its
+    signals over a pipe; the coordinator keeps the single ``RiskManager``,
+    hands every signal batch to ``route`` (the execution side), and
+    broadcasts the risk guard state to the workers whenever it flips.
+    Routing runs in one task per instrument, like the multiplexed book
+    feed's dispatchers: batches for one instrument keep their arrival
+    order, while a slow order round trip on one instrument does not hold
+    up the inbox, the risk updates or the other instruments. Each lane
+    holds at most ``lane_size`` batches and drops the oldest when a slow
+    instrument falls that far behind (counted in ``ShardStats.dropped``),
+    so its backlog cannot grow without bound. ``target``
+    and ``args`` must be picklable (module-level function, plain data)
+    since workers are started with ``spawn``.
+    """
+
+    def __init__(
+        self,
+        target: WorkerTarget,
+        shards: List[List[str]],
+        risk_manager: RiskManager,
+        args: Tuple = (),
+        start_method: str = "spawn",
+        lane_size: int = 64,
+    ) -> None:
+        self.target = target
+        self.shards = shards
+        self.risk_manager = risk_manager
+        self.args = args
+        self.lane_size = lane_size
+        self.stats: Dict[int, ShardStats] = {idx: ShardStats(tuple(shard)) for idx, shard in enumerate(shards)}
+        self._context = multiprocessing.get_context(start_method)
+        self._processes: List[Any] = []
+        self._conns: List[Connection] = []
+        self._inbox: Optional[asyncio.Queue] = None
+        self._lanes: Dict[str, TickPipeline] = {}
+        self._running = 0
+        self._allowed = True
+
+    def start(self) -> "ShardCoordinator":
+        loop = asyncio.get_running_loop()
+        self._inbox = asyncio.Queue()
+        for shard_id, instrument_ids in enumerate(self.shards):
+            parent, child = self._context.Pipe()
+            process = self._context.Process(
+                target=_worker_main,
+                args=(self.target, shard_id, instrument_ids, child, self.args),
+                name=f"okx-shard-{shard_id}",
+                daemon=True,
+            )
+            process.start()
+            child.close()
+            self._processes.append(process)
+            self._conns.append(parent)
+            threading.Thread(target=self._pump, args=(shard_id, parent, loop), daemon=True).start()
+        return self
+
+    def _pump(self, shard_id: int, conn: Connection, loop: asyncio.AbstractEventLoop) -> None:
+        inbox = self._inbox
+        try:
+            while True:
+                message = conn.recv()
+                loop.call_soon_threadsafe(inbox.put_nowait, message)
+                if message[0] == DONE:
+                    return
+        except (EOFError, OSError):
+            loop.call_soon_threadsafe(inbox.put_nowait, (DONE, shard_id, None, None, None, {}))
+
+    def _broadcast(self, message: Tuple) -> None:
+        for conn in self._conns:
+            try:
+                conn.send(message)
+            except (BrokenPipeError, OSError):
+                pass
+
+    async def _lane(self, instrument_id: str, lane: TickPipeline, route: Route) -> None:
+        while True:
+            signals, latency_ms, top = await lane.get()
+            try:
+                await route(instrument_id, signals, latency_ms, top)
+            except Exception:
+                if signals:
+                    logger.exception("Routing signals failed for %s.", instrument_id)
+                else:
+                    logger.exception("Marking %s failed.", instrument_id)
+            finally:
+                lane.task_done()
+            self._check_guard()
+
+    def _check_guard(self) -> None:
+        allowed = self.risk_manager.is_trading_allowed()
+        if allowed != self._allowed:
+            self._allowed = allowed
+            logger.info("Risk guard %s; notifying %d shard(s).", "open" if allowed else "closed", self._running)
+            self._broadcast((RISK, allowed))
+
+    async def run(self, route: Route) -> None:
+        """Serve worker messages until every worker has finished and every routed batch is done."""
+        stats = self.stats
+        risk_manager = self.risk_manager
+        self._running = len(self._processes)
+        self._lanes = lanes = {
+            instrument_id: TickPipeline(coalesce=False, queue_size=self.lane_size)
+            for instrument_ids in self.shards
+            for instrument_id in instrument_ids
+        }
+        shard_of = {instrument_id: stats[idx] for idx, shard in enumerate(self.shards) for instrument_id in shard}
+
+        def push(instrument_id: str, batch: Tuple) -> None:
+            lane = lanes[instrument_id]
+            if len(lane) >= lane.capacity:
+                shard_of[instrument_id].dropped += 1
+            lane.push(batch)
+
+        workers = [
+            asyncio.create_task(self._lane(instrument_id, lane, route)) for instrument_id, lane in lanes.items()
+        ]
+        get = self._inbox.get
+        try:
+            while self._running:
+                message = await get()
+                kind = message[0]
+                if kind == SIGNALS:
+                    _, instrument_id, latency_ms, signals, top = message
+                    push(instrument_id, (signals, latency_ms, top))
+                else:
+                    _, shard_id, ticks, signals, latency_ms, tops = message
+                    shard = stats[shard_id]
+                    if ticks is not None:
+                        shard.ticks, shard.signals, shard.last_latency_ms = ticks, signals, latency_ms
+                    if latency_ms is not None:
+                        risk_manager.update_latency(latency_ms)
+                    for instrument_id, top in tops.items():
+                        # An empty batch marks the position (and lets the order manager expire stale quotes).
+                        push(instrument_id, ([], None, top))
+                    if kind == DONE:
+                        shard.alive = False
+                        self._running -= 1
+                self._check_guard()
+            await asyncio.gather(*(lane.join() for lane in lanes.values()))
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def close(self, timeout: float = 5.0) -> None:
+        self._broadcast((STOP,))
+        loop = asyncio.get_running_loop()
+        for process in self._processes:
+            await loop.run_in_executor(None, process.join, timeout)
+            if process.is_alive():
+                logger.warning("Shard %s did not stop in %.0fs; terminating.", process.name, timeout)
+                process.terminate()
+        for conn in self._conns:
+            conn.close()
+        self._processes.clear()
+        self._conns.clear()
@@ -1,27 +1,69 @@
 from __future__ import annotations
 
+import time
 from dataclasses import dataclass, field
-from datetime import datetime
-from typing import Any, Deque, List
-from collections import deque
+from typing import Any, Dict, Optional, Tuple
+
+from .cold_storage import ColdStorageWriter
+from .hot_storage import FEATURE_FIELDS, ORDER_FIELDS, HotRingBuffer, HotWindow, feature_values
+from .warm_storage import WarmStorageWriter
+
+FEATURES = "features"
+ORDERS = "orders"
+
+HOT_FIELDS = {FEATURES: FEATURE_FIELDS, ORDERS: ORDER_FIELDS}
 
 
 @dataclass
 class StorageManager:
-    hot_capacity: int = 1000
-    hot_storage: Deque[Any] = field(init=False)
+    hot_capacities: Dict[str, int] = field(default_factory=lambda: {FEATURES: 100_000, ORDERS: 10_000})
+    warm: Optional[WarmStorageWriter] = None
+    cold: Optional[ColdStorageWriter] = None
+    hot: Dict[Tuple[str, str], HotRingBuffer] = field(init=False, default_factory=dict)
+
+    def hot_ring(self, kind: str, instrument: str) -> HotRingBuffer:
+        ring = self.hot.get((kind, instrument))
+        if ring is None:
+            ring = self.hot[(kind, instrument)] = HotRingBuffer(HOT_FIELDS[kind], self.hot_capacities[kind])
+        return ring
+
+    def write_hot(self, kind: str, instrument: str, values: Tuple, ts_ns: Optional[int] = None) -> None:
+        self.hot_ring(kind, instrument).append(time.time_ns() if ts_ns is None else ts_ns, *values)
+
+    def write_hot_features(
+        self,
+        instrument: str,
+        snapshot: Any,
+        latency_ms: Optional[float] = None,
+        ts_ns: Optional[int] = None,
+    ) -> None:
+        self.write_hot(FEATURES, instrument, feature_values(snapshot, latency_ms), ts_ns)
 
-    def __post_init__(self) -> None:
-        self.hot_storage = deque(maxlen=self.hot_capacity)
+    def write_hot_order(
+        self,
+        instrument: str,
+        side: str,
+        price: Optional[float],
+        size: float,
+        accepted: bool,
+        ts_ns: Optional[int] = None,
+    ) -> None:
+        values = (1 if side == "buy" else -1, float("nan") if price is None else float(price), float(size), accepted)
+        self.write_hot(ORDERS, instrument, values, ts_ns)
 
-    def write_hot(self, record: Any) -> None:
-        self.hot_storage.append({"ts": datetime.utcnow().isoformat(), "data": record})
+    def read_hot(self, kind: str, instrument: str, n: Optional[int] = None) -> HotWindow:
+        ring = self.hot_ring(kind, instrument)
+        return ring.last(len(ring) if n is None else n)
 
-    def read_hot(self) -> List[Any]:
-        return list(self.hot_storage)
+    def read_hot_since(self, kind: str, instrument: str, ts_ns: int) -> HotWindow:
+        return self.hot_ring(kind, instrument).since(ts_ns)
 
-    def write_warm(self, record: Any) -> None:
-        raise NotImplementedError("Warm storage (Redis) not configured.")
+    def write_warm(self, kind: str, instrument: str, payload: Any, ts_ns: Optional[int] = None) -> None:
+        if self.warm is None:
+            raise NotImplementedError("Warm storage (Redis) not configured.")
+        self.warm.write(kind, instrument, payload, ts_ns)
 
-    def write_cold(self, record: Any) -> None:
-        raise NotImplementedError("Cold storage (Parquet) not configured.")
+    def write_cold(self, kind: str, instrument: str, payload: Any, ts_ns: Optional[int] = None) -> None:
+        if self.cold is None:
+            raise NotImplementedError("Cold storage (Parquet) not configured.")
+        self.cold.write(kind, instrument, payload, ts_ns)
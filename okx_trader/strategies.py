@@ -1,10 +1,16 @@
 from __future__ import annotations
 
+import heapq
+import importlib
+import math
+import time
+from bisect import bisect_left
 from dataclasses import dataclass
 from decimal import Decimal
-from typing import List
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
 
 from .features import FeatureSnapshot
+from .fixed_point import FixedPointCodec
 from .orderbook import OrderBook
 
 
@@ -14,67 +20,366 @@ class OrderSignal:
     size: Decimal
     price: Decimal
     reason: str
+    # A standing quote, restated every tick it stays wanted; ``OrderManager`` only keeps working orders for these.
+    quote: bool = False
+
+
+@dataclass(frozen=True)
+class StrategyParams:
+    """Signal thresholds (in base units, as ``FeatureEngine`` reports them on a Decimal book) and order sizes."""
+
+    ofi_threshold: Decimal = Decimal("50")
+    wmp_threshold: Decimal = Decimal("0")
+    liquidation_size: Decimal = Decimal("1")
+    market_making_size: Decimal = Decimal("0.5")
+    funding_size: Decimal = Decimal("0.3")
+
+    @classmethod
+    def from_dict(cls, values: Dict[str, object]) -> "StrategyParams":
+        return cls(**{name: Decimal(str(value)) for name, value in values.items()})
+
+    def to_dict(self) -> Dict[str, str]:
+        return {name: str(getattr(self, name)) for name in self.__dataclass_fields__}
+
+
+class StrategyUnits:
+    """``StrategyParams`` in the units of the book a strategy runs on.
+
+    Without a codec everything stays Decimal. With one, sizes become lots
+    (rounded down to the lot size; one that rounds to nothing is a config
+    error) and features are integers (wmp in lots * depth), so thresholds
+    are floored to keep ``>`` exact.
+    """
+
+    def __init__(
+        self,
+        params: StrategyParams,
+        codec: Optional[FixedPointCodec] = None,
+        feature_depth: int = 25,
+        quote_refresh_ms: int = 1000,
+    ) -> None:
+        self.params = params
+        self.codec = codec
+        self.feature_depth = feature_depth
+        self.quote_refresh_ns = quote_refresh_ms * 1_000_000
+        self.zero = Decimal("0") if codec is None else 0
+        self.ofi_threshold = self.size_threshold(params.ofi_threshold)
+        if codec is None:
+            self.wmp_threshold = params.wmp_threshold
+        else:
+            self.wmp_threshold = self.size_threshold(params.wmp_threshold * feature_depth)
+        self.liquidation_size = self.size(params.liquidation_size, "liquidation_size")
+        self.market_making_size = self.size(params.market_making_size, "market_making_size")
+        self.funding_size = self.size(params.funding_size, "funding_size")
+
+    def size(self, value: Decimal, name: str = "size"):
+        if self.codec is None:
+            return value
+        lots = math.floor(value / self.codec.lot_size)
+        if value > 0 and lots < 1:
+            raise ValueError(
+                f"Strategy parameter {name}={value} is below one lot (lotSz {self.codec.lot_size}); "
+                f"set {name.upper()} to at least {self.codec.lot_size}"
+            )
+        return lots
+
+    def size_threshold(self, value: Decimal):
+        return value if self.codec is None else math.floor(value / self.codec.lot_size)
+
+    def mid_price(self, best_bid_price, best_ask_price, side: str):
+        if self.codec is None:
+            return (best_bid_price + best_ask_price) / 2
+        # Tick prices cannot hold a half tick: round toward the passive side.
+        total = best_bid_price + best_ask_price
+        return total // 2 if side == "buy" else -(-total // 2)
+
+
+class TickContext:
+    """Per-tick inputs shared by every strategy woken on that tick; reused, never reallocated."""
+
+    __slots__ = ("instrument_id", "bid_price", "bid_size", "ask_price", "ask_size", "features", "now_ns")
+
+    def __init__(self, instrument_id: str = "") -> None:
+        self.instrument_id = instrument_id
+        self.bid_price = self.bid_size = self.ask_price = self.ask_size = None
+        self.features: Optional[FeatureSnapshot] = None
+        self.now_ns = 0
+
+    @property
+    def has_book(self) -> bool:
+        return self.bid_price is not None and self.ask_price is not None
+
+
+@dataclass(frozen=True)
+class FeatureThreshold:
+    """Wake when ``feature`` (its absolute value with ``absolute``) is above ``threshold`` (in engine units)."""
+
+    feature: str
+    threshold: object
+    absolute: bool = False
+
+
+@dataclass(frozen=True)
+class Timer:
+    """Wake every ``interval_ns`` of tick time."""
+
+    interval_ns: int
+
+
+BEST_PRICE = "best_price"
+EVERY_TICK = "every_tick"
+
+
+class Strategy:
+    """Plugin base: declare ``triggers`` and append ``OrderSignal``s in ``on_tick``.
+
+    ``on_tick`` only runs on ticks where at least one trigger fired, so it
+    must not rely on seeing every tick. Triggers are ``BEST_PRICE`` (best bid
+    or ask price changed), ``FeatureThreshold``, ``Timer`` and
+    ``EVERY_TICK``.
+    """
+
+    name = ""
+    triggers: Tuple = ()
+
+    def on_tick(self, context: TickContext, signals: List[OrderSignal]) -> None:
+        raise NotImplementedError
+
+
+StrategyFactory = Callable[[StrategyUnits], Strategy]
+STRATEGIES: Dict[str, StrategyFactory] = {}
+
+
+def register_strategy(name: str) -> Callable[[StrategyFactory], StrategyFactory]:
+    """Class or factory decorator: make a strategy available to ``StrategyEngine`` under ``name``."""
+
+    def decorator(factory: StrategyFactory) -> StrategyFactory:
+        STRATEGIES[name] = factory
+        return factory
+
+    return decorator
+
+
+def create_strategy(name: str, units: StrategyUnits) -> Strategy:
+    """Build a registered strategy; ``package.module:name`` imports the module that registers it first."""
+    if ":" in name:
+        module, name = name.split(":", 1)
+        importlib.import_module(module)
+    try:
+        factory = STRATEGIES[name]
+    except KeyError:
+        raise ValueError(f"Unknown strategy {name!r}; registered: {', '.join(sorted(STRATEGIES))}") from None
+    strategy = factory(units)
+    strategy.name = strategy.name or name
+    return strategy
+
+
+@register_strategy("liquidation_hunting")
+class LiquidationHunting(Strategy):
+    def __init__(self, units: StrategyUnits) -> None:
+        self.units = units
+        self.triggers = (FeatureThreshold("ofi", units.ofi_threshold, absolute=True),)
+
+    def on_tick(self, context: TickContext, signals: List[OrderSignal]) -> None:
+        side = "buy" if context.features.ofi > 0 else "sell"
+        price = self.units.mid_price(context.bid_price, context.ask_price, side)
+        size = self.units.liquidation_size
+        signals.append(OrderSignal(side=side, size=size, price=price, reason="liquidation_hunting"))
+
+
+@register_strategy("market_making")
+class MarketMaking(Strategy):
+    """Quote both sides at the touch; requotes on a best-price change, refreshes on a timer."""
+
+    def __init__(self, units: StrategyUnits) -> None:
+        self.units = units
+        self.triggers = (BEST_PRICE, Timer(units.quote_refresh_ns))
+
+    def on_tick(self, context: TickContext, signals: List[OrderSignal]) -> None:
+        bid_price = context.bid_price
+        ask_price = context.ask_price
+        if ask_price - bid_price > self.units.zero:
+            size = self.units.market_making_size
+            signals.append(OrderSignal(side="buy", size=size, price=bid_price, reason="market_making_bid", quote=True))
+            signals.append(OrderSignal(side="sell", size=size, price=ask_price, reason="market_making_ask", quote=True))
+
+
+@register_strategy("funding_arbitrage")
+class FundingArbitrage(Strategy):
+    def __init__(self, units: StrategyUnits) -> None:
+        self.units = units
+        self.triggers = (FeatureThreshold("wmp", units.wmp_threshold),)
+
+    def on_tick(self, context: TickContext, signals: List[OrderSignal]) -> None:
+        signals.append(
+            OrderSignal(side="buy", size=self.units.funding_size, price=context.bid_price, reason="funding_arbitrage")
+        )
+
+
+@dataclass
+class StrategyStats:
+    wakes: int = 0
+    signals: int = 0
+    busy_ns: int = 0
+
+    @property
+    def mean_ns(self) -> float:
+        return self.busy_ns / self.wakes if self.wakes else 0.0
+
+
+class _ThresholdGroup:
+    """All ``FeatureThreshold`` triggers on one feature: a bisect finds every one that fired."""
+
+    __slots__ = ("feature", "absolute", "thresholds", "masks")
+
+    def __init__(self, feature: str, absolute: bool, entries: List[Tuple[object, int]]) -> None:
+        self.feature = feature
+        self.absolute = absolute
+        entries.sort(key=lambda entry: entry[0])
+        self.thresholds = [threshold for threshold, _ in entries]
+        # masks[k] is every strategy whose threshold is among the k lowest.
+        self.masks = [0]
+        for _, bit in entries:
+            self.masks.append(self.masks[-1] | bit)
 
 
 class StrategyEngine:
+    """Event-driven dispatcher for one instrument's strategy plugins.
+
+    Each tick fills one shared ``TickContext`` (best bid/ask read once) and
+    evaluates every trigger kind once for all strategies -- a price compare,
+    a bisect per feature threshold group, a timer heap -- so only the
+    strategies whose triggers fired run, in registration order, each with
+    its wall time accounted in ``stats``.
+
+    The ``enable_*`` flags select the built-in strategies; ``strategies``
+    adds registered ones by name and ``plugins`` takes instances.
+    """
+
     def __init__(
         self,
         enable_liquidation_hunting: bool,
         enable_funding_arbitrage: bool,
         enable_market_making: bool,
+        codec: Optional[FixedPointCodec] = None,
+        params: Optional[StrategyParams] = None,
+        feature_depth: int = 25,
+        strategies: Sequence[str] = (),
+        plugins: Sequence[Strategy] = (),
+        quote_refresh_ms: int = 1000,
+        clock: Callable[[], int] = time.monotonic_ns,
     ) -> None:
         self.enable_liquidation_hunting = enable_liquidation_hunting
         self.enable_funding_arbitrage = enable_funding_arbitrage
         self.enable_market_making = enable_market_making
-
-    def generate_signals(self, orderbook: OrderBook, features: FeatureSnapshot) -> List[OrderSignal]:
-        signals: List[OrderSignal] = []
-        bids, asks = orderbook.top_levels()
-        if not bids or not asks:
-            return signals
-        best_bid_price, _ = bids[0]
-        best_ask_price, _ = asks[0]
-        mid_price = (best_bid_price + best_ask_price) / 2
-
-        if self.enable_liquidation_hunting and abs(features.ofi) > Decimal("50"):
-            side = "buy" if features.ofi > 0 else "sell"
-            signals.append(
-                OrderSignal(
-                    side=side,
-                    size=Decimal("1"),
-                    price=mid_price,
-                    reason="liquidation_hunting",
-                )
+        self.codec = codec
+        self.params = params = params or StrategyParams()
+        self.units = units = StrategyUnits(params, codec, feature_depth, quote_refresh_ms)
+        self.clock = clock
+        names = [
+            name
+            for name, enabled in (
+                ("liquidation_hunting", enable_liquidation_hunting),
+                ("market_making", enable_market_making),
+                ("funding_arbitrage", enable_funding_arbitrage),
             )
+            if enabled
+        ]
+        names.extend(name for name in strategies if name not in names)
+        self.plugins: List[Strategy] = [create_strategy(name, units) for name in names] + list(plugins)
+        self.stats: Dict[str, StrategyStats] = {}
+        for plugin in self.plugins:
+            if plugin.name in self.stats:
+                raise ValueError(f"Duplicate strategy name {plugin.name!r}")
+            self.stats[plugin.name] = StrategyStats()
+        self._stats = list(self.stats.values())
+        self.context = TickContext()
+        self._every_tick = 0
+        self._best_price = 0
+        self._timers: List[Tuple[int, int, int]] = []
+        self._timers_started = False
+        groups: Dict[Tuple[str, bool], List[Tuple[object, int]]] = {}
+        for idx, plugin in enumerate(self.plugins):
+            bit = 1 << idx
+            for trigger in plugin.triggers:
+                if trigger == EVERY_TICK:
+                    self._every_tick |= bit
+                elif trigger == BEST_PRICE:
+                    self._best_price |= bit
+                elif isinstance(trigger, Timer):
+                    self._timers.append((0, idx, trigger.interval_ns))
+                elif isinstance(trigger, FeatureThreshold):
+                    groups.setdefault((trigger.feature, trigger.absolute), []).append((trigger.threshold, bit))
+                else:
+                    raise ValueError(f"Unknown trigger {trigger!r} on strategy {plugin.name!r}")
+        self._groups = [_ThresholdGroup(feature, absolute, entries) for (feature, absolute), entries in groups.items()]
 
-        if self.enable_market_making:
-            spread = best_ask_price - best_bid_price
-            if spread > Decimal("0"):
-                signals.append(
-                    OrderSignal(
-                        side="buy",
-                        size=Decimal("0.5"),
-                        price=best_bid_price,
-                        reason="market_making_bid",
-                    )
-                )
-                signals.append(
-                    OrderSignal(
-                        side="sell",
-                        size=Decimal("0.5"),
-                        price=best_ask_price,
-                        reason="market_making_ask",
-                    )
-                )
-
-        if self.enable_funding_arbitrage and features.wmp > Decimal("0"):
-            signals.append(
-                OrderSignal(
-                    side="buy",
-                    size=Decimal("0.3"),
-                    price=best_bid_price,
-                    reason="funding_arbitrage",
-                )
-            )
+    def _fired(self, features: FeatureSnapshot, now_ns: int, price_changed: bool) -> int:
+        mask = self._every_tick
+        if price_changed:
+            mask |= self._best_price
+        for group in self._groups:
+            value = getattr(features, group.feature)
+            if group.absolute and value < 0:
+                value = -value
+            mask |= group.masks[bisect_left(group.thresholds, value)]
+        timers = self._timers
+        if timers:
+            if not self._timers_started:
+                # First tick: every timer starts its period now.
+                self._timers = timers = [(now_ns + interval, idx, interval) for _, idx, interval in timers]
+                heapq.heapify(timers)
+                self._timers_started = True
+            while timers[0][0] <= now_ns:
+                _, idx, interval = timers[0]
+                mask |= 1 << idx
+                heapq.heapreplace(timers, (now_ns + interval, idx, interval))
+        return mask
 
+    def generate_signals(
+        self, orderbook: OrderBook, features: FeatureSnapshot, now_ns: Optional[int] = None
+    ) -> List[OrderSignal]:
+        """Signals from the strategies woken by this tick; ``now_ns`` (default ``clock()``) drives timers."""
+        signals: List[OrderSignal] = []
+        context = self.context
+        best_bid = orderbook.best_bid()
+        best_ask = orderbook.best_ask()
+        if best_bid is None or best_ask is None:
+            context.bid_price = context.ask_price = None
+            return signals
+        bid_price, bid_size = best_bid
+        ask_price, ask_size = best_ask
+        price_changed = bid_price != context.bid_price or ask_price != context.ask_price
+        if now_ns is None:
+            now_ns = self.clock()
+        context.instrument_id = orderbook.instrument_id
+        context.bid_price = bid_price
+        context.bid_size = bid_size
+        context.ask_price = ask_price
+        context.ask_size = ask_size
+        context.features = features
+        context.now_ns = now_ns
+        mask = self._fired(features, now_ns, price_changed)
+        if not mask:
+            return signals
+        plugins = self.plugins
+        stats = self._stats
+        perf_counter_ns = time.perf_counter_ns
+        while mask:
+            low = mask & -mask
+            idx = low.bit_length() - 1
+            mask ^= low
+            emitted = len(signals)
+            started = perf_counter_ns()
+            plugins[idx].on_tick(context, signals)
+            entry = stats[idx]
+            entry.busy_ns += perf_counter_ns() - started
+            entry.wakes += 1
+            entry.signals += len(signals) - emitted
         return signals
+
+    def summary(self) -> Dict[str, Dict[str, str]]:
+        return {
+            name: {"wakes": str(entry.wakes), "signals": str(entry.signals), "mean_us": f"{entry.mean_ns / 1000:.2f}"}
+            for name, entry in self.stats.items()
+        }
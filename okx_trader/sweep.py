@@ -0,0 +1,390 @@
+from __future__ import annotations
+
+import dataclasses
+import itertools
+import json
+import mmap
+import os
+import random
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from decimal import ROUND_HALF_EVEN, Decimal
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+from .backtest import BacktestExecutionEngine, SimulatedFillModel
+from .execution import OrderRequest
+from .features import FeatureEngine, FeatureSnapshot
+from .fixed_point import FixedPointCodec
+from .replay import ReplayClock, ReplayDriver
+from .risk import RiskManager
+from .strategies import StrategyEngine, StrategyParams
+from .utils import json_loads
+
+HISTORY_COLUMNS = ("ts_ns", "latency_ms", "instrument", "bid_price", "bid_size", "ask_price", "ask_size", "ofi", "wmp")
+NO_LATENCY = -(1 << 63)
+MIN_SIZE_DECIMALS = 4
+
+_FLUSH_ROWS = 65_536
+
+Frames = Iterable[Tuple[int, Union[str, bytes]]]
+
+
+def _decimals(value: str) -> int:
+    _, _, frac = value.partition(".")
+    return len(frac.rstrip("0"))
+
+
+def infer_codecs(
+    frames: Frames,
+    instrument_ids: Optional[Sequence[str]] = None,
+    max_frames: int = 10_000,
+) -> Dict[str, FixedPointCodec]:
+    """Derive a tick/lot scale per instrument from the precision used in its first snapshot.
+
+    The result only has to represent every price and size exactly, so the
+    tick is the finest price step seen and the lot is at least
+    ``MIN_SIZE_DECIMALS`` decimals (fine enough for fractional order sizes).
+    Scanning stops once every requested instrument has a codec, or after
+    ``max_frames`` when ``instrument_ids`` is ``None``.
+    """
+    codecs: Dict[str, FixedPointCodec] = {}
+    wanted = set(instrument_ids) if instrument_ids is not None else None
+    for count, (_, raw) in enumerate(frames, start=1):
+        data = json_loads(raw)
+        instrument_id = data.get("arg", {}).get("instId")
+        if data.get("action") == "snapshot" and data.get("data") and instrument_id not in codecs:
+            if wanted is None or instrument_id in wanted:
+                payload = data["data"][0]
+                levels = payload.get("bids", []) + payload.get("asks", [])
+                price_decimals = max((_decimals(level[0]) for level in levels), default=0)
+                size_decimals = max(max((_decimals(level[1]) for level in levels), default=0), MIN_SIZE_DECIMALS)
+                codecs[instrument_id] = FixedPointCodec(
+                    tick_size=Decimal(1).scaleb(-price_decimals),
+                    lot_size=Decimal(1).scaleb(-size_decimals),
+                )
+        if wanted is not None and wanted.issubset(codecs):
+            break
+        if wanted is None and count >= max_frames:
+            break
+    return codecs
+
+
+class _ColumnWriter:
+    def __init__(self, directory: str) -> None:
+        self.rows = 0
+        self._columns = {name: array("q") for name in HISTORY_COLUMNS}
+        self._files = {name: open(os.path.join(directory, f"{name}.bin"), "wb") for name in HISTORY_COLUMNS}
+
+    def append(self, *values: int) -> None:
+        for column, value in zip(self._columns.values(), values):
+            column.append(value)
+        self.rows += 1
+        if len(self._columns["ts_ns"]) >= _FLUSH_ROWS:
+            self.flush()
+
+    def flush(self) -> None:
+        for name, column in self._columns.items():
+            column.tofile(self._files[name])
+            del column[:]
+
+    def close(self) -> None:
+        self.flush()
+        for handle in self._files.values():
+            handle.close()
+
+
+async def build_history(
+    frames: Frames,
+    directory: str,
+    codecs: Dict[str, FixedPointCodec],
+    depth: int = 25,
+    validate_checksum: bool = True,
+) -> "BookHistory":
+    """Replay ``frames`` once and store the per-tick strategy inputs as int64 column files.
+
+    Each applied tick yields one row: receive time, exchange latency, the
+    instrument index, best bid/ask in ticks and lots, and the fixed-point
+    ofi/wmp from an incremental ``FeatureEngine``. None of these depend on
+    strategy parameters, so every sweep worker can reuse them.
+    """
+    os.makedirs(directory, exist_ok=True)
+    instruments = sorted(codecs)
+    index = {instrument_id: idx for idx, instrument_id in enumerate(instruments)}
+    engines = {instrument_id: FeatureEngine(depth=depth, incremental=True) for instrument_id in instruments}
+    clock = ReplayClock()
+    writer = _ColumnWriter(directory)
+
+    async def handler(orderbook, message) -> None:
+        best_bid = orderbook.best_bid()
+        best_ask = orderbook.best_ask()
+        instrument_id = orderbook.instrument_id
+        features = engines[instrument_id].compute(orderbook)
+        if best_bid is None or best_ask is None:
+            return
+        latency_ms = NO_LATENCY
+        if message.ts_ms is not None:
+            latency_ms = clock.now_ns // 1_000_000 - message.ts_ms
+        writer.append(
+            clock.now_ns, latency_ms, index[instrument_id], *best_bid, *best_ask, features.ofi, features.wmp
+        )
+
+    driver = ReplayDriver(instruments, codecs=codecs, validate_checksum=validate_checksum, clock=clock)
+    try:
+        await driver.run(frames, handler)
+    finally:
+        writer.close()
+    meta = {
+        "rows": writer.rows,
+        "depth": depth,
+        "instruments": instruments,
+        "codecs": {inst: [str(codecs[inst].tick_size), str(codecs[inst].lot_size)] for inst in instruments},
+    }
+    with open(os.path.join(directory, "meta.json"), "w", encoding="utf-8") as handle:
+        json.dump(meta, handle)
+    return BookHistory(directory)
+
+
+class BookHistory:
+    """Read-only, memory-mapped view of a ``build_history`` directory.
+
+    Columns are ``memoryview`` casts over ``mmap`` pages, so every process
+    that opens the same directory shares one copy through the page cache.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        with open(os.path.join(directory, "meta.json"), encoding="utf-8") as handle:
+            meta = json.load(handle)
+        self.rows: int = meta["rows"]
+        self.depth: int = meta["depth"]
+        self.instruments: List[str] = meta["instruments"]
+        self.codecs = {
+            inst: FixedPointCodec(tick_size=Decimal(tick), lot_size=Decimal(lot))
+            for inst, (tick, lot) in meta["codecs"].items()
+        }
+        self._maps: List[mmap.mmap] = []
+        self.columns: Dict[str, memoryview] = {}
+        for name in HISTORY_COLUMNS:
+            if not self.rows:
+                self.columns[name] = memoryview(array("q"))
+                continue
+            with open(os.path.join(directory, f"{name}.bin"), "rb") as handle:
+                mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps.append(mapped)
+            self.columns[name] = memoryview(mapped).cast("q")
+
+    @staticmethod
+    def exists(directory: str) -> bool:
+        return os.path.exists(os.path.join(directory, "meta.json"))
+
+    def close(self) -> None:
+        for view in self.columns.values():
+            view.release()
+        self.columns = {}
+        for mapped in self._maps:
+            mapped.close()
+        self._maps = []
+
+
+class _TopOfBook:
+    """The slice of ``OrderBook`` that ``StrategyEngine`` and the fill model read."""
+
+    __slots__ = ("instrument_id", "bid", "ask")
+
+    def __init__(self, instrument_id: str) -> None:
+        self.instrument_id = instrument_id
+        self.bid: Optional[Tuple[int, int]] = None
+        self.ask: Optional[Tuple[int, int]] = None
+
+    def best_bid(self) -> Optional[Tuple[int, int]]:
+        return self.bid
+
+    def best_ask(self) -> Optional[Tuple[int, int]]:
+        return self.ask
+
+
+@dataclass
+class SweepSettings:
+    """Everything besides ``StrategyParams`` that a sweep run holds fixed."""
+
+    enable_liquidation_hunting: bool = True
+    enable_funding_arbitrage: bool = True
+    enable_market_making: bool = False
+    max_latency_ms: int = 500
+    max_position_size: float = 1000
+    max_daily_loss: float = 0.05
+    fill_model: SimulatedFillModel = field(default_factory=SimulatedFillModel)
+
+
+@dataclass
+class SweepResult:
+    params: Dict[str, str]
+    pnl: Decimal
+    fees: Decimal
+    fills: int
+    maker_fills: int
+    orders: int
+    rejected: int
+    expired: int
+    gross_position: Decimal
+    elapsed: float
+
+
+def evaluate(history: BookHistory, params: StrategyParams, settings: SweepSettings) -> SweepResult:
+    """Run the strategy -> risk -> simulated execution path over ``history`` for one parameter set.
+
+    Mirrors ``main.build_handler`` in fixed-point mode, minus storage: the
+    fill model sees each tick before the strategy does, as in ``backtest.py``.
+    """
+    started = time.perf_counter()
+    clock = ReplayClock()
+    codecs = history.codecs
+    execution = BacktestExecutionEngine(clock, settings.fill_model, codecs=codecs)
+    risk = RiskManager(settings.max_daily_loss, settings.max_position_size, settings.max_latency_ms)
+    books = [_TopOfBook(instrument_id) for instrument_id in history.instruments]
+    instrument_codecs = [codecs[instrument_id] for instrument_id in history.instruments]
+    strategies = [
+        StrategyEngine(
+            enable_liquidation_hunting=settings.enable_liquidation_hunting,
+            enable_funding_arbitrage=settings.enable_funding_arbitrage,
+            enable_market_making=settings.enable_market_making,
+            codec=codec,
+            params=params,
+            feature_depth=history.depth,
+        )
+        for codec in instrument_codecs
+    ]
+    features = FeatureSnapshot(ofi=0, wmp=0, liquidity_vacuum=0, bid_pressure=0, ask_pressure=0)
+    on_book = execution.on_book
+    submit = execution.submit
+    update_latency = risk.update_latency
+    columns = history.columns
+    for ts_ns, latency_ms, inst, bid_price, bid_size, ask_price, ask_size, ofi, wmp in zip(
+        *(columns[name] for name in HISTORY_COLUMNS)
+    ):
+        clock.now_ns = ts_ns
+        book = books[inst]
+        book.bid = (bid_price, bid_size)
+        book.ask = (ask_price, ask_size)
+        on_book(book)
+        if latency_ms != NO_LATENCY:
+            update_latency(latency_ms)
+        features.ofi = ofi
+        features.wmp = wmp
+        signals = strategies[inst].generate_signals(book, features, ts_ns)
+        if not signals or not risk.is_trading_allowed():
+            continue
+        for signal in signals:
+            submit(OrderRequest.from_signal(book.instrument_id, signal, instrument_codecs[inst]))
+
+    summary = execution.summary().values()
+    return SweepResult(
+        params=params.to_dict(),
+        pnl=sum((Decimal(item["pnl"]) for item in summary), Decimal("0")),
+        fees=sum((Decimal(item["fees"]) for item in summary), Decimal("0")),
+        fills=len(execution.fills),
+        maker_fills=sum(int(item["maker_fills"]) for item in summary),
+        orders=execution.orders_submitted,
+        rejected=execution.orders_rejected,
+        expired=execution.orders_expired,
+        gross_position=sum((abs(Decimal(item["position"])) for item in summary), Decimal("0")),
+        elapsed=time.perf_counter() - started,
+    )
+
+
+_worker_history: Optional[BookHistory] = None
+
+
+def _init_worker(directory: str) -> None:
+    global _worker_history
+    _worker_history = BookHistory(directory)
+
+
+def _evaluate_in_worker(params: Dict[str, str], settings: SweepSettings) -> SweepResult:
+    return evaluate(_worker_history, StrategyParams.from_dict(params), settings)
+
+
+def run_sweep(
+    directory: str,
+    param_sets: Sequence[StrategyParams],
+    settings: Optional[SweepSettings] = None,
+    workers: Optional[int] = None,
+    sort_by: str = "pnl",
+) -> List[SweepResult]:
+    """Evaluate ``param_sets`` across a process pool and return results best-first.
+
+    Workers map the history directory once at start-up instead of receiving
+    (or re-parsing) the book data with every task.
+    """
+    settings = settings or SweepSettings()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(directory,)) as pool:
+        futures = [pool.submit(_evaluate_in_worker, params.to_dict(), settings) for params in param_sets]
+        results = [future.result() for future in futures]
+    results.sort(key=lambda result: getattr(result, sort_by), reverse=True)
+    return results
+
+
+def grid(axes: Mapping[str, Sequence], base: Optional[StrategyParams] = None) -> List[StrategyParams]:
+    """Cartesian product of ``axes`` (field name -> values) over ``base``."""
+    base = base or StrategyParams()
+    names = list(axes)
+    return [
+        dataclasses.replace(base, **{name: Decimal(str(value)) for name, value in zip(names, values)})
+        for values in itertools.product(*(axes[name] for name in names))
+    ]
+
+
+def random_search(
+    ranges: Mapping[str, Tuple[object, object]],
+    count: int,
+    seed: int = 0,
+    base: Optional[StrategyParams] = None,
+    decimals: int = MIN_SIZE_DECIMALS,
+) -> List[StrategyParams]:
+    """``count`` parameter sets drawn uniformly from ``ranges`` (field name -> (low, high)).
+
+    Draws are rounded to ``decimals`` places so sizes stay lot multiples of
+    an inferred codec.
+    """
+    base = base or StrategyParams()
+    rng = random.Random(seed)
+    quantum = Decimal(1).scaleb(-decimals)
+    param_sets = []
+    for _ in range(count):
+        values = {}
+        for name, (low, high) in ranges.items():
+            draw = Decimal(repr(rng.uniform(float(low), float(high))))
+            values[name] = draw.quantize(quantum, rounding=ROUND_HALF_EVEN).normalize()
+        param_sets.append(dataclasses.replace(base, **values))
+    return param_sets
+
+
+def format_table(results: Sequence[SweepResult], limit: Optional[int] = None) -> str:
+    """Ranked plain-text table: one row per parameter set, varying parameters first."""
+    results = list(results)[:limit] if limit else list(results)
+    if not results:
+        return "(no results)"
+    names = list(results[0].params)
+    varying = [name for name in names if len({result.params[name] for result in results}) > 1] or names
+    header = ["#", *varying, "pnl", "fees", "fills", "maker", "orders", "rejected", "expired", "|position|"]
+    rows = [
+        [
+            str(rank),
+            *(result.params[name] for name in varying),
+            f"{result.pnl:.4f}",
+            f"{result.fees:.4f}",
+            str(result.fills),
+            str(result.maker_fills),
+            str(result.orders),
+            str(result.rejected),
+            str(result.expired),
+            f"{result.gross_position.normalize()}",
+        ]
+        for rank, result in enumerate(results, start=1)
+    ]
+    widths = [max(len(row[idx]) for row in [header, *rows]) for idx in range(len(header))]
+    lines = ["  ".join(cell.rjust(width) for cell, width in zip(row, widths)) for row in [header, *rows]]
+    lines.insert(1, "  ".join("-" * width for width in widths))
+    return "\n".join(lines)
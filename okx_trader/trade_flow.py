@@ -0,0 +1,348 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+from typing import Callable, Dict, List, Optional, Sequence
+
+import aiohttp
+
+from .orderbook_stream import PUBLIC_WS_URL
+from .utils import Backoff, instrument_family, json_dumps, json_loads
+
+logger = logging.getLogger(__name__)
+
+TRADES = "trades"
+LIQUIDATION_ORDERS = "liquidation-orders"
+WINDOWS_MS = (1_000, 10_000, 60_000)
+
+
+class TradeFlow:
+    """Rolling trade and liquidation aggregates for one instrument.
+
+    Events are summed into a ring of ``bucket_ms`` buckets spanning the
+    longest window, and every window keeps running totals: an event adds to
+    its bucket and to the totals of the windows it falls in, and moving the
+    clock forward subtracts the buckets that leave each window. Both are
+    O(windows) per event or elapsed bucket; all storage is preallocated, so
+    updates and reads allocate nothing beyond the floats themselves.
+
+    Totals are lists indexed like ``windows_ms`` (1s/10s/60s by default):
+    taker ``buy_volume``/``sell_volume``, ``notional``, ``trades``, and
+    ``liquidation_buy``/``liquidation_sell``/``liquidations`` (a buy
+    liquidation closes a short). Time is exchange time in milliseconds;
+    with ``clock`` (nanoseconds), ``refresh`` ages the windows to now.
+    """
+
+    __slots__ = (
+        "instrument_id",
+        "windows_ms",
+        "bucket_ms",
+        "cluster_size",
+        "clock",
+        "late",
+        "buy_volume",
+        "sell_volume",
+        "notional",
+        "trades",
+        "liquidation_buy",
+        "liquidation_sell",
+        "liquidations",
+        "_spans",
+        "_slots",
+        "_newest",
+        "_buy",
+        "_sell",
+        "_notional",
+        "_trades",
+        "_liq_buy",
+        "_liq_sell",
+        "_liq_count",
+    )
+
+    def __init__(
+        self,
+        instrument_id: str,
+        windows_ms: Sequence[int] = WINDOWS_MS,
+        bucket_ms: int = 100,
+        cluster_size: int = 3,
+        clock: Optional[Callable[[], int]] = None,
+    ) -> None:
+        if not windows_ms or any(window % bucket_ms for window in windows_ms):
+            raise ValueError("Windows must be non-empty multiples of bucket_ms")
+        self.instrument_id = instrument_id
+        self.windows_ms = tuple(windows_ms)
+        self.bucket_ms = bucket_ms
+        self.cluster_size = cluster_size
+        self.clock = clock
+        self.late = 0
+        self._spans = [window // bucket_ms for window in self.windows_ms]
+        self._slots = slots = max(self._spans)
+        self._newest: Optional[int] = None
+        count = len(self.windows_ms)
+        self.buy_volume = [0.0] * count
+        self.sell_volume = [0.0] * count
+        self.notional = [0.0] * count
+        self.trades = [0] * count
+        self.liquidation_buy = [0.0] * count
+        self.liquidation_sell = [0.0] * count
+        self.liquidations = [0] * count
+        self._buy = [0.0] * slots
+        self._sell = [0.0] * slots
+        self._notional = [0.0] * slots
+        self._trades = [0] * slots
+        self._liq_buy = [0.0] * slots
+        self._liq_sell = [0.0] * slots
+        self._liq_count = [0] * slots
+
+    def _clear(self) -> None:
+        for values in (
+            self.buy_volume,
+            self.sell_volume,
+            self.notional,
+            self.liquidation_buy,
+            self.liquidation_sell,
+            self._buy,
+            self._sell,
+            self._notional,
+            self._liq_buy,
+            self._liq_sell,
+        ):
+            values[:] = [0.0] * len(values)
+        for counts in (self.trades, self.liquidations, self._trades, self._liq_count):
+            counts[:] = [0] * len(counts)
+
+    def _advance(self, bucket: int) -> None:
+        newest = self._newest
+        if newest is None or bucket - newest >= self._slots:
+            if newest is not None:
+                self._clear()
+            self._newest = bucket
+            return
+        slots = self._slots
+        spans = self._spans
+        while newest < bucket:
+            newest += 1
+            for idx, span in enumerate(spans):
+                # The bucket leaving this window; for the longest window it is the slot about to be reused.
+                old = (newest - span) % slots
+                self.buy_volume[idx] -= self._buy[old]
+                self.sell_volume[idx] -= self._sell[old]
+                self.notional[idx] -= self._notional[old]
+                self.trades[idx] -= self._trades[old]
+                self.liquidation_buy[idx] -= self._liq_buy[old]
+                self.liquidation_sell[idx] -= self._liq_sell[old]
+                self.liquidations[idx] -= self._liq_count[old]
+            slot = newest % slots
+            self._buy[slot] = self._sell[slot] = self._notional[slot] = 0.0
+            self._liq_buy[slot] = self._liq_sell[slot] = 0.0
+            self._trades[slot] = self._liq_count[slot] = 0
+        self._newest = newest
+
+    def advance(self, ts_ms: int) -> None:
+        """Age the windows to ``ts_ms``; earlier times are ignored."""
+        bucket = ts_ms // self.bucket_ms
+        if self._newest is None or bucket > self._newest:
+            self._advance(bucket)
+
+    def refresh(self) -> None:
+        if self.clock is not None:
+            self.advance(self.clock() // 1_000_000)
+
+    def _age(self, ts_ms: int) -> int:
+        bucket = ts_ms // self.bucket_ms
+        if self._newest is None or bucket > self._newest:
+            self._advance(bucket)
+        return self._newest - bucket
+
+    def add_trade(self, ts_ms: int, price: float, size: float, side: str) -> None:
+        """Record one trade; ``side`` is the taker side."""
+        age = self._age(ts_ms)
+        if age >= self._slots:
+            self.late += 1
+            return
+        slot = (self._newest - age) % self._slots
+        notional = price * size
+        buy = side == "buy"
+        if buy:
+            self._buy[slot] += size
+        else:
+            self._sell[slot] += size
+        self._notional[slot] += notional
+        self._trades[slot] += 1
+        for idx, span in enumerate(self._spans):
+            if age < span:
+                if buy:
+                    self.buy_volume[idx] += size
+                else:
+                    self.sell_volume[idx] += size
+                self.notional[idx] += notional
+                self.trades[idx] += 1
+
+    def add_liquidation(self, ts_ms: int, size: float, side: str) -> None:
+        """Record one liquidation order; ``side`` is the side of the liquidation order."""
+        age = self._age(ts_ms)
+        if age >= self._slots:
+            self.late += 1
+            return
+        slot = (self._newest - age) % self._slots
+        buy = side == "buy"
+        if buy:
+            self._liq_buy[slot] += size
+        else:
+            self._liq_sell[slot] += size
+        self._liq_count[slot] += 1
+        for idx, span in enumerate(self._spans):
+            if age < span:
+                if buy:
+                    self.liquidation_buy[idx] += size
+                else:
+                    self.liquidation_sell[idx] += size
+                self.liquidations[idx] += 1
+
+    def signed_volume(self, window: int = 0) -> float:
+        """Taker buy minus sell volume over ``windows_ms[window]``."""
+        return self.buy_volume[window] - self.sell_volume[window]
+
+    def vwap(self, window: int = 0) -> float:
+        volume = self.buy_volume[window] + self.sell_volume[window]
+        return self.notional[window] / volume if volume > 1e-12 else math.nan
+
+    def intensity(self, window: int = 0) -> float:
+        """Trades per second."""
+        return self.trades[window] * 1000 / self.windows_ms[window]
+
+    def liquidation_volume(self, window: int = 0) -> float:
+        """Buy minus sell liquidation volume: positive while shorts are being squeezed."""
+        return self.liquidation_buy[window] - self.liquidation_sell[window]
+
+    def liquidation_cluster(self, window: int = 0) -> bool:
+        """At least ``cluster_size`` liquidations inside the window."""
+        return self.liquidations[window] >= self.cluster_size
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return {
+            f"{window // 1000}s": {
+                "signed_volume": self.signed_volume(idx),
+                "vwap": self.vwap(idx),
+                "intensity": self.intensity(idx),
+                "liquidation_volume": self.liquidation_volume(idx),
+                "liquidations": self.liquidations[idx],
+            }
+            for idx, window in enumerate(self.windows_ms)
+        }
+
+
+class TradeFlowStreamer:
+    """Public ``trades`` and ``liquidation-orders`` feed into per-instrument ``TradeFlow``s.
+
+    ``liquidation-orders`` is subscribed per ``instType`` and carries every
+    instrument of that type. Entries are matched by ``instFamily`` (``uly``
+    on older payloads), so SWAP liquidations on BTC-USDT-SWAP also reach
+    the BTC-USDT spot flow; sizes stay in the liquidated instrument's
+    contracts. Entries for families without a flow are dropped. Reconnects
+    with jittered backoff.
+    """
+
+    def __init__(
+        self,
+        flows: Dict[str, TradeFlow],
+        url: str = PUBLIC_WS_URL,
+        proxy: str | None = None,
+        liquidation_inst_types: Sequence[str] = ("SWAP",),
+        reconnect_delay: float = 5.0,
+        max_reconnect_delay: float = 60.0,
+        ping_interval: float = 20.0,
+    ) -> None:
+        self.flows = flows
+        self.families: Dict[str, List[TradeFlow]] = {}
+        for instrument_id, flow in flows.items():
+            self.families.setdefault(instrument_family(instrument_id), []).append(flow)
+        self.url = url
+        self.proxy = proxy
+        self.liquidation_inst_types = tuple(liquidation_inst_types)
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.ping_interval = ping_interval
+        self.connections = 0
+        self.trades = 0
+        self.liquidations = 0
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._ws: Optional[aiohttp.ClientWebSocketResponse] = None
+        self._stopped = False
+
+    @property
+    def subscription_args(self) -> List[Dict[str, str]]:
+        args = [{"channel": TRADES, "instId": instrument_id} for instrument_id in self.flows]
+        args.extend({"channel": LIQUIDATION_ORDERS, "instType": inst_type} for inst_type in self.liquidation_inst_types)
+        return args
+
+    async def connect(self) -> None:
+        if self._session is None:
+            self._session = aiohttp.ClientSession()
+        self._ws = await self._session.ws_connect(
+            self.url,
+            heartbeat=self.ping_interval,
+            timeout=aiohttp.ClientWSTimeout(ws_receive=max(60.0, 3 * self.ping_interval), ws_close=10.0),
+            proxy=self.proxy,
+        )
+        await self._ws.send_str(json_dumps({"op": "subscribe", "args": self.subscription_args}))
+        self.connections += 1
+
+    async def close(self) -> None:
+        self._stopped = True
+        if self._ws is not None:
+            await self._ws.close()
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def run_forever(self) -> None:
+        backoff = Backoff(self.reconnect_delay, self.max_reconnect_delay)
+        try:
+            while not self._stopped:
+                try:
+                    await self.connect()
+                    async for msg in self._ws:
+                        if msg.type == aiohttp.WSMsgType.TEXT:
+                            backoff.reset()
+                            self.on_message(json_loads(msg.data))
+                        elif msg.type == aiohttp.WSMsgType.ERROR:
+                            break
+                except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as exc:
+                    logger.warning("Trade stream error: %r.", exc)
+                if not self._stopped:
+                    delay = backoff.next()
+                    logger.warning("Trade stream disconnected; reconnecting in %.2fs.", delay)
+                    await asyncio.sleep(delay)
+        finally:
+            if self._session is not None:
+                await self._session.close()
+                self._session = None
+
+    def on_message(self, message: Dict) -> None:
+        data = message.get("data")
+        if data is None:
+            if message.get("event") == "error":
+                logger.warning("Trade stream error event: %s", message.get("msg"))
+            return
+        channel = message.get("arg", {}).get("channel")
+        flows = self.flows
+        if channel == TRADES:
+            for entry in data:
+                flow = flows.get(entry.get("instId"))
+                if flow is not None:
+                    flow.add_trade(int(entry["ts"]), float(entry["px"]), float(entry["sz"]), entry["side"])
+                    self.trades += 1
+        elif channel == LIQUIDATION_ORDERS:
+            families = self.families
+            for entry in data:
+                family = entry.get("instFamily") or entry.get("uly") or instrument_family(entry.get("instId", ""))
+                matched = families.get(family)
+                if not matched:
+                    continue
+                for detail in entry.get("details", []):
+                    ts_ms, size, side = int(detail["ts"]), float(detail["sz"]), detail["side"]
+                    for flow in matched:
+                        flow.add_liquidation(ts_ms, size, side)
+                    self.liquidations += 1
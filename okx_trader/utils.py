@@ -1,7 +1,15 @@
 from __future__ import annotations
 
+import json
+import random
+import time
 from decimal import Decimal, ROUND_HALF_UP
-from typing import Iterable
+from typing import Any, Callable, Iterable
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 
 def to_decimal(value: str | float | int) -> Decimal:
@@ -12,6 +20,86 @@ def quantize(value: Decimal, precision: str = "0.00000001") -> Decimal:
     return value.quantize(Decimal(precision), rounding=ROUND_HALF_UP)
 
 
+if orjson is not None:
+
+    def json_dumps(value: Any) -> str:
+        return orjson.dumps(value).decode()
+
+    json_loads = orjson.loads
+else:
+
+    def json_dumps(value: Any) -> str:
+        return json.dumps(value, separators=(",", ":"))
+
+    json_loads = json.loads
+
+
+class MonotonicClock:
+    """Wall-clock nanoseconds read from ``time.monotonic_ns``.
+
+    The offset to ``time.time_ns`` is taken once, so NTP steps cannot make
+    latency jump or go negative mid-session; ``resync`` re-anchors it.
+    """
+
+    __slots__ = ("offset_ns",)
+
+    def __init__(self) -> None:
+        self.offset_ns = 0
+        self.resync()
+
+    def resync(self) -> None:
+        self.offset_ns = time.time_ns() - time.monotonic_ns()
+
+    def __call__(self) -> int:
+        return time.monotonic_ns() + self.offset_ns
+
+
+class Backoff:
+    """Exponential reconnect backoff with full jitter.
+
+    The n-th consecutive retry waits ``uniform(0, min(cap, base * 2**n))``,
+    so clients dropped together do not reconnect in lockstep; ``reset``
+    after a connection has proven healthy.
+    """
+
+    __slots__ = ("base", "cap", "attempts", "_random")
+
+    def __init__(self, base: float, cap: float = 60.0, rng: Callable[[], float] = random.random) -> None:
+        self.base = base
+        self.cap = max(cap, base)
+        self.attempts = 0
+        self._random = rng
+
+    def next(self) -> float:
+        delay = self._random() * min(self.cap, self.base * (1 << min(self.attempts, 32)))
+        self.attempts += 1
+        return delay
+
+    def reset(self) -> None:
+        self.attempts = 0
+
+
+def iso_timestamp() -> str:
+    now = time.time()
+    return f"{time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(now))}.{int(now * 1000) % 1000:03d}Z"
+
+
+def instrument_type(instrument_id: str) -> str:
+    parts = instrument_id.split("-")
+    if parts[-1] == "SWAP":
+        return "SWAP"
+    if len(parts) == 3 and parts[-1].isdigit():
+        return "FUTURES"
+    if len(parts) >= 4:
+        return "OPTION"
+    return "SPOT"
+
+
+def instrument_family(instrument_id: str) -> str:
+    """``instFamily`` shared by spot and derivatives on one pair: BTC-USDT, BTC-USDT-SWAP -> BTC-USDT."""
+    return "-".join(instrument_id.split("-")[:2])
+
+
 def chunks(seq: Iterable, size: int):
     chunk = []
     for item in seq:
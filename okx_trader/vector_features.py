@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import math
+from typing import Optional, Sequence, Tuple
+
+from .features import VACUUM_SCALE, FeatureSnapshot, _div_round_half_up
+from .orderbook import BookSide, OrderBook
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class VectorFeatureSnapshot:
+    __slots__ = (
+        "ofi",
+        "wmp",
+        "liquidity_vacuum",
+        "bid_pressure",
+        "ask_pressure",
+        "microprice",
+        "spread",
+        "multi_level_ofi",
+        "depth_imbalance",
+        "spread_mean",
+        "volatility",
+    )
+
+    def __init__(
+        self,
+        ofi: float,
+        wmp: float,
+        liquidity_vacuum: float,
+        bid_pressure: float,
+        ask_pressure: float,
+        microprice: float,
+        spread: float,
+        multi_level_ofi,
+        depth_imbalance,
+        spread_mean,
+        volatility,
+    ) -> None:
+        self.ofi = ofi
+        self.wmp = wmp
+        self.liquidity_vacuum = liquidity_vacuum
+        self.bid_pressure = bid_pressure
+        self.ask_pressure = ask_pressure
+        self.microprice = microprice
+        self.spread = spread
+        self.multi_level_ofi = multi_level_ofi
+        self.depth_imbalance = depth_imbalance
+        self.spread_mean = spread_mean
+        self.volatility = volatility
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"VectorFeatureSnapshot({fields})"
+
+    def core(self) -> Tuple[float, float, float, float, float]:
+        return self.ofi, self.wmp, self.liquidity_vacuum, self.bid_pressure, self.ask_pressure
+
+
+class _RollingStats:
+    """Running mean/std for several trailing windows over one shared ring.
+
+    The handful of windows makes plain floats cheaper than NumPy here.
+    """
+
+    def __init__(self, windows: Sequence[int]) -> None:
+        self.windows = tuple(windows)
+        self.capacity = max(self.windows)
+        self._ring = [0.0] * self.capacity
+        self._sum = [0.0] * len(self.windows)
+        self._sumsq = [0.0] * len(self.windows)
+        self._count = 0
+
+    def push(self, value: float) -> None:
+        ring = self._ring
+        capacity = self.capacity
+        count = self._count
+        square = value * value
+        for idx, window in enumerate(self.windows):
+            if count >= window:
+                leaving = ring[(count - window) % capacity]
+                self._sum[idx] += value - leaving
+                self._sumsq[idx] += square - leaving * leaving
+            else:
+                self._sum[idx] += value
+                self._sumsq[idx] += square
+        ring[count % capacity] = value
+        self._count = count + 1
+
+    def mean(self) -> Tuple[float, ...]:
+        count = self._count
+        return tuple(total / min(count, window) if count else 0.0 for total, window in zip(self._sum, self.windows))
+
+    def std(self) -> Tuple[float, ...]:
+        count = self._count
+        result = []
+        for total, total_sq, window in zip(self._sum, self._sumsq, self.windows):
+            n = min(count, window)
+            if not n:
+                result.append(0.0)
+                continue
+            mean = total / n
+            result.append(math.sqrt(max(total_sq / n - mean * mean, 0.0)))
+        return tuple(result)
+
+
+class VectorFeatureEngine:
+    """NumPy implementation of ``FeatureEngine`` plus multi-depth and rolling features.
+
+    ``ofi``/``wmp``/``liquidity_vacuum``/pressures match ``FeatureEngine`` up
+    to float rounding, in its units: on a fixed-point book sizes are lots,
+    wmp is lots * depth and the vacuum ratio is scaled by ``VACUUM_SCALE``,
+    so ``StrategyUnits`` thresholds apply to either engine.
+    The extra features are the per-level OFI over the first ``ofi_levels``
+    levels, the level-1 microprice, a depth-weighted imbalance for each of
+    ``imbalance_depths``, and spread mean / mid log-return volatility over
+    each of ``windows`` ticks.
+    """
+
+    def __init__(
+        self,
+        depth: int = 25,
+        ofi_levels: int = 5,
+        imbalance_depths: Sequence[int] = (1, 5, 10, 25),
+        windows: Sequence[int] = (20, 100, 500),
+    ) -> None:
+        if np is None:
+            raise RuntimeError("VectorFeatureEngine requires numpy (pip install numpy)")
+        self.depth = depth
+        self.ofi_levels = min(ofi_levels, depth)
+        self.imbalance_depths = np.asarray([min(d, depth) for d in imbalance_depths], dtype=np.int64)
+        self._fixed_weights = depth - np.arange(depth, dtype=np.float64)
+        self._weights = self._fixed_weights / depth
+        self._prev: Optional[Tuple] = None
+        self._last_mid: Optional[float] = None
+        self._spreads = _RollingStats(windows)
+        self._returns = _RollingStats(windows)
+
+    def _side_arrays(self, side: BookSide) -> Tuple:
+        top = side.top_prices(min(self.depth, side.depth))
+        levels = side.levels
+        count = len(top)
+        prices = np.fromiter(map(float, top), dtype=np.float64, count=count)
+        sizes = np.fromiter(map(float, [levels[price] for price in top]), dtype=np.float64, count=count)
+        return prices, sizes
+
+    @staticmethod
+    def _matched_prev_sizes(prices, prev_prices, prev_sizes, descending: bool):
+        if not len(prev_prices) or not len(prices):
+            return np.zeros_like(prices)
+        keys = -prev_prices if descending else prev_prices
+        lookup = -prices if descending else prices
+        idx = np.minimum(np.searchsorted(keys, lookup), len(keys) - 1)
+        return np.where(keys[idx] == lookup, prev_sizes[idx], 0.0)
+
+    def _multi_level_ofi(self, bid_px, bid_sz, ask_px, ask_sz, prev) -> "np.ndarray":
+        levels = self.ofi_levels
+        result = np.zeros(levels, dtype=np.float64)
+        if prev is None:
+            return result
+        prev_bid_px, prev_bid_sz, prev_ask_px, prev_ask_sz = prev
+        n = min(levels, len(bid_px), len(prev_bid_px), len(ask_px), len(prev_ask_px))
+        if n == 0:
+            return result
+        bp, bq, pbp, pbq = bid_px[:n], bid_sz[:n], prev_bid_px[:n], prev_bid_sz[:n]
+        ap, aq, pap, paq = ask_px[:n], ask_sz[:n], prev_ask_px[:n], prev_ask_sz[:n]
+        bid_flow = np.where(bp >= pbp, bq, 0.0) - np.where(bp <= pbp, pbq, 0.0)
+        ask_flow = np.where(ap <= pap, aq, 0.0) - np.where(ap >= pap, paq, 0.0)
+        result[:n] = bid_flow - ask_flow
+        return result
+
+    def compute(self, orderbook: OrderBook) -> VectorFeatureSnapshot:
+        bid_px, bid_sz = self._side_arrays(orderbook.bids)
+        ask_px, ask_sz = self._side_arrays(orderbook.asks)
+        prev = self._prev
+
+        if prev is None:
+            ofi = float(bid_sz.sum() - ask_sz.sum())
+        else:
+            prev_bid = self._matched_prev_sizes(bid_px, prev[0], prev[1], descending=True)
+            prev_ask = self._matched_prev_sizes(ask_px, prev[2], prev[3], descending=False)
+            ofi = float((bid_sz - prev_bid).sum() - (ask_sz - prev_ask).sum())
+
+        fixed = orderbook.fixed_point
+        weights = self._fixed_weights if fixed else self._weights
+        wmp = float(bid_sz @ weights[: len(bid_sz)] - ask_sz @ weights[: len(ask_sz)])
+        bid_pressure = float(bid_sz.sum())
+        ask_pressure = float(ask_sz.sum())
+        total = bid_pressure + ask_pressure
+        liquidity_vacuum = 0.0
+        if len(bid_sz) and len(ask_sz) and total:
+            if fixed:
+                # Lot counts are exact in a float; round the ratio like ``FeatureEngine`` does.
+                scaled = _div_round_half_up(int(bid_pressure - ask_pressure) * VACUUM_SCALE, int(total))
+                liquidity_vacuum = float(scaled)
+            else:
+                liquidity_vacuum = (bid_pressure - ask_pressure) / total
+
+        bid_cum = np.cumsum(bid_sz * weights[: len(bid_sz)])
+        ask_cum = np.cumsum(ask_sz * weights[: len(ask_sz)])
+        depth_imbalance = np.zeros(len(self.imbalance_depths), dtype=np.float64)
+        if len(bid_cum) and len(ask_cum):
+            bid_at = bid_cum[np.minimum(self.imbalance_depths, len(bid_cum)) - 1]
+            ask_at = ask_cum[np.minimum(self.imbalance_depths, len(ask_cum)) - 1]
+            np.divide(bid_at - ask_at, bid_at + ask_at, out=depth_imbalance, where=(bid_at + ask_at) > 0)
+
+        microprice = spread = math.nan
+        if len(bid_px) and len(ask_px):
+            best_bid, best_ask = bid_px[0], ask_px[0]
+            top_total = bid_sz[0] + ask_sz[0]
+            microprice = float((best_bid * ask_sz[0] + best_ask * bid_sz[0]) / top_total) if top_total else math.nan
+            spread = float(best_ask - best_bid)
+            mid = (best_bid + best_ask) / 2
+            self._spreads.push(spread)
+            if self._last_mid is not None and self._last_mid > 0 and mid > 0:
+                self._returns.push(math.log(mid / self._last_mid))
+            self._last_mid = mid
+
+        snapshot = VectorFeatureSnapshot(
+            ofi=ofi,
+            wmp=wmp,
+            liquidity_vacuum=liquidity_vacuum,
+            bid_pressure=bid_pressure,
+            ask_pressure=ask_pressure,
+            microprice=microprice,
+            spread=spread,
+            multi_level_ofi=self._multi_level_ofi(bid_px, bid_sz, ask_px, ask_sz, prev),
+            depth_imbalance=depth_imbalance,
+            spread_mean=self._spreads.mean(),
+            volatility=self._returns.std(),
+        )
+        self._prev = (bid_px, bid_sz, ask_px, ask_sz)
+        return snapshot
+
+    @staticmethod
+    def max_deviation(vector: VectorFeatureSnapshot, reference: FeatureSnapshot) -> float:
+        expected = (
+            reference.ofi,
+            reference.wmp,
+            reference.liquidity_vacuum,
+            reference.bid_pressure,
+            reference.ask_pressure,
+        )
+        return max(abs(got - float(want)) for got, want in zip(vector.core(), expected))
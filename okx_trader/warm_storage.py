@@ -0,0 +1,522 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import struct
+import time
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlparse
+
+from .utils import Backoff
+
+logger = logging.getLogger(__name__)
+
+FEATURES = "features"
+ORDERS = "orders"
+
+_FEATURE_STRUCT = struct.Struct("<qdddddd")
+_ORDER_HEAD = struct.Struct("<q?")
+_ORDER_FIELDS = ("side", "size", "price", "client_order_id", "order_id", "code", "msg", "reason")
+
+
+class RedisError(Exception):
+    pass
+
+
+def _encode_command(args: Sequence[Any]) -> bytes:
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if not isinstance(arg, bytes):
+            arg = str(arg).encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(parts)
+
+
+async def _read_reply(reader: asyncio.StreamReader) -> Any:
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError("Redis connection closed")
+    kind, body = line[:1], line[1:-2]
+    if kind == b"+":
+        return body.decode()
+    if kind == b"-":
+        return RedisError(body.decode())
+    if kind == b":":
+        return int(body)
+    if kind == b"$":
+        length = int(body)
+        if length < 0:
+            return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2]
+    if kind == b"*":
+        length = int(body)
+        if length < 0:
+            return None
+        return [await _read_reply(reader) for _ in range(length)]
+    raise RedisError(f"Unexpected RESP reply: {line!r}")
+
+
+class RedisProtocolBackend:
+    """Minimal RESP2 client: one connection, whole batches sent as a single pipeline.
+
+    Any failure while a pipeline is in flight (reset, EOF, a short read,
+    cancellation) leaves unread replies on the socket, so the connection is
+    discarded and ``ConnectionError`` raised; the next ``execute`` reconnects,
+    no sooner than a jittered backoff after the last failed attempt.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 6379,
+        db: int = 0,
+        password: Optional[str] = None,
+        connect_timeout: float = 2.0,
+        reconnect_delay: float = 0.5,
+        max_reconnect_delay: float = 10.0,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.db = db
+        self.password = password
+        self.connect_timeout = connect_timeout
+        self.reconnects = 0
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._lock = asyncio.Lock()
+        self._backoff = Backoff(reconnect_delay, max_reconnect_delay)
+        self._retry_at = 0.0
+        self._connected_once = False
+
+    async def connect(self) -> None:
+        async with self._lock:
+            await self._open()
+
+    async def _open(self) -> None:
+        try:
+            self._reader, self._writer = await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.port), self.connect_timeout
+            )
+            setup = []
+            if self.password:
+                setup.append(("AUTH", self.password))
+            if self.db:
+                setup.append(("SELECT", self.db))
+            for reply in await self._pipeline(setup):
+                if isinstance(reply, RedisError):
+                    raise reply
+        except BaseException:
+            self._drop()
+            self._retry_at = time.monotonic() + self._backoff.next()
+            raise
+        self._backoff.reset()
+        if self._connected_once:
+            self.reconnects += 1
+            logger.info("Warm storage reconnected to %s:%d.", self.host, self.port)
+        self._connected_once = True
+
+    def _drop(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        self._writer = self._reader = None
+
+    async def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            await self._writer.wait_closed()
+            self._writer = self._reader = None
+
+    async def _pipeline(self, commands: Sequence[Sequence[Any]]) -> List[Any]:
+        if not commands:
+            return []
+        self._writer.write(b"".join(_encode_command(command) for command in commands))
+        await self._writer.drain()
+        return [await _read_reply(self._reader) for _ in commands]
+
+    async def execute(self, commands: Sequence[Sequence[Any]]) -> List[Any]:
+        """Send ``commands`` back-to-back and read all replies; errors are returned, not raised."""
+        if not commands:
+            return []
+        async with self._lock:
+            if self._writer is None:
+                if time.monotonic() < self._retry_at:
+                    raise ConnectionError("Redis backend not connected")
+                try:
+                    await self._open()
+                except (OSError, EOFError, asyncio.TimeoutError, RedisError) as exc:
+                    raise ConnectionError(f"Redis reconnect failed: {exc!r}") from exc
+            try:
+                return await self._pipeline(commands)
+            except BaseException as exc:
+                # Replies may be left unread, so nothing after this can be trusted on this socket.
+                self._drop()
+                if isinstance(exc, (OSError, EOFError, RedisError)):
+                    raise ConnectionError(f"Redis pipeline failed: {exc!r}") from exc
+                raise
+
+
+class FakeRedisBackend:
+    """In-process stand-in implementing the stream commands the warm tier uses.
+
+    ``latency`` adds a simulated round trip per pipeline.
+    """
+
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.streams: Dict[bytes, Tuple[List[Tuple[int, int]], List[List[bytes]]]] = {}
+        self.expiry: Dict[bytes, float] = {}
+        self.pipelines = 0
+        self.commands = 0
+
+    async def connect(self) -> None:
+        return None
+
+    async def close(self) -> None:
+        return None
+
+    async def execute(self, commands: Sequence[Sequence[Any]]) -> List[Any]:
+        if not commands:
+            return []
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.pipelines += 1
+        self.commands += len(commands)
+        replies = []
+        for command in commands:
+            args = [arg if isinstance(arg, bytes) else str(arg).encode() for arg in command]
+            handler = getattr(self, f"_cmd_{args[0].decode().lower()}", None)
+            try:
+                if handler is None:
+                    raise RedisError(f"ERR unknown command '{args[0].decode()}'")
+                replies.append(handler(args[1:]))
+            except RedisError as exc:
+                replies.append(exc)
+        return replies
+
+    def _stream(self, key: bytes):
+        deadline = self.expiry.get(key)
+        if deadline is not None and deadline <= time.monotonic():
+            self.streams.pop(key, None)
+            self.expiry.pop(key, None)
+        return self.streams.get(key)
+
+    def _cmd_xadd(self, args: List[bytes]) -> bytes:
+        key, rest = args[0], args[1:]
+        maxlen = minid = None
+        while rest[0].upper() in (b"MAXLEN", b"MINID"):
+            option, rest = rest[0].upper(), rest[1:]
+            if rest[0] in (b"~", b"="):
+                rest = rest[1:]
+            if option == b"MAXLEN":
+                maxlen = int(rest[0])
+            else:
+                minid = int(rest[0].split(b"-")[0])
+            rest = rest[1:]
+        stream = self._stream(key)
+        if stream is None:
+            stream = self.streams[key] = ([], [])
+        ids, values = stream
+        ms = time.time_ns() // 1_000_000
+        last = ids[-1] if ids else (0, -1)
+        entry_id = (ms, 0) if ms > last[0] else (last[0], last[1] + 1)
+        ids.append(entry_id)
+        values.append(rest[1:])
+        if maxlen is not None and len(ids) > maxlen:
+            del ids[: len(ids) - maxlen], values[: len(values) - maxlen]
+        if minid is not None:
+            cut = bisect_left(ids, (minid, 0))
+            del ids[:cut], values[:cut]
+        return b"%d-%d" % entry_id
+
+    def _cmd_xrange(self, args: List[bytes]) -> List:
+        stream = self._stream(args[0])
+        if stream is None:
+            return []
+        ids, values = stream
+        start, end = _parse_range_bound(args[1], 0), _parse_range_bound(args[2], 1 << 62)
+        count = int(args[4]) if len(args) >= 5 and args[3].upper() == b"COUNT" else None
+        lo = bisect_left(ids, (start, 0))
+        hi = bisect_right(ids, (end, 1 << 62))
+        if count is not None:
+            hi = min(hi, lo + count)
+        return [[b"%d-%d" % ids[idx], values[idx]] for idx in range(lo, hi)]
+
+    def _cmd_xlen(self, args: List[bytes]) -> int:
+        stream = self._stream(args[0])
+        return 0 if stream is None else len(stream[0])
+
+    def _cmd_expire(self, args: List[bytes]) -> int:
+        if self._stream(args[0]) is None:
+            return 0
+        self.expiry[args[0]] = time.monotonic() + int(args[1])
+        return 1
+
+    def _cmd_del(self, args: List[bytes]) -> int:
+        removed = 0
+        for key in args:
+            removed += self.streams.pop(key, None) is not None
+            self.expiry.pop(key, None)
+        return removed
+
+
+def _parse_range_bound(value: bytes, default: int) -> int:
+    if value in (b"-", b"+"):
+        return default
+    return int(value.split(b"-")[0])
+
+
+def backend_from_url(url: str):
+    """``redis://[:password@]host[:port][/db]`` or ``memory://`` for the in-process fake."""
+    parsed = urlparse(url)
+    if parsed.scheme == "memory":
+        return FakeRedisBackend()
+    if parsed.scheme != "redis":
+        raise ValueError(f"Unsupported warm storage URL: {url}")
+    db = int(parsed.path.lstrip("/") or 0)
+    return RedisProtocolBackend(parsed.hostname or "127.0.0.1", parsed.port or 6379, db, parsed.password)
+
+
+def encode_features(ts_ns: int, snapshot: Any, latency_ms: Optional[float]) -> bytes:
+    return _FEATURE_STRUCT.pack(
+        ts_ns,
+        float(snapshot.ofi),
+        float(snapshot.wmp),
+        float(snapshot.liquidity_vacuum),
+        float(snapshot.bid_pressure),
+        float(snapshot.ask_pressure),
+        math.nan if latency_ms is None else float(latency_ms),
+    )
+
+
+def decode_features(value: bytes) -> Dict[str, Any]:
+    ts_ns, ofi, wmp, vacuum, bid_pressure, ask_pressure, latency_ms = _FEATURE_STRUCT.unpack(value)
+    return {
+        "ts_ns": ts_ns,
+        "ofi": ofi,
+        "wmp": wmp,
+        "liquidity_vacuum": vacuum,
+        "bid_pressure": bid_pressure,
+        "ask_pressure": ask_pressure,
+        "latency_ms": None if math.isnan(latency_ms) else latency_ms,
+    }
+
+
+def encode_order(ts_ns: int, result: Dict, reason: Optional[str]) -> bytes:
+    # Fixed header plus NUL-separated strings; None and "" both come back as None.
+    if result.get("dry_run"):
+        order = result.get("order") or {}
+        fields = (order.get("side"), order.get("sz"), order.get("px"), None, None, None, None, reason)
+    else:
+        entry = (result.get("data") or [{}])[0]
+        fields = (
+            None,
+            None,
+            None,
+            entry.get("clOrdId"),
+            entry.get("ordId"),
+            entry.get("sCode") or result.get("code"),
+            entry.get("sMsg") or result.get("msg"),
+            reason,
+        )
+    body = "\0".join("" if value is None else str(value) for value in fields).encode()
+    return _ORDER_HEAD.pack(ts_ns, bool(result.get("dry_run"))) + body
+
+
+def decode_order(value: bytes) -> Dict[str, Any]:
+    ts_ns, dry_run = _ORDER_HEAD.unpack_from(value)
+    fields = value[_ORDER_HEAD.size :].decode().split("\0")
+    record: Dict[str, Any] = {"ts_ns": ts_ns, "dry_run": dry_run}
+    for name, field_value in zip(_ORDER_FIELDS, fields):
+        record[name] = field_value or None
+    return record
+
+
+_DECODERS = {FEATURES: decode_features, ORDERS: decode_order}
+
+
+@dataclass
+class WarmStorageMetrics:
+    enqueued: int = 0
+    written: int = 0
+    dropped: int = 0
+    errors: int = 0
+    flushes: int = 0
+    last_flush_ms: float = 0.0
+    max_flush_ms: float = 0.0
+    max_age_ms: int = 0
+
+
+class WarmStorageWriter:
+    """Warm tier: the last ``retention_seconds`` of features/orders per instrument in Redis streams.
+
+    ``write_*`` packs a fixed binary record and appends it to a buffer; a
+    background task ships the buffer as one pipeline of ``XADD`` commands
+    every ``batch_size`` records or ``flush_interval`` seconds. Streams are
+    trimmed with ``MINID ~`` to the retention window (or ``MAXLEN ~`` when
+    ``maxlen`` is set) and expire when an instrument goes quiet. If the
+    backend falls behind, the oldest buffered records beyond
+    ``max_pending`` are dropped rather than blocking the caller.
+    """
+
+    def __init__(
+        self,
+        backend,
+        prefix: str = "okx",
+        batch_size: int = 256,
+        flush_interval: float = 0.05,
+        retention_seconds: int = 3600,
+        maxlen: Optional[int] = None,
+        max_pending: int = 100_000,
+    ) -> None:
+        self.backend = backend
+        self.prefix = prefix
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retention_seconds = retention_seconds
+        self.maxlen = maxlen
+        self.max_pending = max_pending
+        self.metrics = WarmStorageMetrics()
+        self._buffer: List[Tuple[str, bytes, int]] = []
+        self._ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+
+    def key(self, kind: str, instrument: str) -> str:
+        return f"{self.prefix}:{kind}:{instrument}"
+
+    async def start(self) -> None:
+        await self.backend.connect()
+        self._closing = False
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        self._closing = True
+        self._ready.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        await self.backend.close()
+
+    def write_features(
+        self,
+        instrument: str,
+        snapshot: Any,
+        latency_ms: Optional[float] = None,
+        ts_ns: Optional[int] = None,
+    ) -> None:
+        ts_ns = time.time_ns() if ts_ns is None else ts_ns
+        self._append(self.key(FEATURES, instrument), encode_features(ts_ns, snapshot, latency_ms), ts_ns)
+
+    def write_order(
+        self,
+        instrument: str,
+        result: Dict,
+        reason: Optional[str] = None,
+        ts_ns: Optional[int] = None,
+    ) -> None:
+        ts_ns = time.time_ns() if ts_ns is None else ts_ns
+        self._append(self.key(ORDERS, instrument), encode_order(ts_ns, result, reason), ts_ns)
+
+    def write(self, kind: str, instrument: str, payload: Any, ts_ns: Optional[int] = None) -> None:
+        if kind == FEATURES:
+            snapshot, latency_ms = payload
+            self.write_features(instrument, snapshot, latency_ms, ts_ns)
+        elif kind == ORDERS:
+            result, reason = payload
+            self.write_order(instrument, result, reason, ts_ns)
+        else:
+            raise ValueError(f"Unknown warm record kind: {kind}")
+
+    def _append(self, key: str, value: bytes, ts_ns: int) -> None:
+        buffer = self._buffer
+        buffer.append((key, value, ts_ns))
+        self.metrics.enqueued += 1
+        if len(buffer) > self.max_pending:
+            overflow = len(buffer) - self.max_pending
+            del buffer[:overflow]
+            self.metrics.dropped += overflow
+        if len(buffer) >= self.batch_size:
+            self._ready.set()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._ready.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._ready.clear()
+            while self._buffer:
+                await self.flush()
+                if len(self._buffer) < self.batch_size:
+                    break
+            if self._closing and not self._buffer:
+                return
+
+    async def flush(self) -> None:
+        batch = self._buffer[: self.batch_size]
+        if not batch:
+            return
+        del self._buffer[: len(batch)]
+        commands: List[Tuple] = []
+        keys = set()
+        for key, value, ts_ns in batch:
+            if self.maxlen is not None:
+                trim: Tuple = ("MAXLEN", "~", self.maxlen)
+            else:
+                trim = ("MINID", "~", ts_ns // 1_000_000 - self.retention_seconds * 1000)
+            commands.append(("XADD", key, *trim, "*", "v", value))
+            keys.add(key)
+        commands.extend(("EXPIRE", key, self.retention_seconds) for key in keys)
+        metrics = self.metrics
+        start = time.perf_counter()
+        try:
+            replies = await self.backend.execute(commands)
+        except (OSError, EOFError, asyncio.TimeoutError) as exc:
+            metrics.errors += len(batch)
+            logger.warning("Warm storage flush of %d records failed: %r", len(batch), exc)
+            return
+        elapsed = (time.perf_counter() - start) * 1000
+        # Stream ids are insert times; how far they run ahead of the records' own ts bounds read_range's pad.
+        age_ms = time.time_ns() // 1_000_000 - min(ts_ns for _, _, ts_ns in batch) // 1_000_000
+        if age_ms > metrics.max_age_ms:
+            metrics.max_age_ms = age_ms
+        failed = sum(isinstance(reply, RedisError) for reply in replies[: len(batch)])
+        metrics.errors += failed
+        metrics.written += len(batch) - failed
+        metrics.flushes += 1
+        metrics.last_flush_ms = elapsed
+        if elapsed > metrics.max_flush_ms:
+            metrics.max_flush_ms = elapsed
+
+    async def read_range(
+        self,
+        kind: str,
+        instrument: str,
+        start_ns: Optional[int] = None,
+        end_ns: Optional[int] = None,
+        count: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Decoded records with ``start_ns <= ts_ns <= end_ns``, oldest first."""
+        # Stream ids carry the server's insert time, which trails a record's own ts by up to the longest
+        # time anything sat in the buffer (plus clock skew): pad the id range by that and filter on ts.
+        pad_ms = max(1000, int(self.flush_interval * 1000) * 4)
+        start = "-" if start_ns is None else max(0, start_ns // 1_000_000 - pad_ms)
+        end = "+" if end_ns is None else end_ns // 1_000_000 + pad_ms + self.metrics.max_age_ms
+        command: Tuple = ("XRANGE", self.key(kind, instrument), start, end)
+        reply = (await self.backend.execute([command]))[0]
+        if isinstance(reply, RedisError):
+            raise reply
+        decode = _DECODERS[kind]
+        records = []
+        for _, fields in reply or ():
+            values = dict(zip(fields[::2], fields[1::2]))
+            record = decode(values[b"v"])
+            ts_ns = record["ts_ns"]
+            if (start_ns is None or ts_ns >= start_ns) and (end_ns is None or ts_ns <= end_ns):
+                records.append(record)
+        records.sort(key=lambda record: record["ts_ns"])
+        return records if count is None else records[:count]
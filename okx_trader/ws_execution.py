@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import time
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+
+from .execution import OkxRestClient, OrderRequest, amend_payload, order_ref
+from .utils import Backoff, json_dumps, json_loads
+
+logger = logging.getLogger(__name__)
+
+PRIVATE_WS_URL = "wss://ws.okx.com:8443/ws/v5/private"
+
+
+def login_args(client: OkxRestClient) -> Dict[str, str]:
+    timestamp = str(int(time.time()))
+    return {
+        "apiKey": client.api_key,
+        "passphrase": client.passphrase,
+        "timestamp": timestamp,
+        "sign": client._sign(timestamp, "GET", "/users/self/verify", ""),
+    }
+
+
+class OkxWsTradeClient:
+    """Order entry over the OKX private WebSocket.
+
+    Requests are tagged with an ``id`` and resolved by the reader task when
+    the matching response arrives. A dropped socket fails every pending
+    request with ``ConnectionError`` so callers can fall back to REST, and
+    is reopened (and logged in again) with jittered backoff until ``close``.
+    """
+
+    def __init__(
+        self,
+        rest_client: OkxRestClient,
+        url: str = PRIVATE_WS_URL,
+        proxy: str | None = None,
+        request_timeout: float = 5.0,
+        reconnect_delay: float = 1.0,
+        max_reconnect_delay: float = 30.0,
+    ) -> None:
+        self.rest_client = rest_client
+        self.url = url
+        self.proxy = proxy
+        self.request_timeout = request_timeout
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.reconnects = 0
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._ws: Optional[aiohttp.ClientWebSocketResponse] = None
+        self._reader: Optional[asyncio.Task] = None
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._ids = itertools.count(1)
+        self._reconnector: Optional[asyncio.Task] = None
+        self._closing = False
+
+    @property
+    def connected(self) -> bool:
+        return self._ws is not None and not self._ws.closed
+
+    async def connect(self) -> None:
+        self._closing = False
+        await self._open()
+
+    async def _open(self) -> None:
+        if self._session is None:
+            self._session = aiohttp.ClientSession()
+        self._ws = await self._session.ws_connect(self.url, heartbeat=20, proxy=self.proxy)
+        await self._ws.send_str(json_dumps({"op": "login", "args": [login_args(self.rest_client)]}))
+        response = await asyncio.wait_for(self._ws.receive_json(loads=json_loads), self.request_timeout)
+        if response.get("event") != "login" or response.get("code") != "0":
+            await self._ws.close()
+            raise RuntimeError(f"WebSocket login failed: {response.get('msg')}")
+        self._reader = asyncio.create_task(self._read())
+
+    async def _reconnect(self) -> None:
+        backoff = Backoff(self.reconnect_delay, self.max_reconnect_delay)
+        while not self._closing:
+            delay = backoff.next()
+            logger.warning("Private WebSocket trade channel closed; reconnecting in %.2fs.", delay)
+            await asyncio.sleep(delay)
+            try:
+                await self._open()
+            except (aiohttp.ClientError, asyncio.TimeoutError, OSError, RuntimeError) as exc:
+                logger.warning("Private WebSocket reconnect failed: %r.", exc)
+                continue
+            self.reconnects += 1
+            return
+
+    async def close(self) -> None:
+        self._closing = True
+        if self._reconnector is not None:
+            self._reconnector.cancel()
+            await asyncio.gather(self._reconnector, return_exceptions=True)
+            self._reconnector = None
+        if self._ws is not None:
+            await self._ws.close()
+        if self._reader is not None:
+            await asyncio.gather(self._reader, return_exceptions=True)
+            self._reader = None
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _read(self) -> None:
+        try:
+            async for msg in self._ws:
+                if msg.type == aiohttp.WSMsgType.TEXT:
+                    data = json_loads(msg.data)
+                    future = self._pending.pop(data.get("id", ""), None)
+                    if future is not None and not future.done():
+                        future.set_result(data)
+                    elif data.get("event") == "error":
+                        logger.warning("Private WebSocket error: %s", data.get("msg"))
+                elif msg.type == aiohttp.WSMsgType.ERROR:
+                    break
+        finally:
+            pending, self._pending = self._pending, {}
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Private WebSocket closed"))
+            if not self._closing:
+                self._reconnector = asyncio.create_task(self._reconnect())
+
+    async def _call(self, op: str, args: List[Dict[str, Any]]) -> Dict:
+        if not self.connected:
+            raise ConnectionError("Private WebSocket not connected")
+        request_id = str(next(self._ids))
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            await self._ws.send_str(json_dumps({"id": request_id, "op": op, "args": args}))
+            return await asyncio.wait_for(future, self.request_timeout)
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def place_order(self, order: OrderRequest) -> Dict:
+        return await self._call("order", [order.to_payload()])
+
+    async def place_batch_orders(self, orders: List[OrderRequest]) -> Dict:
+        return await self._call("batch-orders", [order.to_payload() for order in orders])
+
+    async def amend_order(
+        self,
+        instrument_id: str,
+        order_id: Optional[str],
+        new_price: Optional[Decimal] = None,
+        new_size: Optional[Decimal] = None,
+        client_order_id: Optional[str] = None,
+    ) -> Dict:
+        payload = amend_payload(instrument_id, order_id, new_price, new_size, client_order_id)
+        return await self._call("amend-order", [payload])
+
+    async def cancel_order(
+        self, instrument_id: str, order_id: Optional[str], client_order_id: Optional[str] = None
+    ) -> Dict:
+        return await self._call("cancel-order", [order_ref(instrument_id, order_id, client_order_id)])
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from decimal import Decimal
+from typing import Dict, List, Tuple
+
+from main import build_strategy_params
+from okx_trader import AppConfig, FixedPointCodec
+from okx_trader.backtest import SimulatedFillModel
+from okx_trader.recorder import read_frames
+from okx_trader.sweep import (
+    BookHistory,
+    SweepSettings,
+    build_history,
+    format_table,
+    grid,
+    infer_codecs,
+    random_search,
+    run_sweep,
+)
+
+
+def _parse_axes(specs: List[str]) -> Dict[str, List[str]]:
+    # name=v1,v2,...
+    axes = {}
+    for spec in specs:
+        name, _, values = spec.partition("=")
+        axes[name.strip()] = [value.strip() for value in values.split(",") if value.strip()]
+    return axes
+
+
+def _parse_ranges(specs: List[str]) -> Dict[str, Tuple[str, str]]:
+    # name=low:high
+    ranges = {}
+    for spec in specs:
+        name, _, bounds = spec.partition("=")
+        low, _, high = bounds.partition(":")
+        ranges[name.strip()] = (low, high)
+    return ranges
+
+
+async def _prepare_history(args: argparse.Namespace, config: AppConfig, directory: str) -> BookHistory:
+    if BookHistory.exists(directory):
+        return BookHistory(directory)
+    if args.tick_size and args.lot_size:
+        codec = FixedPointCodec(tick_size=Decimal(args.tick_size), lot_size=Decimal(args.lot_size))
+        codecs = {instrument_id: codec for instrument_id in config.instruments}
+    else:
+        codecs = infer_codecs(read_frames(args.recordings), config.instruments)
+    start = time.perf_counter()
+    history = await build_history(
+        read_frames(args.recordings), directory, codecs, validate_checksum=not args.no_checksum
+    )
+    elapsed = time.perf_counter() - start
+    print(f"Decoded {history.rows:,} ticks for {', '.join(history.instruments)} in {elapsed:.1f} s.")
+    return history
+
+
+def run(args: argparse.Namespace) -> None:
+    config = AppConfig.from_env()
+    base = build_strategy_params(config)
+    if args.random:
+        param_sets = random_search(_parse_ranges(args.range), args.random, seed=args.seed, base=base)
+    else:
+        param_sets = grid(_parse_axes(args.grid), base=base)
+    settings = SweepSettings(
+        enable_liquidation_hunting=config.enable_liquidation_hunting,
+        enable_funding_arbitrage=config.enable_funding_arbitrage,
+        enable_market_making=config.enable_market_making,
+        max_latency_ms=config.max_latency_ms,
+        max_position_size=config.max_position_size,
+        max_daily_loss=config.max_daily_loss,
+        fill_model=SimulatedFillModel(
+            latency_ns=int(args.latency_ms * 1_000_000),
+            order_ttl_ns=int(args.order_ttl_ms * 1_000_000),
+        ),
+    )
+    with tempfile.TemporaryDirectory() as scratch:
+        directory = args.history or os.path.join(scratch, "history")
+        history = asyncio.run(_prepare_history(args, config, directory))
+        rows = history.rows
+        history.close()
+        start = time.perf_counter()
+        results = run_sweep(directory, param_sets, settings, workers=args.workers, sort_by=args.sort)
+        elapsed = time.perf_counter() - start
+    print(f"Evaluated {len(results)} parameter sets over {rows:,} ticks in {elapsed:.1f} s.")
+    print(format_table(results, args.top))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sweep StrategyEngine parameters over recorded books-l2-tbt frames.")
+    parser.add_argument("recordings", nargs="+", help="recording files, globs or directories (RECORD_DIR output)")
+    parser.add_argument("--grid", action="append", default=[], metavar="NAME=V1,V2", help="grid axis (repeatable)")
+    parser.add_argument("--random", type=int, default=0, metavar="N", help="draw N random sets from --range instead")
+    parser.add_argument("--range", action="append", default=[], metavar="NAME=LOW:HIGH", help="random search range")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--sort", default="pnl", choices=["pnl", "fills", "maker_fills", "fees"])
+    parser.add_argument("--top", type=int, default=20, help="rows to print")
+    parser.add_argument("--history", help="keep the decoded tick history here and reuse it on later runs")
+    parser.add_argument("--tick-size", help="price scale for the decoded history (default: inferred)")
+    parser.add_argument("--lot-size", help="size scale for the decoded history (default: inferred)")
+    parser.add_argument("--latency-ms", type=float, default=5, help="order entry latency of the fill model")
+    parser.add_argument("--order-ttl-ms", type=float, default=1000, help="resting order lifetime")
+    parser.add_argument("--no-checksum", action="store_true", help="skip per-frame checksum validation")
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
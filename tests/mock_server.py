@@ -0,0 +1,634 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import random
+import time
+from collections import deque
+from decimal import Decimal
+from typing import Deque, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from aiohttp import WSMsgType, web
+
+from okx_trader.orderbook import OrderBook
+from okx_trader.rate_limit import ACCOUNT, BATCH_ORDERS_PATH, CANCEL_PATH, ORDER_PATH, RATE_LIMITED_CODE, RateLimit
+
+Level = Sequence[str]
+
+
+def build_book_frames(
+    instrument_id: str,
+    snapshot: Tuple[List[Level], List[Level]],
+    updates: Iterable[Tuple[List[Level], List[Level]]],
+    ts_start: int = 1_700_000_000_000,
+) -> List[Dict]:
+    """Turn a snapshot plus deltas into books-l2-tbt frames with valid seqId/checksum."""
+    reference = OrderBook(instrument_id)
+    arg = {"channel": "books-l2-tbt", "instId": instrument_id}
+    bids, asks = snapshot
+    reference.apply_snapshot(bids, asks)
+    frames = [
+        {
+            "arg": arg,
+            "action": "snapshot",
+            "data": [
+                {
+                    "bids": bids,
+                    "asks": asks,
+                    "ts": str(ts_start),
+                    "checksum": reference.checksum(),
+                    "seqId": 1,
+                    "prevSeqId": -1,
+                }
+            ],
+        }
+    ]
+    for seq_id, (bids, asks) in enumerate(updates, start=2):
+        reference.apply_update(bids, asks)
+        frames.append(
+            {
+                "arg": arg,
+                "action": "update",
+                "data": [
+                    {
+                        "bids": bids,
+                        "asks": asks,
+                        "ts": str(ts_start + seq_id),
+                        "checksum": reference.checksum(),
+                        "seqId": seq_id,
+                        "prevSeqId": seq_id - 1,
+                    }
+                ],
+            }
+        )
+    return frames
+
+
+class _SlidingWindowCounter:
+    """The exchange's side of ``RateLimit``: units seen per key over the trailing ``window``.
+
+    Kept independent of ``RateLimiter``/``TokenBucket`` so the scheduler is
+    checked against a second implementation rather than against itself.
+    """
+
+    def __init__(self, limits: Dict[str, RateLimit], clock=time.monotonic) -> None:
+        self.limits = limits
+        self.clock = clock
+        self._hits: Dict[Tuple[str, str], Deque[Tuple[float, int]]] = {}
+
+    def _used(self, key: Tuple[str, str], window: float, now: float) -> int:
+        hits = self._hits.setdefault(key, deque())
+        while hits and hits[0][0] <= now - window:
+            hits.popleft()
+        return sum(units for _, units in hits)
+
+    def admit(self, paths: Sequence[str], counts: Dict[str, int]) -> bool:
+        """Count the request against every limit on ``paths`` if none would go over; else count nothing."""
+        now = self.clock()
+        charges = []
+        for path in paths:
+            limit = self.limits.get(path)
+            if limit is None:
+                continue
+            if limit.per_instrument:
+                for instrument_id, orders in counts.items():
+                    charges.append(((path, instrument_id), limit, orders if limit.per_order else 1))
+            else:
+                charges.append(((path, ""), limit, sum(counts.values()) if limit.per_order else 1))
+        if any(self._used(key, limit.window, now) + units > limit.requests for key, limit, units in charges):
+            return False
+        for key, _, units in charges:
+            self._hits[key].append((now, units))
+        return True
+
+
+class _Replay:
+    def __init__(self, instrument_id: str, frames: List[Dict]) -> None:
+        self.instrument_id = instrument_id
+        self.frames = frames
+        self.position = 0
+        self.book = OrderBook(instrument_id)
+        self.seq_id: Optional[int] = None
+        self.task: Optional[asyncio.Task] = None
+
+    def advance(self, frame: Dict) -> None:
+        payload = frame["data"][0]
+        if frame.get("action") == "snapshot":
+            self.book.apply_snapshot(payload["bids"], payload["asks"])
+        else:
+            self.book.apply_update(payload["bids"], payload["asks"])
+        self.seq_id = payload.get("seqId")
+        self.position += 1
+
+    def levels(self, limit: Optional[int] = None) -> Tuple[List[List[str]], List[List[str]]]:
+        bids, asks = self.book.top_levels(limit)
+        return (
+            [[str(price), str(size), "0", "1"] for price, size in bids],
+            [[str(price), str(size), "0", "1"] for price, size in asks],
+        )
+
+    def snapshot_frame(self) -> Dict:
+        bids, asks = self.levels()
+        return {
+            "arg": {"channel": "books-l2-tbt", "instId": self.instrument_id},
+            "action": "snapshot",
+            "data": [
+                {
+                    "bids": bids,
+                    "asks": asks,
+                    "checksum": self.book.checksum(),
+                    "seqId": self.seq_id,
+                    "prevSeqId": -1,
+                }
+            ],
+        }
+
+
+class MockOkxServer:
+    """Local stand-in for the OKX public WebSocket and REST API.
+
+    Each subscribed instId gets its frames replayed in order. A resubscribe
+    (the streamer's resync) is answered with a snapshot of the book as
+    replayed so far, then the replay carries on. ``drop_every`` skips every
+    Nth update to exercise gap detection. REST and private-WebSocket order
+    endpoints accept everything and answer with sequential ordIds;
+    ``ws_unresponsive`` makes the private socket swallow order requests so
+    REST fallback can be exercised, and ``ws_ack_lost`` makes it book them
+    without answering (the order exists; only the ack is lost). With ``rate_limits`` (e.g.
+    ``OKX_RATE_LIMITS``) the REST order endpoints answer HTTP 429 / code
+    50011 once a sliding-window count over a limit's ``window`` would
+    exceed it, as OKX does.
+
+    Accepted orders are kept as account state: private sockets that
+    subscribe to ``orders``/``positions``/``account`` get pushes for every
+    new, amended, cancelled and filled order (``fill_order``), and the REST
+    ``orders-pending``/``order``/``fills``/``positions``/``balance`` queries
+    answer from the same state. ``drop_private`` closes the private sockets
+    so reconnect reconciliation can be exercised (``private_available =
+    False`` refuses new ones until reset); fills made meanwhile are only
+    visible over REST. Setting ``order_query_code`` makes every
+    ``order`` query fail with that code (e.g. ``50011``) and no data.
+
+    With ``live_interval`` the public feed is a shared live stream instead
+    of a per-connection replay: one frame per instrument every
+    ``live_interval`` seconds goes to every subscribed socket, a
+    (re)subscribe starts with a snapshot of the current book, and each
+    socket independently stalls for ``stall_ms`` with ``stall_probability``
+    per frame. ``published_ns`` holds the publish time of every
+    ``(instId, seqId)``, ``drop_public`` closes the public sockets, and
+    ``/api/v5/market/books`` answers from the live book.
+    """
+
+    def __init__(
+        self,
+        frames: Optional[Dict[str, List[Dict]]] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        close_after_replay: bool = True,
+        drop_every: int = 0,
+        ws_unresponsive: bool = False,
+        ws_ack_lost: bool = False,
+        rate_limits: Optional[Dict[str, RateLimit]] = None,
+        live_interval: float = 0.0,
+        stall_probability: float = 0.0,
+        stall_ms: float = 0.0,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.frames: Dict[str, List[Dict]] = frames or {}
+        self.host = host
+        self.port = port
+        self.close_after_replay = close_after_replay
+        self.drop_every = drop_every
+        self.ws_unresponsive = ws_unresponsive
+        self.ws_ack_lost = ws_ack_lost
+        self.connections = 0
+        self.requests: List[Dict] = []
+        self.frames_sent = 0
+        self.rest_orders: List[Dict] = []
+        self.ws_orders: List[Dict] = []
+        self.rest_requests = 0
+        self.rate_limited = 0
+        self._limiter = _SlidingWindowCounter(rate_limits) if rate_limits else None
+        self.rest_peers: Set[Tuple] = set()
+        self._order_ids = itertools.count(1)
+        self.account_orders: Dict[str, Dict] = {}
+        self.account_positions: Dict[str, Dict] = {}
+        self.account_fills: List[Dict] = []
+        self.private_available = True
+        self.order_query_code: Optional[str] = None
+        self.account_equity = "10000"
+        self._subscribers: Set[web.WebSocketResponse] = set()
+        self._private_sockets: Set[web.WebSocketResponse] = set()
+        self.live_interval = live_interval
+        self.stall_probability = stall_probability
+        self.stall_ms = stall_ms
+        self.published_ns: Dict[Tuple[str, int], int] = {}
+        self._random = random.Random(seed)
+        self._feeds: Dict[str, _Replay] = {}
+        self._listeners: Dict[str, Dict[web.WebSocketResponse, asyncio.Queue]] = {}
+        self._public_sockets: Set[web.WebSocketResponse] = set()
+        self._feed_task: Optional[asyncio.Task] = None
+        self._app = web.Application()
+        self._app.router.add_get("/ws/v5/public", self._public)
+        self._app.router.add_get("/api/v5/public/time", self._time)
+        self._app.router.add_get("/ws/v5/private", self._private)
+        self._app.router.add_post("/api/v5/trade/order", self._rest_order)
+        self._app.router.add_post("/api/v5/trade/batch-orders", self._rest_order)
+        self._app.router.add_post("/api/v5/trade/amend-order", self._rest_order)
+        self._app.router.add_post("/api/v5/trade/cancel-order", self._rest_order)
+        self._app.router.add_get("/api/v5/trade/orders-pending", self._orders_pending)
+        self._app.router.add_get("/api/v5/trade/order", self._order_query)
+        self._app.router.add_get("/api/v5/trade/fills", self._fills)
+        self._app.router.add_get("/api/v5/account/positions", self._positions)
+        self._app.router.add_get("/api/v5/account/balance", self._balance)
+        self._app.router.add_get("/api/v5/market/books", self._market_books)
+        self._runner: Optional[web.AppRunner] = None
+
+    @property
+    def public_url(self) -> str:
+        return f"ws://{self.host}:{self.port}/ws/v5/public"
+
+    @property
+    def private_url(self) -> str:
+        return f"ws://{self.host}:{self.port}/ws/v5/private"
+
+    @property
+    def rest_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self) -> "MockOkxServer":
+        self._runner = web.AppRunner(self._app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        return self
+
+    async def close(self) -> None:
+        if self._feed_task is not None:
+            self._feed_task.cancel()
+            await asyncio.gather(self._feed_task, return_exceptions=True)
+            self._feed_task = None
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> "MockOkxServer":
+        return await self.start()
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    def _track(self, request: web.Request) -> None:
+        self.rest_requests += 1
+        self.rest_peers.add(request.transport.get_extra_info("peername"))
+
+    async def _time(self, request: web.Request) -> web.Response:
+        self._track(request)
+        return web.json_response({"code": "0", "msg": "", "data": [{"ts": str(int(time.time() * 1000))}]})
+
+    def _ack(self, args: List[Dict]) -> List[Dict]:
+        return [
+            {
+                "ordId": arg.get("ordId") or str(next(self._order_ids)),
+                "clOrdId": arg.get("clOrdId", ""),
+                "sCode": "0",
+                "sMsg": "",
+            }
+            for arg in args
+        ]
+
+    def _book(self, op: str, args: List[Dict], acks: List[Dict]) -> List[Dict]:
+        """Apply accepted order requests to the account state; returns the changed orders."""
+        changed = []
+        now = str(int(time.time() * 1000))
+        for arg, ack in zip(args, acks):
+            if op in ("order", "batch-orders"):
+                order = {
+                    "instId": arg.get("instId", ""),
+                    "ordId": ack["ordId"],
+                    "clOrdId": arg.get("clOrdId", ""),
+                    "side": arg.get("side", ""),
+                    "px": arg.get("px", ""),
+                    "sz": arg.get("sz", "0"),
+                    "state": "live",
+                    "accFillSz": "0",
+                    "avgPx": "",
+                    "fee": "0",
+                    "uTime": now,
+                }
+                self.account_orders[order["ordId"]] = order
+            else:
+                order = self.account_orders.get(arg.get("ordId", ""))
+                if order is None and arg.get("clOrdId"):
+                    order = next((o for o in self.account_orders.values() if o["clOrdId"] == arg["clOrdId"]), None)
+                if order is None or order["state"] not in ("live", "partially_filled"):
+                    continue
+                ack["ordId"] = order["ordId"]
+                if op == "cancel-order":
+                    order["state"] = "canceled"
+                else:
+                    order["px"] = arg.get("newPx", order["px"])
+                    order["sz"] = arg.get("newSz", order["sz"])
+                order["uTime"] = now
+            changed.append(dict(order))
+        return changed
+
+    async def _push(self, channel: str, data: List[Dict]) -> None:
+        message = json.dumps({"arg": {"channel": channel, "instType": "ANY"}, "data": data})
+        for ws in list(self._subscribers):
+            if not ws.closed:
+                await ws.send_str(message)
+
+    async def fill_order(
+        self, order_id: str, size: Optional[str] = None, price: Optional[str] = None, fee_rate: str = "0.0002"
+    ) -> Dict:
+        """Fill ``size`` (default: the rest) of a working order at ``price`` (default: its limit) and push it."""
+        order = self.account_orders[order_id]
+        remaining = Decimal(order["sz"]) - Decimal(order["accFillSz"])
+        fill_size = min(Decimal(size) if size else remaining, remaining)
+        fill_price = Decimal(price or order["px"])
+        filled = Decimal(order["accFillSz"]) + fill_size
+        avg = Decimal(order["avgPx"] or "0")
+        fee = -(fill_price * fill_size * Decimal(fee_rate))
+        order.update(
+            accFillSz=str(filled),
+            avgPx=str((avg * Decimal(order["accFillSz"]) + fill_price * fill_size) / filled),
+            fee=str(Decimal(order["fee"]) + fee),
+            fillSz=str(fill_size),
+            fillPx=str(fill_price),
+            fillFee=str(fee),
+            tradeId=str(next(self._order_ids)),
+            state="filled" if filled >= Decimal(order["sz"]) else "partially_filled",
+            uTime=str(int(time.time() * 1000)),
+        )
+        self.account_fills.append(
+            {
+                "instId": order["instId"],
+                "ordId": order["ordId"],
+                "clOrdId": order["clOrdId"],
+                "billId": str(len(self.account_fills) + 1),
+                "tradeId": order["tradeId"],
+                "side": order["side"],
+                "fillPx": order["fillPx"],
+                "fillSz": order["fillSz"],
+                "fee": order["fillFee"],
+                "ts": order["uTime"],
+            }
+        )
+        position = self._fill_position(order["instId"], order["side"], fill_size, fill_price)
+        await self._push("orders", [dict(order)])
+        await self._push("positions", [dict(position)])
+        return order
+
+    def _fill_position(self, instrument_id: str, side: str, size: Decimal, price: Decimal) -> Dict:
+        position = self.account_positions.setdefault(
+            instrument_id, {"instId": instrument_id, "posSide": "net", "pos": "0", "avgPx": ""}
+        )
+        current = Decimal(position["pos"])
+        avg = Decimal(position["avgPx"] or "0")
+        signed = size if side == "buy" else -size
+        updated = current + signed
+        if not current or (current > 0) == (signed > 0):
+            avg = (avg * abs(current) + price * size) / abs(updated)
+        elif (updated > 0) != (current > 0):
+            avg = price
+        position.update(pos=str(updated), avgPx=str(avg) if updated else "")
+        return position
+
+    async def drop_private(self) -> None:
+        for ws in list(self._private_sockets):
+            await ws.close()
+        self._subscribers.clear()
+
+    async def drop_public(self) -> None:
+        for ws in list(self._public_sockets):
+            await ws.close()
+
+    async def _market_books(self, request: web.Request) -> web.Response:
+        self._track(request)
+        feed = self._feeds.get(request.query.get("instId", ""))
+        if feed is None or feed.seq_id is None:
+            return web.json_response({"code": "51001", "msg": "Instrument ID does not exist", "data": []})
+        bids, asks = feed.levels(int(request.query.get("sz", "1")))
+        data = [{"bids": bids, "asks": asks, "ts": str(int(time.time() * 1000))}]
+        return web.json_response({"code": "0", "msg": "", "data": data})
+
+    async def _orders_pending(self, request: web.Request) -> web.Response:
+        self._track(request)
+        after = int(request.query.get("after") or 1 << 62)
+        pending = [
+            dict(order)
+            for order in reversed(list(self.account_orders.values()))
+            if order["state"] in ("live", "partially_filled") and int(order["ordId"]) < after
+        ]
+        limit = int(request.query.get("limit", "100"))
+        return web.json_response({"code": "0", "msg": "", "data": pending[:limit]})
+
+    async def _order_query(self, request: web.Request) -> web.Response:
+        self._track(request)
+        if self.order_query_code is not None:
+            return web.json_response({"code": self.order_query_code, "msg": "Order query failed", "data": []})
+        order = self.account_orders.get(request.query.get("ordId", ""))
+        client_order_id = request.query.get("clOrdId")
+        if order is None and client_order_id:
+            order = next((item for item in self.account_orders.values() if item["clOrdId"] == client_order_id), None)
+        if order is None:
+            return web.json_response({"code": "51603", "msg": "Order does not exist", "data": []})
+        return web.json_response({"code": "0", "msg": "", "data": [dict(order)]})
+
+    async def _fills(self, request: web.Request) -> web.Response:
+        self._track(request)
+        begin = int(request.query.get("begin") or 0)
+        after = int(request.query.get("after") or 1 << 62)
+        fills = [
+            dict(fill)
+            for fill in reversed(self.account_fills)
+            if int(fill["ts"]) >= begin and int(fill["billId"]) < after
+        ]
+        limit = int(request.query.get("limit", "100"))
+        return web.json_response({"code": "0", "msg": "", "data": fills[:limit]})
+
+    async def _positions(self, request: web.Request) -> web.Response:
+        self._track(request)
+        data = [dict(position) for position in self.account_positions.values() if Decimal(position["pos"])]
+        return web.json_response({"code": "0", "msg": "", "data": data})
+
+    async def _balance(self, request: web.Request) -> web.Response:
+        self._track(request)
+        return web.json_response({"code": "0", "msg": "", "data": [{"totalEq": self.account_equity, "details": []}]})
+
+    async def _rest_order(self, request: web.Request) -> web.Response:
+        self._track(request)
+        body = await request.json()
+        args = body if isinstance(body, list) else [body]
+        if self._limiter is not None:
+            counts: Dict[str, int] = {}
+            for arg in args:
+                counts[arg.get("instId", "")] = counts.get(arg.get("instId", ""), 0) + 1
+            path = request.path
+            if path == BATCH_ORDERS_PATH and len(args) == 1:
+                # OKX charges a one-order batch against the place-order limit.
+                path = ORDER_PATH
+            paths = (path,) if path == CANCEL_PATH else (path, ACCOUNT)
+            if not self._limiter.admit(paths, counts):
+                self.rate_limited += 1
+                return web.json_response({"code": RATE_LIMITED_CODE, "msg": "Too Many Requests", "data": []}, status=429)
+        self.rest_orders.extend(args)
+        acks = self._ack(args)
+        changed = self._book(request.path.rsplit("/", 1)[-1], args, acks)
+        if changed:
+            await self._push("orders", changed)
+        return web.json_response({"code": "0", "msg": "", "data": acks})
+
+    async def _private(self, request: web.Request) -> web.StreamResponse:
+        if not self.private_available:
+            return web.Response(status=503)
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self._private_sockets.add(ws)
+        async for msg in ws:
+            if msg.type != WSMsgType.TEXT:
+                continue
+            payload = json.loads(msg.data)
+            op = payload.get("op")
+            if op == "login":
+                await ws.send_str(json.dumps({"event": "login", "code": "0", "msg": "", "connId": "mock"}))
+                continue
+            args = payload.get("args", [])
+            if op == "subscribe":
+                self._subscribers.add(ws)
+                for arg in args:
+                    await ws.send_str(json.dumps({"event": "subscribe", "arg": arg, "connId": "mock"}))
+                continue
+            self.ws_orders.extend(args)
+            if self.ws_unresponsive:
+                continue
+            acks = self._ack(args)
+            if not self.ws_ack_lost:
+                await ws.send_str(json.dumps({"id": payload.get("id"), "op": op, "code": "0", "msg": "", "data": acks}))
+            changed = self._book(op, args, acks)
+            if changed:
+                await self._push("orders", changed)
+        self._subscribers.discard(ws)
+        self._private_sockets.discard(ws)
+        return ws
+
+    async def _public(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.connections += 1
+        if self.live_interval:
+            return await self._public_live(ws)
+        replays: Dict[str, _Replay] = {}
+        async for msg in ws:
+            if msg.type != WSMsgType.TEXT:
+                continue
+            payload = json.loads(msg.data)
+            self.requests.append(payload)
+            op = payload.get("op")
+            for arg in payload.get("args", []):
+                await ws.send_str(json.dumps({"event": op, "arg": arg, "connId": "mock"}))
+                instrument_id = arg.get("instId")
+                replay = replays.get(instrument_id)
+                if op == "unsubscribe" and replay and replay.task:
+                    replay.task.cancel()
+                elif op == "subscribe":
+                    if replay is None:
+                        replay = replays[instrument_id] = _Replay(instrument_id, self.frames.get(instrument_id, []))
+                        replay.task = asyncio.create_task(self._replay(ws, replays, replay, resume=False))
+                    else:
+                        replay.task = asyncio.create_task(self._replay(ws, replays, replay, resume=True))
+        for replay in replays.values():
+            if replay.task:
+                replay.task.cancel()
+        return ws
+
+    async def _replay(self, ws: web.WebSocketResponse, replays: Dict[str, _Replay], replay: _Replay, resume: bool) -> None:
+        if resume:
+            await ws.send_str(json.dumps(replay.snapshot_frame()))
+        frames = replay.frames
+        while replay.position < len(frames):
+            if ws.closed:
+                return
+            frame = frames[replay.position]
+            replay.advance(frame)
+            if self.drop_every and replay.position % self.drop_every == 0 and frame.get("action") != "snapshot":
+                continue
+            await ws.send_str(json.dumps(frame))
+            self.frames_sent += 1
+            if replay.position % 64 == 0:
+                await asyncio.sleep(0)
+        if self.close_after_replay and all(item.position >= len(item.frames) for item in replays.values()):
+            # Give a pending resubscribe a chance to arrive before hanging up.
+            await asyncio.sleep(0.05)
+            if all(item.task is None or item.task.done() or item.task is asyncio.current_task() for item in replays.values()):
+                await ws.close()
+
+    def _ensure_feed(self) -> None:
+        if self._feed_task is not None:
+            return
+        for instrument_id, frames in self.frames.items():
+            feed = self._feeds[instrument_id] = _Replay(instrument_id, frames)
+            if frames:
+                feed.advance(frames[0])
+        self._feed_task = asyncio.create_task(self._run_feed())
+
+    async def _run_feed(self) -> None:
+        feeds = list(self._feeds.values())
+        while any(feed.position < len(feed.frames) for feed in feeds):
+            await asyncio.sleep(self.live_interval)
+            for feed in feeds:
+                if feed.position >= len(feed.frames):
+                    continue
+                frame = feed.frames[feed.position]
+                feed.advance(frame)
+                self.published_ns[(feed.instrument_id, feed.seq_id)] = time.perf_counter_ns()
+                raw = json.dumps(frame)
+                for queue in self._listeners.get(feed.instrument_id, {}).values():
+                    queue.put_nowait(raw)
+
+    async def _public_live(self, ws: web.WebSocketResponse) -> web.WebSocketResponse:
+        self._ensure_feed()
+        self._public_sockets.add(ws)
+        outbox: asyncio.Queue = asyncio.Queue()
+        sender = asyncio.create_task(self._send_live(ws, outbox))
+        subscribed: Set[str] = set()
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                payload = json.loads(msg.data)
+                self.requests.append(payload)
+                op = payload.get("op")
+                for arg in payload.get("args", []):
+                    instrument_id = arg.get("instId")
+                    outbox.put_nowait(json.dumps({"event": op, "arg": arg, "connId": "mock"}))
+                    listeners = self._listeners.setdefault(instrument_id, {})
+                    if op == "unsubscribe":
+                        listeners.pop(ws, None)
+                        subscribed.discard(instrument_id)
+                    elif op == "subscribe" and instrument_id in self._feeds:
+                        # Queued in the same step as the registration: the snapshot precedes every update.
+                        outbox.put_nowait(json.dumps(self._feeds[instrument_id].snapshot_frame()))
+                        listeners[ws] = outbox
+                        subscribed.add(instrument_id)
+        finally:
+            for instrument_id in subscribed:
+                self._listeners[instrument_id].pop(ws, None)
+            self._public_sockets.discard(ws)
+            sender.cancel()
+        return ws
+
+    async def _send_live(self, ws: web.WebSocketResponse, outbox: asyncio.Queue) -> None:
+        rng = self._random
+        while not ws.closed:
+            raw = await outbox.get()
+            if self.stall_probability and rng.random() < self.stall_probability:
+                await asyncio.sleep(self.stall_ms / 1000)
+            try:
+                await ws.send_str(raw)
+            except ConnectionResetError:
+                return
+            self.frames_sent += 1
@@ -0,0 +1,18 @@
+"""A strategy registered on import, for loading by ``module:name``."""
+
+from __future__ import annotations
+
+from typing import List
+
+from okx_trader.strategies import EVERY_TICK, OrderSignal, Strategy, StrategyUnits, TickContext, register_strategy
+
+
+@register_strategy("echo_bid")
+class EchoBid(Strategy):
+    triggers = (EVERY_TICK,)
+
+    def __init__(self, units: StrategyUnits) -> None:
+        self.units = units
+
+    def on_tick(self, context: TickContext, signals: List[OrderSignal]) -> None:
+        signals.append(OrderSignal("buy", self.units.liquidation_size, context.bid_price, "echo_bid"))
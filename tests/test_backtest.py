@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from decimal import Decimal
+from typing import List
+
+from benchmarks.synthetic import make_snapshot, make_updates
+from okx_trader.backtest import BacktestExecutionEngine, SimulatedFillModel
+from okx_trader.execution import OrderRequest
+from okx_trader.fixed_point import FixedPointCodec
+from okx_trader.orderbook import OrderBook
+from okx_trader.recorder import FrameRecorder, read_frames, recording_files
+from okx_trader.replay import ReplayClock, ReplayDriver
+from tests.mock_server import build_book_frames
+
+INSTRUMENT = "BTC-USDT"
+START_NS = 1_700_000_000_000_000_000
+MS = 1_000_000
+
+
+def test_recorded_frames_replay_to_the_same_book(tmp_path):
+    snapshot = make_snapshot(50)
+    updates = list(make_updates(400, 50))
+    frames = [json.dumps(frame) for frame in build_book_frames(INSTRUMENT, snapshot, updates)]
+    recorder = FrameRecorder(str(tmp_path), rotate_seconds=1)
+    recorder.start()
+    # 10 ms apart: the recording spans several one-second files.
+    for idx, frame in enumerate(frames):
+        recorder.record(frame, START_NS + idx * 10 * MS)
+    recorder.stop()
+    assert recorder.metrics.frames == len(frames)
+    assert len(recording_files(str(tmp_path))) == recorder.metrics.files > 1
+
+    recorded = list(read_frames(str(tmp_path)))
+    assert recorded == [(START_NS + idx * 10 * MS, frame.encode()) for idx, frame in enumerate(frames)]
+
+    clock = ReplayClock()
+    seen: List[int] = []
+
+    async def handler(orderbook, message) -> None:
+        seen.append(clock())
+
+    driver = ReplayDriver([INSTRUMENT], clock=clock)
+    stats = asyncio.run(driver.run(recorded, handler))
+    assert (stats.frames, stats.applied, stats.rejected) == (len(frames), len(frames), 0)
+    assert seen == [recv_ns for recv_ns, _ in recorded]
+    reference = OrderBook(INSTRUMENT)
+    reference.apply_snapshot(*snapshot)
+    for bids, asks in updates:
+        reference.apply_update(bids, asks)
+    book = driver.books[INSTRUMENT]
+    assert list(book.bids.top_levels()) == list(reference.bids.top_levels())
+    assert list(book.asks.top_levels()) == list(reference.asks.top_levels())
+
+
+def _book(bid: str, ask: str, codec=None) -> OrderBook:
+    book = OrderBook(INSTRUMENT, codec=codec)
+    book.apply_snapshot([[bid, "1", "0", "1"]], [[ask, "1", "0", "1"]])
+    return book
+
+
+def _engine(**model) -> tuple:
+    clock = ReplayClock(START_NS)
+    engine = BacktestExecutionEngine(clock, SimulatedFillModel(latency_ns=5 * MS, order_ttl_ns=100 * MS, **model))
+    updates: List[dict] = []
+    engine.order_listeners.append(updates.append)
+    return clock, engine, updates
+
+
+def _order(side: str, price: str, size: str = "2") -> OrderRequest:
+    return OrderRequest(INSTRUMENT, side, Decimal(size), Decimal(price))
+
+
+def test_replay_clock_reads_the_frame_time():
+    clock = ReplayClock(5)
+    assert clock() == 5
+    clock.now_ns = 7
+    assert clock() == 7
+
+
+def test_marketable_order_fills_as_taker_at_the_opposite_best_after_the_latency():
+    clock, engine, updates = _engine()
+    assert engine.submit(_order("buy", "102"))["sCode"] == "0"
+    clock.now_ns = START_NS + 4 * MS
+    engine.on_book(_book("100", "101"))
+    assert engine.fills == []
+    clock.now_ns = START_NS + 5 * MS
+    engine.on_book(_book("100", "101"))
+    (fill,) = engine.fills
+    assert (fill.price, fill.size, fill.liquidity, fill.ts_ns) == (Decimal("101"), Decimal("2"), "taker", clock.now_ns)
+    assert fill.fee == Decimal("101") * 2 * Decimal("0.0005")
+    assert updates[-1]["state"] == "filled" and updates[-1]["execType"] == "T"
+    assert updates[-1]["fillFee"] == str(-fill.fee)
+    summary = engine.summary()[INSTRUMENT]
+    assert summary["position"] == "2" and Decimal(summary["cash"]) == -(Decimal("202") + fill.fee)
+
+
+def test_resting_order_fills_as_maker_at_its_own_price_once_touched():
+    clock, engine, updates = _engine()
+    engine.submit(_order("sell", "103"))
+    clock.now_ns = START_NS + 10 * MS
+    engine.on_book(_book("100", "101"))
+    assert engine.fills == []
+    clock.now_ns = START_NS + 20 * MS
+    # The bid jumps through the order: a maker fill still prices at the order, not the bid.
+    engine.on_book(_book("103.5", "104"))
+    (fill,) = engine.fills
+    assert (fill.side, fill.price, fill.liquidity) == ("sell", Decimal("103"), "maker")
+    assert fill.fee == Decimal("103") * 2 * Decimal("0.0002")
+    assert updates[-1]["execType"] == "M"
+    assert engine.summary()[INSTRUMENT]["maker_fills"] == "1"
+
+
+def test_untouched_order_expires_after_its_ttl():
+    clock, engine, updates = _engine()
+    engine.submit(_order("buy", "99"))
+    for offset_ms in (10, 104):
+        clock.now_ns = START_NS + offset_ms * MS
+        engine.on_book(_book("100", "101"))
+    assert engine.orders_expired == 0
+    clock.now_ns = START_NS + 105 * MS
+    engine.on_book(_book("100", "101"))
+    assert engine.orders_expired == 1 and engine.fills == []
+    assert updates[-1]["state"] == "canceled"
+    assert engine.summary()[INSTRUMENT]["open_orders"] == "0"
+
+
+def test_open_order_cap_rejects_further_orders():
+    clock, engine, _ = _engine(max_open_orders=2)
+    results = [engine.submit(_order("buy", price)) for price in ("95", "96", "97")]
+    assert [result["sCode"] for result in results] == ["0", "0", "1"]
+    assert [result["clOrdId"] for result in results] == ["bt1", "bt2", "bt3"]
+    assert (engine.orders_submitted, engine.orders_rejected) == (3, 1)
+
+
+def test_fixed_point_books_fill_at_decimal_prices():
+    codec = FixedPointCodec(tick_size=Decimal("0.1"), lot_size=Decimal("0.0001"))
+    clock = ReplayClock(START_NS)
+    engine = BacktestExecutionEngine(clock, SimulatedFillModel(latency_ns=0), codecs={INSTRUMENT: codec})
+    engine.submit(_order("buy", "101.5"))
+    engine.on_book(_book("100.9", "101.1", codec))
+    (fill,) = engine.fills
+    assert fill.price == Decimal("101.1") and fill.liquidity == "taker"
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from benchmarks.synthetic import make_snapshot, make_updates
+from okx_trader.decoding import available_decoders, make_decoder
+from tests.mock_server import build_book_frames
+
+INSTRUMENT = "BTC-USDT"
+
+
+def _raw_frames() -> list:
+    frames = build_book_frames(INSTRUMENT, make_snapshot(30), make_updates(50, 30))
+    frames.append({"event": "subscribe", "arg": {"channel": "books-l2-tbt", "instId": INSTRUMENT}, "connId": "a1"})
+    frames.append({"event": "error", "code": "60012", "msg": "Invalid request", "connId": "a1"})
+    frames.append({"arg": {"channel": "books-l2-tbt", "instId": INSTRUMENT}, "action": "update", "data": []})
+    # Numeric levels do not fit the msgspec schema and take its dict fallback.
+    payload = {"bids": [[100, 1, 0, 1]], "asks": [], "ts": "5", "seqId": 9, "prevSeqId": 8}
+    frames.append({"arg": {"channel": "books-l2-tbt", "instId": INSTRUMENT}, "action": "update", "data": [payload]})
+    return [json.dumps(frame) for frame in frames]
+
+
+def _fields(message) -> tuple:
+    return (
+        message.action,
+        message.instrument_id,
+        [list(level) for level in message.bids],
+        [list(level) for level in message.asks],
+        message.ts_ms,
+        message.seq_id,
+        message.prev_seq_id,
+        message.checksum,
+        message.has_data,
+    )
+
+
+@pytest.mark.parametrize("name", available_decoders())
+@pytest.mark.parametrize("as_bytes", [False, True], ids=["str", "bytes"])
+def test_decoders_agree_with_the_stdlib_decoder(name, as_bytes):
+    reference = make_decoder("stdlib")
+    decoder = make_decoder(name)
+    for raw in _raw_frames():
+        wire = raw.encode() if as_bytes else raw
+        expected = reference.decode(raw)
+        message = decoder.decode(wire)
+        assert _fields(message) == _fields(expected), raw
+        assert isinstance(message.ts_ms, (int, type(None)))
+        # The lazy dict is the frame as sent.
+        assert message.data == json.loads(raw)
+
+
+def test_snapshot_fields_are_the_wire_values():
+    raw = _raw_frames()[0]
+    frame = json.loads(raw)["data"][0]
+    for name in available_decoders():
+        message = make_decoder(name).decode(raw)
+        assert message.action == "snapshot"
+        assert [list(level) for level in message.bids] == frame["bids"]
+        assert message.ts_ms == int(frame["ts"])
+        assert (message.seq_id, message.prev_seq_id, message.checksum) == (1, -1, frame["checksum"])
+
+
+def test_unknown_decoder_is_rejected():
+    with pytest.raises(ValueError):
+        make_decoder("simdjson")
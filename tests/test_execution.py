@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import asyncio
+from decimal import Decimal
+
+import pytest
+
+from okx_trader.execution import ExecutionEngine, OkxRestClient, OrderRequest
+from okx_trader.rate_limit import RATE_LIMITED_CODE
+from okx_trader.ws_execution import OkxWsTradeClient
+from tests.mock_server import MockOkxServer
+
+INSTRUMENT = "BTC-USDT"
+
+
+def _order(price: str = "30000.1") -> OrderRequest:
+    return OrderRequest(INSTRUMENT, "buy", Decimal("0.01"), Decimal(price))
+
+
+async def _with_engine(scenario, **server_options):
+    async with MockOkxServer(**server_options) as server:
+        rest = OkxRestClient("key", "secret", "pass", base_url=server.rest_url)
+        ws = OkxWsTradeClient(rest, url=server.private_url, request_timeout=0.1, reconnect_delay=0.01)
+        await ws.connect()
+        engine = ExecutionEngine(rest, dry_run=False, ws_client=ws)
+        try:
+            result = await scenario(server, engine, ws)
+        finally:
+            await ws.close()
+            await rest.close()
+        return server, engine, ws, result
+
+
+def test_lost_ack_for_a_filled_order_is_not_resent_over_rest():
+    async def scenario(server, engine, ws):
+        order = _order()
+        task = asyncio.create_task(engine.execute(order))
+        while not server.account_orders:
+            await asyncio.sleep(0.001)
+        # The order fills before the WebSocket ack times out, so OKX would accept its clOrdId again.
+        await server.fill_order(next(iter(server.account_orders)))
+        return order, await task
+
+    server, engine, _, (order, result) = asyncio.run(_with_engine(scenario, ws_ack_lost=True))
+    assert engine.ws_fallbacks == 1 and engine.ws_recovered == 1
+    assert server.rest_orders == []
+    assert len(server.account_orders) == 1
+    assert result["code"] == "0"
+    assert result["data"][0]["clOrdId"] == order.client_order_id
+    assert result["data"][0]["ordId"] == next(iter(server.account_orders))
+
+
+def test_order_that_never_reached_okx_is_resent_once():
+    async def scenario(server, engine, ws):
+        return await engine.execute(_order())
+
+    server, engine, _, result = asyncio.run(_with_engine(scenario, ws_unresponsive=True))
+    assert engine.ws_fallbacks == 1 and engine.ws_recovered == 0
+    assert len(server.rest_orders) == 1
+    assert result["code"] == "0"
+
+
+def test_batch_resends_only_the_orders_okx_does_not_have():
+    async def scenario(server, engine, ws):
+        orders = [_order("30000.1"), _order("30000.2"), _order("30000.3")]
+        task = asyncio.create_task(engine.execute_batch(orders))
+        while not server.ws_orders:
+            await asyncio.sleep(0.001)
+        # Only the first order of the batch made it; the other two are dropped from the account.
+        for order_id in list(server.account_orders)[1:]:
+            del server.account_orders[order_id]
+        return orders, await task
+
+    server, engine, _, (orders, result) = asyncio.run(_with_engine(scenario, ws_ack_lost=True))
+    assert engine.ws_recovered == 1
+    assert [order["clOrdId"] for order in server.rest_orders] == [order.client_order_id for order in orders[1:]]
+    assert [entry["clOrdId"] for entry in result["data"]] == [order.client_order_id for order in orders]
+
+
+def test_trade_socket_reconnects_after_a_drop():
+    async def scenario(server, engine, ws):
+        await server.drop_private()
+        while ws.reconnects == 0:
+            await asyncio.sleep(0.005)
+        return await engine.execute(_order())
+
+    server, engine, ws, result = asyncio.run(_with_engine(scenario))
+    assert ws.reconnects == 1
+    assert engine.ws_fallbacks == 0
+    assert len(server.ws_orders) == 1 and server.rest_orders == []
+    assert result["code"] == "0"
+
+
+def test_failed_lookup_raises_instead_of_resending():
+    async def scenario(server, engine, ws):
+        server.order_query_code = RATE_LIMITED_CODE
+        with pytest.raises(RuntimeError, match=RATE_LIMITED_CODE):
+            await engine.execute(_order())
+
+    server, engine, _, _ = asyncio.run(_with_engine(scenario, ws_ack_lost=True))
+    assert engine.ws_fallbacks == 1 and engine.ws_recovered == 0
+    assert server.rest_orders == []
+    assert len(server.account_orders) == 1
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Optional
+
+import pytest
+
+from benchmarks.synthetic import make_snapshot, make_updates
+from okx_trader.features import FeatureEngine
+from okx_trader.fixed_point import FixedPointCodec
+from okx_trader.orderbook import MAX_TRACKED_CHANGES, OrderBook
+
+CODEC = FixedPointCodec(tick_size=Decimal("0.1"), lot_size=Decimal("0.0001"))
+DEPTH = 25
+
+
+def _book(codec: Optional[FixedPointCodec], levels: int = 60) -> OrderBook:
+    book = OrderBook("BTC-USDT", depth=400, codec=codec)
+    book.apply_snapshot(*make_snapshot(levels))
+    return book
+
+
+def _book_fields(snapshot) -> tuple:
+    return snapshot.ofi, snapshot.wmp, snapshot.liquidity_vacuum, snapshot.bid_pressure, snapshot.ask_pressure
+
+
+def _assert_parity(book: OrderBook, incremental: FeatureEngine, full: FeatureEngine) -> None:
+    assert _book_fields(incremental.compute(book)) == _book_fields(full.compute(book))
+
+
+def _size_changes(count: int, start: int = 0) -> list:
+    # Size-only changes, every one to a new size, on levels that stay inside the tracked depth.
+    return [
+        [str(Decimal("30000.0") - Decimal("0.1") * (1 + idx % DEPTH)), f"{start + idx + 1}.5", "0", "1"]
+        for idx in range(count)
+    ]
+
+
+@pytest.mark.parametrize("codec", [None, CODEC], ids=["decimal", "fixed"])
+@pytest.mark.parametrize("seed", [3, 11, 29])
+def test_random_streams_match_the_full_compute_on_every_tick(codec, seed):
+    book = _book(codec)
+    incremental, full = FeatureEngine(DEPTH, incremental=True), FeatureEngine(DEPTH)
+    _assert_parity(book, incremental, full)
+    for bids, asks in make_updates(2000, 60, seed=seed):
+        book.apply_update(bids, asks)
+        _assert_parity(book, incremental, full)
+    # Both paths ran: size changes incrementally, inserts and deletes near the touch by rescanning.
+    assert incremental.incremental_computes > 500
+    assert 1 < incremental.full_computes < 2000
+
+
+@pytest.mark.parametrize("codec", [None, CODEC], ids=["decimal", "fixed"])
+def test_several_updates_between_computes_match(codec):
+    book = _book(codec)
+    incremental, full = FeatureEngine(DEPTH, incremental=True), FeatureEngine(DEPTH)
+    for idx, (bids, asks) in enumerate(make_updates(3000, 60, seed=5)):
+        book.apply_update(bids, asks)
+        if idx % 7 == 0:
+            _assert_parity(book, incremental, full)
+
+
+@pytest.mark.parametrize("codec", [None, CODEC], ids=["decimal", "fixed"])
+def test_insert_and_delete_inside_the_depth_fall_back_to_a_full_scan(codec):
+    book = _book(codec)
+    incremental, full = FeatureEngine(DEPTH, incremental=True), FeatureEngine(DEPTH)
+    _assert_parity(book, incremental, full)
+    book.apply_update(_size_changes(3), [])
+    _assert_parity(book, incremental, full)
+    assert (incremental.full_computes, incremental.incremental_computes) == (1, 1)
+    # A new best bid shifts every rank below it.
+    book.apply_update([["30000.0", "2", "0", "1"]], [])
+    _assert_parity(book, incremental, full)
+    assert incremental.full_computes == 2
+    book.apply_update([], [["30000.3", "0", "0", "0"]])
+    _assert_parity(book, incremental, full)
+    assert incremental.full_computes == 3
+    book.apply_update(_size_changes(2, start=10), [])
+    _assert_parity(book, incremental, full)
+    assert (incremental.full_computes, incremental.incremental_computes) == (3, 2)
+
+
+@pytest.mark.parametrize("codec", [None, CODEC], ids=["decimal", "fixed"])
+def test_snapshot_falls_back_to_a_full_scan(codec):
+    book = _book(codec)
+    incremental, full = FeatureEngine(DEPTH, incremental=True), FeatureEngine(DEPTH)
+    _assert_parity(book, incremental, full)
+    book.apply_snapshot(*make_snapshot(60, seed=99))
+    assert book.structure_changed
+    _assert_parity(book, incremental, full)
+    assert (incremental.full_computes, incremental.incremental_computes) == (2, 0)
+
+
+@pytest.mark.parametrize("codec", [None, CODEC], ids=["decimal", "fixed"])
+def test_change_log_overflow_falls_back_to_a_full_scan(codec):
+    book = _book(codec)
+    incremental, full = FeatureEngine(DEPTH, incremental=True), FeatureEngine(DEPTH)
+    _assert_parity(book, incremental, full)
+    book.apply_update(_size_changes(MAX_TRACKED_CHANGES), [])
+    assert not book.structure_changed
+    _assert_parity(book, incremental, full)
+    assert (incremental.full_computes, incremental.incremental_computes) == (1, 1)
+    book.apply_update(_size_changes(MAX_TRACKED_CHANGES + 1, start=1000), [])
+    assert book.structure_changed
+    _assert_parity(book, incremental, full)
+    assert (incremental.full_computes, incremental.incremental_computes) == (2, 1)
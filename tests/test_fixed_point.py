@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from decimal import ROUND_CEILING, ROUND_FLOOR, Decimal
+
+import pytest
+
+from benchmarks.synthetic import make_snapshot, make_updates
+from okx_trader.features import FeatureEngine
+from okx_trader.fixed_point import FixedPointCodec
+from okx_trader.orderbook import OrderBook
+from okx_trader.strategies import StrategyEngine, StrategyParams, StrategyUnits
+
+CODEC = FixedPointCodec(tick_size=Decimal("0.1"), lot_size=Decimal("0.0001"))
+DEPTH = 25
+TICKS = 1500
+
+
+def _books():
+    decimal_book = OrderBook("BTC-USDT", depth=400)
+    fixed_book = OrderBook("BTC-USDT", depth=400, codec=CODEC)
+    snapshot = make_snapshot(400)
+    decimal_book.apply_snapshot(*snapshot)
+    fixed_book.apply_snapshot(*snapshot)
+    return decimal_book, fixed_book
+
+
+def _engines(codec):
+    params = StrategyParams(ofi_threshold=Decimal("2"), wmp_threshold=Decimal("0.5"))
+    return StrategyEngine(True, True, True, codec=codec, params=params, feature_depth=DEPTH, quote_refresh_ms=1)
+
+
+def _passive(price: Decimal, side: str) -> Decimal:
+    # A fixed-point mid cannot hold half a tick and rounds toward the passive side.
+    return price.quantize(CODEC.tick_size, rounding=ROUND_FLOOR if side == "buy" else ROUND_CEILING)
+
+
+def test_fixed_point_pipeline_matches_decimal():
+    decimal_book, fixed_book = _books()
+    decimal_features, fixed_features = FeatureEngine(DEPTH), FeatureEngine(DEPTH)
+    decimal_strategies, fixed_strategies = _engines(None), _engines(CODEC)
+    fired = set()
+    for tick, (bids, asks) in enumerate(make_updates(TICKS, 400)):
+        decimal_book.apply_update(bids, asks)
+        fixed_book.apply_update(bids, asks)
+        decimal_bids, decimal_asks = decimal_book.top_levels(DEPTH)
+        fixed_bids, fixed_asks = fixed_book.top_levels(DEPTH)
+        for decimal_side, fixed_side in ((decimal_bids, fixed_bids), (decimal_asks, fixed_asks)):
+            assert list(decimal_side) == [
+                (CODEC.price_to_decimal(price), CODEC.size_to_decimal(size)) for price, size in fixed_side
+            ]
+        assert fixed_book.checksum() == decimal_book.checksum()
+
+        expected = decimal_features.compute(decimal_book)
+        snapshot = fixed_features.compute(fixed_book)
+        converted = fixed_features.to_decimal(snapshot, CODEC)
+        assert converted.ofi == expected.ofi
+        assert converted.wmp == expected.wmp
+        assert converted.bid_pressure == expected.bid_pressure
+        assert converted.ask_pressure == expected.ask_pressure
+        assert abs(converted.liquidity_vacuum - expected.liquidity_vacuum) <= Decimal("0.5e-8")
+
+        now_ns = tick * 1_000_000
+        decimal_signals = decimal_strategies.generate_signals(decimal_book, expected, now_ns)
+        fixed_signals = fixed_strategies.generate_signals(fixed_book, snapshot, now_ns)
+        assert [signal.reason for signal in fixed_signals] == [signal.reason for signal in decimal_signals]
+        for decimal_signal, fixed_signal in zip(decimal_signals, fixed_signals):
+            price = decimal_signal.price
+            if decimal_signal.reason == "liquidation_hunting":
+                price = _passive(price, decimal_signal.side)
+            assert fixed_signal.side == decimal_signal.side
+            assert CODEC.size_to_decimal(fixed_signal.size) == decimal_signal.size
+            assert CODEC.price_to_decimal(fixed_signal.price) == price
+            fired.add(decimal_signal.reason)
+    assert fired == {"liquidation_hunting", "market_making_bid", "market_making_ask", "funding_arbitrage"}
+
+
+def test_sizes_round_down_to_the_lot_size():
+    units = StrategyUnits(StrategyParams(), FixedPointCodec(tick_size=Decimal("0.1"), lot_size=Decimal("0.2")))
+    assert units.liquidation_size == 5
+    assert units.market_making_size == 2
+    assert units.funding_size == 1
+
+
+def test_size_below_one_lot_names_the_parameter():
+    codec = FixedPointCodec(tick_size=Decimal("0.1"), lot_size=Decimal("1"))
+    with pytest.raises(ValueError, match="market_making_size=0.5 is below one lot"):
+        StrategyUnits(StrategyParams(), codec)
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from okx_trader.hot_storage import FEATURE_FIELDS, HotRingBuffer
+
+CAPACITY = 1000
+
+
+def _values(idx: int):
+    return tuple(float(idx * 10 + column) for column in range(len(FEATURE_FIELDS)))
+
+
+def test_ring_starts_small_and_grows_to_capacity():
+    ring = HotRingBuffer(FEATURE_FIELDS, 100_000, initial=64)
+    full = HotRingBuffer(FEATURE_FIELDS, 100_000, initial=100_000)
+    assert ring.nbytes * 1000 < full.nbytes
+    for idx in range(5000):
+        ring.append(idx, *_values(idx))
+    assert ring.nbytes < full.nbytes
+    assert list(ring.last(3)["ts_ns"]) == [4997, 4998, 4999]
+
+
+def test_windows_match_a_reference_across_growth_and_wrap():
+    ring = HotRingBuffer(FEATURE_FIELDS, CAPACITY, initial=16)
+    appended = []
+    for idx in range(3 * CAPACITY + 7):
+        ring.append(idx, *_values(idx))
+        appended.append((idx,) + _values(idx))
+        if idx % 97 == 0 or idx in (15, 16, 17, CAPACITY - 1, CAPACITY, CAPACITY + 1):
+            kept = appended[-CAPACITY:]
+            assert len(ring) == len(kept)
+            assert list(ring.last(CAPACITY).rows()) == kept
+            assert list(ring.last(5).rows()) == kept[-5:]
+            assert list(ring.since(idx - 20).rows()) == [row for row in kept if row[0] >= idx - 20]
+            assert ring.latest() == appended[-1]
+    assert ring.nbytes == HotRingBuffer(FEATURE_FIELDS, CAPACITY, initial=CAPACITY).nbytes
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import re
+
+import aiohttp
+import pytest
+
+from okx_trader.latency import (
+    BOOK_APPLY,
+    DECODE,
+    QUANTILES,
+    RISK,
+    STAGES,
+    SUB_BUCKET_BITS,
+    LatencyHistogram,
+    LatencyRecorder,
+    MetricsServer,
+)
+
+# Above 2**SUB_BUCKET_BITS a bucket spans 1/32 of its lower bound.
+BUCKET_ERROR = 1 / (1 << (SUB_BUCKET_BITS - 1))
+
+
+def _exact(values, q: float) -> int:
+    ranked = sorted(values)
+    return ranked[max(1, int(q * len(ranked) + 0.5)) - 1]
+
+
+def _samples(distribution: str, rng: random.Random) -> list:
+    if distribution == "uniform":
+        return [rng.randint(1_000, 5_000_000) for _ in range(50_000)]
+    if distribution == "lognormal":
+        return [int(rng.lognormvariate(11, 1.5)) for _ in range(50_000)]
+    if distribution == "exponential":
+        return [int(rng.expovariate(1 / 40_000)) for _ in range(50_000)]
+    return [rng.randint(0, 63) for _ in range(5_000)]
+
+
+@pytest.mark.parametrize("distribution", ["uniform", "lognormal", "exponential", "small"])
+def test_quantiles_are_within_the_bucket_error(distribution):
+    values = _samples(distribution, random.Random(17))
+    histogram = LatencyHistogram()
+    for value in values:
+        histogram.record(value)
+    assert histogram.count == len(values) and histogram.max == max(values)
+    for q in (0.01, 0.25, *QUANTILES, 1.0):
+        exact = _exact(values, q)
+        reported = histogram.quantile(q)
+        # The bucket's upper bound: never below the true value and at most ~3% above it.
+        assert exact <= reported <= exact * (1 + BUCKET_ERROR), (q, exact, reported)
+        if distribution == "small":
+            assert reported == exact
+
+
+def test_since_reports_only_the_later_counts():
+    histogram = LatencyHistogram()
+    for value in range(1_000, 2_000):
+        histogram.record(value)
+    earlier = histogram.copy()
+    for value in range(100_000, 100_100):
+        histogram.record(value)
+    delta = histogram.since(earlier)
+    assert delta.count == 100
+    assert 100_000 <= delta.quantile(0.5) <= 100_099 * (1 + BUCKET_ERROR)
+
+
+_SAMPLE = re.compile(r'^okx_trader_stage_latency_seconds(_sum|_count)?\{stage="(\w+)"(,quantile="([\d.]+)")?\} (\S+)$')
+
+
+def test_metrics_endpoint_serves_prometheus_text():
+    recorder = LatencyRecorder()
+    for value in (1_000, 2_000, 3_000):
+        recorder.record(BOOK_APPLY, value)
+    recorder.record(DECODE, 1_500_000_000)
+
+    async def scrape():
+        server = await MetricsServer(recorder, port=0).start()
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.get(f"http://127.0.0.1:{server.port}/metrics") as response:
+                    return response.status, response.content_type, await response.text()
+        finally:
+            await server.close()
+
+    status, content_type, text = asyncio.run(scrape())
+    assert status == 200 and content_type == "text/plain"
+    assert text.endswith("\n")
+    lines = text.splitlines()
+    assert lines[:2] == [
+        "# HELP okx_trader_stage_latency_seconds Hot-path latency per tick stage.",
+        "# TYPE okx_trader_stage_latency_seconds summary",
+    ]
+    samples = {}
+    for line in lines[2:]:
+        match = _SAMPLE.match(line)
+        assert match, line
+        suffix, stage, _, quantile, value = match.groups()
+        samples[(suffix or "", stage, quantile)] = float(value)
+    assert {stage for _, stage, _ in samples} == set(STAGES)
+    assert len(samples) == len(STAGES) * (len(QUANTILES) + 2)
+    assert samples[("_count", BOOK_APPLY, None)] == 3
+    assert samples[("_sum", BOOK_APPLY, None)] == pytest.approx(6e-6)
+    assert samples[("", BOOK_APPLY, "0.5")] == pytest.approx(2e-6, rel=BUCKET_ERROR)
+    assert samples[("", DECODE, "0.999")] == pytest.approx(1.5, rel=BUCKET_ERROR)
+    assert samples[("_count", RISK, None)] == 0
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+
+from benchmarks.synthetic import make_snapshot, make_updates
+from okx_trader.decoding import OrderBookMessage
+from okx_trader.multiplex_stream import MultiplexOrderBookStreamer
+from okx_trader.orderbook import OrderBook
+from tests.mock_server import MockOkxServer, build_book_frames
+
+INSTRUMENT = "BTC-USDT"
+
+
+def _message(action: str, seq_id: int, prev_seq_id: int, bid: str) -> OrderBookMessage:
+    payload = {"bids": [[bid, "1", "0", "1"]], "asks": [], "ts": "1", "seqId": seq_id, "prevSeqId": prev_seq_id}
+    return OrderBookMessage.from_dict({"arg": {"instId": INSTRUMENT}, "action": action, "data": [payload]})
+
+
+def _feed(streamer: MultiplexOrderBookStreamer, messages) -> list:
+    book_streamer = streamer.streamers[INSTRUMENT]
+    applied = []
+    for message in messages:
+        if streamer._fresh(message) and book_streamer.apply_message(message):
+            applied.append(message.seq_id)
+    return applied
+
+
+def _reset_sequence() -> list:
+    return [
+        _message("snapshot", 1000, -1, "100"),
+        _message("update", 1001, 1000, "101"),
+        # Sequence reset: seqId drops below prevSeqId, and the chain continues from the new value.
+        _message("update", 5, 1001, "102"),
+        _message("update", 6, 5, "103"),
+    ]
+
+
+def test_sequence_reset_is_applied_without_redundancy():
+    streamer = MultiplexOrderBookStreamer([INSTRUMENT], validate_checksum=False)
+    streamer.streamers[INSTRUMENT].awaiting_snapshot = True
+    assert _feed(streamer, _reset_sequence()) == [1000, 1001, 5, 6]
+    assert streamer.streamers[INSTRUMENT].synced
+    assert str(streamer.streamers[INSTRUMENT].orderbook.best_bid()[0]) == "103"
+
+
+def test_redundant_copies_are_dropped_across_a_reset():
+    streamer = MultiplexOrderBookStreamer([INSTRUMENT], validate_checksum=False, redundancy=2)
+    streamer.streamers[INSTRUMENT].awaiting_snapshot = True
+    first = _reset_sequence()
+    # The second socket lags by one frame and repeats everything, including the snapshot.
+    second = _reset_sequence()
+    interleaved = [first[0], first[1], second[0], first[2], second[1], first[3], second[2], second[3]]
+    assert _feed(streamer, interleaved) == [1000, 1001, 5, 6]
+    assert streamer.recovery.duplicates == 4
+    assert streamer.streamers[INSTRUMENT].synced
+
+
+def test_gap_still_reaches_the_book_and_unsyncs_it():
+    streamer = MultiplexOrderBookStreamer([INSTRUMENT], validate_checksum=False, redundancy=2)
+    streamer.streamers[INSTRUMENT].awaiting_snapshot = True
+    messages = [_message("snapshot", 10, -1, "100"), _message("update", 11, 10, "101")]
+    messages.append(_message("update", 13, 12, "102"))
+    assert _feed(streamer, messages) == [10, 11]
+    assert streamer._fresh(_message("update", 14, 13, "103"))
+    assert not streamer.streamers[INSTRUMENT].synced
+
+
+class _RestBook:
+    async def get_order_book(self, instrument_id: str, depth: int = 400) -> dict:
+        return {"code": "0", "data": [{"bids": [["90", "1", "0", "1"]], "asks": [], "ts": "1"}]}
+
+
+async def _ignore(orderbook, message) -> None:
+    pass
+
+
+def _warm_start_after(ws_first: bool) -> MultiplexOrderBookStreamer:
+    streamer = MultiplexOrderBookStreamer([INSTRUMENT], validate_checksum=False, rest_client=_RestBook())
+
+    async def run():
+        queue = streamer._queues[INSTRUMENT] = asyncio.Queue()
+        book_streamer = streamer.streamers[INSTRUMENT]
+        book_streamer.awaiting_snapshot = True
+        streamer._recovering[INSTRUMENT] = 1
+        snapshot = _message("snapshot", 1000, -1, "100")
+        if ws_first:
+            queue.put_nowait(snapshot)
+            await streamer._warm_start(INSTRUMENT)
+        else:
+            await streamer._warm_start(INSTRUMENT)
+            queue.put_nowait(snapshot)
+        dispatcher = asyncio.create_task(streamer._dispatch(book_streamer, queue, _ignore))
+        await queue.join()
+        dispatcher.cancel()
+
+    asyncio.run(run())
+    return streamer
+
+
+def test_rest_snapshot_queued_behind_the_websocket_snapshot_is_dropped():
+    streamer = _warm_start_after(ws_first=True)
+    book_streamer = streamer.streamers[INSTRUMENT]
+    assert str(book_streamer.orderbook.best_bid()[0]) == "100"
+    assert book_streamer._seq_id == 1000 and book_streamer.synced
+    assert streamer.recovery.rest_snapshots == 0
+    assert INSTRUMENT not in streamer._recovering
+
+
+def test_rest_snapshot_ahead_of_the_websocket_snapshot_seeds_the_book():
+    streamer = _warm_start_after(ws_first=False)
+    book_streamer = streamer.streamers[INSTRUMENT]
+    assert str(book_streamer.orderbook.best_bid()[0]) == "100"
+    assert book_streamer._seq_id == 1000 and book_streamer.synced
+    assert streamer.recovery.rest_snapshots == 1
+
+
+def _recorded(instrument_ids, frames: int = 300, levels: int = 50):
+    snapshot = make_snapshot(levels)
+    updates = list(make_updates(frames, levels))
+    return {instrument_id: build_book_frames(instrument_id, snapshot, updates) for instrument_id in instrument_ids}
+
+
+def _replay(recorded, handler=None, **options):
+    async def run():
+        async def count(orderbook, message):
+            return None
+
+        async with MockOkxServer(recorded, drop_every=options.pop("drop_every", 0)) as server:
+            streamer = MultiplexOrderBookStreamer(list(recorded), depth=50, url=server.public_url, **options)
+            await asyncio.wait_for(streamer.run_forever(handler or count), 10)
+        return streamer
+
+    return asyncio.run(run())
+
+
+def _assert_books_match(streamer, recorded):
+    for instrument_id, frames in recorded.items():
+        reference = OrderBook(instrument_id, depth=50)
+        reference.apply_snapshot(frames[0]["data"][0]["bids"], frames[0]["data"][0]["asks"])
+        for frame in frames[1:]:
+            reference.apply_update(frame["data"][0]["bids"], frame["data"][0]["asks"])
+        book = streamer.books[instrument_id]
+        assert book.checksum() == frames[-1]["data"][0]["checksum"]
+        assert list(book.bids.top_levels()) == list(reference.bids.top_levels())
+        assert list(book.asks.top_levels()) == list(reference.asks.top_levels())
+        assert streamer.streamers[instrument_id].synced
+
+
+def test_replay_rebuilds_every_book():
+    recorded = _recorded([f"SYN{idx}-USDT" for idx in range(4)])
+    streamer = _replay(recorded, connections=2)
+    _assert_books_match(streamer, recorded)
+    assert sum(item.resync_count for item in streamer.streamers.values()) == 0
+
+
+def test_replay_with_gaps_resyncs_to_the_same_books():
+    recorded = _recorded([f"SYN{idx}-USDT" for idx in range(3)])
+    streamer = _replay(recorded, drop_every=50)
+    _assert_books_match(streamer, recorded)
+    assert all(item.resync_count > 0 for item in streamer.streamers.values())
+
+
+def test_full_queue_resyncs_that_instrument_without_blocking_the_others():
+    recorded = _recorded(["SLOW-USDT", "FAST-USDT"], frames=1000)
+    handled = Counter()
+
+    async def handler(orderbook, message):
+        handled[orderbook.instrument_id] += 1
+        if orderbook.instrument_id == "SLOW-USDT":
+            await asyncio.sleep(0.002)
+
+    streamer = _replay(recorded, handler, queue_size=128)
+    _assert_books_match(streamer, recorded)
+    assert streamer.recovery.overflows > 0
+    assert streamer.streamers["FAST-USDT"].resync_count == 0
+    assert handled["FAST-USDT"] == len(recorded["FAST-USDT"])
+    assert handled["SLOW-USDT"] < len(recorded["SLOW-USDT"])
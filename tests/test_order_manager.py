@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import asyncio
+from decimal import Decimal
+
+from okx_trader.execution import ExecutionEngine
+from okx_trader.order_manager import CANCEL, PLACE, OrderManager
+from okx_trader.strategies import OrderSignal
+
+INSTRUMENT = "BTC-USDT"
+
+
+def _quote(price: str) -> OrderSignal:
+    return OrderSignal("buy", Decimal("0.5"), Decimal(price), "market_making_bid", quote=True)
+
+
+def _directional(price: str) -> OrderSignal:
+    return OrderSignal("sell", Decimal("1"), Decimal(price), "liquidation_hunting")
+
+
+def test_only_quotes_are_kept_as_working_orders():
+    manager = OrderManager(ExecutionEngine(None, dry_run=True), clock=lambda: 0)
+
+    async def run():
+        first = await manager.reconcile(INSTRUMENT, [_quote("30000"), _directional("30001")])
+        second = await manager.reconcile(INSTRUMENT, [_quote("30000"), _directional("30001")])
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert [(action.action, action.reason) for action in first] == [
+        (PLACE, "market_making_bid"),
+        (PLACE, "liquidation_hunting"),
+    ]
+    # The quote is unchanged and kept; the directional signal is a new order every time it fires.
+    assert [(action.action, action.reason) for action in second] == [(PLACE, "liquidation_hunting")]
+    assert [order.key for order in manager.working(INSTRUMENT)] == [("market_making_bid", "buy")]
+    assert manager.stats.kept == 1 and manager.stats.placed == 3
+
+
+class _UnackedExecution:
+    """Accepts orders with an ack that carries no ordId yet; records cancel arguments."""
+
+    def __init__(self) -> None:
+        self.cancels = []
+
+    async def execute(self, order):
+        order.client_order_id = order.client_order_id or "c1"
+        return {"code": "0", "msg": "", "data": [{"clOrdId": order.client_order_id, "ordId": "", "sCode": "0"}]}
+
+    async def cancel(self, instrument_id, order_id, client_order_id=None):
+        self.cancels.append((instrument_id, order_id, client_order_id))
+        return {"code": "0", "msg": "", "data": [{"clOrdId": client_order_id, "ordId": "", "sCode": "0"}]}
+
+
+def test_cancel_falls_back_to_the_client_order_id():
+    now = [0]
+    execution = _UnackedExecution()
+    manager = OrderManager(execution, quote_ttl_ns=10, clock=lambda: now[0])
+
+    async def run():
+        placed = await manager.reconcile(INSTRUMENT, [_quote("30000")])
+        now[0] = 100
+        return placed, await manager.reconcile(INSTRUMENT, [])
+
+    placed, expired = asyncio.run(run())
+    assert placed[0].order.order_id is None
+    assert [action.action for action in expired] == [CANCEL]
+    assert execution.cancels == [(INSTRUMENT, None, "c1")]
+    assert manager.working(INSTRUMENT) == []
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from decimal import Decimal
+
+import pytest
+
+from okx_trader.fixed_point import FixedPointCodec
+from okx_trader.orderbook import OrderBook
+
+# The worked example from the OKX order book checksum documentation.
+DOC_BIDS = [["3366.1", "7", "0", "3"], ["3366", "6", "3", "4"]]
+DOC_ASKS = [["3366.8", "9", "10", "3"], ["3368", "8", "3", "4"]]
+DOC_CHECKSUM = -1881014294
+
+CODEC = FixedPointCodec(tick_size=Decimal("0.1"), lot_size=Decimal("1"))
+
+
+@pytest.mark.parametrize("codec", [None, CODEC], ids=["decimal", "fixed"])
+def test_checksum_matches_the_okx_documentation_example(codec):
+    book = OrderBook("BTC-USDT", codec=codec)
+    book.apply_snapshot(DOC_BIDS, DOC_ASKS)
+    assert book.checksum() == DOC_CHECKSUM
+
+
+@pytest.mark.parametrize("codec", [None, CODEC], ids=["decimal", "fixed"])
+def test_checksum_follows_updates_to_the_documented_book(codec):
+    book = OrderBook("BTC-USDT", codec=codec)
+    book.apply_snapshot([["3366.2", "1", "0", "1"], ["3366.1", "2", "0", "1"]], [["3366.8", "9", "0", "1"]])
+    first = book.checksum()
+    book.apply_update([["3366.2", "0", "0", "0"], ["3366.1", "7", "0", "3"], ["3366", "6", "3", "4"]], [])
+    assert book.checksum() != first
+    book.apply_update([], [["3368", "8", "3", "4"]])
+    assert book.checksum() == DOC_CHECKSUM
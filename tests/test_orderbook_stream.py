@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import asyncio
+from decimal import Decimal
+
+from okx_trader.decoding import OrderBookMessage
+from okx_trader.orderbook_stream import OrderBookStreamer
+from okx_trader.pipeline import TickPipeline
+
+INSTRUMENT = "BTC-USDT"
+
+
+class _DeltaLog:
+    def __init__(self) -> None:
+        self.deltas = []
+
+    def write_book_delta(self, instrument, message, ts_ns=None) -> None:
+        self.deltas.append((instrument, message["data"][0]["seqId"]))
+
+
+def _frames(count: int):
+    frames = [{"bids": [["100", "1", "0", "1"]], "asks": [["101", "1", "0", "1"]], "seqId": 1, "prevSeqId": -1}]
+    for seq_id in range(2, count + 1):
+        bids = [[str(100 - seq_id % 5), "2", "0", "1"]]
+        frames.append({"bids": bids, "asks": [], "seqId": seq_id, "prevSeqId": seq_id - 1})
+    return [
+        OrderBookMessage.from_dict(
+            {"arg": {"instId": INSTRUMENT}, "action": "snapshot" if idx == 0 else "update", "data": [frame]}
+        )
+        for idx, frame in enumerate(frames)
+    ]
+
+
+def test_every_applied_frame_is_persisted_even_when_ticks_coalesce():
+    cold = _DeltaLog()
+    streamer = OrderBookStreamer(INSTRUMENT, validate_checksum=False, cold=cold)
+    pipeline = TickPipeline(coalesce=True)
+
+    async def run() -> None:
+        for message in _frames(50):
+            if await streamer.ingest(message):
+                pipeline.push(message)
+
+    asyncio.run(run())
+    assert pipeline.metrics.coalesced > 0
+    assert cold.deltas == [(INSTRUMENT, seq_id) for seq_id in range(1, 51)]
+
+
+def test_frames_that_fail_to_apply_are_not_persisted():
+    cold = _DeltaLog()
+    streamer = OrderBookStreamer(INSTRUMENT, validate_checksum=False, cold=cold)
+    streamer.awaiting_snapshot = True
+    frames = _frames(3)
+    assert not asyncio.run(streamer.ingest(frames[1]))
+    assert cold.deltas == []
+
+
+def _message(action: str, seq_id: int, prev_seq_id: int, bids, asks, checksum=None) -> OrderBookMessage:
+    payload = {"bids": bids, "asks": asks, "seqId": seq_id, "prevSeqId": prev_seq_id}
+    if checksum is not None:
+        payload["checksum"] = checksum
+    return OrderBookMessage.from_dict({"arg": {"instId": INSTRUMENT}, "action": action, "data": [payload]})
+
+
+def _doc_snapshot(seq_id: int) -> OrderBookMessage:
+    # The OKX documentation's checksum example.
+    bids = [["3366.1", "7", "0", "3"], ["3366", "6", "3", "4"]]
+    asks = [["3366.8", "9", "10", "3"], ["3368", "8", "3", "4"]]
+    return _message("snapshot", seq_id, -1, bids, asks, checksum=-1881014294)
+
+
+def test_sequence_gap_drops_updates_until_the_next_snapshot():
+    streamer = OrderBookStreamer(INSTRUMENT)
+    assert streamer.apply_message(_doc_snapshot(10))
+    assert streamer.apply_message(_message("update", 11, 10, [["3366.1", "5", "0", "2"]], []))
+    assert not streamer.apply_message(_message("update", 14, 13, [["3366.1", "1", "0", "1"]], []))
+    assert not streamer.synced
+    assert not streamer.apply_message(_message("update", 15, 14, [["3366.1", "2", "0", "1"]], []))
+    assert streamer.orderbook.best_bid()[1] == Decimal("5")
+    assert streamer.apply_message(_doc_snapshot(20))
+    assert streamer.synced and streamer.orderbook.best_bid()[1] == Decimal("7")
+
+
+def test_checksum_mismatch_drops_updates_until_the_next_snapshot():
+    streamer = OrderBookStreamer(INSTRUMENT)
+    assert streamer.apply_message(_doc_snapshot(10))
+    assert not streamer.apply_message(_message("update", 11, 10, [["3366.1", "5", "0", "2"]], [], checksum=123))
+    assert not streamer.synced
+    # Correctly linked, but the book can no longer be trusted.
+    assert not streamer.apply_message(_message("update", 12, 11, [["3366.1", "6", "0", "2"]], []))
+    assert streamer.orderbook.best_bid()[1] == Decimal("5")
+    assert streamer.apply_message(_doc_snapshot(20))
+    assert streamer.synced and streamer.orderbook.checksum() == -1881014294
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import asyncio
+from decimal import Decimal
+
+from okx_trader.execution import ExecutionEngine, OkxRestClient, OrderRequest
+from okx_trader.private_stream import PrivateStreamer
+from okx_trader.risk import RiskManager
+from tests.mock_server import MockOkxServer
+
+INSTRUMENT = "BTC-USDT-SWAP"
+
+
+async def _until(predicate, timeout: float = 5.0) -> None:
+    async def poll() -> None:
+        while not predicate():
+            await asyncio.sleep(0.005)
+
+    await asyncio.wait_for(poll(), timeout)
+
+
+async def _place(execution: ExecutionEngine, risk: RiskManager, side: str, size: str, price: str) -> str:
+    order = OrderRequest(INSTRUMENT, side, Decimal(size), Decimal(price))
+    result = await execution.execute(order)
+    risk.track_order(order)
+    return result["data"][0]["ordId"]
+
+
+async def _disconnect_scenario():
+    async with MockOkxServer() as server:
+        client = OkxRestClient("key", "secret", "pass", server.rest_url)
+        execution = ExecutionEngine(client, dry_run=False)
+        risk = RiskManager(0.05, 1000, 500)
+        streamer = PrivateStreamer(client, url=server.private_url, reconnect_delay=0.05, max_reconnect_delay=0.1)
+        streamer.order_listeners.append(risk.on_order_update)
+        streamer.position_listeners.append(risk.on_position)
+        streamer.tracked_orders = risk.open_client_order_ids
+        streamer.closed_order_listeners.append(risk.on_order_closed)
+        task = asyncio.create_task(streamer.run_forever())
+        try:
+            await asyncio.wait_for(streamer.connected.wait(), 5)
+            resting = await _place(execution, risk, "buy", "2", "100")
+            canceled = await _place(execution, risk, "sell", "1", "110")
+            await _until(lambda: resting in streamer.orders and canceled in streamer.orders)
+
+            server.private_available = False
+            await server.drop_private()
+            await _until(lambda: not streamer.connected.is_set())
+            # While the feed is down: a partial fill on a known order, a cancel, and an order
+            # placed and fully filled that the private feed never saw at all.
+            await server.fill_order(resting, size="0.5", price="100")
+            await client.cancel_order(INSTRUMENT, canceled)
+            missed = await _place(execution, risk, "buy", "3", "101")
+            await server.fill_order(missed, price="101")
+            server.private_available = True
+            await _until(lambda: streamer.reconciliations >= 2)
+        finally:
+            await streamer.close()
+            await asyncio.gather(task, return_exceptions=True)
+            await client.close()
+        return server, streamer, risk, (resting, canceled, missed)
+
+
+def test_reconnect_applies_fills_of_orders_never_seen_and_closes_stale_exposure():
+    server, streamer, risk, (resting, canceled, missed) = asyncio.run(_disconnect_scenario())
+    position = risk.positions[INSTRUMENT]
+
+    assert position.position == Decimal("3.5") == Decimal(server.account_positions[INSTRUMENT]["pos"])
+    assert position.open_buy == Decimal("1.5")
+    assert position.open_sell == 0
+    assert set(streamer.orders) == {resting}
+    assert set(risk.open_client_order_ids()) == {server.account_orders[resting]["clOrdId"]}
+    assert streamer.missed_orders == 1
+    assert missed not in streamer.orders
+    assert risk.position_corrections == 0
+
+
+def test_stale_exposure_no_longer_blocks_position_corrections():
+    server, streamer, risk, (resting, _, _) = asyncio.run(_disconnect_scenario())
+    # Once the last working order is gone, exchange position pushes correct the local position again.
+    streamer.apply_order(dict(server.account_orders[resting], state="canceled"))
+    streamer.apply_position({"instId": INSTRUMENT, "posSide": "net", "pos": "4", "avgPx": "100"})
+    assert risk.open_client_order_ids() == []
+    assert risk.positions[INSTRUMENT].position == Decimal("4")
+    assert risk.position_corrections == 1
+
+
+async def _failed_lookup_scenario():
+    async with MockOkxServer() as server:
+        client = OkxRestClient("key", "secret", "pass", server.rest_url)
+        execution = ExecutionEngine(client, dry_run=False)
+        risk = RiskManager(0.05, 1000, 500)
+        streamer = PrivateStreamer(client, url=server.private_url, reconnect_delay=0.05, max_reconnect_delay=0.1)
+        streamer.order_listeners.append(risk.on_order_update)
+        streamer.tracked_orders = risk.open_client_order_ids
+        streamer.closed_order_listeners.append(risk.on_order_closed)
+        task = asyncio.create_task(streamer.run_forever())
+        try:
+            await asyncio.wait_for(streamer.connected.wait(), 5)
+            canceled = await _place(execution, risk, "sell", "1", "110")
+            await _until(lambda: canceled in streamer.orders)
+
+            server.private_available = False
+            await server.drop_private()
+            await _until(lambda: not streamer.connected.is_set())
+            await client.cancel_order(INSTRUMENT, canceled)
+            # Throttled lookups say nothing about the order: it must stay working until OKX answers.
+            server.order_query_code = "50011"
+            server.private_available = True
+            await asyncio.sleep(0.3)
+            kept = (set(streamer.orders), list(risk.open_client_order_ids()), streamer.reconciliations)
+            server.order_query_code = None
+            await _until(lambda: streamer.reconciliations >= 2)
+        finally:
+            await streamer.close()
+            await asyncio.gather(task, return_exceptions=True)
+            await client.close()
+        return canceled, kept, streamer, risk
+
+
+def test_failed_lookup_keeps_the_order_until_okx_answers():
+    canceled, (orders, open_ids, reconciliations), streamer, risk = asyncio.run(_failed_lookup_scenario())
+    assert orders == {canceled}
+    assert len(open_ids) == 1
+    assert reconciliations == 1
+    assert streamer.orders == {}
+    assert risk.open_client_order_ids() == []
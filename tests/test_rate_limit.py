@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from decimal import Decimal
+from typing import Dict, List, Tuple
+
+from okx_trader.execution import OkxRestClient, OrderRequest
+from okx_trader.rate_limit import (
+    ACCOUNT,
+    AMEND_PATH,
+    BATCH_ORDERS_PATH,
+    CANCEL_PATH,
+    ORDER_PATH,
+    RATE_LIMITED_CODE,
+    RateLimit,
+    RateLimiter,
+    RequestScheduler,
+)
+from tests.mock_server import MockOkxServer
+
+# OKX_RATE_LIMITS shape with a short window, so a burst spans several windows in well under a second.
+LIMITS: Dict[str, RateLimit] = {
+    ORDER_PATH: RateLimit(10, window=0.2),
+    BATCH_ORDERS_PATH: RateLimit(30, window=0.2, per_order=True),
+    AMEND_PATH: RateLimit(10, window=0.2),
+    CANCEL_PATH: RateLimit(10, window=0.2),
+    ACCOUNT: RateLimit(50, window=0.2, per_instrument=False, per_order=True),
+}
+
+
+def _orders(count: int, instruments: int = 3) -> List[OrderRequest]:
+    price = Decimal("30000.1")
+    return [
+        OrderRequest(f"SYN{idx % instruments}-USDT", "buy", Decimal("0.01"), price, client_order_id=f"o{idx}")
+        for idx in range(count)
+    ]
+
+
+def test_scheduled_burst_is_never_throttled_by_the_exchange():
+    async def run():
+        async with MockOkxServer(rate_limits=LIMITS) as server:
+            client = OkxRestClient("key", "secret", "pass", base_url=server.rest_url)
+            scheduler = await RequestScheduler(client, RateLimiter(LIMITS, headroom=0.9)).start()
+            orders = _orders(240)
+            placed = [asyncio.ensure_future(scheduler.place_order(order)) for order in orders]
+            cancels = [asyncio.ensure_future(scheduler.cancel_order(order.instrument_id, "1")) for order in orders[:30]]
+            results = await asyncio.gather(*placed, *cancels)
+            await scheduler.close()
+            await client.close()
+            return server, scheduler, orders, results
+
+    server, scheduler, orders, results = asyncio.run(run())
+    assert server.rate_limited == 0
+    assert scheduler.metrics.rate_limited == 0
+    assert all(result["code"] == "0" for result in results)
+    placed = [order["clOrdId"] for order in server.rest_orders if "clOrdId" in order]
+    assert sorted(placed) == sorted(order.client_order_id for order in orders)
+    assert [result["data"][0]["clOrdId"] for result in results[: len(orders)]] == [o.client_order_id for o in orders]
+
+
+class _ThrottlingClient:
+    """Answers batch calls from a script of (code, sCodes), reporting entries in reverse order."""
+
+    pool_size = 4
+
+    def __init__(self, script) -> None:
+        self.script = list(script)
+        self.batches: List[List[str]] = []
+
+    async def place_batch_orders(self, orders: List[OrderRequest]) -> Dict:
+        self.batches.append([order.client_order_id for order in orders])
+        code, s_codes = self.script.pop(0) if self.script else ("0", None)
+        entries = [
+            {"clOrdId": order.client_order_id, "ordId": f"id-{order.client_order_id}", "sCode": s_code, "sMsg": ""}
+            for order, s_code in zip(orders, s_codes or ["0"] * len(orders))
+        ]
+        return {"code": code, "msg": "", "data": entries[::-1]}
+
+
+def _scheduled(client: _ThrottlingClient, orders: List[OrderRequest]):
+    async def run():
+        scheduler = await RequestScheduler(client, RateLimiter({}), coalesce_window=0.01).start()
+        results = await asyncio.gather(*(scheduler.place_order(order) for order in orders))
+        await scheduler.close()
+        return scheduler, results
+
+    return asyncio.run(run())
+
+
+def test_partly_throttled_batch_requeues_only_the_refused_orders():
+    orders = _orders(4, instruments=1)
+    client = _ThrottlingClient([("2", ["0", RATE_LIMITED_CODE, "0", RATE_LIMITED_CODE])])
+    scheduler, results = _scheduled(client, orders)
+    assert client.batches == [["o0", "o1", "o2", "o3"], ["o1", "o3"]]
+    assert scheduler.metrics.rate_limited == 1
+    assert [result["code"] for result in results] == ["0"] * 4
+    assert [result["data"][0]["ordId"] for result in results] == [f"id-o{idx}" for idx in range(4)]
+
+
+def test_throttled_batch_with_per_order_data_requeues_every_order():
+    orders = _orders(3, instruments=1)
+    client = _ThrottlingClient([(RATE_LIMITED_CODE, [RATE_LIMITED_CODE] * 3)])
+    scheduler, results = _scheduled(client, orders)
+    assert client.batches == [["o0", "o1", "o2"], ["o0", "o1", "o2"]]
+    assert [result["data"][0]["clOrdId"] for result in results] == ["o0", "o1", "o2"]
+    assert all(result["code"] == "0" for result in results)
+
+
+class _RecordingClient:
+    """Accepts everything and records which endpoint each order went out on."""
+
+    pool_size = 4
+
+    def __init__(self) -> None:
+        self.calls: List[Tuple[str, List[str], float]] = []
+
+    def _ack(self, path: str, orders: List[OrderRequest]) -> Dict:
+        self.calls.append((path, [order.client_order_id for order in orders], time.monotonic()))
+        data = [{"clOrdId": order.client_order_id, "ordId": "1", "sCode": "0", "sMsg": ""} for order in orders]
+        return {"code": "0", "msg": "", "data": data}
+
+    async def place_order(self, order: OrderRequest) -> Dict:
+        return self._ack(ORDER_PATH, [order])
+
+    async def place_batch_orders(self, orders: List[OrderRequest]) -> Dict:
+        return self._ack(BATCH_ORDERS_PATH, orders)
+
+
+def test_a_lone_order_waits_for_the_order_limit_instead_of_going_out_as_a_batch():
+    limits = {ORDER_PATH: RateLimit(1, window=0.2), BATCH_ORDERS_PATH: RateLimit(30, window=0.2, per_order=True)}
+    client = _RecordingClient()
+
+    async def run():
+        scheduler = await RequestScheduler(client, RateLimiter(limits, headroom=1.0)).start()
+        first, second = _orders(2, instruments=1)
+        started = time.monotonic()
+        await scheduler.place_order(first)
+        await scheduler.place_order(second)
+        await scheduler.close()
+        return started
+
+    started = asyncio.run(run())
+    assert [(path, ids) for path, ids, _ in client.calls] == [(ORDER_PATH, ["o0"]), (ORDER_PATH, ["o1"])]
+    assert client.calls[1][2] - started >= 0.15
+
+
+def test_a_partly_available_batch_bucket_never_sends_a_one_order_batch():
+    # Room for one more batched order on SYN0: that order waits for the single-order limit instead.
+    limits = {ORDER_PATH: RateLimit(1, window=0.2), BATCH_ORDERS_PATH: RateLimit(1, window=0.2, per_order=True)}
+    client = _RecordingClient()
+    orders = _orders(3, instruments=1)
+
+    async def run():
+        scheduler = await RequestScheduler(client, RateLimiter(limits, headroom=1.0), coalesce_window=0.01).start()
+        await asyncio.gather(*(scheduler.place_order(order) for order in orders))
+        await scheduler.close()
+
+    asyncio.run(run())
+    assert all(path == ORDER_PATH or len(ids) > 1 for path, ids, _ in client.calls)
+    assert sorted(order_id for _, ids, _ in client.calls for order_id in ids) == ["o0", "o1", "o2"]
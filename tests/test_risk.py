@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from decimal import Decimal
+
+from okx_trader.execution import OrderRequest
+from okx_trader.risk import RiskManager
+
+LINEAR = {"instId": "BTC-USDT-SWAP", "instType": "SWAP", "ctVal": "0.01", "ctValCcy": "BTC", "ctType": "linear"}
+INVERSE = {"instId": "BTC-USD-SWAP", "instType": "SWAP", "ctVal": "100", "ctValCcy": "USD", "ctType": "inverse"}
+
+
+def _risk(**options) -> RiskManager:
+    risk = RiskManager(max_daily_loss=0.05, max_position_size=5, max_latency_ms=500, **options)
+    risk.add_instrument(LINEAR)
+    risk.add_instrument(INVERSE)
+    return risk
+
+
+def _fill(instrument_id: str, side: str, size: str, price: str, fee: str = "0", fee_ccy: str = "USDT") -> dict:
+    return {
+        "instId": instrument_id,
+        "side": side,
+        "fillSz": size,
+        "fillPx": price,
+        "fillFee": fee,
+        "fillFeeCcy": fee_ccy,
+    }
+
+
+def test_linear_swap_fills_are_converted_from_contracts():
+    risk = _risk()
+    risk.on_order_update(_fill("BTC-USDT-SWAP", "buy", "100", "30000", "-0.6"))
+    risk.on_order_update(_fill("BTC-USDT-SWAP", "sell", "100", "30100", "-0.6"))
+    position = risk.positions["BTC-USDT-SWAP"]
+    assert position.position == 0
+    assert position.realized == Decimal("100")
+    assert position.fees == Decimal("1.2")
+    assert risk.total_pnl == Decimal("98.8")
+
+
+def test_inverse_swap_is_sized_by_its_quote_value():
+    risk = _risk()
+    risk.on_order_update(_fill("BTC-USD-SWAP", "buy", "10", "25000", fee_ccy="BTC"))
+    assert risk.positions["BTC-USD-SWAP"].position == Decimal("0.04")
+
+
+def test_contract_orders_are_checked_in_base_units_and_notional():
+    risk = _risk(max_order_notional=10_000)
+    # 400 contracts of 0.01 BTC: 4 BTC, below the 5 BTC cap but 120k USDT of notional.
+    order = OrderRequest("BTC-USDT-SWAP", "buy", Decimal("400"), Decimal("30000"), client_order_id="a")
+    assert risk.check_order(order) == "order_notional"
+    small = OrderRequest("BTC-USDT-SWAP", "buy", Decimal("30"), Decimal("30000"), client_order_id="b")
+    assert risk.check_order(small) is None
+    risk.track_order(small)
+    assert risk.positions["BTC-USDT-SWAP"].open_buy == Decimal("0.3")
+    risk.on_order_update({**_fill("BTC-USDT-SWAP", "buy", "10", "30000"), "clOrdId": "b", "state": "partially_filled"})
+    assert risk.positions["BTC-USDT-SWAP"].open_buy == Decimal("0.2")
+    risk.on_order_closed("b")
+    assert risk.positions["BTC-USDT-SWAP"].open_buy == 0
+
+
+def test_exchange_position_in_contracts_matches_local_position():
+    risk = _risk()
+    risk.on_order_update(_fill("BTC-USDT-SWAP", "buy", "100", "30000"))
+    risk.on_position({"instId": "BTC-USDT-SWAP", "posSide": "net", "pos": "100", "avgPx": "30000"})
+    assert risk.position_corrections == 0
+    assert risk.positions["BTC-USDT-SWAP"].position == 1
+
+
+def test_spot_buy_fee_in_base_currency_is_booked_in_quote():
+    risk = _risk()
+    risk.on_order_update(_fill("BTC-USDT", "buy", "1", "30000", "-0.001", fee_ccy="BTC"))
+    risk.on_order_update(_fill("BTC-USDT", "sell", "1", "30000", "-30", fee_ccy="USDT"))
+    assert risk.positions["BTC-USDT"].fees == Decimal("60")
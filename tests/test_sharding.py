@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import time
+from decimal import Decimal
+from typing import List, Tuple
+
+from okx_trader.risk import RiskManager
+from okx_trader.sharding import SIGNALS, ShardCoordinator, WorkerLink
+from okx_trader.strategies import OrderSignal
+
+BATCHES = 20
+
+
+def _signal(idx: int, reason: str = "test") -> OrderSignal:
+    return OrderSignal("buy", Decimal("0.01"), Decimal(30000 + idx), reason)
+
+
+async def emit_batches(link: WorkerLink, instrument_ids: List[str]) -> None:
+    for idx in range(BATCHES):
+        for instrument_id in instrument_ids:
+            await link.route(instrument_id, [_signal(idx)], 1, None)
+
+
+def test_a_slow_instrument_does_not_hold_up_the_others():
+    routed: List[Tuple[str, int, float]] = []
+
+    async def route(instrument_id, signals, latency_ms, top) -> None:
+        if instrument_id == "SLOW-USDT":
+            await asyncio.sleep(0.02)
+        for signal in signals:
+            routed.append((instrument_id, int(signal.price) - 30000, time.monotonic()))
+
+    async def run():
+        risk = RiskManager(max_daily_loss=0.05, max_position_size=5, max_latency_ms=500)
+        coordinator = ShardCoordinator(emit_batches, [["SLOW-USDT", "FAST-USDT"]], risk).start()
+        await coordinator.run(route)
+        await coordinator.close()
+
+    asyncio.run(run())
+    for instrument_id in ("SLOW-USDT", "FAST-USDT"):
+        assert [idx for name, idx, _ in routed if name == instrument_id] == list(range(BATCHES))
+    fast_done = max(at for name, _, at in routed if name == "FAST-USDT")
+    slow_done = max(at for name, _, at in routed if name == "SLOW-USDT")
+    assert fast_done < slow_done - 0.1
+
+
+def test_a_lane_keeps_only_the_newest_batches_of_a_slow_instrument():
+    routed: List[Tuple[str, int]] = []
+
+    async def route(instrument_id, signals, latency_ms, top) -> None:
+        if instrument_id == "SLOW-USDT":
+            await asyncio.sleep(0.02)
+        routed.extend((instrument_id, int(signal.price) - 30000) for signal in signals)
+
+    async def run() -> ShardCoordinator:
+        risk = RiskManager(max_daily_loss=0.05, max_position_size=5, max_latency_ms=500)
+        coordinator = ShardCoordinator(emit_batches, [["SLOW-USDT", "FAST-USDT"]], risk, lane_size=4).start()
+        await coordinator.run(route)
+        await coordinator.close()
+        return coordinator
+
+    coordinator = asyncio.run(run())
+    slow = [idx for name, idx in routed if name == "SLOW-USDT"]
+    assert slow == sorted(slow) and slow[-1] == BATCHES - 1
+    assert len(slow) < BATCHES
+    # Every batch is either routed or counted as dropped.
+    assert coordinator.stats[0].dropped == 2 * BATCHES - len(routed)
+
+
+def test_route_does_not_block_on_a_full_pipe():
+    parent, child = multiprocessing.Pipe()
+    link = WorkerLink(child, 0)
+    padding = "x" * 10_000
+
+    async def burst() -> float:
+        started = time.perf_counter()
+        for idx in range(100):
+            await link.route("BTC-USDT", [_signal(idx, padding)], 1, None)
+        return time.perf_counter() - started
+
+    # 1 MB of batches against a pipe buffer of a few dozen kB that nobody reads yet.
+    assert asyncio.run(burst()) < 0.5
+    received = [parent.recv() for _ in range(100)]
+    assert [message[0] for message in received] == [SIGNALS] * 100
+    assert [int(message[3][0].price) - 30000 for message in received] == list(range(100))
+    parent.close()
+    child.close()
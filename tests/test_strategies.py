@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import List
+
+import pytest
+
+from okx_trader.features import FeatureSnapshot
+from okx_trader.orderbook import OrderBook
+from okx_trader.strategies import (
+    BEST_PRICE,
+    STRATEGIES,
+    FeatureThreshold,
+    OrderSignal,
+    Strategy,
+    StrategyEngine,
+    StrategyParams,
+    StrategyUnits,
+    Timer,
+    create_strategy,
+)
+
+INSTRUMENT = "BTC-USDT"
+
+
+def _book(bid: str = "100", ask: str = "101") -> OrderBook:
+    book = OrderBook(INSTRUMENT)
+    book.apply_snapshot([[bid, "1", "0", "1"]], [[ask, "1", "0", "1"]])
+    return book
+
+
+def _features(ofi: str = "0", wmp: str = "0") -> FeatureSnapshot:
+    zero = Decimal("0")
+    return FeatureSnapshot(Decimal(ofi), Decimal(wmp), liquidity_vacuum=zero, bid_pressure=zero, ask_pressure=zero)
+
+
+class _Probe(Strategy):
+    def __init__(self, name: str, triggers: tuple, woken: List[str]) -> None:
+        self.name = name
+        self.triggers = triggers
+        self.woken = woken
+
+    def on_tick(self, context, signals: List[OrderSignal]) -> None:
+        self.woken.append(self.name)
+
+
+def _engine(*plugins: Strategy) -> StrategyEngine:
+    return StrategyEngine(False, False, False, plugins=plugins)
+
+
+def test_best_price_trigger_fires_only_when_the_touch_moves():
+    woken: List[str] = []
+    engine = _engine(_Probe("touch", (BEST_PRICE,), woken))
+    features = _features()
+    engine.generate_signals(_book(), features, now_ns=1)
+    engine.generate_signals(_book(), features, now_ns=2)
+    engine.generate_signals(_book(ask="100.5"), features, now_ns=3)
+    engine.generate_signals(_book(bid="99"), features, now_ns=4)
+    assert woken == ["touch"] * 3
+    assert engine.stats["touch"].wakes == 3
+
+
+def test_feature_thresholds_fire_above_the_threshold_and_on_magnitude_when_absolute():
+    woken: List[str] = []
+    engine = _engine(
+        _Probe("ofi_up", (FeatureThreshold("ofi", Decimal("2")),), woken),
+        _Probe("ofi_abs", (FeatureThreshold("ofi", Decimal("2"), absolute=True),), woken),
+        _Probe("ofi_high", (FeatureThreshold("ofi", Decimal("5")),), woken),
+    )
+    expected = {
+        "1": [],
+        "2": [],
+        "3": ["ofi_up", "ofi_abs"],
+        "-3": ["ofi_abs"],
+        "6": ["ofi_up", "ofi_abs", "ofi_high"],
+        "-6": ["ofi_abs"],
+    }
+    book = _book()
+    for ofi, names in expected.items():
+        woken.clear()
+        engine.generate_signals(book, _features(ofi=ofi), now_ns=1)
+        assert woken == names, ofi
+
+
+def test_timer_fires_once_per_interval_of_tick_time():
+    woken: List[str] = []
+    engine = _engine(_Probe("timer", (Timer(100),), woken))
+    book, features = _book(), _features()
+    for now_ns in (1_000, 1_050, 1_099, 1_100, 1_150, 1_350, 1_400, 1_449):
+        engine.generate_signals(book, features, now_ns=now_ns)
+    # The first tick starts the period: fires at 1_100, then 1_350 (>= 1_200), then not again before 1_450.
+    assert engine.stats["timer"].wakes == 2
+
+
+def test_woken_strategies_run_in_registration_order():
+    woken: List[str] = []
+    engine = _engine(
+        _Probe("timer", (Timer(1),), woken),
+        _Probe("threshold", (FeatureThreshold("wmp", Decimal("0")),), woken),
+        _Probe("touch", (BEST_PRICE,), woken),
+        _Probe("quiet", (FeatureThreshold("wmp", Decimal("100")),), woken),
+    )
+    engine.generate_signals(_book(), _features(wmp="1"), now_ns=1)
+    engine.generate_signals(_book(bid="99"), _features(wmp="1"), now_ns=5)
+    assert woken == ["threshold", "touch", "timer", "threshold", "touch"]
+
+
+def test_strategies_load_by_module_and_name():
+    units = StrategyUnits(StrategyParams(), None, 25, 1000)
+    with pytest.raises(ValueError):
+        create_strategy("echo_bid_missing", units)
+    strategy = create_strategy("tests.plugin_strategy:echo_bid", units)
+    assert "echo_bid" in STRATEGIES and strategy.name == "echo_bid"
+    engine = StrategyEngine(False, False, False, strategies=["tests.plugin_strategy:echo_bid"])
+    signals = engine.generate_signals(_book(), _features(), now_ns=1)
+    assert [(signal.reason, signal.price) for signal in signals] == [("echo_bid", Decimal("100"))]
+    with pytest.raises(ValueError):
+        StrategyEngine(False, False, False, strategies=["echo_bid"], plugins=[strategy])
+
+
+def test_market_making_requotes_only_on_a_touch_change_or_its_refresh_timer():
+    engine = StrategyEngine(False, False, True, quote_refresh_ms=1)
+    features = _features()
+    quotes = []
+    for now_ns, book in (
+        (0, _book()),
+        (100_000, _book()),
+        (200_000, _book(bid="100.5")),
+        (300_000, _book(bid="100.5")),
+        (1_000_000, _book(bid="100.5")),
+        (1_200_000, _book(bid="100.5")),
+    ):
+        signals = engine.generate_signals(book, features, now_ns=now_ns)
+        quotes.append([(signal.side, signal.price, signal.quote) for signal in signals])
+    both = [("buy", Decimal("100"), True), ("sell", Decimal("101"), True)]
+    moved = [("buy", Decimal("100.5"), True), ("sell", Decimal("101"), True)]
+    assert quotes == [both, [], moved, [], moved, []]
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from decimal import Decimal
+
+from benchmarks.synthetic import make_snapshot, make_updates
+from okx_trader.backtest import SimulatedFillModel
+from okx_trader.features import FeatureEngine
+from okx_trader.orderbook import OrderBook
+from okx_trader.recorder import FrameRecorder, read_frames
+from okx_trader.strategies import StrategyParams
+from okx_trader.sweep import (
+    HISTORY_COLUMNS,
+    NO_LATENCY,
+    BookHistory,
+    SweepSettings,
+    build_history,
+    evaluate,
+    format_table,
+    grid,
+    infer_codecs,
+    random_search,
+    run_sweep,
+)
+from tests.mock_server import build_book_frames
+
+INSTRUMENTS = ("BTC-USDT", "ETH-USDT")
+START_NS = 1_700_000_000_000_000_000
+MS = 1_000_000
+LEVELS = 40
+UPDATES = 600
+
+
+def _record(directory: str) -> dict:
+    """Interleaved recordings of two instruments, 1 ms apart, exchange ts 3 ms behind receive time."""
+    frames = {
+        instrument_id: build_book_frames(
+            instrument_id, make_snapshot(LEVELS, seed=seed), make_updates(UPDATES, LEVELS, seed=seed), START_NS // MS
+        )
+        for seed, instrument_id in enumerate(INSTRUMENTS, start=1)
+    }
+    recorder = FrameRecorder(directory)
+    recorder.start()
+    for idx in range(UPDATES + 1):
+        for offset, instrument_id in enumerate(INSTRUMENTS):
+            frame = frames[instrument_id][idx]
+            frame["data"][0]["ts"] = str(START_NS // MS + 2 * idx + offset - 3)
+            recorder.record(json.dumps(frame), START_NS + (2 * idx + offset) * MS)
+    recorder.stop()
+    return frames
+
+
+def _history(tmp_path) -> BookHistory:
+    recordings = str(tmp_path / "recordings")
+    frames = _record(recordings)
+    codecs = infer_codecs(read_frames(recordings), INSTRUMENTS)
+    history = asyncio.run(build_history(read_frames(recordings), str(tmp_path / "history"), codecs))
+    return frames, history
+
+
+def test_history_columns_decode_the_recording(tmp_path):
+    frames, history = _history(tmp_path)
+    assert history.instruments == sorted(INSTRUMENTS)
+    assert history.rows == len(INSTRUMENTS) * (UPDATES + 1)
+    assert set(history.columns) == set(HISTORY_COLUMNS)
+    rows = list(zip(*(history.columns[name] for name in HISTORY_COLUMNS)))
+    for instrument_id in INSTRUMENTS:
+        codec = history.codecs[instrument_id]
+        book = OrderBook(instrument_id, codec=codec)
+        engine = FeatureEngine(history.depth)
+        inst = history.instruments.index(instrument_id)
+        mine = [row for row in rows if row[2] == inst]
+        assert len(mine) == UPDATES + 1
+        for frame, (ts_ns, latency_ms, _, bid, bid_size, ask, ask_size, ofi, wmp) in zip(frames[instrument_id], mine):
+            payload = frame["data"][0]
+            if frame["action"] == "snapshot":
+                book.apply_snapshot(payload["bids"], payload["asks"])
+            else:
+                book.apply_update(payload["bids"], payload["asks"])
+            features = engine.compute(book)
+            assert latency_ms == 3 and latency_ms != NO_LATENCY
+            assert (bid, bid_size) == book.best_bid() and (ask, ask_size) == book.best_ask()
+            assert (ofi, wmp) == (features.ofi, features.wmp)
+    # A second open maps the same files instead of decoding again.
+    reopened = BookHistory(history.directory)
+    assert list(reopened.columns["ts_ns"]) == list(history.columns["ts_ns"])
+    reopened.close()
+    history.close()
+
+
+def test_grid_and_random_search_rank_the_same_results_as_a_direct_evaluation(tmp_path):
+    _, history = _history(tmp_path)
+    settings = SweepSettings(
+        enable_market_making=True,
+        fill_model=SimulatedFillModel(latency_ns=2 * MS, order_ttl_ns=50 * MS),
+    )
+    base = StrategyParams(liquidation_size=Decimal("0.1"), market_making_size=Decimal("0.05"))
+    param_sets = grid({"ofi_threshold": [2, 5, 20], "wmp_threshold": [0, 1]}, base=base)
+    assert len(param_sets) == 6
+    param_sets += random_search({"ofi_threshold": (1, 30)}, 3, seed=4, base=base)
+    assert random_search({"ofi_threshold": (1, 30)}, 3, seed=4, base=base) == param_sets[6:]
+    assert all(Decimal(1) <= params.ofi_threshold <= Decimal(30) for params in param_sets[6:])
+
+    direct = {json.dumps(params.to_dict()): evaluate(history, params, settings) for params in param_sets}
+    history.close()
+    results = run_sweep(history.directory, param_sets, settings, workers=2)
+    assert len(results) == len(param_sets)
+    assert [result.pnl for result in results] == sorted((result.pnl for result in results), reverse=True)
+    for result in results:
+        expected = direct[json.dumps(result.params)]
+        assert (result.pnl, result.fees, result.fills, result.orders) == (
+            expected.pnl, expected.fees, expected.fills, expected.orders
+        )
+    assert any(result.fills for result in results)
+    assert len({result.orders for result in results}) > 1
+    by_fills = run_sweep(history.directory, param_sets[:2], settings, workers=1, sort_by="fills")
+    assert by_fills[0].fills >= by_fills[1].fills
+    table = format_table(results, limit=3).splitlines()
+    assert len(table) == 2 + 3 and "ofi_threshold" in table[0]
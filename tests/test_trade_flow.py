@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from typing import List
+
+from benchmarks.synthetic import make_snapshot
+from okx_trader.features import FeatureEngine
+from okx_trader.orderbook import OrderBook
+from okx_trader.strategies import FeatureThreshold, OrderSignal, Strategy, StrategyEngine
+from okx_trader.trade_flow import LIQUIDATION_ORDERS, TRADES, TradeFlow, TradeFlowStreamer
+
+TS = 1_700_000_000_000
+
+
+def _liquidation(instrument_id: str, side: str, size: str, family: bool = True) -> dict:
+    entry = {"instId": instrument_id, "details": [{"side": side, "posSide": "net", "sz": size, "ts": str(TS)}]}
+    if family:
+        entry["instFamily"] = "-".join(instrument_id.split("-")[:2])
+    return {"arg": {"channel": LIQUIDATION_ORDERS, "instType": "SWAP"}, "data": [entry]}
+
+
+def _trade(instrument_id: str, side: str, size: str, ts: int = TS) -> dict:
+    entry = {"instId": instrument_id, "tradeId": "1", "px": "30000", "sz": size, "side": side, "ts": str(ts)}
+    return {"arg": {"channel": TRADES, "instId": instrument_id}, "data": [entry]}
+
+
+def test_swap_liquidations_reach_every_flow_of_the_family():
+    spot, swap, other = TradeFlow("BTC-USDT"), TradeFlow("BTC-USDT-SWAP"), TradeFlow("ETH-USDT")
+    streamer = TradeFlowStreamer({"BTC-USDT": spot, "BTC-USDT-SWAP": swap, "ETH-USDT": other})
+    streamer.on_message(_liquidation("BTC-USDT-SWAP", "buy", "3"))
+    streamer.on_message(_liquidation("BTC-USDT-SWAP", "sell", "1", family=False))
+    streamer.on_message(_liquidation("BTC-USD-SWAP", "sell", "5"))
+    assert streamer.liquidations == 2
+    for flow in (spot, swap):
+        assert flow.liquidations[0] == 2
+        assert flow.liquidation_volume(0) == 2.0
+    assert other.liquidations[0] == 0
+
+
+def test_snapshots_keep_the_flow_values_they_were_computed_with():
+    flow = TradeFlow("BTC-USDT")
+    streamer = TradeFlowStreamer({"BTC-USDT": flow})
+    engine = FeatureEngine(25, trade_flow=flow)
+    book = OrderBook("BTC-USDT", depth=400)
+    book.apply_snapshot(*make_snapshot(50))
+    streamer.on_message(_trade("BTC-USDT", "buy", "2"))
+    first = engine.compute(book)
+    streamer.on_message(_trade("BTC-USDT", "sell", "5", TS + 10))
+    second = engine.compute(book)
+    assert (first.signed_volume, first.vwap, first.trade_intensity) == (2.0, 30000.0, 1.0)
+    assert (second.signed_volume, second.trade_intensity) == (-3.0, 2.0)
+
+
+class _FlowWatcher(Strategy):
+    name = "flow_watcher"
+    triggers = (FeatureThreshold("signed_volume", 1.5, absolute=True),)
+
+    def __init__(self) -> None:
+        self.seen: List[float] = []
+
+    def on_tick(self, context, signals: List[OrderSignal]) -> None:
+        self.seen.append(context.features.signed_volume)
+
+
+def test_flow_fields_drive_feature_thresholds():
+    flow = TradeFlow("BTC-USDT")
+    streamer = TradeFlowStreamer({"BTC-USDT": flow})
+    features = FeatureEngine(25, trade_flow=flow)
+    watcher = _FlowWatcher()
+    strategies = StrategyEngine(False, False, False, plugins=[watcher])
+    book = OrderBook("BTC-USDT", depth=400)
+    book.apply_snapshot(*make_snapshot(50))
+    strategies.generate_signals(book, features.compute(book), now_ns=1)
+    streamer.on_message(_trade("BTC-USDT", "buy", "1"))
+    strategies.generate_signals(book, features.compute(book), now_ns=2)
+    streamer.on_message(_trade("BTC-USDT", "sell", "3", TS + 10))
+    strategies.generate_signals(book, features.compute(book), now_ns=3)
+    assert watcher.seen == [-2.0]
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from decimal import Decimal
+
+import pytest
+
+from benchmarks.synthetic import make_snapshot, make_updates
+from okx_trader.features import FeatureEngine
+from okx_trader.fixed_point import FixedPointCodec
+from okx_trader.orderbook import OrderBook
+from okx_trader.strategies import StrategyEngine, StrategyParams
+from okx_trader.vector_features import VectorFeatureEngine
+
+pytest.importorskip("numpy")
+
+CODEC = FixedPointCodec(tick_size=Decimal("0.1"), lot_size=Decimal("0.0001"))
+DEPTH = 25
+TICKS = 1500
+
+
+def _run(codec):
+    book = OrderBook("BTC-USDT", depth=400, codec=codec)
+    book.apply_snapshot(*make_snapshot(400))
+    scalar, vector = FeatureEngine(DEPTH), VectorFeatureEngine(DEPTH)
+    for bids, asks in make_updates(TICKS, 400):
+        book.apply_update(bids, asks)
+        yield book, scalar.compute(book), vector.compute(book)
+
+
+def _core(snapshot):
+    return snapshot.ofi, snapshot.wmp, snapshot.liquidity_vacuum, snapshot.bid_pressure, snapshot.ask_pressure
+
+
+def test_decimal_book_matches_feature_engine():
+    for _, expected, got in _run(None):
+        for value, want in zip(_core(got), _core(expected)):
+            assert value == pytest.approx(float(want), rel=1e-9, abs=1e-9)
+
+
+def test_fixed_point_book_matches_feature_engine_units():
+    for _, expected, got in _run(CODEC):
+        assert _core(got) == _core(expected)
+
+
+def test_fixed_point_strategy_thresholds_fire_the_same_with_either_engine():
+    params = StrategyParams(ofi_threshold=Decimal("2"), wmp_threshold=Decimal("0.5"))
+
+    def engine():
+        return StrategyEngine(True, True, False, codec=CODEC, params=params, feature_depth=DEPTH)
+
+    scalar_strategies, vector_strategies = engine(), engine()
+    fired = 0
+    for tick, (book, expected, got) in enumerate(_run(CODEC)):
+        want = scalar_strategies.generate_signals(book, expected, tick)
+        signals = vector_strategies.generate_signals(book, got, tick)
+        assert [(s.reason, s.side, s.size, s.price) for s in signals] == [
+            (s.reason, s.side, s.size, s.price) for s in want
+        ]
+        fired += any(s.reason == "funding_arbitrage" for s in want)
+    assert 0 < fired < TICKS
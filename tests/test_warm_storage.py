@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+from okx_trader.warm_storage import FEATURES, FakeRedisBackend, RedisProtocolBackend, WarmStorageWriter
+
+
+class _StubRedis:
+    """Answers XADD/EXPIRE over RESP; ``truncate_next`` cuts the next pipeline's reply short and hangs up."""
+
+    def __init__(self) -> None:
+        self.added = 0
+        self.connections = 0
+        self.truncate_next = False
+        self.port = 0
+        self._server = None
+
+    async def start(self) -> "_StubRedis":
+        self._server = await asyncio.start_server(self._serve, "127.0.0.1", 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def close(self) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _command(self, reader: asyncio.StreamReader):
+        line = await reader.readline()
+        if not line:
+            return None
+        args = []
+        for _ in range(int(line[1:])):
+            length = int((await reader.readline())[1:])
+            args.append((await reader.readexactly(length + 2))[:-2])
+        return args
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            while True:
+                args = await self._command(reader)
+                if args is None:
+                    return
+                if self.truncate_next:
+                    self.truncate_next = False
+                    writer.write(b"$15\r\n1700000000000")
+                    await writer.drain()
+                    return
+                if args[0] == b"XADD":
+                    self.added += 1
+                    writer.write(b"$15\r\n1700000000000-0\r\n")
+                else:
+                    writer.write(b":1\r\n")
+                await writer.drain()
+        finally:
+            writer.close()
+
+
+def _snapshot() -> SimpleNamespace:
+    return SimpleNamespace(ofi=1.0, wmp=0.5, liquidity_vacuum=0.0, bid_pressure=2.0, ask_pressure=1.0)
+
+
+async def _flush_across_a_drop():
+    stub = await _StubRedis().start()
+    backend = RedisProtocolBackend("127.0.0.1", stub.port, reconnect_delay=0.0)
+    writer = WarmStorageWriter(backend, batch_size=4, flush_interval=0.01)
+    await writer.start()
+    try:
+        for _ in range(4):
+            writer.write_features("BTC-USDT", _snapshot())
+        await writer.flush()
+        stub.truncate_next = True
+        for _ in range(4):
+            writer.write_features("BTC-USDT", _snapshot())
+        await writer.flush()
+        failed = writer.metrics.errors
+        for _ in range(4):
+            writer.write_features("BTC-USDT", _snapshot())
+        await writer.flush()
+    finally:
+        await writer.close()
+        await stub.close()
+    return stub, backend, writer, failed
+
+
+def test_flush_reconnects_after_a_reply_is_cut_short():
+    stub, backend, writer, failed = asyncio.run(_flush_across_a_drop())
+    assert failed == 4
+    assert writer.metrics.written == 8
+    assert writer.metrics.errors == 4
+    assert backend.reconnects == 1
+    assert stub.connections == 2
+    assert stub.added == 8
+
+
+def test_read_range_finds_records_that_sat_in_the_buffer():
+    async def run():
+        writer = WarmStorageWriter(FakeRedisBackend())
+        await writer.start()
+        # Written 5 s before it reaches the server: its stream id runs 5 s ahead of its own ts.
+        ts_ns = time.time_ns() - 5_000_000_000
+        writer.write_features("BTC-USDT", _snapshot(), ts_ns=ts_ns)
+        await writer.flush()
+        records = await writer.read_range(FEATURES, "BTC-USDT", ts_ns - 1, ts_ns + 1)
+        await writer.close()
+        return ts_ns, records
+
+    ts_ns, records = asyncio.run(run())
+    assert [record["ts_ns"] for record in records] == [ts_ns]